@@ -0,0 +1,189 @@
+"""
+Annotation Index for AudioBrowser QML
+
+Keeps the notes of one file (one annotation set, the merged view of all
+visible sets, or a legacy per-file list) sorted by timestamp next to a
+parallel array of timestamps, so playback-synchronized lookups are bisect
+searches instead of scans:
+- nearest annotation to a position (within a tolerance)
+- annotations whose timestamp falls in [start, end]
+- next / previous marker from a position
+
+New notes are inserted in place, which keeps the list sorted without
+re-sorting it after every edit.
+
+Per-file summaries (note, important and subsection counts, last edit) let
+list rows show their annotation badges without looking at the notes.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def note_time(note: Dict[str, Any]) -> int:
+    """Timestamp of a note in ms (QML notes use timestamp_ms, stored notes ms)."""
+    value = note.get("timestamp_ms", note.get("ms", 0))
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class AnnotationTimeline:
+    """
+    A timestamp-sorted list of notes with bisect lookups.
+
+    The list is used in place: a set's notes list stays the one stored in
+    the set, and is sorted (stably) on construction if it isn't already.
+    """
+
+    def __init__(self, notes: List[Dict[str, Any]]):
+        """
+        Index a list of notes.
+
+        Args:
+            notes: Notes of one file; sorted in place if needed
+        """
+        times = [note_time(note) for note in notes]
+        if any(a > b for a, b in zip(times, times[1:])):
+            notes.sort(key=note_time)
+            times.sort()
+        self.notes = notes
+        self._times = times
+        self._by_category: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._subsections: Optional[List[Dict[str, Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def indexes(self, notes: List[Dict[str, Any]]) -> bool:
+        """Whether this timeline is still valid for the given notes list."""
+        return notes is self.notes and len(notes) == len(self._times)
+
+    def insert(self, note: Dict[str, Any]) -> int:
+        """
+        Insert a note after any notes with the same timestamp.
+
+        Returns:
+            Index of the new note
+        """
+        t = note_time(note)
+        index = bisect_right(self._times, t)
+        self._times.insert(index, t)
+        self.notes.insert(index, note)
+        # Filtered views are rebuilt on their next use
+        self._by_category = None
+        self._subsections = None
+        return index
+
+    def nearest(self, timestamp_ms: int, tolerance_ms: Optional[int] = None) -> int:
+        """
+        Index of the note closest to timestamp_ms (the earlier one on a tie).
+
+        Args:
+            timestamp_ms: Position in milliseconds
+            tolerance_ms: Maximum distance, or None for no limit
+
+        Returns:
+            Note index, or -1 if there is no note within tolerance
+        """
+        times = self._times
+        if not times:
+            return -1
+        i = bisect_left(times, timestamp_ms)
+        best = -1
+        if i > 0:
+            best = i - 1
+            # Earliest of several notes sharing the closest earlier timestamp
+            best = bisect_left(times, times[best])
+        if i < len(times) and (best < 0 or times[i] - timestamp_ms < timestamp_ms - times[best]):
+            best = i
+        if tolerance_ms is not None and abs(times[best] - timestamp_ms) > tolerance_ms:
+            return -1
+        return best
+
+    def range_indexes(self, start_ms: int, end_ms: int) -> Tuple[int, int]:
+        """Slice bounds of the notes with start_ms <= timestamp <= end_ms."""
+        lo = bisect_left(self._times, start_ms)
+        hi = bisect_right(self._times, end_ms)
+        return lo, max(lo, hi)
+
+    def in_range(self, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+        """Notes with start_ms <= timestamp <= end_ms, in time order."""
+        lo, hi = self.range_indexes(start_ms, end_ms)
+        return self.notes[lo:hi]
+
+    def next_index(self, timestamp_ms: int) -> int:
+        """Index of the first note after timestamp_ms, or -1."""
+        i = bisect_right(self._times, timestamp_ms)
+        return i if i < len(self._times) else -1
+
+    def previous_index(self, timestamp_ms: int) -> int:
+        """Index of the last note before timestamp_ms, or -1."""
+        return bisect_left(self._times, timestamp_ms) - 1
+
+    def by_category(self, category: str) -> List[Dict[str, Any]]:
+        """Notes in a category, in time order."""
+        if self._by_category is None:
+            self._by_category = {}
+            for note in self.notes:
+                self._by_category.setdefault(note.get("category", ""), []).append(note)
+        return list(self._by_category.get(category, []))
+
+    def subsections(self) -> List[Dict[str, Any]]:
+        """Subsection notes (with an end time), in time order."""
+        if self._subsections is None:
+            self._subsections = [note for note in self.notes if _is_subsection(note)]
+        return list(self._subsections)
+
+
+def _is_subsection(note: Dict[str, Any]) -> bool:
+    return bool(note.get("subsection", False)) and note.get("end_ms") is not None
+
+
+def new_summary() -> Dict[str, Any]:
+    """Summary of a file without annotations."""
+    return {"count": 0, "important": 0, "subsections": 0, "updated": ""}
+
+
+def add_to_summary(summary: Dict[str, Any], note: Dict[str, Any]) -> None:
+    """Count one note into a file's summary."""
+    summary["count"] += 1
+    if note.get("important", False):
+        summary["important"] += 1
+    if _is_subsection(note):
+        summary["subsections"] += 1
+    # ISO timestamps compare in time order; notes from other apps may have none
+    edited = note.get("updated_at") or note.get("created_at") or ""
+    if edited > summary["updated"]:
+        summary["updated"] = edited
+
+
+def summarize_notes(notes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary of one notes list."""
+    summary = new_summary()
+    for note in notes:
+        add_to_summary(summary, note)
+    return summary
+
+
+def summarize_sets(sets: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-file summaries of the notes in all visible annotation sets.
+
+    Returns:
+        Filename -> summary, for files with at least one note
+    """
+    summaries: Dict[str, Dict[str, Any]] = {}
+    for aset in sets:
+        if not aset.get("visible", True):
+            continue
+        for file_name, file_data in aset.get("files", {}).items():
+            if not isinstance(file_data, dict) or not file_data.get("notes"):
+                continue
+            summary = summaries.get(file_name)
+            if summary is None:
+                summary = summaries[file_name] = new_summary()
+            for note in file_data["notes"]:
+                add_to_summary(summary, note)
+    return summaries
@@ -12,15 +12,25 @@ import sys
 import json
 import uuid
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from datetime import datetime
-from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, pyqtProperty
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot, pyqtProperty
 
 # Add parent directory to path to import shared modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from shared.metadata_manager import MetadataManager
 
+from .annotation_index import (AnnotationTimeline, add_to_summary, new_summary,
+                               summarize_notes, summarize_sets)
+
+
+# Edits are written once no further edit has arrived for this long
+ANNOTATION_SAVE_DELAY_MS = 1000
+
+# With journaled saving, the journal is folded into the main file after this much idle time
+ANNOTATION_COMPACT_DELAY_MS = 30000
+
 
 class AnnotationManager(QObject):
     """
@@ -38,6 +48,17 @@ class AnnotationManager(QObject):
     - Automatic timestamp tracking
     - Multi-annotation sets with switching and merged view
     - Signal emissions for UI updates
+    - Timestamp index per notes list (and per file for the merged view):
+      nearest / range / next / previous lookups are bisect searches
+    - Per-file annotation summaries of the folder for list-row badges,
+      built once per set load and updated in place on edits
+    - Write-behind saving: edits mark the data dirty and are written
+      ANNOTATION_SAVE_DELAY_MS after the last one, and before switching
+      file, folder or user (call flushPendingSaves on exit)
+    - Optional journaled saving (setJournalEnabled): writes append the
+      changed files to a journal, compacted into the main file after
+      ANNOTATION_COMPACT_DELAY_MS idle and when switching folder or user
+      (call compactAnnotationSets on exit)
     """
     
     # Signals for state changes
@@ -52,6 +73,8 @@ class AnnotationManager(QObject):
     annotationSetsChanged = pyqtSignal()  # Emitted when annotation sets change
     currentSetChanged = pyqtSignal(str)  # Emitted when current set changes (set_id)
     showAllSetsChanged = pyqtSignal(bool)  # Emitted when show all sets toggle changes
+    saveStateChanged = pyqtSignal(bool)  # True while edits are waiting to be written
+    annotationSummaryChanged = pyqtSignal(str)  # File path whose annotation summary changed
     
     def __init__(self, parent=None):
         """Initialize the annotation manager."""
@@ -69,9 +92,35 @@ class AnnotationManager(QObject):
         self._current_set_id: Optional[str] = None  # ID of the currently active set
         self._show_all_sets: bool = False  # Whether to show annotations from all visible sets
         
+        # Timestamp indexes: id(notes list) -> timeline, and file name -> merged
+        # timeline of all visible sets
+        self._timelines: Dict[int, AnnotationTimeline] = {}
+        self._merged_timelines: Dict[str, AnnotationTimeline] = {}
+        
+        # Annotation summaries: file name -> summary of all visible sets
+        # (None until first asked for), and file path -> legacy file summary
+        self._summaries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._legacy_summaries: Dict[str, Dict[str, Any]] = {}
+        
+        # Set changes all emit annotationSetsChanged; views across sets are rebuilt
+        self.annotationSetsChanged.connect(self._drop_set_views)
+        
         # Initialize shared metadata manager
         self._metadata_manager = MetadataManager(username=self._current_user)
         
+        # Write-behind state: whether the sets file is dirty, and which
+        # legacy per-file annotation lists are
+        self._sets_dirty = False
+        self._dirty_files: Set[str] = set()
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(ANNOTATION_SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self.flushPendingSaves)
+        self._compact_timer = QTimer(self)
+        self._compact_timer.setSingleShot(True)
+        self._compact_timer.setInterval(ANNOTATION_COMPACT_DELAY_MS)
+        self._compact_timer.timeout.connect(self.compactAnnotationSets)
+        
     # ========== QML-accessible methods ==========
     
     @pyqtSlot(str)
@@ -83,6 +132,7 @@ class AnnotationManager(QObject):
             file_path: Path to the audio file
         """
         if file_path != self._current_file:
+            self.flushPendingSaves()
             self._current_file = file_path
             self.currentFileChanged.emit(file_path)
             
@@ -121,6 +171,8 @@ class AnnotationManager(QObject):
         Args:
             username: Username for annotation attribution
         """
+        # Pending edits belong to the previous user's file
+        self.compactAnnotationSets()
         self._current_user = username if username else "default_user"
         self._metadata_manager.set_username(self._current_user)
     
@@ -200,14 +252,21 @@ class AnnotationManager(QObject):
                 "notes": []
             }
         
-        # Add annotation to current set
-        current_set["files"][file_name]["notes"].append(annotation)
-        
-        # Sort by timestamp
-        current_set["files"][file_name]["notes"].sort(key=lambda a: a["timestamp_ms"])
+        # Add annotation to current set, keeping the notes in timestamp order
+        self._timeline_for(current_set["files"][file_name]["notes"]).insert(annotation)
+        if current_set.get("visible", True):
+            merged = self._merged_timelines.get(file_name)
+            if merged is not None:
+                merged.insert(self._tag_with_set(annotation, current_set))
+            if self._summaries is not None:
+                summary = self._summaries.get(file_name)
+                if summary is None:
+                    summary = self._summaries[file_name] = new_summary()
+                add_to_summary(summary, annotation)
+                self.annotationSummaryChanged.emit(self._current_file)
         
         # Save annotation sets to disk
-        self._save_annotation_sets()
+        self._schedule_sets_save()
         
         # Record in undo manager
         if self._undo_manager:
@@ -303,7 +362,7 @@ class AnnotationManager(QObject):
         annotations.sort(key=lambda a: a["timestamp_ms"])
         
         # Save to disk
-        self._save_annotations(self._current_file)
+        self._schedule_file_save(self._current_file)
         
         # Emit signals
         self.annotationUpdated.emit(self._current_file, index)
@@ -337,7 +396,7 @@ class AnnotationManager(QObject):
         del annotations[index]
         
         # Save to disk
-        self._save_annotations(self._current_file)
+        self._schedule_file_save(self._current_file)
         
         # Record in undo manager
         if self._undo_manager:
@@ -365,7 +424,7 @@ class AnnotationManager(QObject):
         for i, annotation in enumerate(annotations):
             if annotation.get('uid') == uid:
                 del annotations[i]
-                self._save_annotations(file_path)
+                self._schedule_file_save(file_path)
                 self.annotationsChanged.emit(file_path)
                 return True
         return False
@@ -384,7 +443,7 @@ class AnnotationManager(QObject):
         
         self._annotations[file_path].append(annotation.copy())
         self._annotations[file_path].sort(key=lambda a: a.get("timestamp_ms", 0))
-        self._save_annotations(file_path)
+        self._schedule_file_save(file_path)
         self.annotationsChanged.emit(file_path)
     
     def updateAnnotationField(self, file_path: str, uid: int, field: str, value: Any) -> bool:
@@ -413,7 +472,7 @@ class AnnotationManager(QObject):
                 if field == "timestamp_ms":
                     annotations.sort(key=lambda a: a.get("timestamp_ms", 0))
                 
-                self._save_annotations(file_path)
+                self._schedule_file_save(file_path)
                 self.annotationsChanged.emit(file_path)
                 return True
         return False
@@ -426,7 +485,7 @@ class AnnotationManager(QObject):
         
         if self._current_file in self._annotations:
             self._annotations[self._current_file].clear()
-            self._save_annotations(self._current_file)
+            self._schedule_file_save(self._current_file)
             self.annotationsChanged.emit(self._current_file)
     
     @pyqtSlot(result=list)
@@ -440,60 +499,10 @@ class AnnotationManager(QObject):
         Returns:
             List of annotation dictionaries
         """
-        if not self._current_file:
+        timeline = self._current_timeline()
+        if timeline is None:
             return []
-        
-        # Get filename from full path
-        file_name = Path(self._current_file).name
-        
-        # Check if we have annotation sets with data
-        has_annotation_sets = len(self._annotation_sets) > 0
-        
-        if self._show_all_sets and has_annotation_sets:
-            # Merged view: get annotations from all visible sets
-            all_annotations = []
-            for aset in self._annotation_sets:
-                if not aset.get("visible", True):
-                    continue
-                
-                # Get file data from this set
-                file_data = aset.get("files", {}).get(file_name, {})
-                notes = file_data.get("notes", [])
-                
-                # Add set name and color to each annotation
-                for note in notes:
-                    note_copy = note.copy()
-                    note_copy["_set_name"] = aset["name"]
-                    note_copy["_set_color"] = aset["color"]
-                    note_copy["_set_id"] = aset["id"]
-                    all_annotations.append(note_copy)
-            
-            # Sort by timestamp
-            all_annotations.sort(key=lambda a: a.get("timestamp_ms", 0))
-            
-            # If no annotations found in sets, fall back to legacy format
-            if not all_annotations:
-                return self._annotations.get(self._current_file, [])
-            
-            return all_annotations
-        elif has_annotation_sets and self._current_set_id:
-            # Single set view: get annotations from current set only
-            current_set = self._get_current_set_object()
-            if current_set:
-                file_data = current_set.get("files", {}).get(file_name, {})
-                annotations = file_data.get("notes", [])
-                
-                # If no annotations found in sets, fall back to legacy format
-                if not annotations:
-                    return self._annotations.get(self._current_file, [])
-                
-                return annotations
-            
-            # No current set found, fall back to legacy format
-            return self._annotations.get(self._current_file, [])
-        else:
-            # No annotation sets or not using sets, use legacy format
-            return self._annotations.get(self._current_file, [])
+        return list(timeline.notes)
     
     @pyqtSlot(int, result='QVariantMap')
     def getAnnotation(self, index: int) -> Dict[str, Any]:
@@ -577,26 +586,69 @@ class AnnotationManager(QObject):
     @pyqtSlot(int, result=int)
     def findAnnotationAtTime(self, timestamp_ms: int, tolerance_ms: int = 500) -> int:
         """
-        Find an annotation near the given timestamp.
+        Find the annotation nearest to the given timestamp.
         
         Args:
             timestamp_ms: Target timestamp in milliseconds
             tolerance_ms: Time tolerance in milliseconds
             
         Returns:
-            Index of the nearest annotation within tolerance, or -1 if none found
+            Index (into getAnnotations) of the nearest annotation within
+            tolerance, or -1 if none found
         """
-        if not self._current_file:
+        timeline = self._current_timeline()
+        if timeline is None:
             return -1
+        return timeline.nearest(timestamp_ms, tolerance_ms)
+    
+    @pyqtSlot(int, int, result=list)
+    def getAnnotationsInRange(self, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+        """
+        Get the annotations whose timestamp lies in [start_ms, end_ms].
         
-        annotations = self._annotations.get(self._current_file, [])
+        Args:
+            start_ms: Range start in milliseconds
+            end_ms: Range end in milliseconds (inclusive)
+            
+        Returns:
+            List of annotations in time order
+        """
+        timeline = self._current_timeline()
+        if timeline is None:
+            return []
+        return timeline.in_range(start_ms, end_ms)
+    
+    @pyqtSlot(int, result=int)
+    def findNextAnnotation(self, timestamp_ms: int) -> int:
+        """
+        Find the first annotation after a position (e.g. to jump to the next marker).
         
-        for i, annotation in enumerate(annotations):
-            time_diff = abs(annotation["timestamp_ms"] - timestamp_ms)
-            if time_diff <= tolerance_ms:
-                return i
+        Args:
+            timestamp_ms: Position in milliseconds
+            
+        Returns:
+            Index into getAnnotations, or -1 if there is none
+        """
+        timeline = self._current_timeline()
+        if timeline is None:
+            return -1
+        return timeline.next_index(timestamp_ms)
+    
+    @pyqtSlot(int, result=int)
+    def findPreviousAnnotation(self, timestamp_ms: int) -> int:
+        """
+        Find the last annotation before a position.
         
-        return -1
+        Args:
+            timestamp_ms: Position in milliseconds
+            
+        Returns:
+            Index into getAnnotations, or -1 if there is none
+        """
+        timeline = self._current_timeline()
+        if timeline is None:
+            return -1
+        return timeline.previous_index(timestamp_ms)
     
     @pyqtSlot(str, result=list)
     def filterByCategory(self, category: str) -> List[Dict[str, Any]]:
@@ -609,15 +661,14 @@ class AnnotationManager(QObject):
         Returns:
             List of matching annotations
         """
-        if not self._current_file:
+        timeline = self._current_timeline()
+        if timeline is None:
             return []
         
-        annotations = self._annotations.get(self._current_file, [])
-        
         if not category:
-            return annotations
+            return list(timeline.notes)
         
-        return [a for a in annotations if a.get("category") == category]
+        return timeline.by_category(category)
     
     @pyqtSlot(result=list)
     def getImportantAnnotations(self) -> List[Dict[str, Any]]:
@@ -633,10 +684,67 @@ class AnnotationManager(QObject):
         annotations = self._annotations.get(self._current_file, [])
         return [a for a in annotations if a.get("important", False)]
     
+    def getImportantFileNames(self) -> Optional[Set[str]]:
+        """
+        Get the names of files with important annotations in any visible set.
+        
+        Returns:
+            Set of filenames, or None in legacy mode (use
+            getAnnotationSummary per file instead)
+        """
+        summaries = self.getAnnotationSummaries()
+        if summaries is None:
+            return None
+        return {name for name, summary in summaries.items() if summary["important"]}
+    
+    def getAnnotationSummaries(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get the annotation summaries of the current folder's files.
+        
+        Built from all visible sets on first use after the sets load or
+        change, then kept up to date as annotations are added, so
+        FileListModel can badge each row with a dict lookup.
+        
+        Returns:
+            Filename -> {"count", "important", "subsections", "updated"}
+            for files with notes, or None in legacy mode
+        """
+        if len(self._annotation_sets) == 0:
+            return None
+        if self._summaries is None:
+            self._summaries = summarize_sets(self._annotation_sets)
+        return self._summaries
+    
+    @pyqtSlot(str, result='QVariantMap')
+    def getAnnotationSummary(self, file_path: str) -> Dict[str, Any]:
+        """
+        Get the annotation summary of one file.
+        
+        Args:
+            file_path: Path to the audio file
+            
+        Returns:
+            Dict with note count ("count"), important count ("important"),
+            subsection count ("subsections") and last edit ("updated", ISO
+            timestamp or empty if unknown)
+        """
+        summaries = self.getAnnotationSummaries()
+        if summaries is not None:
+            return dict(summaries.get(Path(file_path).name) or new_summary())
+        
+        # Legacy mode: summarize the per-file annotations once
+        summary = self._legacy_summaries.get(file_path)
+        if summary is None:
+            if file_path not in self._annotations:
+                self._load_annotations(file_path)
+            summary = summarize_notes(self._annotations.get(file_path, []))
+            self._legacy_summaries[file_path] = summary
+        return dict(summary)
+    
     def getImportantAnnotationsForFile(self, file_path: str) -> List[Dict[str, Any]]:
         """
         Get all important annotations for a specific file.
-        This is used by FileListModel to show important annotation indicator.
+        For a yes/no indicator, getAnnotationSummary is cheaper.
         
         Args:
             file_path: Path to the audio file
@@ -682,12 +790,11 @@ class AnnotationManager(QObject):
         Returns:
             List of subsection annotations
         """
-        if not self._current_file:
+        # Same notes as getAnnotations (respecting current set or merged view)
+        timeline = self._current_timeline()
+        if timeline is None:
             return []
-        
-        # Get all annotations (respecting current set or merged view)
-        annotations = self.getAnnotations()
-        return [a for a in annotations if a.get("subsection", False) and a.get("end_ms") is not None]
+        return timeline.subsections()
     
     @pyqtSlot(int, int, str, str)
     def addSubsection(self, start_ms: int, end_ms: int, label: str, note: str = "") -> None:
@@ -746,12 +853,98 @@ class AnnotationManager(QObject):
     @pyqtSlot(str)
     def saveAnnotations(self, file_path: str) -> None:
         """
-        Explicitly save annotations for a file.
+        Explicitly save annotations for a file (and any other pending edits).
         
         Args:
             file_path: Path to the audio file
         """
-        self._save_annotations(file_path)
+        self._dirty_files.add(file_path)
+        self.flushPendingSaves()
+    
+    @pyqtSlot(result=bool)
+    def hasUnsavedChanges(self) -> bool:
+        """Whether edits are waiting to be written to disk."""
+        return self._sets_dirty or bool(self._dirty_files)
+    
+    @pyqtSlot()
+    def flushPendingSaves(self) -> None:
+        """Write all pending annotation edits to disk now."""
+        self._save_timer.stop()
+        if not self.hasUnsavedChanges():
+            return
+        sets_dirty, self._sets_dirty = self._sets_dirty, False
+        dirty_files, self._dirty_files = self._dirty_files, set()
+        if sets_dirty:
+            self._save_annotation_sets()
+            if self._metadata_manager.is_journal_enabled():
+                self._compact_timer.start()
+        for file_path in sorted(dirty_files):
+            self._save_annotations(file_path)
+        self.saveStateChanged.emit(False)
+    
+    @pyqtSlot()
+    def compactAnnotationSets(self) -> None:
+        """Write pending edits and fold the annotation journal into the sets file."""
+        self.flushPendingSaves()
+        self._compact_timer.stop()
+        if self._current_directory and not self._metadata_manager.compact_annotation_sets(
+                self._current_directory, username=self._current_user):
+            self.errorOccurred.emit("Failed to compact annotation journal")
+    
+    @pyqtSlot(bool)
+    def setJournalEnabled(self, enabled: bool) -> None:
+        """
+        Save annotation sets through an append-only journal instead of full rewrites.
+        
+        Args:
+            enabled: Whether to journal annotation set saves
+        """
+        if enabled == self._metadata_manager.is_journal_enabled():
+            return
+        self.compactAnnotationSets()
+        self._metadata_manager.set_journal_enabled(enabled)
+        if enabled and self._current_directory:
+            # Give the metadata manager the on-disk state to diff against
+            self._metadata_manager.load_annotation_sets(self._current_directory, username=self._current_user)
+    
+    @pyqtSlot(result=bool)
+    def getJournalEnabled(self) -> bool:
+        """Whether annotation sets are saved through a journal."""
+        return self._metadata_manager.is_journal_enabled()
+    
+    @pyqtSlot()
+    def exportFolderStores(self) -> None:
+        """Write pending edits and bring the legacy files of changed folder stores up to date."""
+        self.compactAnnotationSets()
+        self._metadata_manager.export_dirty_folder_stores()
+    
+    @pyqtSlot(bool)
+    def setFolderStoreEnabled(self, enabled: bool) -> None:
+        """
+        Keep per-folder metadata in one .folder_store.json per folder.
+        
+        Applies to every backend reading metadata through the shared cache.
+        
+        Args:
+            enabled: Whether to use folder stores
+        """
+        if enabled == self._metadata_manager.is_folder_store_enabled():
+            return
+        # Legacy files must hold everything before they are read directly again
+        self.exportFolderStores()
+        self._metadata_manager.set_folder_store_enabled(enabled)
+    
+    @pyqtSlot(result=bool)
+    def getFolderStoreEnabled(self) -> bool:
+        """Whether per-folder metadata is kept in store files."""
+        return self._metadata_manager.is_folder_store_enabled()
+    
+    def _mark_dirty(self) -> None:
+        """Restart the idle timer after an edit; announce the first pending edit."""
+        was_dirty = self._save_timer.isActive()
+        self._save_timer.start()
+        if not was_dirty:
+            self.saveStateChanged.emit(True)
     
     # ========== Annotation Sets Management ==========
     
@@ -762,7 +955,14 @@ class AnnotationManager(QObject):
         Args:
             directory: Path to the current directory
         """
+        self.compactAnnotationSets()
+        if self._current_directory:
+            # Let other applications see this folder's changes
+            self._metadata_manager.export_folder_store(self._current_directory)
         self._current_directory = directory
+        if directory:
+            # Pick up files other applications changed while we were away
+            self._metadata_manager.sync_folder_store(Path(directory))
         self._load_annotation_sets()
     
     @pyqtSlot(result=list)
@@ -857,7 +1057,7 @@ class AnnotationManager(QObject):
         self._current_set_id = set_id
         
         # Save annotation sets
-        self._save_annotation_sets()
+        self._schedule_sets_save()
         
         # Emit signals
         self.annotationSetsChanged.emit()
@@ -877,7 +1077,7 @@ class AnnotationManager(QObject):
         for aset in self._annotation_sets:
             if aset["id"] == set_id:
                 aset["name"] = new_name.strip()
-                self._save_annotation_sets()
+                self._schedule_sets_save()
                 self.annotationSetsChanged.emit()
                 return
     
@@ -905,7 +1105,7 @@ class AnnotationManager(QObject):
             self.currentSetChanged.emit(self._current_set_id)
         
         # Save and notify
-        self._save_annotation_sets()
+        self._schedule_sets_save()
         self.annotationSetsChanged.emit()
         
         return True
@@ -922,7 +1122,7 @@ class AnnotationManager(QObject):
         for aset in self._annotation_sets:
             if aset["id"] == set_id:
                 aset["visible"] = visible
-                self._save_annotation_sets()
+                self._schedule_sets_save()
                 self.annotationSetsChanged.emit()
                 # If in merged view, reload annotations
                 if self._show_all_sets and self._current_file:
@@ -969,6 +1169,78 @@ class AnnotationManager(QObject):
         
         return None
     
+    # ========== Timestamp index ==========
+    
+    def _timeline_for(self, notes: List[Dict[str, Any]]) -> AnnotationTimeline:
+        """Get (building if needed) the timestamp index of a notes list."""
+        timeline = self._timelines.get(id(notes))
+        if timeline is None or not timeline.indexes(notes):
+            timeline = AnnotationTimeline(notes)
+            self._timelines[id(notes)] = timeline
+        return timeline
+    
+    def _forget_timeline(self, notes: Optional[List[Dict[str, Any]]]) -> None:
+        """Drop a notes list's index after the list or its notes were edited outside it."""
+        if notes is not None:
+            self._timelines.pop(id(notes), None)
+    
+    def _drop_set_views(self) -> None:
+        """Forget the merged timelines and summaries after the sets changed."""
+        self._merged_timelines.clear()
+        self._summaries = None
+    
+    def _tag_with_set(self, note: Dict[str, Any], aset: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a note labelled with its set, for the merged view."""
+        note_copy = note.copy()
+        note_copy["_set_name"] = aset["name"]
+        note_copy["_set_color"] = aset["color"]
+        note_copy["_set_id"] = aset["id"]
+        return note_copy
+    
+    def _merged_timeline(self, file_name: str) -> AnnotationTimeline:
+        """Get (building if needed) the merged index of a file's notes in all visible sets."""
+        timeline = self._merged_timelines.get(file_name)
+        if timeline is None:
+            merged = []
+            for aset in self._annotation_sets:
+                if not aset.get("visible", True):
+                    continue
+                file_data = aset.get("files", {}).get(file_name, {})
+                for note in file_data.get("notes", []):
+                    merged.append(self._tag_with_set(note, aset))
+            timeline = AnnotationTimeline(merged)
+            self._merged_timelines[file_name] = timeline
+        return timeline
+    
+    def _current_timeline(self) -> Optional[AnnotationTimeline]:
+        """
+        Index of the notes shown for the current file.
+        
+        If show_all_sets is True, that is the merged view of all visible sets;
+        otherwise the current set's notes. Falls back to the legacy per-file
+        annotations when the sets have none for the file.
+        """
+        if not self._current_file:
+            return None
+        
+        file_name = Path(self._current_file).name
+        timeline = None
+        if self._show_all_sets and self._annotation_sets:
+            timeline = self._merged_timeline(file_name)
+        elif self._annotation_sets and self._current_set_id:
+            current_set = self._get_current_set_object()
+            if current_set:
+                notes = current_set.get("files", {}).get(file_name, {}).get("notes")
+                if notes:
+                    timeline = self._timeline_for(notes)
+        
+        if timeline is None or len(timeline) == 0:
+            legacy = self._annotations.get(self._current_file)
+            if legacy is None:
+                return None
+            timeline = self._timeline_for(legacy)
+        return timeline
+    
     # ========== Internal methods ==========
     
     def _load_annotations(self, file_path: str) -> None:
@@ -997,11 +1269,29 @@ class AnnotationManager(QObject):
         
         # Sort by timestamp
         annotations.sort(key=lambda a: a.get("timestamp_ms", 0))
+        self._forget_timeline(self._annotations.get(file_path))
+        self._legacy_summaries.pop(file_path, None)
         self._annotations[file_path] = annotations
     
+    def _schedule_file_save(self, file_path: str) -> None:
+        """
+        Mark a file's annotations (legacy format) for the next write.
+        
+        Args:
+            file_path: Path to the audio file
+        """
+        if not file_path or file_path not in self._annotations:
+            return
+        # Every change to the list comes through here, so its index is rebuilt on next use
+        self._forget_timeline(self._annotations[file_path])
+        if self._legacy_summaries.pop(file_path, None) is not None:
+            self.annotationSummaryChanged.emit(file_path)
+        self._dirty_files.add(file_path)
+        self._mark_dirty()
+    
     def _save_annotations(self, file_path: str) -> None:
         """
-        Save annotations to disk for a file (legacy format).
+        Write annotations to disk for a file (legacy format).
         
         Args:
             file_path: Path to the audio file
@@ -1143,6 +1433,9 @@ class AnnotationManager(QObject):
     
     def _load_annotation_sets(self) -> None:
         """Load annotation sets from disk using shared metadata manager."""
+        # Indexes of the previous folder's sets
+        self._timelines.clear()
+        self._drop_set_views()
         if not self._current_directory:
             self._create_default_set()
             return
@@ -1177,6 +1470,13 @@ class AnnotationManager(QObject):
         if self._current_set_id:
             self.currentSetChanged.emit(self._current_set_id)
     
+    def _schedule_sets_save(self) -> None:
+        """Mark the annotation sets for the next write (see flushPendingSaves)."""
+        if not self._current_directory:
+            return
+        self._sets_dirty = True
+        self._mark_dirty()
+    
     def _save_annotation_sets(self) -> None:
         """Save annotation sets to disk in format compatible with original app using shared metadata manager."""
         if not self._current_directory:
@@ -1221,6 +1521,8 @@ class AnnotationManager(QObject):
                             cleaned_note["subsection"] = note["subsection"]
                         if note.get("subsection_note"):
                             cleaned_note["subsection_note"] = note["subsection_note"]
+                        if note.get("updated_at"):
+                            cleaned_note["updated_at"] = note["updated_at"]
                         
                         cleaned_files["notes"].append(cleaned_note)
                     
@@ -1268,7 +1570,7 @@ class AnnotationManager(QObject):
         
         self._annotation_sets = [default_set]
         self._current_set_id = set_id
-        self._save_annotation_sets()
+        self._schedule_sets_save()
     
     def _convert_legacy_to_multi_set(self, legacy_data: Dict) -> None:
         """
@@ -1292,4 +1594,4 @@ class AnnotationManager(QObject):
         
         self._annotation_sets = [new_set]
         self._current_set_id = set_id
-        self._save_annotation_sets()
+        self._schedule_sets_save()
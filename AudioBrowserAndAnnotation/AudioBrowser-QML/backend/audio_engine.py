@@ -54,6 +54,7 @@ class AudioEngine(QObject):
         self._volume = 100
         self._playback_speed = 1.0
         self._autoplay_pending = False  # Flag to track if we should play after loading
+        self._seek_pending: Optional[int] = None  # Position to seek to once loaded
         
         # Channel control state
         self._channel_mode = "stereo"  # "stereo", "left", "right", "mono"
@@ -99,6 +100,7 @@ class AudioEngine(QObject):
             
             self._current_file = path
             self._autoplay_pending = False  # Reset autoplay flag when explicitly loading
+            self._seek_pending = None
             self._player.setSource(QUrl.fromLocalFile(str(path)))
             self.currentFileChanged.emit(str(path))
             logger.debug(f"Audio file loaded successfully: {path.name}")
@@ -127,6 +129,7 @@ class AudioEngine(QObject):
             
             self._current_file = path
             self._autoplay_pending = True  # Set flag to play when loaded
+            self._seek_pending = None
             self._player.setSource(QUrl.fromLocalFile(str(path)))
             self.currentFileChanged.emit(str(path))
             logger.debug(f"Audio file loaded with autoplay: {path.name}")
@@ -137,6 +140,25 @@ class AudioEngine(QObject):
             self.errorOccurred.emit(error_msg)
             self._autoplay_pending = False
     
+    @pyqtSlot(str, int)
+    def loadAndPlayAt(self, file_path: str, position_ms: int) -> None:
+        """
+        Load an audio file and play it from a position once loaded.
+        
+        Args:
+            file_path: Path to the audio file
+            position_ms: Start position in milliseconds
+        """
+        if self._current_file == Path(file_path) and self._player.mediaStatus() in (
+                QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.BufferedMedia,
+                QMediaPlayer.MediaStatus.EndOfMedia):
+            self.seek(position_ms)
+            self.play()
+            return
+        self.loadAndPlay(file_path)
+        if self._autoplay_pending:
+            self._seek_pending = max(0, position_ms)
+    
     @pyqtSlot()
     def play(self) -> None:
         """Start or resume playback."""
@@ -383,6 +405,9 @@ class AudioEngine(QObject):
         self.mediaStatusChanged.emit(status_str)
         
         # Auto-play when media is loaded if requested
+        if status == QMediaPlayer.MediaStatus.LoadedMedia and self._seek_pending is not None:
+            self._player.setPosition(self._seek_pending)
+            self._seek_pending = None
         if status == QMediaPlayer.MediaStatus.LoadedMedia and self._autoplay_pending:
             self._autoplay_pending = False
             self.play()
@@ -0,0 +1,566 @@
+"""
+Audio Ingest Pipeline for AudioBrowser QML
+
+Decodes each audio file exactly once and fans the samples out to every
+consumer that needs them:
+- Waveform peaks (handed to the WaveformEngine cache)
+- All registered fingerprint algorithms (.audio_fingerprints.json)
+- Duration (.duration_cache.json)
+- Loudness and spectrogram summaries (.audio_analysis.json)
+
+Opening a new folder therefore costs one decode per file instead of one
+decode per consumer. Files whose persisted outputs are all up to date are
+skipped without decoding.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QThread
+
+# Import shared metadata constants
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import metadata_cache
+from shared.metadata_constants import ANALYSIS_JSON, DURATIONS_JSON
+
+from .fingerprint_engine import (
+    CHECKPOINT_EVERY_FILES,
+    CHECKPOINT_INTERVAL_SECONDS,
+    FINGERPRINT_ALGORITHMS,
+    HAVE_NUMPY,
+    compute_multiple_fingerprints,
+    load_fingerprint_cache,
+    merge_fingerprint_entries,
+)
+from .waveform_engine import WAVEFORM_COLUMNS, compute_waveform_peaks, decode_audio_array
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+# Constants
+SPECTRUM_BANDS = 32
+SPECTRUM_FFT_SIZE = 2048
+SILENCE_DBFS = -120.0
+
+
+# ========== Analysis functions ==========
+
+def _to_dbfs(value: float) -> float:
+    """Convert a linear amplitude (0..1) to dBFS, clamped at SILENCE_DBFS."""
+    if value <= 0.0:
+        return SILENCE_DBFS
+    if HAVE_NUMPY:
+        return max(SILENCE_DBFS, float(20.0 * np.log10(value)))
+    import math
+    return max(SILENCE_DBFS, 20.0 * math.log10(value))
+
+
+def compute_loudness(samples) -> Dict[str, float]:
+    """
+    Compute simple loudness statistics for mono samples.
+
+    Returns:
+        Dictionary with rms_dbfs, peak_dbfs and crest_db
+    """
+    if samples is None or len(samples) == 0:
+        return {"rms_dbfs": SILENCE_DBFS, "peak_dbfs": SILENCE_DBFS, "crest_db": 0.0}
+
+    if HAVE_NUMPY:
+        arr = np.asarray(samples, dtype=np.float32)
+        rms = float(np.sqrt(np.mean(arr.astype(np.float64) ** 2)))
+        peak = float(np.max(np.abs(arr)))
+    else:
+        rms = (sum(s * s for s in samples) / len(samples)) ** 0.5
+        peak = max(abs(s) for s in samples)
+
+    rms_db = _to_dbfs(rms)
+    peak_db = _to_dbfs(peak)
+    return {
+        "rms_dbfs": round(rms_db, 2),
+        "peak_dbfs": round(peak_db, 2),
+        "crest_db": round(peak_db - rms_db, 2),
+    }
+
+
+def compute_spectrum_summary(samples, sr: int, bands: int = SPECTRUM_BANDS) -> Dict[str, Any]:
+    """
+    Summarize the long-term spectrum of mono samples.
+
+    Averages the power spectrum over non-overlapping frames and folds it into
+    log-spaced bands between 40 Hz and Nyquist.
+
+    Returns:
+        Dictionary with band_edges_hz, band_db and centroid_hz (empty if numpy is unavailable)
+    """
+    if not HAVE_NUMPY or samples is None or sr <= 0:
+        return {}
+
+    arr = np.asarray(samples, dtype=np.float32)
+    n_fft = SPECTRUM_FFT_SIZE
+    n_frames = len(arr) // n_fft
+    if n_frames == 0:
+        return {}
+
+    frames = arr[: n_frames * n_fft].reshape((n_frames, n_fft)) * np.hanning(n_fft).astype(np.float32)
+    power = np.mean(np.abs(np.fft.rfft(frames, axis=1)) ** 2, axis=0)
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / sr)
+
+    total = float(np.sum(power))
+    centroid = float(np.sum(freqs * power) / total) if total > 0 else 0.0
+
+    edges = np.logspace(np.log10(40.0), np.log10(sr / 2.0), bands + 1)
+    band_db = []
+    for i in range(bands):
+        mask = (freqs >= edges[i]) & (freqs < edges[i + 1])
+        energy = float(np.mean(power[mask])) if np.any(mask) else 0.0
+        band_db.append(round(10.0 * np.log10(energy), 2) if energy > 0 else SILENCE_DBFS)
+
+    return {
+        "band_edges_hz": [round(float(e), 1) for e in edges],
+        "band_db": band_db,
+        "centroid_hz": round(centroid, 1),
+    }
+
+
+def ingest_file(path: Path, algorithms: Optional[List[str]] = None,
+                columns: int = WAVEFORM_COLUMNS) -> Dict[str, Any]:
+    """
+    Decode a file once and compute every derived output from the same samples.
+
+    Args:
+        path: Audio file to ingest
+        algorithms: Fingerprint algorithms to compute (all registered if None,
+            none if an empty list)
+        columns: Number of waveform peak columns
+
+    Returns:
+        Dictionary with duration_ms, sample_rate, size, mtime, peaks,
+        fingerprints, loudness and spectrum
+    """
+    path = Path(path)
+    stat = path.stat()
+    samples, sr, duration_ms = decode_audio_array(path)
+
+    if algorithms is None:
+        algorithms = list(FINGERPRINT_ALGORITHMS.keys())
+
+    return {
+        "duration_ms": int(duration_ms),
+        "sample_rate": int(sr),
+        "size": stat.st_size,
+        "mtime": int(stat.st_mtime),
+        "peaks": compute_waveform_peaks(samples, columns),
+        "fingerprints": compute_multiple_fingerprints(samples, sr, algorithms) if algorithms else {},
+        "loudness": compute_loudness(samples),
+        "spectrum": compute_spectrum_summary(samples, sr),
+    }
+
+
+# ========== Cache helpers ==========
+
+def load_analysis_cache(dirpath: Path) -> Dict:
+    """Load the loudness/spectrum analysis cache for a directory."""
+    data = metadata_cache.load_json(Path(dirpath) / ANALYSIS_JSON, copy=True)
+    if isinstance(data, dict) and "files" in data:
+        return data
+    return {"version": 1, "files": {}}
+
+
+def save_analysis_cache(dirpath: Path, cache: Dict) -> None:
+    """Save the loudness/spectrum analysis cache for a directory."""
+    try:
+        metadata_cache.save_json(Path(dirpath) / ANALYSIS_JSON, cache)
+    except Exception as e:
+        print(f"Error saving analysis cache: {e}")
+
+
+def load_duration_cache(dirpath: Path) -> Dict[str, int]:
+    """Load the raw duration cache (filename -> milliseconds) for a directory."""
+    data = metadata_cache.load_json(Path(dirpath) / DURATIONS_JSON, copy=True)
+    return data if isinstance(data, dict) else {}
+
+
+def merge_duration_entries(dirpath: Path, entries: Dict[str, int]) -> None:
+    """
+    Merge newly measured durations (filename -> milliseconds) into the cache on disk.
+    
+    The cache is re-read first, so durations FileManager flushed since the
+    caller loaded it are kept.
+    
+    Raises:
+        OSError, TypeError, ValueError: If the cache can't be written
+    """
+    durations = load_duration_cache(dirpath)
+    durations.update(entries)
+    metadata_cache.save_json(Path(dirpath) / DURATIONS_JSON, durations)
+
+
+def _signature_matches(entry: Dict, size: int, mtime: int) -> bool:
+    """Check a cache entry's size/mtime against the file (entries without a signature are trusted)."""
+    if "size" in entry and entry.get("size") != size:
+        return False
+    if "mtime" in entry and entry.get("mtime") != mtime:
+        return False
+    return True
+
+
+def missing_fingerprint_algorithms(fp_cache: Dict, filename: str, size: int, mtime: int) -> List[str]:
+    """Return the registered algorithms that still need computing for a file."""
+    if filename in fp_cache.get("excluded_files", []):
+        return []
+    entry = fp_cache.get("files", {}).get(filename)
+    if not isinstance(entry, dict) or not _signature_matches(entry, size, mtime):
+        return list(FINGERPRINT_ALGORITHMS.keys())
+    have = entry.get("fingerprints", {})
+    return [alg for alg in FINGERPRINT_ALGORITHMS if alg not in have]
+
+
+def needs_ingest(filepath: Path, fp_cache: Dict, durations: Dict, analysis: Dict) -> bool:
+    """
+    Check whether any persisted output for a file is missing or stale.
+
+    The waveform cache is not consulted: peaks are produced as a by-product
+    whenever a file is decoded, but a file is never decoded for peaks alone.
+    """
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return False
+    size, mtime = stat.st_size, int(stat.st_mtime)
+    name = filepath.name
+
+    if name not in durations:
+        return True
+    entry = analysis.get("files", {}).get(name)
+    if not isinstance(entry, dict) or not _signature_matches(entry, size, mtime) or "size" not in entry:
+        return True
+    return bool(missing_fingerprint_algorithms(fp_cache, name, size, mtime))
+
+
+# ========== Worker and QObject ==========
+
+class IngestWorker(QThread):
+    """Worker thread that ingests a list of files from one directory."""
+
+    progressUpdate = pyqtSignal(int, int, str)  # current, total, filename
+    fileIngested = pyqtSignal(str, list, int, int, int)  # path, peaks, duration_ms, size, mtime
+    checkpointed = pyqtSignal()  # Caches saved
+    finished = pyqtSignal(bool, str)  # success, message
+
+    def __init__(self, directory: Path, files: List[str], generation: int = 0):
+        super().__init__()
+        self.directory = directory
+        self.generation = generation
+        self.files = list(files)
+        self._should_stop = False
+        # Guards self.files while addFiles appends to it; closed once run() has
+        # taken the last file, after which additions are refused
+        self._files_lock = threading.Lock()
+        self._closed = False
+
+    def stop(self):
+        """Request the worker to stop."""
+        self._should_stop = True
+
+    def addFiles(self, files: List[str]) -> bool:
+        """
+        Append files from the same directory to the running ingest.
+        
+        Returns:
+            False if the worker has already taken its last file or was
+            stopped; the caller must then ingest the files itself
+        """
+        with self._files_lock:
+            if self._closed or self._should_stop:
+                return False
+            known = set(self.files)
+            for filepath in files:
+                if filepath not in known:
+                    known.add(filepath)
+                    self.files.append(filepath)
+            return True
+
+    def _next_file(self, index: int):
+        """Get (file at index, current total), or (None, total) once the list is used up."""
+        with self._files_lock:
+            total = len(self.files)
+            if index >= total:
+                self._closed = True
+                return None, total
+            return self.files[index], total
+
+    def run(self):
+        """
+        Ingest files, checkpointing every updated cache periodically.
+        
+        Caches are saved every CHECKPOINT_EVERY_FILES ingested files (or
+        CHECKPOINT_INTERVAL_SECONDS), at the end, and on cancel or error, so
+        an interrupted run resumes from the last checkpoint. Files added with
+        addFiles while the run is going are ingested in the same run.
+        """
+        pending_fingerprints: Dict[str, Dict] = {}
+        pending_durations: Dict[str, int] = {}
+        durations: Dict[str, int] = {}
+        analysis: Dict = {}
+        unsaved = 0
+        try:
+            fp_cache = load_fingerprint_cache(self.directory)
+            durations = load_duration_cache(self.directory)
+            analysis = load_analysis_cache(self.directory)
+
+            ingested = 0
+            cancelled = False
+            last_checkpoint = time.monotonic()
+            idx = 0
+
+            while True:
+                filepath, total = self._next_file(idx)
+                if filepath is None:
+                    break
+                idx += 1
+                if self._should_stop:
+                    cancelled = True
+                    break
+
+                path = Path(filepath)
+                if not needs_ingest(path, fp_cache, durations, analysis):
+                    self.progressUpdate.emit(idx, total, f"Cached: {path.name}")
+                    continue
+
+                self.progressUpdate.emit(idx, total, f"Ingesting: {path.name}")
+
+                try:
+                    stat = path.stat()
+                    algorithms = missing_fingerprint_algorithms(
+                        fp_cache, path.name, stat.st_size, int(stat.st_mtime))
+                    result = ingest_file(path, algorithms)
+                except Exception as e:
+                    print(f"Error ingesting {path.name}: {e}")
+                    continue
+
+                self._merge_result(path.name, result, fp_cache, durations, analysis)
+                if path.name in fp_cache["files"] and path.name not in fp_cache.get("excluded_files", []):
+                    pending_fingerprints[path.name] = fp_cache["files"][path.name]
+                pending_durations[path.name] = result["duration_ms"]
+                ingested += 1
+                unsaved += 1
+                self.fileIngested.emit(str(path), result["peaks"], result["duration_ms"],
+                                       result["size"], result["mtime"])
+
+                if (unsaved >= CHECKPOINT_EVERY_FILES or
+                        time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS):
+                    self._checkpoint(pending_fingerprints, pending_durations, analysis)
+                    unsaved = 0
+                    last_checkpoint = time.monotonic()
+
+            # Persist whatever was computed, including partial work on cancel
+            if unsaved:
+                self._checkpoint(pending_fingerprints, pending_durations, analysis)
+
+            if cancelled:
+                self.finished.emit(False, "Operation cancelled")
+            else:
+                self.finished.emit(True, f"Ingested {ingested} files")
+
+        except Exception as e:
+            if unsaved:
+                self._checkpoint(pending_fingerprints, pending_durations, analysis)
+            self.finished.emit(False, f"Error: {str(e)}")
+        finally:
+            with self._files_lock:
+                self._closed = True
+
+    def _checkpoint(self, pending_fingerprints: Dict[str, Dict], pending_durations: Dict[str, int],
+                    analysis: Dict) -> None:
+        """Save the caches touched since the last checkpoint."""
+        try:
+            if pending_fingerprints:
+                merge_fingerprint_entries(self.directory, pending_fingerprints)
+                pending_fingerprints.clear()
+            if pending_durations:
+                merge_duration_entries(self.directory, pending_durations)
+                pending_durations.clear()
+            save_analysis_cache(self.directory, analysis)
+        except Exception as e:
+            print(f"Error checkpointing ingest caches: {e}")
+        self.checkpointed.emit()
+
+    @staticmethod
+    def _merge_result(filename: str, result: Dict, fp_cache: Dict,
+                      durations: Dict, analysis: Dict) -> None:
+        """Merge one file's ingest result into the in-memory caches."""
+        signature = {"size": result["size"], "mtime": result["mtime"]}
+
+        if filename not in fp_cache.get("excluded_files", []):
+            entry = fp_cache["files"].get(filename)
+            if not isinstance(entry, dict) or not _signature_matches(entry, result["size"], result["mtime"]):
+                entry = {"fingerprints": {}}
+            entry.setdefault("fingerprints", {}).update(result["fingerprints"])
+            entry.update(signature)
+            entry["duration_ms"] = result["duration_ms"]
+            fp_cache["files"][filename] = entry
+
+        durations[filename] = result["duration_ms"]
+
+        analysis["files"][filename] = {
+            **signature,
+            "duration_ms": result["duration_ms"],
+            "sample_rate": result["sample_rate"],
+            "loudness": result["loudness"],
+            "spectrum": result["spectrum"],
+        }
+
+
+# Running workers, including superseded ones finishing in the background;
+# holding them here keeps each QThread alive until its run() returns
+_ingest_workers: Set[IngestWorker] = set()
+
+
+class AudioIngestPipeline(QObject):
+    """
+    Single decode-once ingest stage for QML application.
+    Runs an IngestWorker per directory and forwards peaks to the waveform engine.
+    """
+
+    # Signals
+    ingestStarted = pyqtSignal()
+    ingestProgress = pyqtSignal(int, int, str)  # current, total, status
+    ingestFinished = pyqtSignal(bool, str)  # success, message
+    fileIngested = pyqtSignal(str)  # file_path
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._current_directory: Optional[Path] = None
+        self._waveform_engine = None
+        self._worker: Optional[IngestWorker] = None
+        # Bumped whenever the current worker is superseded or cancelled, so
+        # anything an abandoned worker still reports is ignored
+        self._generation = 0
+        # Files that arrived while the worker for their folder was finishing
+        self._queued: List[str] = []
+
+    def setWaveformEngine(self, engine) -> None:
+        """Set the waveform engine that receives computed peaks."""
+        self._waveform_engine = engine
+
+    @pyqtSlot(str)
+    def setCurrentDirectory(self, directory: str):
+        """Set the current directory for ingest operations."""
+        self._current_directory = Path(directory) if directory else None
+
+    @pyqtSlot(list)
+    def ingestFiles(self, files: list):
+        """Ingest the given files (all from the current directory) in background."""
+        if not files:
+            return
+
+        directory = Path(files[0]).parent
+        files = [str(f) for f in files]
+
+        # Files appearing in the folder being ingested (e.g. a take being
+        # recorded) join the running ingest, or follow it if it is finishing
+        if self._worker and self._worker.isRunning() and self._worker.directory == directory:
+            if not self._worker.addFiles(files):
+                self._queued.extend(f for f in files if f not in self._queued)
+            return
+
+        # A new folder supersedes any ingest still running for the previous one
+        if self._worker and self._worker.isRunning():
+            self._abandon_worker()
+        if self._queued and Path(self._queued[0]).parent == directory:
+            files = self._queued + [f for f in files if f not in self._queued]
+        self._queued = []
+        self._start_worker(directory, files)
+
+    def _start_worker(self, directory: Path, files: List[str]) -> None:
+        """Start an IngestWorker for files of one directory."""
+        self._generation += 1
+        worker = IngestWorker(directory, files, self._generation)
+        worker.progressUpdate.connect(self.ingestProgress)
+        worker.fileIngested.connect(self._on_file_ingested)
+        worker.checkpointed.connect(self._flush_waveforms)
+        worker.finished.connect(self._on_ingest_finished)
+        _ingest_workers.add(worker)
+        self._worker = worker
+
+        self.ingestStarted.emit()
+        worker.start()
+
+    def _abandon_worker(self) -> None:
+        """
+        Stop the current worker without waiting for it.
+        
+        The worker saves what it has computed and finishes in the background;
+        its progress no longer reaches the UI and its completion is reported
+        here as a cancellation.
+        """
+        worker = self._worker
+        if worker is None:
+            return
+        self._worker = None
+        self._generation += 1
+        worker.stop()
+        worker.progressUpdate.disconnect(self.ingestProgress)
+        self.ingestFinished.emit(False, "Operation cancelled")
+
+    @pyqtSlot()
+    def cancelIngest(self):
+        """Cancel ongoing ingest (returns at once; the worker stops in background)."""
+        self._queued = []
+        if self._worker and self._worker.isRunning():
+            self._abandon_worker()
+
+    @pyqtSlot()
+    def finishIngest(self):
+        """Stop every ingest worker and wait for them to save their caches (e.g. on exit)."""
+        self._queued = []
+        self._abandon_worker()
+        for worker in list(_ingest_workers):
+            worker.stop()
+            worker.wait()
+        self._flush_waveforms()
+
+    @pyqtSlot(result=bool)
+    def isIngesting(self) -> bool:
+        """Check whether an ingest is running."""
+        return bool(self._worker and self._worker.isRunning())
+
+    @pyqtSlot(str, result=str)
+    def getAnalysis(self, file_path: str) -> str:
+        """Get cached loudness/spectrum analysis for a file as JSON ("{}" if none)."""
+        path = Path(file_path)
+        entry = load_analysis_cache(path.parent).get("files", {}).get(path.name, {})
+        return json.dumps(entry)
+
+    def _on_file_ingested(self, file_path: str, peaks: list, duration_ms: int, size: int, mtime: int):
+        """Hand peaks to the waveform engine so playback doesn't decode again."""
+        if self._waveform_engine is not None:
+            try:
+                self._waveform_engine.storeWaveform(file_path, peaks, duration_ms, size, mtime)
+            except Exception as e:
+                print(f"Error storing ingested waveform: {e}")
+        self.fileIngested.emit(file_path)
+
+    def _flush_waveforms(self):
+        """Save the waveforms stored since the last checkpoint."""
+        if self._waveform_engine is not None:
+            self._waveform_engine.flushCache()
+
+    def _on_ingest_finished(self, success: bool, message: str):
+        """Handle ingest completion (abandoned workers were reported when cancelled)."""
+        self._flush_waveforms()
+        worker = self.sender()
+        _ingest_workers.discard(worker)
+        if worker.generation == self._generation:
+            self._worker = None
+            self.ingestFinished.emit(success, message)
+            if self._queued:
+                queued, self._queued = self._queued, []
+                self._start_worker(Path(queued[0]).parent, queued)
+        worker.wait()
+        worker.deleteLater()
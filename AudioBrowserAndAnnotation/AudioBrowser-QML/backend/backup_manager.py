@@ -2,10 +2,11 @@
 Backup Manager Module
 
 Handles metadata file backups for AudioBrowser QML.
-Creates timestamped backups before modifications and supports restore functionality.
+Creates content-addressed snapshots before modifications and supports restore functionality.
 """
 
 import sys
+from datetime import datetime
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional
 
@@ -26,6 +27,7 @@ from shared.metadata_constants import (
     CLIPS_JSON,
 )
 from shared import backup_utils
+from shared.metadata_cache import get_metadata_cache
 
 
 class BackupManager(QObject):
@@ -34,7 +36,8 @@ class BackupManager(QObject):
     
     Features:
     - Automatic backup creation before file modifications
-    - Timestamped backup folders (.backup/YYYY-MM-DD-###)
+    - Snapshot manifests (.backup/YYYY-MM-DD-###.json) sharing one blob store,
+      plus older full-copy backup folders (.backup/YYYY-MM-DD-###/)
     - Discovery of available backups across practice folders
     - Restore from backup with preview
     """
@@ -128,21 +131,13 @@ class BackupManager(QObject):
             if not self.should_create_backup(practice_folder):
                 return ""
             
-            backup_folder = self.create_backup_folder_name(practice_folder)
-            backed_up_count = self.backup_metadata_files(practice_folder, backup_folder)
-            
-            if backed_up_count > 0:
-                self.backupCreated.emit(str(backup_folder))
-                return str(backup_folder)
-            else:
-                # Clean up empty backup folder
-                try:
-                    backup_folder.rmdir()
-                    # Also try to remove parent .backup directory if it's empty
-                    backup_folder.parent.rmdir()
-                except Exception:
-                    pass
+            # Unchanged files are shared with earlier snapshots; None if nothing changed
+            manifest = backup_utils.create_snapshot(practice_folder)
+            if manifest is None:
                 return ""
+            
+            self.backupCreated.emit(str(manifest))
+            return str(manifest)
                 
         except Exception as e:
             error_msg = f"Failed to create backup: {str(e)}"
@@ -165,14 +160,16 @@ class BackupManager(QObject):
             backups = []
             
             # Search for .backup directories recursively
-            for backup_dir in root.rglob(".backup"):
+            for backup_dir in root.rglob(backup_utils.BACKUP_DIR_NAME):
                 if backup_dir.is_dir():
-                    # Look for dated backup folders within each .backup directory
+                    # Look for snapshot manifests and dated backup folders within each .backup directory
                     for backup_folder in backup_dir.iterdir():
-                        if backup_folder.is_dir():
+                        if backup_folder.is_dir() and backup_folder.name == backup_utils.BACKUP_OBJECTS_DIR:
+                            continue  # Blob store
+                        if backup_folder.is_dir() or backup_utils.is_snapshot_manifest(backup_folder):
                             try:
-                                # Parse folder name format: YYYY-MM-DD-###
-                                folder_name = backup_folder.name
+                                # Parse name format: YYYY-MM-DD-###
+                                folder_name = backup_utils.backup_name(backup_folder)
                                 date_part = folder_name.rsplit('-', 1)[0]  # Remove counter
                                 date_obj = datetime.strptime(date_part, "%Y-%m-%d")
                                 
@@ -196,7 +193,7 @@ class BackupManager(QObject):
                                 practice_folder = backup_dir.parent
                                 rel_practice = practice_folder.relative_to(root)
                                 practice_name = str(rel_practice) if str(rel_practice) != "." else "Root"
-                                display_name = f"{backup_folder.name} - {practice_name}"
+                                display_name = f"{folder_name} - {practice_name}"
                                 
                                 backups.append({
                                     'path': str(backup_folder),
@@ -206,7 +203,7 @@ class BackupManager(QObject):
                                 })
             
             # Sort by folder name (includes timestamp) in descending order
-            backups.sort(key=lambda x: Path(x['path']).name, reverse=True)
+            backups.sort(key=lambda x: backup_utils.backup_name(Path(x['path'])), reverse=True)
             return backups
             
         except Exception as e:
@@ -217,10 +214,10 @@ class BackupManager(QObject):
     @pyqtSlot(str, result=list)
     def getBackupContents(self, backup_folder_path: str) -> List[str]:
         """
-        Get the list of files in a backup folder.
+        Get the list of files in a backup.
         
         Args:
-            backup_folder_path: Path to specific backup folder
+            backup_folder_path: Path to a snapshot manifest or backup folder
             
         Returns:
             List of file names in the backup
@@ -231,9 +228,12 @@ class BackupManager(QObject):
             if not backup_folder.exists():
                 return []
             
-            # Get all JSON files in the backup folder
+            if backup_utils.is_snapshot_manifest(backup_folder):
+                return backup_utils.list_backup_files(backup_folder)
+            
+            # Get all metadata files (JSON plus compact fingerprint vectors) in the backup folder
             files = []
-            for backup_file in backup_folder.glob("*.json"):
+            for backup_file in list(backup_folder.glob("*.json")) + list(backup_folder.glob("*.npz")):
                 if backup_file.is_file():
                     files.append(backup_file.name)
             
@@ -264,12 +264,20 @@ class BackupManager(QObject):
                 self.backupError.emit(f"Backup folder not found: {backup_folder_path}")
                 return 0
             
+            if backup_utils.is_snapshot_manifest(backup_folder):
+                restored_count = backup_utils.restore_metadata_from_backup(
+                    backup_folder, target_folder, self._root_path or target_folder)
+                if restored_count > 0:
+                    self.backupRestored.emit(restored_count)
+                return restored_count
+            
             restored_count = 0
-            # Copy all JSON files from backup to target folder
-            for backup_file in backup_folder.glob("*.json"):
+            # Copy all metadata files from backup to target folder
+            for backup_file in list(backup_folder.glob("*.json")) + list(backup_folder.glob("*.npz")):
                 try:
                     target_file = target_folder / backup_file.name
                     target_file.write_bytes(backup_file.read_bytes())
+                    get_metadata_cache().invalidate(target_file)
                     restored_count += 1
                     print(f"Restored: {backup_file.name}")
                 except Exception as e:
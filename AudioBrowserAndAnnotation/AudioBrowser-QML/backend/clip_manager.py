@@ -6,12 +6,17 @@ Manages audio clips (regions) for audio files with CRUD operations, persistence,
 and export functionality. Provides QML integration via signals and slots.
 """
 
-import json
+import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import json_io
+
 
 class ClipManager(QObject):
     """
@@ -373,9 +378,8 @@ class ClipManager(QObject):
             return
         
         try:
-            with open(clips_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
+            data = json_io.read_json(clips_file)
+            
             # Validate data format
             if isinstance(data, list):
                 self._clips[file_path] = data
@@ -403,9 +407,8 @@ class ClipManager(QObject):
             # Create parent directory if it doesn't exist
             clips_file.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write clips to file
-            with open(clips_file, 'w', encoding='utf-8') as f:
-                json.dump(self._clips[file_path], f, indent=2, ensure_ascii=False)
-                
+            # Write clips to file (atomically)
+            json_io.write_json(clips_file, self._clips[file_path])
+            
         except Exception as e:
             self.errorOccurred.emit(f"Failed to save clips: {str(e)}")
@@ -14,6 +14,11 @@ from pathlib import Path
 from typing import List, Dict, Optional, Callable
 from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import metadata_cache
+
 
 class ExportWorker(QThread):
     """
@@ -174,6 +179,8 @@ class ExportWorker(QThread):
             if metadata_file.exists():
                 try:
                     shutil.copy2(metadata_file, dest_folder / metadata_file.name)
+                    # copy2 keeps the source mtime, so don't trust a cached copy of the target
+                    metadata_cache.get_metadata_cache().invalidate(dest_folder / metadata_file.name)
                 except Exception as e:
                     self.progress.emit(f"Warning: Failed to copy metadata {metadata_file.name}: {e}")
     
@@ -8,51 +8,94 @@ Provides file discovery, filtering, and metadata access.
 
 import os
 import sys
-import wave
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional, Set, Any
-from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, pyqtProperty
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot, pyqtProperty
 
 
 # Set up module logger
 logger = logging.getLogger(__name__)
 
-# Ensure optional dependencies are available
-def _ensure_import(mod_name: str, pip_name: str | None = None) -> bool:
-    """Try to import a module, installing it if necessary."""
-    if pip_name is None:
-        pip_name = mod_name
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.audio_probe import probe_duration_ms
+from shared.dir_walker import WalkStats, scan_directory, skip_dirs_named, walk_directories
+from shared import metadata_cache
+from shared.library_catalog import tokenize
+from shared.note_search import NoteSearchIndex, build_note_index
+
+
+# Audio file extensions
+AUDIO_EXTENSIONS = {".wav", ".wave", ".mp3"}
+
+# Subfolders left out of folder scans (besides hidden ones)
+SKIPPED_FOLDERS = {"docs"}
+
+# Folders listed concurrently by recursive scans, so per-listing round trips
+# on network shares overlap instead of adding up
+SCAN_WORKERS = 8
+
+# Probed durations are buffered and written to .duration_cache.json at most
+# this long after the first unsaved one (also on directory change and exit)
+DURATION_FLUSH_DELAY_MS = 2000
+
+# The note search index is reconciled at least this often (changes the
+# library watcher can't see, e.g. in other folders or from sync clients)
+NOTE_INDEX_REFRESH_MS = 60000
+
+
+def read_duration_ms(path: Path) -> int:
+    """
+    Read an audio file's duration without caching it.
+    
+    Parses WAV, FLAC, MP3 and Ogg headers directly (see shared.audio_probe),
+    falling back to mutagen and then ffprobe. Nothing is decoded, and it is
+    safe to call from worker threads.
     
+    Args:
+        path: Path to the audio file
+        
+    Returns:
+        Duration in milliseconds, or 0 if it can't be determined
+    """
     try:
-        __import__(mod_name)
-        return True
-    except ImportError:
-        print(f"Installing {pip_name}...")
-        import subprocess
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", pip_name])
-            __import__(mod_name)
-            return True
-        except Exception as e:
-            print(f"Failed to install {pip_name}: {e}")
-            return False
+        return probe_duration_ms(path)
+    except Exception as e:
+        print(f"Duration probe failed for {path.name}: {e}")
+    return 0
 
-# Try to import optional dependencies for MP3 support
-try:
-    from pydub import AudioSegment
-    HAVE_PYDUB = True
-except ImportError:
-    HAVE_PYDUB = False
 
-# Ensure mutagen is available for metadata extraction
-HAVE_MUTAGEN = _ensure_import("mutagen", "mutagen")
-if HAVE_MUTAGEN:
-    from mutagen import File as MutagenFile
+class NoteIndexWorker(QThread):
+    """Worker thread that rebuilds the note search index of a library root."""
+    
+    finished = pyqtSignal(object)  # NoteSearchIndex, or None if stopped
+    
+    def __init__(self, root: Path, previous: Optional[NoteSearchIndex] = None):
+        super().__init__()
+        self.root = root
+        self.previous = previous
+        self._should_stop = False
+    
+    def stop(self):
+        """Request the worker to stop (the walk ends at the next folder)."""
+        self._should_stop = True
+    
+    def run(self):
+        """Walk the library, re-reading only folders whose metadata changed."""
+        try:
+            index = build_note_index(self.root, self.previous, skip_dirs_named(SKIPPED_FOLDERS),
+                                     SCAN_WORKERS, lambda: self._should_stop)
+        except Exception as e:
+            print(f"Error indexing notes under {self.root}: {e}")
+            index = None
+        self.finished.emit(index)
 
 
-# Audio file extensions
-AUDIO_EXTENSIONS = {".wav", ".wave", ".mp3"}
+# Note index workers still running, kept alive until they finish even if
+# they were superseded (or their FileManager went away)
+_note_index_workers: Set[NoteIndexWorker] = set()
 
 
 class FileManager(QObject):
@@ -65,9 +108,11 @@ class FileManager(QObject):
     
     # Signals for state changes
     filesDiscovered = pyqtSignal(list)  # List of discovered file paths
+    directoryScanned = pyqtSignal(str)  # Directory whose files were just discovered
     currentDirectoryChanged = pyqtSignal(str)  # Current directory path
     errorOccurred = pyqtSignal(str)  # Error message
     scanProgress = pyqtSignal(int, int)  # (current, total) for progress tracking
+    noteIndexChanged = pyqtSignal()  # The note search index was rebuilt
     
     def __init__(self, parent=None):
         """Initialize the file manager."""
@@ -81,6 +126,28 @@ class FileManager(QObject):
         self._best_takes: Set[str] = set()  # Set of file paths marked as best takes
         self._partial_takes: Set[str] = set()  # Set of file paths marked as partial takes
         self._hidden_songs: Set[str] = set()  # Set of file paths marked as hidden
+        
+        # Parsed per-folder metadata files, keyed by path and validated
+        # against (st_mtime_ns, st_size) so unchanged files are parsed once
+        self._metadata_memo: Dict[str, Tuple[Optional[Tuple[int, int]], Any]] = {}
+        
+        # Optional shared.library_catalog.LibraryCatalog for whole-library queries
+        self._catalog = None
+        
+        # Write-behind buffer of durations not yet saved, per directory
+        self._pending_durations: Dict[Path, Dict[str, int]] = {}
+        self._duration_flush_timer = QTimer(self)
+        self._duration_flush_timer.setSingleShot(True)
+        self._duration_flush_timer.setInterval(DURATION_FLUSH_DELAY_MS)
+        self._duration_flush_timer.timeout.connect(self.flushDurationCache)
+        
+        # Note search index (used without a catalog), rebuilt in background
+        self._note_index = None
+        self._note_index_worker: Optional[NoteIndexWorker] = None
+        self._note_index_pending = False
+        self._note_index_timer = QTimer(self)
+        self._note_index_timer.setInterval(NOTE_INDEX_REFRESH_MS)
+        self._note_index_timer.timeout.connect(self.refreshNoteIndex)
     
     # ========== Properties ==========
     
@@ -119,6 +186,9 @@ class FileManager(QObject):
                 self.errorOccurred.emit(error_msg)
                 return
             
+            # Save buffered durations before leaving the old directory
+            self.flushDurationCache()
+            
             self._current_directory = path
             logger.debug(f"Current directory set to: {path}")
             self.currentDirectoryChanged.emit(str(path))
@@ -126,6 +196,10 @@ class FileManager(QObject):
             # Load takes metadata for the new directory
             self._load_takes_for_directory(path)
             
+            # Index the new library's notes for searchNotes
+            self.refreshNoteIndex()
+            self._note_index_timer.start()
+            
             # Automatically discover files in the new directory
             self.discoverAudioFiles(str(path))
             
@@ -165,9 +239,8 @@ class FileManager(QObject):
             self._load_takes_for_directory(scan_path)
             
             # Discover audio files (non-recursive - only immediate directory)
-            files = []
-            for ext in self._audio_extensions:
-                files.extend(scan_path.glob(f"*{ext}"))
+            listing = scan_directory(scan_path, self._audio_extensions, skip_dir=None)
+            files = [Path(entry.path) for entry in listing.audio]
             
             # Sort files by name
             files.sort(key=lambda p: p.name.lower())
@@ -177,6 +250,7 @@ class FileManager(QObject):
             
             # Emit list of file paths as strings
             file_paths = [str(f) for f in files]
+            self.directoryScanned.emit(str(scan_path))
             self.filesDiscovered.emit(file_paths)
             
         except Exception as e:
@@ -203,38 +277,19 @@ class FileManager(QObject):
             
             files_info = []
             
-            def scan_directory(dir_path: Path, relative_folder: str = ""):
-                """Recursively scan directory for audio files."""
-                try:
-                    has_audio_files = False
-                    subdirectories = []
-                    
-                    # Get files in this directory
-                    for ext in self._audio_extensions:
-                        for file_path in dir_path.glob(f"*{ext}"):
-                            if file_path.is_file():
-                                files_info.append({
-                                    'path': str(file_path),
-                                    'folder': relative_folder,
-                                    'name': file_path.name
-                                })
-                                has_audio_files = True
-                    
-                    # Get subdirectories (skip hidden ones and docs folders)
-                    for item in dir_path.iterdir():
-                        if item.is_dir() and not item.name.startswith('.') and item.name != 'docs':
-                            subdirectories.append(item)
-                    
-                    # Recursively scan subdirectories
-                    for subdir in subdirectories:
-                        new_relative = subdir.name if not relative_folder else f"{relative_folder}/{subdir.name}"
-                        scan_directory(subdir, new_relative)
-                        
-                except (OSError, PermissionError):
-                    pass  # Skip directories we can't read
+            # Skip hidden and docs folders; unreadable folders are skipped by the walker
+            stats = WalkStats()
+            for listing in walk_directories(scan_path, self._audio_extensions,
+                                            skip_dirs_named(SKIPPED_FOLDERS),
+                                            workers=SCAN_WORKERS, stats=stats):
+                for entry in listing.audio:
+                    files_info.append({
+                        'path': entry.path,
+                        'folder': listing.relative,
+                        'name': entry.name
+                    })
             
-            # Start scanning from root
-            scan_directory(scan_path, "")
+            logger.debug(f"Recursive scan of {scan_path}: {stats}")
             
             # Sort by folder then name
             files_info.sort(key=lambda x: (x['folder'], x['name'].lower()))
@@ -371,6 +426,24 @@ class FileManager(QObject):
         """
         return [str(f) for f in self._discovered_files]
     
+    def updateDiscoveredFiles(self, added: List[str], removed: List[str]) -> None:
+        """
+        Apply incremental changes to the discovered file list.
+        
+        Used by LibraryWatcher so getDiscoveredFiles stays current without
+        rescanning the directory.
+        
+        Args:
+            added: Paths of new files
+            removed: Paths of files that are gone
+        """
+        gone = {Path(p) for p in removed}
+        files = [f for f in self._discovered_files if f not in gone]
+        known = set(files)
+        files.extend(p for p in map(Path, added) if p not in known)
+        files.sort(key=lambda p: p.name.lower())
+        self._discovered_files = files
+    
     @pyqtSlot(result=str)
     def getCurrentDirectory(self) -> str:
         """
@@ -437,10 +510,10 @@ class FileManager(QObject):
             if not scan_path.exists() or not scan_path.is_dir():
                 return []
             
-            subdirs = [d for d in scan_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
+            subdirs = scan_directory(scan_path, self._audio_extensions).dirs
             subdirs.sort(key=lambda d: d.name.lower())
             
-            return [str(d) for d in subdirs]
+            return [d.path for d in subdirs]
             
         except Exception as e:
             self.errorOccurred.emit(f"Error getting subdirectories: {e}")
@@ -463,42 +536,33 @@ class FileManager(QObject):
             if not root_path.exists() or not root_path.is_dir():
                 return []
             
-            directories_info = []
-            
-            def count_audio_files(dir_path: Path) -> int:
-                """Count audio files in a directory (non-recursive)."""
-                count = 0
-                for ext in self._audio_extensions:
-                    count += len(list(dir_path.glob(f"*{ext}")))
-                return count
+            catalog_info = self._catalog_directories(root_path)
+            if catalog_info is not None:
+                return catalog_info
             
-            def scan_directory(dir_path: Path):
-                """Recursively scan directory structure."""
-                try:
-                    audio_count = count_audio_files(dir_path)
-                    
-                    # Add this directory if it has audio files, but SKIP the root folder
-                    # Only subdirectories should be selectable
-                    if audio_count > 0 and dir_path != root_path:
-                        directories_info.append({
-                            'path': str(dir_path),
-                            'name': dir_path.name,
-                            'parent': str(dir_path.parent),
-                            'hasAudio': audio_count > 0,
-                            'audioCount': audio_count,
-                            'isRoot': False
-                        })
-                    
-                    # Scan subdirectories (skip hidden ones and docs folders)
-                    for item in dir_path.iterdir():
-                        if item.is_dir() and not item.name.startswith('.') and item.name != 'docs':
-                            scan_directory(item)
-                            
-                except (OSError, PermissionError):
-                    pass  # Skip directories we can't read
+            directories_info = []
             
-            # Start scanning from root
-            scan_directory(root_path)
+            # Skip hidden and docs folders; unreadable folders are skipped by the walker
+            stats = WalkStats()
+            for listing in walk_directories(root_path, self._audio_extensions,
+                                            skip_dirs_named(SKIPPED_FOLDERS),
+                                            workers=SCAN_WORKERS, stats=stats):
+                audio_count = len(listing.audio)
+                
+                # Add this directory if it has audio files, but SKIP the root folder
+                # Only subdirectories should be selectable
+                if audio_count > 0 and listing.relative:
+                    dir_path = listing.path
+                    directories_info.append({
+                        'path': str(dir_path),
+                        'name': dir_path.name,
+                        'parent': str(dir_path.parent),
+                        'hasAudio': True,
+                        'audioCount': audio_count,
+                        'isRoot': False
+                    })
+            
+            logger.debug(f"Directory scan of {root_path}: {stats}")
             
             # Sort by path to maintain hierarchy
             directories_info.sort(key=lambda x: x['path'])
@@ -509,6 +573,228 @@ class FileManager(QObject):
             self.errorOccurred.emit(f"Error getting directories with audio: {e}")
             return []
     
+    def setLibraryCatalog(self, catalog) -> None:
+        """
+        Answer folder tree and search queries from a library catalog.
+        
+        Args:
+            catalog: LibraryCatalog, or None to scan the filesystem
+        """
+        self._catalog = catalog
+    
+    def _catalog_directories(self, root_path: Path) -> Optional[List[Dict[str, Any]]]:
+        """getDirectoriesWithAudioFiles from the catalog, or None if it doesn't cover root_path."""
+        catalog = self._catalog
+        prefix = catalog.relative_path(root_path) if catalog is not None else None
+        if prefix is None:
+            return None
+        
+        skipped = {name.lower() for name in SKIPPED_FOLDERS}
+        directories_info = []
+        for folder in catalog.folders(with_audio=True):
+            relative = folder["relative"]
+            if prefix:
+                if not relative.startswith(prefix + "/"):
+                    continue
+                relative = relative[len(prefix) + 1:]
+            # Root excluded, as are docs folders (the walk never enters them)
+            if not relative or any(part.lower() in skipped for part in relative.split("/")):
+                continue
+            dir_path = Path(folder["path"])
+            directories_info.append({
+                'path': str(dir_path),
+                'name': dir_path.name,
+                'parent': str(dir_path.parent),
+                'hasAudio': True,
+                'audioCount': folder["audio_count"],
+                'isRoot': False
+            })
+        directories_info.sort(key=lambda x: x['path'])
+        return directories_info
+    
+    @pyqtSlot(str, result=list)
+    def searchLibrary(self, text: str) -> list:
+        """
+        Find audio files anywhere under the current directory by provided name or filename.
+        
+        Uses the library catalog when one is set; otherwise walks the folders.
+        
+        Args:
+            text: Text to look for (case-insensitive)
+            
+        Returns:
+            List of dicts with 'path', 'name', 'folder' and 'providedName' keys
+        """
+        text = text.strip()
+        root_path = self._current_directory
+        if not text or root_path is None:
+            return []
+        try:
+            catalog = self._catalog
+            prefix = catalog.relative_path(root_path) if catalog is not None else None
+            if prefix is not None:
+                results = []
+                for info in catalog.search(text):
+                    folder = info["folder"]
+                    if prefix:
+                        if folder != prefix and not folder.startswith(prefix + "/"):
+                            continue
+                        folder = folder[len(prefix) + 1:]
+                    results.append({
+                        'path': info["path"],
+                        'name': info["name"],
+                        'folder': folder,
+                        'providedName': info["provided_name"],
+                    })
+                return results
+            
+            needle = text.lower()
+            results = []
+            for listing in walk_directories(root_path, self._audio_extensions,
+                                            skip_dirs_named(SKIPPED_FOLDERS), workers=SCAN_WORKERS):
+                if not listing.audio:
+                    continue
+                names = self._provided_names_view(listing.path)
+                for entry in listing.audio:
+                    provided = names.get(entry.name) or names.get(Path(entry.name).stem) or ""
+                    if needle in entry.name.lower() or needle in provided.lower():
+                        results.append({
+                            'path': entry.path,
+                            'name': entry.name,
+                            'folder': listing.relative,
+                            'providedName': provided,
+                        })
+            return results
+        except Exception as e:
+            self.errorOccurred.emit(f"Error searching library: {e}")
+            return []
+    
+    @pyqtSlot(str, result=list)
+    def searchNotes(self, text: str) -> list:
+        """
+        Full-text search of annotations, section labels, file and folder notes and
+        provided names of every user, anywhere under the current directory.
+        
+        Every word must start a word of the match ("dave flub" finds "Dave
+        flubbed the bridge"). Answered from the library catalog when one is
+        set, otherwise from the note search index; neither is reconciled
+        here (see refreshNoteIndex), so a query never walks the library.
+        Until the first index is built there are no results and
+        noteIndexChanged follows.
+        
+        Args:
+            text: Words to look for (case-insensitive)
+            
+        Returns:
+            List of dicts with 'path' (audio file, or folder for folder notes),
+            'directory' (folder to open), 'name', 'folder' (relative),
+            'owner' (annotation set), 'kind' ('note', 'section', 'file_note',
+            'folder_note' or 'name'), 'timestampMs' (-1 without a timestamp)
+            and 'text' keys
+        """
+        root_path = self._current_directory
+        if not tokenize(text) or root_path is None:
+            return []
+        
+        try:
+            catalog = self._catalog
+            prefix = catalog.relative_path(root_path) if catalog is not None else None
+            if prefix is not None:
+                matches = catalog.search_notes(text)
+            else:
+                index = self._note_index
+                if index is None or index.root != root_path:
+                    self.refreshNoteIndex()
+                    return []
+                prefix = ""
+                matches = index.search(text)
+            
+            results = []
+            for info in matches:
+                folder = info["folder"]
+                if prefix:
+                    if folder != prefix and not folder.startswith(prefix + "/"):
+                        continue
+                    folder = folder[len(prefix) + 1:]
+                path = info["path"]
+                results.append({
+                    'path': path,
+                    'directory': str(Path(path).parent) if info["file"] else path,
+                    'name': info["file"],
+                    'folder': folder,
+                    'owner': info["owner"],
+                    'kind': info["kind"],
+                    'timestampMs': info["ms"] if info["ms"] is not None else -1,
+                    'text': info["text"],
+                })
+            return results
+        except Exception as e:
+            self.errorOccurred.emit(f"Error searching notes: {e}")
+            return []
+    
+    @pyqtSlot()
+    def refreshNoteIndex(self) -> None:
+        """
+        Reconcile the note search index with the filesystem in background.
+        
+        Runs when the directory changes, periodically, and when the library
+        watcher or an annotation save reports a change. Folders whose
+        metadata files are unchanged are reused. With a library catalog set,
+        the catalog is reconciled instead.
+        """
+        catalog = self._catalog
+        if catalog is not None:
+            catalog.refresh_in_background()
+            return
+        root_path = self._current_directory
+        if root_path is None:
+            return
+        
+        worker = self._note_index_worker
+        if worker is not None:
+            if worker.root == root_path:
+                # Run again once this pass is done
+                self._note_index_pending = True
+                return
+            # Another library: let the old walk stop in background and drop its result
+            worker.stop()
+        
+        worker = NoteIndexWorker(root_path, self._note_index)
+        worker.finished.connect(self._on_note_index_finished)
+        _note_index_workers.add(worker)
+        self._note_index_worker = worker
+        self._note_index_pending = False
+        worker.start()
+    
+    def _on_note_index_finished(self, index: Optional[NoteSearchIndex]) -> None:
+        """Swap in a rebuilt note index (results of superseded workers are dropped)."""
+        worker = self.sender()
+        _note_index_workers.discard(worker)
+        if worker is self._note_index_worker:
+            self._note_index_worker = None
+            if index is not None:
+                self._note_index = index
+                self.noteIndexChanged.emit()
+            if self._note_index_pending:
+                self._note_index_pending = False
+                self.refreshNoteIndex()
+        worker.wait()
+        worker.deleteLater()
+    
+    @pyqtSlot(result=bool)
+    def isNoteIndexBuilding(self) -> bool:
+        """Whether the note search index is being (re)built."""
+        return self._note_index_worker is not None
+    
+    @pyqtSlot()
+    def cancelNoteIndex(self) -> None:
+        """Stop note indexing and wait for the workers (e.g. on exit)."""
+        self._note_index_timer.stop()
+        self._note_index_pending = False
+        for worker in list(_note_index_workers):
+            worker.stop()
+            worker.wait()
+    
     # ========== File filtering methods ==========
     
     @pyqtSlot(str, result=list)
@@ -670,32 +956,8 @@ class FileManager(QObject):
             if not path.exists():
                 return 0
             
-            suffix = path.suffix.lower()
-            
-            # Handle WAV files
-            if suffix in ['.wav', '.wave']:
-                try:
-                    with wave.open(str(path), 'rb') as wf:
-                        frames = wf.getnframes()
-                        rate = wf.getframerate()
-                        if rate > 0:
-                            duration_ms = int((frames / rate) * 1000)
-                            return duration_ms
-                        else:
-                            logging.warning(f"Invalid sample rate (0) for {path}")
-                            return 0
-                except Exception:
-                    return 0
-            
-            # Handle MP3 files (if pydub is available)
-            elif suffix == '.mp3' and HAVE_PYDUB:
-                try:
-                    audio = AudioSegment.from_mp3(str(path))
-                    return len(audio)  # pydub returns duration in milliseconds
-                except Exception:
-                    return 0
-            
-            return 0
+            # Header probe: no need to decode the whole file
+            return read_duration_ms(path)
             
         except Exception:
             return 0
@@ -727,26 +989,82 @@ class FileManager(QObject):
     
     # ========== Metadata loading from original AudioBrowser ==========
     
-    def _load_provided_names(self, directory: Path) -> Dict[str, str]:
+    def _read_metadata_json(self, json_path: Path, parse: Callable[[Any], Any]) -> Any:
         """
-        Load provided names from .provided_names.json file.
+        Read a per-folder metadata JSON file through the memo.
+        
+        The raw JSON comes from the shared metadata cache and the parsed value
+        is only rebuilt when the file (or the folder store holding it)
+        changes. Callers must not mutate the returned value.
         
         Args:
-            directory: Directory to check for metadata
+            json_path: Path to the metadata file
+            parse: Converts the raw JSON (None if the file is missing) into
+                the value to memoize
             
         Returns:
-            Dictionary mapping filenames to provided names
+            The parsed value
         """
+        key = str(json_path)
+        signature = metadata_cache.metadata_signature(json_path)
+        
+        cached = self._metadata_memo.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        raw = metadata_cache.load_json(json_path) if signature is not None else None
+        value = parse(raw)
+        self._metadata_memo[key] = (signature, value)
+        return value
+    
+    def _forget_metadata_json(self, json_path: Path) -> None:
+        """Drop a memoized metadata file after writing it."""
+        self._metadata_memo.pop(str(json_path), None)
+    
+    def _provided_names_view(self, directory: Path) -> Dict[str, str]:
+        """Memoized provided names for a directory (do not mutate)."""
         try:
-            import json
-            names_file = directory / ".provided_names.json"
-            if names_file.exists():
-                with open(names_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            return self._read_metadata_json(
+                directory / ".provided_names.json",
+                lambda data: data if isinstance(data, dict) else {})
         except Exception as e:
             print(f"Warning: Could not load provided names: {e}")
         return {}
     
+    def _duration_cache_view(self, directory: Path) -> Dict[str, int]:
+        """Memoized duration cache (milliseconds) for a directory (do not mutate)."""
+        def parse(data):
+            if not isinstance(data, dict):
+                return {}
+            # Convert seconds to milliseconds if needed
+            if data and isinstance(next(iter(data.values())), (int, float)):
+                return {k: int(v * 1000) if v < 10000 else int(v) for k, v in data.items()}
+            return data
+        
+        try:
+            saved = self._read_metadata_json(directory / ".duration_cache.json", parse)
+        except Exception as e:
+            print(f"Warning: Could not load duration cache: {e}")
+            saved = {}
+        pending = self._pending_durations.get(directory)
+        if not pending:
+            return saved
+        # None marks an entry forgotten but not yet removed from the file
+        merged = {**saved, **pending}
+        return {k: v for k, v in merged.items() if v is not None}
+    
+    def _load_provided_names(self, directory: Path) -> Dict[str, str]:
+        """
+        Load provided names from .provided_names.json file.
+        
+        Args:
+            directory: Directory to check for metadata
+            
+        Returns:
+            Dictionary mapping filenames to provided names
+        """
+        return dict(self._provided_names_view(directory))
+    
     def _load_duration_cache(self, directory: Path) -> Dict[str, int]:
         """
         Load duration cache from .duration_cache.json file.
@@ -757,19 +1075,33 @@ class FileManager(QObject):
         Returns:
             Dictionary mapping filenames to durations in milliseconds
         """
-        try:
-            import json
-            cache_file = directory / ".duration_cache.json"
-            if cache_file.exists():
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Convert seconds to milliseconds if needed
-                    if data and isinstance(next(iter(data.values())), (int, float)):
-                        return {k: int(v * 1000) if v < 10000 else int(v) for k, v in data.items()}
-                    return data
-        except Exception as e:
-            print(f"Warning: Could not load duration cache: {e}")
-        return {}
+        return dict(self._duration_cache_view(directory))
+    
+    def getFolderSnapshot(self, directory: Path) -> Dict[str, Any]:
+        """
+        Get the file metadata for a directory in one lookup.
+        
+        Used to build file lists without re-reading the metadata files for
+        every row. The name and duration maps come from the memo and are
+        refreshed when the files on disk change; the take and hidden sets
+        are the live in-memory state. Callers must not mutate the result.
+        
+        Args:
+            directory: Directory to snapshot
+            
+        Returns:
+            Dictionary with 'names' and 'durations' (keyed by filename or
+            stem) and 'best_takes', 'partial_takes' and 'hidden' (sets of
+            file paths)
+        """
+        directory = Path(directory)
+        return {
+            "names": self._provided_names_view(directory),
+            "durations": self._duration_cache_view(directory),
+            "best_takes": self._best_takes,
+            "partial_takes": self._partial_takes,
+            "hidden": self._hidden_songs,
+        }
     
     @pyqtSlot(str, result=str)
     def getProvidedName(self, file_path: str) -> str:
@@ -788,7 +1120,7 @@ class FileManager(QObject):
                 return ""
             
             directory = path.parent
-            provided_names = self._load_provided_names(directory)
+            provided_names = self._provided_names_view(directory)
             
             # Try both with and without extension
             filename = path.name
@@ -815,7 +1147,6 @@ class FileManager(QObject):
             provided_name: Library/song name to set (empty string to remove)
         """
         try:
-            import json
             path = Path(file_path)
             if not path.exists():
                 return
@@ -835,8 +1166,8 @@ class FileManager(QObject):
                 provided_names.pop(filename, None)
             
             # Save back to file
-            with open(names_file, 'w', encoding='utf-8') as f:
-                json.dump(provided_names, f, indent=2, ensure_ascii=False)
+            metadata_cache.save_json(names_file, provided_names)
+            self._forget_metadata_json(names_file)
             
             # Emit signal to refresh UI
             self.filesChanged.emit()
@@ -861,7 +1192,7 @@ class FileManager(QObject):
                 return 0
             
             directory = path.parent
-            duration_cache = self._load_duration_cache(directory)
+            duration_cache = self._duration_cache_view(directory)
             
             # Try both with and without extension
             filename = path.name
@@ -894,35 +1225,11 @@ class FileManager(QObject):
             if not path.exists():
                 return 0
             
-            # Try using mutagen to extract duration if available
-            if HAVE_MUTAGEN:
-                try:
-                    audio = MutagenFile(str(path))
-                    if audio and hasattr(audio.info, 'length'):
-                        duration_ms = int(audio.info.length * 1000)
-                        # Cache the duration
-                        self._cache_duration(file_path, duration_ms)
-                        return duration_ms
-                except Exception as e:
-                    print(f"Mutagen extraction failed for {path.name}: {e}")
-            
-            # Fallback: try using wave module for WAV files
-            if path.suffix.lower() == '.wav':
-                try:
-                    import wave
-                    with wave.open(str(path), 'rb') as wav_file:
-                        frames = wav_file.getnframes()
-                        rate = wav_file.getframerate()
-                        if rate > 0:
-                            duration_ms = int((frames / rate) * 1000)
-                            # Cache the duration
-                            self._cache_duration(file_path, duration_ms)
-                            return duration_ms
-                        else:
-                            logging.warning(f"Invalid sample rate (0) for {path}")
-                            return 0
-                except Exception as e:
-                    print(f"Wave extraction failed for {path.name}: {e}")
+            duration_ms = read_duration_ms(path)
+            if duration_ms > 0:
+                # Cache the duration
+                self._cache_duration(file_path, duration_ms)
+            return duration_ms
                     
         except Exception as e:
             print(f"Error extracting duration: {e}")
@@ -937,24 +1244,78 @@ class FileManager(QObject):
             file_path: Path to the audio file
             duration_ms: Duration in milliseconds
         """
-        try:
-            import json
-            path = Path(file_path)
-            directory = path.parent
+        path = Path(file_path)
+        self.cacheDurations(path.parent, {path.name: duration_ms})
+    
+    def cacheDurations(self, directory: Path, durations: Dict[str, int]) -> None:
+        """
+        Add durations to a directory's duration cache.
+        
+        Updates are buffered and coalesced; flushDurationCache writes them
+        out, at the latest DURATION_FLUSH_DELAY_MS after the first one.
+        Lookups see buffered values straight away.
+        
+        Args:
+            directory: Directory holding the files
+            durations: Mapping of filename to duration in milliseconds
+        """
+        if not durations:
+            return
+        self._pending_durations.setdefault(Path(directory), {}).update(durations)
+        if not self._duration_flush_timer.isActive():
+            self._duration_flush_timer.start()
+    
+    def forgetDurations(self, directory: Path, names: List[str]) -> None:
+        """
+        Drop cached durations for files that changed or no longer exist.
+        
+        Removals go through the same write-behind buffer as cacheDurations.
+        Entries keyed by stem (older caches) are dropped as well.
+        
+        Args:
+            directory: Directory holding the files
+            names: Filenames whose durations are stale
+        """
+        if not names:
+            return
+        pending = self._pending_durations.setdefault(Path(directory), {})
+        for name in names:
+            pending[name] = None
+            pending[Path(name).stem] = None
+        if not self._duration_flush_timer.isActive():
+            self._duration_flush_timer.start()
+    
+    @pyqtSlot()
+    def flushDurationCache(self) -> None:
+        """
+        Write all buffered durations to disk.
+        
+        Each directory's cache is re-read, merged and replaced atomically, so
+        a crash leaves either the previous file or the merged one. Entries
+        that fail to save stay buffered for the next flush.
+        """
+        self._duration_flush_timer.stop()
+        pending, self._pending_durations = self._pending_durations, {}
+        for directory, durations in pending.items():
             cache_file = directory / ".duration_cache.json"
-            
-            # Load existing cache
-            duration_cache = self._load_duration_cache(directory)
-            
-            # Update cache
-            duration_cache[path.name] = duration_ms
-            
-            # Save back to file
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(duration_cache, f, indent=2)
-                
-        except Exception as e:
-            print(f"Error caching duration: {e}")
+            try:
+                # Merge into the raw file so the read-side unit conversion
+                # is never written back
+                duration_cache = metadata_cache.load_json(cache_file, {}, copy=True)
+                if not isinstance(duration_cache, dict):
+                    duration_cache = {}
+                for name, duration_ms in durations.items():
+                    if duration_ms is None:
+                        duration_cache.pop(name, None)
+                    else:
+                        duration_cache[name] = duration_ms
+                metadata_cache.save_json(cache_file, duration_cache)
+            except Exception as e:
+                print(f"Error caching durations: {e}")
+                # Keep them (under any newer values) for the next attempt
+                self._pending_durations[directory] = {**durations, **self._pending_durations.get(directory, {})}
+            finally:
+                self._forget_metadata_json(cache_file)
     
     @pyqtSlot(str, result=bool)
     # ========== Best/Partial Take Tracking ==========
@@ -984,15 +1345,11 @@ class FileManager(QObject):
         result = {"best_takes": [], "partial_takes": [], "hidden_songs": []}
         
         try:
-            import json
-            
             # Try new dedicated .takes_metadata.json format first
             takes_file = self._get_takes_file(directory)
-            if takes_file.exists():
-                with open(takes_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if data:
-                        return data
+            data = metadata_cache.load_json(takes_file, copy=True)
+            if data:
+                return data
             
             # Fall back to reading from annotation sets (.audio_notes_*.json files)
             # These files can contain per-file metadata in two formats:
@@ -1000,29 +1357,15 @@ class FileManager(QObject):
             # 2. Old legacy format: {filename: {best_take: true}}
             for notes_file in directory.glob(".audio_notes_*.json"):
                 try:
-                    with open(notes_file, 'r', encoding='utf-8') as f:
-                        notes_data = json.load(f)
-                        
-                        # Check if this is the new annotation sets format (has "sets" key)
-                        if isinstance(notes_data, dict) and "sets" in notes_data:
-                            # New format: Extract metadata from all sets
-                            sets = notes_data.get("sets", [])
-                            for annotation_set in sets:
-                                files = annotation_set.get("files", {})
-                                for filename, file_data in files.items():
-                                    if isinstance(file_data, dict):
-                                        if file_data.get('best_take', False):
-                                            if filename not in result['best_takes']:
-                                                result['best_takes'].append(filename)
-                                        if file_data.get('partial_take', False):
-                                            if filename not in result['partial_takes']:
-                                                result['partial_takes'].append(filename)
-                                        # Note: hidden_songs might be stored differently in sets
-                                        # For now, we don't extract it from sets format
-                        else:
-                            # Old legacy format: data is directly a dict with filenames as keys
-                            # Each entry can have 'best_take' and 'partial_take' boolean flags
-                            for filename, file_data in notes_data.items():
+                    notes_data = metadata_cache.load_json(notes_file, {})
+                    
+                    # Check if this is the new annotation sets format (has "sets" key)
+                    if isinstance(notes_data, dict) and "sets" in notes_data:
+                        # New format: Extract metadata from all sets
+                        sets = notes_data.get("sets", [])
+                        for annotation_set in sets:
+                            files = annotation_set.get("files", {})
+                            for filename, file_data in files.items():
                                 if isinstance(file_data, dict):
                                     if file_data.get('best_take', False):
                                         if filename not in result['best_takes']:
@@ -1030,6 +1373,19 @@ class FileManager(QObject):
                                     if file_data.get('partial_take', False):
                                         if filename not in result['partial_takes']:
                                             result['partial_takes'].append(filename)
+                                    # Note: hidden_songs might be stored differently in sets
+                                    # For now, we don't extract it from sets format
+                    else:
+                        # Old legacy format: data is directly a dict with filenames as keys
+                        # Each entry can have 'best_take' and 'partial_take' boolean flags
+                        for filename, file_data in notes_data.items():
+                            if isinstance(file_data, dict):
+                                if file_data.get('best_take', False):
+                                    if filename not in result['best_takes']:
+                                        result['best_takes'].append(filename)
+                                if file_data.get('partial_take', False):
+                                    if filename not in result['partial_takes']:
+                                        result['partial_takes'].append(filename)
                 except Exception as e:
                     print(f"Warning: Could not load notes file {notes_file}: {e}")
                     continue
@@ -1048,10 +1404,8 @@ class FileManager(QObject):
             metadata: Dictionary with 'best_takes' and 'partial_takes' lists
         """
         try:
-            import json
             takes_file = self._get_takes_file(directory)
-            with open(takes_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            metadata_cache.save_json(takes_file, metadata)
         except Exception as e:
             self.errorOccurred.emit(f"Error saving takes metadata: {e}")
     
@@ -6,10 +6,13 @@ This module provides audio fingerprinting functionality including:
 - Cross-folder matching
 - Fingerprint cache management
 - Background fingerprint generation
+- Landmark indexing for locating songs inside long recordings (landmark_index)
 """
 
 import json
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QThread
@@ -35,10 +38,35 @@ HAVE_NUMPY = _ensure_import("numpy", "numpy")
 if HAVE_NUMPY:
     import numpy as np
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import metadata_cache
+from shared.dir_walker import walk_directories
+from shared import json_io
+from shared.fingerprint_store import (
+    is_compact_manifest,
+    read_fingerprint_store,
+    write_fingerprint_store,
+)
+
+from .landmark_index import LandmarkIndexWorker, LandmarkSearchWorker
+from .waveform_engine import (
+    decode_audio_window,
+    load_audio_data,
+    resample_audio,
+    trim_to_window,
+)
+
 # Constants
 FINGERPRINTS_JSON = ".audio_fingerprints.json"
 DEFAULT_ALGORITHM = "spectral"
 
+# Long generation runs save progress every N files or every N seconds,
+# whichever comes first, so a cancelled or crashed run can resume
+CHECKPOINT_EVERY_FILES = 10
+CHECKPOINT_INTERVAL_SECONDS = 60.0
+
 
 # ========== Audio fingerprinting functions ==========
 
@@ -217,6 +245,10 @@ def compute_spectral_fingerprint(samples: List[float], sr: int) -> List[float]:
 def compute_lightweight_fingerprint(samples: List[float], sr: int) -> List[float]:
     """
     Lightweight fingerprint using downsampled STFT with log-spaced frequency bands.
+    
+    Only the middle 60 seconds at ~11 kHz are used; the registry's decode spec
+    lets loaders hand over exactly that window, in which case the decimation
+    and trimming below are no-ops.
     """
     if not HAVE_NUMPY:
         # Simple fallback - just return fixed-size vector
@@ -489,30 +521,87 @@ def compute_audfprint_fingerprint(samples: List[float], sr: int) -> List[float]:
 
 
 # Dictionary of available algorithms
+#
+# "decode" declares the audio an algorithm actually needs: a window length in
+# seconds, where to take it from ("middle" or "start") and a sample rate.
+# None means the whole file at its native rate. Loaders use this to seek and
+# decode only the needed window instead of the full track.
 FINGERPRINT_ALGORITHMS = {
     "spectral": {
         "name": "Spectral Analysis",
         "description": "Original spectral band analysis (default)",
-        "compute_func": compute_spectral_fingerprint
+        "compute_func": compute_spectral_fingerprint,
+        "decode": None
     },
     "lightweight": {
         "name": "Lightweight STFT", 
         "description": "Downsampled STFT with log-spaced bands",
-        "compute_func": compute_lightweight_fingerprint
+        "compute_func": compute_lightweight_fingerprint,
+        "decode": {"window_seconds": 60, "position": "middle", "sample_rate": 11025}
     },
     "chromaprint": {
         "name": "ChromaPrint-style",
         "description": "Chroma-based fingerprinting with pitch class mapping",
-        "compute_func": compute_chromaprint_fingerprint
+        "compute_func": compute_chromaprint_fingerprint,
+        "decode": None
     },
     "audfprint": {
         "name": "AudFprint-style",
         "description": "Constellation approach with spectral peak hashing", 
-        "compute_func": compute_audfprint_fingerprint
+        "compute_func": compute_audfprint_fingerprint,
+        "decode": None
     }
 }
 
 
+def get_decode_spec(algorithm: str) -> Optional[Dict]:
+    """Get the decode window/rate an algorithm requires (None for the whole file)."""
+    return FINGERPRINT_ALGORITHMS.get(algorithm, {}).get("decode")
+
+
+def prepare_samples_for_algorithm(samples, sr: int, algorithm: str):
+    """
+    Cut full-file samples down to an algorithm's decode window and rate.
+    
+    Samples that were already decoded with the window (see
+    load_audio_for_algorithm) pass through unchanged, so both paths feed the
+    algorithm identical input.
+    
+    Returns:
+        Tuple of (samples, sample_rate)
+    """
+    spec = get_decode_spec(algorithm)
+    if not spec or not HAVE_NUMPY:
+        return samples, sr
+    samples = trim_to_window(samples, sr, spec.get("window_seconds"), spec.get("position", "middle"))
+    target_sr = spec.get("sample_rate")
+    if target_sr and sr != target_sr:
+        return resample_audio(samples, sr, target_sr), target_sr
+    return samples, sr
+
+
+def load_audio_for_algorithm(filepath: str, algorithm: str, audio_loader=None):
+    """
+    Load the audio an algorithm needs, decoding only its declared window.
+    
+    Algorithms without a decode spec use audio_loader (or a full decode).
+    
+    Returns:
+        Tuple of (samples, sample_rate)
+    """
+    spec = get_decode_spec(algorithm)
+    if spec:
+        return decode_audio_window(
+            Path(filepath),
+            window_s=spec.get("window_seconds"),
+            target_sr=spec.get("sample_rate"),
+            position=spec.get("position", "middle"),
+        )
+    if audio_loader is not None:
+        return audio_loader(filepath)
+    return load_audio_data(Path(filepath))
+
+
 def compute_multiple_fingerprints(samples: List[float], sr: int, algorithms: List[str] = None) -> Dict[str, List[float]]:
     """
     Compute fingerprints using multiple algorithms.
@@ -533,7 +622,8 @@ def compute_multiple_fingerprints(samples: List[float], sr: int, algorithms: Lis
         if alg_name in FINGERPRINT_ALGORITHMS:
             compute_func = FINGERPRINT_ALGORITHMS[alg_name]["compute_func"]
             try:
-                fingerprints[alg_name] = compute_func(samples, sr)
+                alg_samples, alg_sr = prepare_samples_for_algorithm(samples, sr, alg_name)
+                fingerprints[alg_name] = compute_func(alg_samples, alg_sr)
             except Exception as e:
                 print(f"Error computing {alg_name} fingerprint: {e}")
                 # Fallback to basic pattern
@@ -559,9 +649,7 @@ def get_fingerprint_for_algorithm(file_data: Dict, algorithm: str) -> Optional[L
 
 
 def migrate_fingerprint_cache(cache: Dict) -> Dict:
-    """
-    Migrate old single-fingerprint cache format to new multiple-algorithms format.
-    """
+    """Migrate old single-fingerprint cache format to new multiple-algorithms format."""
     if "files" not in cache:
         return cache
     
@@ -580,92 +668,258 @@ def migrate_fingerprint_cache(cache: Dict) -> Dict:
     return cache
 
 
-def load_fingerprint_cache(dirpath: Path) -> Dict:
-    """Load fingerprint cache from directory."""
-    cache_path = dirpath / FINGERPRINTS_JSON
+# ========== Fingerprint cache access ==========
+#
+# Parsed caches are memoized process-wide, keyed by cache file path and
+# validated against (st_mtime_ns, st_size), so repeated reads from QML do not
+# re-parse every fingerprint vector. Folder flags and exclusions live in a
+# separate small structure for the per-row is_* helpers.
+
+_fp_cache_memo: Dict[str, Dict] = {}
+_fp_cache_lock = threading.Lock()
+# Serializes read-modify-write of cache files between workers and UI toggles
+_fp_write_lock = threading.RLock()
+
+
+def _empty_fingerprint_cache() -> Dict:
+    return {"version": 1, "files": {}, "excluded_files": []}
+
+
+def _fingerprint_cache_signature(cache_path: Path) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for a cache file, or None if it doesn't exist."""
     try:
-        if cache_path.exists():
-            with open(cache_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            cache = data if isinstance(data, dict) and "files" in data else {"version": 1, "files": {}, "excluded_files": []}
-        else:
-            cache = {"version": 1, "files": {}, "excluded_files": []}
+        st = cache_path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _extract_fingerprint_flags(cache: Dict) -> Dict:
+    """Build the small flags structure from a parsed cache."""
+    return {
+        "is_reference_folder": bool(cache.get("is_reference_folder", False)),
+        "ignore_fingerprints": bool(cache.get("ignore_fingerprints", False)),
+        "excluded_files": frozenset(cache.get("excluded_files", [])),
+    }
+
+
+def _parse_fingerprint_cache(dirpath: Path) -> Dict:
+    """Read (either storage format) and migrate a cache from disk."""
+    try:
+        data = read_fingerprint_store(dirpath)
+        cache = data if isinstance(data, dict) and "files" in data else _empty_fingerprint_cache()
     except Exception:
-        cache = {"version": 1, "files": {}, "excluded_files": []}
+        cache = _empty_fingerprint_cache()
     
     # Ensure excluded_files field exists
     if "excluded_files" not in cache:
         cache["excluded_files"] = []
     
     # Migrate old format if needed
-    cache = migrate_fingerprint_cache(cache)
+    return migrate_fingerprint_cache(cache)
+
+
+def _memoized_fingerprint_entry(dirpath: Path) -> Dict:
+    """Return the memo entry {signature, cache, flags} for a directory, refreshing if stale."""
+    cache_path = Path(dirpath) / FINGERPRINTS_JSON
+    key = str(cache_path)
+    signature = _fingerprint_cache_signature(cache_path)
+    
+    with _fp_cache_lock:
+        entry = _fp_cache_memo.get(key)
+        if entry is not None and entry["signature"] == signature:
+            return entry
+    
+    cache = _parse_fingerprint_cache(Path(dirpath))
+    entry = {"signature": signature, "cache": cache, "flags": _extract_fingerprint_flags(cache)}
+    with _fp_cache_lock:
+        _fp_cache_memo[key] = entry
+    return entry
+
+
+def _copy_fingerprint_cache(cache: Dict) -> Dict:
+    """
+    Copy a cache deeply enough for callers to mutate it.
     
-    return cache
+    Per-file dicts and the fingerprint maps are copied; the vectors themselves
+    are shared since callers only ever replace them.
+    """
+    result = dict(cache)
+    result["files"] = {
+        name: ({**data, "fingerprints": dict(data["fingerprints"])}
+               if isinstance(data, dict) and isinstance(data.get("fingerprints"), dict)
+               else (dict(data) if isinstance(data, dict) else data))
+        for name, data in cache.get("files", {}).items()
+    }
+    result["excluded_files"] = list(cache.get("excluded_files", []))
+    return result
+
+
+def load_fingerprint_cache(dirpath: Path, readonly: bool = False) -> Dict:
+    """
+    Load fingerprint cache from directory.
+    
+    Args:
+        dirpath: Practice folder
+        readonly: Return the shared memoized cache instead of a copy. Callers
+            passing True must not mutate the result.
+    """
+    cache = _memoized_fingerprint_entry(Path(dirpath))["cache"]
+    return cache if readonly else _copy_fingerprint_cache(cache)
+
+
+def load_fingerprint_flags(dirpath: Path) -> Dict:
+    """
+    Get folder flags and exclusions without touching fingerprint vectors.
+    
+    Returns:
+        Dictionary with is_reference_folder, ignore_fingerprints and
+        excluded_files (a frozenset)
+    """
+    return _memoized_fingerprint_entry(Path(dirpath))["flags"]
+
+
+def invalidate_fingerprint_cache(dirpath: Optional[Path] = None) -> None:
+    """Drop memoized caches for one directory, or all of them."""
+    with _fp_cache_lock:
+        if dirpath is None:
+            _fp_cache_memo.clear()
+        else:
+            _fp_cache_memo.pop(str(Path(dirpath) / FINGERPRINTS_JSON), None)
 
 
 def save_fingerprint_cache(dirpath: Path, cache: Dict) -> None:
-    """Save fingerprint cache to directory."""
-    cache_path = dirpath / FINGERPRINTS_JSON
+    """Save fingerprint cache to directory (compact format when numpy is available)."""
+    cache_path = Path(dirpath) / FINGERPRINTS_JSON
     try:
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(cache, f, indent=2, ensure_ascii=False)
+        if write_fingerprint_store(Path(dirpath), cache):
+            cache["storage"] = "npz"
+        else:
+            cache.pop("storage", None)
+            json_io.write_json(cache_path, cache)
     except Exception as e:
         print(f"Error saving fingerprint cache: {e}")
+        invalidate_fingerprint_cache(dirpath)
+        return
+    
+    # Write through so the next read doesn't re-parse what we just wrote
+    saved = _copy_fingerprint_cache(cache)
+    entry = {
+        "signature": _fingerprint_cache_signature(cache_path),
+        "cache": saved,
+        "flags": _extract_fingerprint_flags(saved),
+    }
+    with _fp_cache_lock:
+        _fp_cache_memo[str(cache_path)] = entry
+
+
+def compact_fingerprint_cache(dirpath: Path) -> bool:
+    """
+    Rewrite a legacy all-JSON fingerprint cache holding vectors in the compact
+    manifest + binary format (see shared.fingerprint_store).
+    
+    Reads never convert a cache; FingerprintEngine.compactFolderCache runs
+    this in the background for each scanned folder, and every save writes the
+    compact format anyway.
+    
+    Returns:
+        True if the cache was converted
+    """
+    with _fp_write_lock:
+        cache = load_fingerprint_cache(dirpath, readonly=True)
+        if is_compact_manifest(cache) or not any(isinstance(data, dict) and data.get("fingerprints")
+                                                 for data in cache.get("files", {}).values()):
+            return False
+        cache = load_fingerprint_cache(dirpath)
+        save_fingerprint_cache(dirpath, cache)
+        if not is_compact_manifest(cache):
+            return False
+        print(f"Migrated fingerprint cache in {dirpath} to compact storage")
+        return True
+
+
+def merge_fingerprint_entries(dirpath: Path, entries: Dict[str, Dict]) -> Dict:
+    """
+    Merge newly computed per-file entries into the cache on disk and save it.
+    
+    The cache is re-read first, so flags, exclusions and fingerprints saved
+    by anyone else since the caller loaded it are kept. An entry whose
+    size/mtime differs from the stored one replaces it; otherwise its
+    fingerprints are added. Files excluded in the meantime are skipped.
+    
+    Returns:
+        The saved cache
+    """
+    with _fp_write_lock:
+        cache = load_fingerprint_cache(dirpath)
+        excluded = set(cache.get("excluded_files", []))
+        for filename, new_entry in entries.items():
+            if filename in excluded:
+                continue
+            entry = cache["files"].get(filename)
+            stale = (isinstance(entry, dict) and "size" in entry and "size" in new_entry and
+                     (entry["size"], entry.get("mtime")) != (new_entry["size"], new_entry.get("mtime")))
+            if not isinstance(entry, dict) or stale:
+                entry = {"fingerprints": {}}
+            entry.setdefault("fingerprints", {}).update(new_entry.get("fingerprints", {}))
+            entry.update({k: v for k, v in new_entry.items() if k != "fingerprints"})
+            cache["files"][filename] = entry
+        save_fingerprint_cache(dirpath, cache)
+        return cache
 
 
 def is_file_excluded_from_fingerprinting(dirpath: Path, filename: str) -> bool:
     """Check if a file is excluded from fingerprinting in a directory."""
-    cache = load_fingerprint_cache(dirpath)
-    excluded_files = cache.get("excluded_files", [])
-    return filename in excluded_files
+    return filename in load_fingerprint_flags(dirpath)["excluded_files"]
 
 
 def is_folder_reference(dirpath: Path) -> bool:
     """Check if a folder is marked as a reference folder (higher matching weight)."""
-    cache = load_fingerprint_cache(dirpath)
-    return cache.get("is_reference_folder", False)
+    return load_fingerprint_flags(dirpath)["is_reference_folder"]
 
 
 def toggle_folder_reference(dirpath: Path) -> bool:
     """Toggle reference folder status. Returns new reference status."""
-    cache = load_fingerprint_cache(dirpath)
-    current_status = cache.get("is_reference_folder", False)
-    cache["is_reference_folder"] = not current_status
-    save_fingerprint_cache(dirpath, cache)
+    with _fp_write_lock:
+        cache = load_fingerprint_cache(dirpath)
+        current_status = cache.get("is_reference_folder", False)
+        cache["is_reference_folder"] = not current_status
+        save_fingerprint_cache(dirpath, cache)
     return cache["is_reference_folder"]
 
 
 def is_folder_ignored(dirpath: Path) -> bool:
     """Check if a folder is marked to be ignored for fingerprint matching."""
-    cache = load_fingerprint_cache(dirpath)
-    return cache.get("ignore_fingerprints", False)
+    return load_fingerprint_flags(dirpath)["ignore_fingerprints"]
 
 
 def toggle_folder_ignore(dirpath: Path) -> bool:
     """Toggle folder ignore status. Returns new ignore status."""
-    cache = load_fingerprint_cache(dirpath)
-    current_status = cache.get("ignore_fingerprints", False)
-    cache["ignore_fingerprints"] = not current_status
-    save_fingerprint_cache(dirpath, cache)
+    with _fp_write_lock:
+        cache = load_fingerprint_cache(dirpath)
+        current_status = cache.get("ignore_fingerprints", False)
+        cache["ignore_fingerprints"] = not current_status
+        save_fingerprint_cache(dirpath, cache)
     return cache["ignore_fingerprints"]
 
 
 def toggle_file_fingerprint_exclusion(dirpath: Path, filename: str) -> bool:
     """Toggle fingerprint exclusion status for a file. Returns new exclusion status."""
-    cache = load_fingerprint_cache(dirpath)
-    excluded_files = cache.get("excluded_files", [])
-    
-    if filename in excluded_files:
-        # Remove from exclusion list
-        excluded_files.remove(filename)
-        is_excluded = False
-    else:
-        # Add to exclusion list
-        excluded_files.append(filename)
-        is_excluded = True
-    
-    cache["excluded_files"] = excluded_files
-    save_fingerprint_cache(dirpath, cache)
+    with _fp_write_lock:
+        cache = load_fingerprint_cache(dirpath)
+        excluded_files = cache.get("excluded_files", [])
+        
+        if filename in excluded_files:
+            # Remove from exclusion list
+            excluded_files.remove(filename)
+            is_excluded = False
+        else:
+            # Add to exclusion list
+            excluded_files.append(filename)
+            is_excluded = True
+        
+        cache["excluded_files"] = excluded_files
+        save_fingerprint_cache(dirpath, cache)
     return is_excluded
 
 
@@ -678,17 +932,11 @@ def discover_practice_folders_with_fingerprints(root_path: Path) -> List[Path]:
     if not root_path.exists() or not root_path.is_dir():
         return practice_folders
     
-    # Check root directory itself
-    if (root_path / FINGERPRINTS_JSON).exists():
-        practice_folders.append(root_path)
-    
-    # Search all subdirectories
+    # Root directory first, then all subdirectories (hidden folders skipped)
     try:
-        for item in root_path.rglob(FINGERPRINTS_JSON):
-            if item.is_file():
-                folder = item.parent
-                if folder not in practice_folders:
-                    practice_folders.append(folder)
+        for listing in walk_directories(root_path):
+            if listing.has_file(FINGERPRINTS_JSON):
+                practice_folders.append(listing.path)
     except Exception as e:
         print(f"Error discovering practice folders: {e}")
     
@@ -718,14 +966,8 @@ def collect_fingerprints_from_folders(folder_paths: List[Path], algorithm: str,
     NAMES_JSON = ".audio_names.json"
     
     def load_json(filepath: Path, default=None):
-        """Load JSON file with fallback."""
-        try:
-            if filepath.exists():
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Error loading {filepath}: {e}")
-        return default
+        """Load JSON file with fallback (shared metadata cache, read-only)."""
+        return metadata_cache.load_json(filepath, default)
     
     fingerprint_map = {}
     
@@ -733,7 +975,7 @@ def collect_fingerprints_from_folders(folder_paths: List[Path], algorithm: str,
         if exclude_dir and folder_path.resolve() == exclude_dir.resolve():
             continue
             
-        cache = load_fingerprint_cache(folder_path)
+        cache = load_fingerprint_cache(folder_path, readonly=True)
         files_data = cache.get("files", {})
         excluded_files = cache.get("excluded_files", [])
         
@@ -965,17 +1207,26 @@ class FingerprintWorker(QThread):
         self._should_stop = True
     
     def run(self):
-        """Generate fingerprints for files."""
+        """
+        Generate fingerprints for files.
+        
+        Progress is checkpointed to disk periodically and on cancel or error.
+        Files that already have this algorithm's fingerprint are skipped, so
+        rerunning after an interruption resumes where the last run stopped.
+        """
+        generated_count = 0
+        pending: Dict[str, Dict] = {}
+        last_checkpoint = time.monotonic()
         try:
             cache = load_fingerprint_cache(self.directory)
             excluded_files = cache.get("excluded_files", [])
             
             total = len(self.files)
-            generated_count = 0
             
             for idx, filepath in enumerate(self.files):
                 if self._should_stop:
-                    self.finished.emit(False, "Operation cancelled")
+                    self._checkpoint(pending)
+                    self.finished.emit(False, f"Operation cancelled ({generated_count} fingerprints saved)")
                     return
                 
                 filename = Path(filepath).name
@@ -996,28 +1247,56 @@ class FingerprintWorker(QThread):
                 
                 # Load audio and generate fingerprint
                 try:
-                    samples, sr = self.audio_loader(filepath)
-                    if samples and sr:
+                    samples, sr = load_audio_for_algorithm(filepath, self.algorithm, self.audio_loader)
+                    if samples is not None and len(samples) > 0 and sr:
                         fingerprint = compute_multiple_fingerprints(samples, sr, [self.algorithm])
-                        
-                        # Update cache
-                        if filename not in cache["files"]:
-                            cache["files"][filename] = {"fingerprints": {}}
-                        if "fingerprints" not in cache["files"][filename]:
-                            cache["files"][filename]["fingerprints"] = {}
-                        
-                        cache["files"][filename]["fingerprints"][self.algorithm] = fingerprint[self.algorithm]
+                        pending[filename] = {"fingerprints": {self.algorithm: fingerprint[self.algorithm]}}
                         generated_count += 1
                 except Exception as e:
                     print(f"Error processing {filename}: {e}")
+                
+                if (len(pending) >= CHECKPOINT_EVERY_FILES or
+                        time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS):
+                    self._checkpoint(pending)
+                    last_checkpoint = time.monotonic()
             
             # Save cache
-            save_fingerprint_cache(self.directory, cache)
+            self._checkpoint(pending)
             
             self.finished.emit(True, f"Generated {generated_count} fingerprints")
             
         except Exception as e:
+            self._checkpoint(pending)
             self.finished.emit(False, f"Error: {str(e)}")
+    
+    def _checkpoint(self, pending: Dict[str, Dict]) -> None:
+        """Merge pending fingerprints into the on-disk cache and clear them."""
+        if not pending:
+            return
+        try:
+            merge_fingerprint_entries(self.directory, pending)
+            pending.clear()
+        except Exception as e:
+            print(f"Error checkpointing fingerprints: {e}")
+
+
+class CacheCompactWorker(QThread):
+    """Worker thread converting legacy fingerprint caches to compact storage."""
+    
+    finished = pyqtSignal(str, bool)  # directory, converted
+    
+    def __init__(self, directory: Path):
+        super().__init__()
+        self.directory = directory
+    
+    def run(self):
+        """Convert one folder's cache."""
+        try:
+            converted = compact_fingerprint_cache(self.directory)
+        except Exception as e:
+            print(f"Error compacting fingerprint cache in {self.directory}: {e}")
+            converted = False
+        self.finished.emit(str(self.directory), converted)
 
 
 class FingerprintEngine(QObject):
@@ -1031,6 +1310,10 @@ class FingerprintEngine(QObject):
     fingerprintGenerationProgress = pyqtSignal(int, int, str)  # current, total, status
     fingerprintGenerationFinished = pyqtSignal(bool, str)  # success, message
     matchingFinished = pyqtSignal(str)  # results as JSON string
+    landmarkProgress = pyqtSignal(int, int, str)  # current, total, status
+    landmarkIndexFinished = pyqtSignal(bool, str)  # success, message
+    landmarkSearchFinished = pyqtSignal(bool, str)  # success, results JSON or error message
+    cacheCompacted = pyqtSignal(str, bool)  # directory, converted
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -1038,6 +1321,9 @@ class FingerprintEngine(QObject):
         self._current_algorithm = DEFAULT_ALGORITHM
         self._threshold = 0.7
         self._worker = None
+        self._landmark_worker = None
+        self._compact_worker = None
+        self._compact_pending: List[Path] = []
         self._audio_loader = None  # Will be set by caller
     
     def setAudioLoader(self, loader):
@@ -1048,6 +1334,46 @@ class FingerprintEngine(QObject):
     def setCurrentDirectory(self, directory: str):
         """Set the current directory for fingerprinting operations."""
         self._current_directory = Path(directory) if directory else None
+        if self._current_directory:
+            self.compactFolderCache(directory)
+    
+    @pyqtSlot(str)
+    def compactFolderCache(self, directory: str):
+        """
+        Convert a folder's legacy fingerprint cache to compact storage in background.
+        
+        Called for every scanned folder; folders are converted one at a time
+        and results arrive via cacheCompacted.
+        """
+        folder = Path(directory)
+        if folder in self._compact_pending or (self._compact_worker and self._compact_worker.directory == folder):
+            return
+        self._compact_pending.append(folder)
+        if not self._compact_worker:
+            self._start_next_compaction()
+    
+    def _start_next_compaction(self):
+        if not self._compact_pending:
+            return
+        self._compact_worker = CacheCompactWorker(self._compact_pending.pop(0))
+        self._compact_worker.finished.connect(self._on_compaction_finished)
+        self._compact_worker.start()
+    
+    def _on_compaction_finished(self, directory: str, converted: bool):
+        """Handle one folder's conversion and start the next."""
+        if self._compact_worker:
+            self._compact_worker.wait()
+            self._compact_worker.deleteLater()
+            self._compact_worker = None
+        self.cacheCompacted.emit(directory, converted)
+        self._start_next_compaction()
+    
+    @pyqtSlot()
+    def finishCacheCompaction(self):
+        """Drop queued conversions and wait for the running one (e.g. on exit)."""
+        self._compact_pending.clear()
+        if self._compact_worker:
+            self._compact_worker.wait()
     
     @pyqtSlot(str)
     def setAlgorithm(self, algorithm: str):
@@ -1128,7 +1454,7 @@ class FingerprintEngine(QObject):
         if not dir_path or not dir_path.exists():
             return json.dumps({"error": "Invalid directory"})
         
-        cache = load_fingerprint_cache(dir_path)
+        cache = load_fingerprint_cache(dir_path, readonly=True)
         files_data = cache.get("files", {})
         
         info = {
@@ -1183,3 +1509,60 @@ class FingerprintEngine(QObject):
     def toggleFolderIgnore(self, directory: str) -> bool:
         """Toggle folder ignore status."""
         return toggle_folder_ignore(Path(directory))
+    
+    # ========== Landmark index (offset-aware matching) ==========
+    
+    @pyqtSlot(list)
+    def buildLandmarkIndex(self, files: list):
+        """Index landmarks for the given files of the current directory in background."""
+        if not self._current_directory:
+            self.landmarkIndexFinished.emit(False, "No directory set")
+            return
+        if self._landmark_worker and self._landmark_worker.isRunning():
+            self.landmarkIndexFinished.emit(False, "Landmark operation already in progress")
+            return
+        
+        excluded = load_fingerprint_flags(self._current_directory)["excluded_files"]
+        self._landmark_worker = LandmarkIndexWorker(self._current_directory, files, excluded)
+        self._landmark_worker.progressUpdate.connect(self.landmarkProgress)
+        self._landmark_worker.finished.connect(self._on_landmark_index_finished)
+        self._landmark_worker.start()
+    
+    @pyqtSlot(str, str)
+    def findSongsInRecording(self, recording_path: str, root_path: str):
+        """
+        Locate indexed songs inside a long recording in background.
+        
+        Every folder under root_path with a landmark index (except ignored
+        folders) is searched. Results arrive via landmarkSearchFinished.
+        """
+        if self._landmark_worker and self._landmark_worker.isRunning():
+            self.landmarkSearchFinished.emit(False, "Landmark operation already in progress")
+            return
+        
+        self._landmark_worker = LandmarkSearchWorker(Path(recording_path), Path(root_path),
+                                                     folder_ignored=is_folder_ignored)
+        self._landmark_worker.progressUpdate.connect(self.landmarkProgress)
+        self._landmark_worker.finished.connect(self._on_landmark_search_finished)
+        self._landmark_worker.start()
+    
+    def _on_landmark_index_finished(self, success: bool, message: str):
+        """Handle landmark indexing completion."""
+        self.landmarkIndexFinished.emit(success, message)
+        if self._landmark_worker:
+            self._landmark_worker.deleteLater()
+            self._landmark_worker = None
+    
+    def _on_landmark_search_finished(self, success: bool, result: str):
+        """Handle landmark search completion."""
+        self.landmarkSearchFinished.emit(success, result)
+        if self._landmark_worker:
+            self._landmark_worker.deleteLater()
+            self._landmark_worker = None
+    
+    @pyqtSlot()
+    def cancelLandmarkWork(self):
+        """Cancel ongoing landmark indexing or search."""
+        if self._landmark_worker and self._landmark_worker.isRunning():
+            self._landmark_worker.stop()
+            self._landmark_worker.wait()
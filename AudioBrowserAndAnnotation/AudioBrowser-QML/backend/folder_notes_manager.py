@@ -8,11 +8,17 @@ Author: AudioBrowser QML Development Team
 Date: December 2024
 """
 
+import sys
 from pathlib import Path
 from typing import Optional
 import json
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import json_io
+
 
 class FolderNotesManager(QObject):
     """
@@ -180,14 +186,13 @@ class FolderNotesManager(QObject):
                 'folder': str(self._current_folder)
             }
             
-            # Save to file
-            with open(notes_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Save to file (atomically)
+            json_io.write_json(notes_file, data)
             
             self._modified = False
             self.notesSaved.emit(str(notes_file))
             
-        except IOError as e:
+        except (OSError, TypeError, ValueError) as e:
             self.error.emit(f"Error saving notes: {str(e)}")
     
     @pyqtSlot()
@@ -13,6 +13,7 @@ This module provides Google Drive synchronization functionality including:
 from __future__ import annotations
 import json
 import os
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Set, Any
 from datetime import datetime
@@ -27,6 +28,11 @@ from .cloud_sync_base import (
     SYNC_EXCLUDED, VERSION_FILE, SYNC_HISTORY_FILE, SYNC_RULES_FILE, ANNOTATION_PATTERNS
 )
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.dir_walker import walk_directories
+
 # Google Drive API imports (with auto-installation)
 def _ensure_gdrive_import():
     """Ensure Google Drive libraries are available, installing if needed."""
@@ -643,24 +649,14 @@ def get_sync_files(directory: Path) -> Set[str]:
     if not directory.exists():
         return sync_files
     
-    def scan_directory(current_dir: Path, relative_prefix: str = ""):
-        """Recursively scan directory and add syncable files."""
-        for item in current_dir.iterdir():
-            # Skip excluded directories
-            if item.is_dir():
-                if item.name not in SYNC_EXCLUDED:
-                    # Recursively scan subdirectory
-                    subdir_prefix = f"{relative_prefix}{item.name}/" if relative_prefix else f"{item.name}/"
-                    scan_directory(item, subdir_prefix)
-                continue
-            
-            # Check if file should be synced
-            if should_sync_file(item.name):
+    # Only excluded folders are skipped; hidden folders may hold synced metadata
+    for listing in walk_directories(directory, skip_dir=lambda name: name in SYNC_EXCLUDED):
+        prefix = f"{listing.relative}/" if listing.relative else ""
+        for entry in listing.files:
+            if should_sync_file(entry.name):
                 # Add file with relative path from root
-                relative_path = f"{relative_prefix}{item.name}"
-                sync_files.add(relative_path)
+                sync_files.add(f"{prefix}{entry.name}")
     
-    scan_directory(directory)
     return sync_files
 
 
@@ -0,0 +1,666 @@
+"""
+Landmark Hash Index for AudioBrowser QML
+
+Offset-aware audio matching in the style of Shazam/audfprint:
+- Spectrogram peaks are paired into landmarks: a hash of (f1, f2 - f1, dt)
+  plus the anchor time t1
+- Each practice folder stores its landmarks in .audio_landmarks.npz
+- Folders are merged into an inverted index: hash -> (file, anchor time),
+  kept as flat NumPy arrays sorted by hash with a direct bucket table, so a
+  lookup costs the same however many songs are indexed; the merged index is
+  kept in memory until one of its folders' landmark files changes
+- Queries vote on (file, t_reference - t_query) offsets; true matches pile
+  up in one offset bin while chance collisions are spread out
+
+Unlike the fixed-size fingerprint vectors, this finds a short clip inside a
+song and finds every song (with its start time) inside a long continuous
+rehearsal recording. Long recordings are read in chunks so they never have
+to be decoded into memory at once.
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# Import shared metadata constants
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.dir_walker import walk_directories
+from shared.file_utils import atomic_write_bytes
+from shared.metadata_constants import LANDMARKS_NPZ
+
+from .waveform_engine import HAVE_NUMPY, decode_audio_window, get_audio_duration_seconds, resample_audio
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+# Analysis parameters (changing any of these invalidates stored landmarks)
+LANDMARK_SAMPLE_RATE = 11025
+LANDMARK_FFT_SIZE = 512
+LANDMARK_HOP = 256
+FRAME_SECONDS = LANDMARK_HOP / LANDMARK_SAMPLE_RATE
+PEAKS_PER_FRAME = 3
+PEAK_RELATIVE_THRESHOLD = 0.05  # Peaks must reach this fraction of the frame maximum
+PEAK_ABSOLUTE_FLOOR = 1e-3      # Ignore peaks in (near) silence
+FAN_OUT = 3                     # Landmarks per anchor peak
+MAX_DT_FRAMES = 63              # Target zone length (6 bits)
+MAX_DF_BINS = 31                # Target zone height (6 bits, signed)
+HASH_BITS = 20                  # 8 bits f1 + 6 bits df + 6 bits dt
+LANDMARK_STORE_VERSION = 1
+
+# Indexing and query limits
+CHUNK_FRAMES = 4096             # Frames per decode chunk (~95 s)
+MAX_INDEX_SECONDS = 20 * 60     # Longer files are recordings to search, not songs
+MAX_BUCKET_HITS = 2000          # Skip hashes this common; they carry no information
+MIN_MATCH_VOTES = 25             # Chance collisions rarely line up more than ~15 times
+OFFSET_TOLERANCE_FRAMES = 2
+
+
+# ========== Landmark extraction ==========
+
+def _spectrogram_peaks(samples, first_frame: int) -> Tuple:
+    """
+    Pick up to PEAKS_PER_FRAME local maxima per spectrogram frame.
+
+    Returns:
+        Tuple of (frame indices, frequency bins) sorted by time, as int arrays.
+        Frame indices are absolute: the first frame of samples is first_frame.
+    """
+    arr = np.asarray(samples, dtype=np.float32)
+    if len(arr) < LANDMARK_FFT_SIZE:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    frames = np.lib.stride_tricks.sliding_window_view(arr, LANDMARK_FFT_SIZE)[::LANDMARK_HOP]
+    spec = np.abs(np.fft.rfft(frames * np.hanning(LANDMARK_FFT_SIZE).astype(np.float32), axis=1))
+    spec = spec[:, 1:257]  # 256 bins, so f fits in 8 bits
+
+    # Local maximum across neighbouring bins and neighbouring frames
+    padded = np.pad(spec, 1, mode="constant", constant_values=-1.0)
+    centre = padded[1:-1, 1:-1]
+    is_peak = (
+        (centre > padded[1:-1, :-2]) & (centre >= padded[1:-1, 2:]) &
+        (centre > padded[:-2, 1:-1]) & (centre >= padded[2:, 1:-1])
+    )
+    frame_max = spec.max(axis=1, keepdims=True)
+    is_peak &= (spec >= frame_max * PEAK_RELATIVE_THRESHOLD) & (spec > PEAK_ABSOLUTE_FLOOR)
+
+    strength = np.where(is_peak, spec, 0.0)
+    k = min(PEAKS_PER_FRAME, strength.shape[1])
+    top = np.argpartition(-strength, k - 1, axis=1)[:, :k]
+    keep = np.take_along_axis(strength, top, axis=1) > 0
+
+    t = np.repeat(np.arange(len(spec)), k).reshape(len(spec), k)[keep] + first_frame
+    f = top[keep]
+    order = np.lexsort((f, t))
+    return t[order].astype(np.int64), f[order].astype(np.int64)
+
+
+def _pair_peaks(t, f, anchor_lo: int = 0, anchor_hi: Optional[int] = None) -> Tuple:
+    """
+    Pair each anchor peak with up to FAN_OUT later peaks in its target zone.
+
+    Only anchors with anchor_lo <= t < anchor_hi produce landmarks, so chunks
+    decoded with overlap don't emit the same landmark twice.
+
+    Returns:
+        Tuple of (hashes as uint32, anchor frames as uint32)
+    """
+    n = len(t)
+    anchors = (t >= anchor_lo) if anchor_hi is None else ((t >= anchor_lo) & (t < anchor_hi))
+    used = np.zeros(n, dtype=np.int64)
+    hashes, times = [], []
+
+    for step in range(1, n):
+        i = np.arange(n - step)
+        j = i + step
+        dt = t[j] - t[i]
+        if not np.any(dt <= MAX_DT_FRAMES):
+            break
+        df = f[j] - f[i]
+        ok = (dt >= 1) & (dt <= MAX_DT_FRAMES) & (np.abs(df) <= MAX_DF_BINS) & anchors[i] & (used[i] < FAN_OUT)
+        if not np.any(ok):
+            continue
+        i, dt, df = i[ok], dt[ok], df[ok]
+        used[i] += 1
+        hashes.append((f[i] << 12) | ((df + 32) << 6) | dt)
+        times.append(t[i])
+
+    if not hashes:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+    return np.concatenate(hashes).astype(np.uint32), np.concatenate(times).astype(np.uint32)
+
+
+def extract_landmarks(samples, sr: int) -> Tuple:
+    """
+    Compute landmark hashes for in-memory mono samples.
+
+    Returns:
+        Tuple of (hashes, anchor frames) as uint32 arrays
+    """
+    if samples is None or len(samples) == 0 or not sr:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+    if sr != LANDMARK_SAMPLE_RATE:
+        samples = resample_audio(samples, sr, LANDMARK_SAMPLE_RATE)
+    t, f = _spectrogram_peaks(samples, 0)
+    return _pair_peaks(t, f)
+
+
+def iter_file_landmarks(path: Path, chunk_frames: int = CHUNK_FRAMES):
+    """
+    Compute landmarks for a file chunk by chunk.
+
+    Each chunk is decoded with enough overlap that peaks near its edges see
+    their neighbours and anchors near its end still reach their full target
+    zone, so the concatenated output equals a single full-file pass.
+
+    Yields:
+        (hashes, anchor frames, seconds processed, total seconds or None)
+    """
+    path = Path(path)
+    duration = get_audio_duration_seconds(path)
+    chunk_s = chunk_frames * FRAME_SECONDS
+
+    if duration is None or duration <= 2 * chunk_s:
+        samples, sr = decode_audio_window(path, None, LANDMARK_SAMPLE_RATE)
+        hashes, times = extract_landmarks(samples, sr)
+        yield hashes, times, duration or 0.0, duration
+        return
+
+    first_frame = 0
+    while first_frame * FRAME_SECONDS < duration:
+        lead = 1 if first_frame > 0 else 0
+        start_frame = first_frame - lead
+        frames_needed = lead + chunk_frames + MAX_DT_FRAMES + 2
+        window_s = (frames_needed * LANDMARK_HOP + LANDMARK_FFT_SIZE) / LANDMARK_SAMPLE_RATE
+        samples, sr = decode_audio_window(path, window_s, LANDMARK_SAMPLE_RATE,
+                                          position=start_frame * FRAME_SECONDS)
+        if sr != LANDMARK_SAMPLE_RATE:
+            samples = resample_audio(samples, sr, LANDMARK_SAMPLE_RATE)
+        if samples is None or len(samples) < LANDMARK_FFT_SIZE:
+            break
+        t, f = _spectrogram_peaks(samples, start_frame)
+        hashes, times = _pair_peaks(t, f, first_frame, first_frame + chunk_frames)
+        first_frame += chunk_frames
+        yield hashes, times, min(duration, first_frame * FRAME_SECONDS), duration
+
+
+def extract_file_landmarks(path: Path) -> Tuple:
+    """Compute all landmarks for a file (see iter_file_landmarks)."""
+    parts = list(iter_file_landmarks(path))
+    if not parts:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+    return (np.concatenate([p[0] for p in parts]),
+            np.concatenate([p[1] for p in parts]))
+
+
+# ========== Per-folder storage ==========
+
+def load_landmark_store(dirpath: Path) -> Dict[str, Dict]:
+    """
+    Load a folder's landmarks.
+
+    Returns:
+        Dictionary of filename -> {"size", "mtime", "hashes", "times"}
+        (empty if missing, unreadable or from other analysis parameters)
+    """
+    store = {}
+    if not HAVE_NUMPY:
+        return store
+    try:
+        with np.load(Path(dirpath) / LANDMARKS_NPZ, allow_pickle=False) as npz:
+            if int(npz["version"]) != LANDMARK_STORE_VERSION:
+                return store
+            hashes, times = npz["hashes"], npz["times"]
+            bounds = npz["bounds"]
+            for idx, name in enumerate(npz["names"]):
+                start, end = bounds[idx], bounds[idx + 1]
+                store[str(name)] = {
+                    "size": int(npz["sizes"][idx]),
+                    "mtime": int(npz["mtimes"][idx]),
+                    "hashes": hashes[start:end],
+                    "times": times[start:end],
+                }
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: Could not load landmark index for {dirpath}: {e}")
+    return store
+
+
+def save_landmark_store(dirpath: Path, store: Dict[str, Dict]) -> None:
+    """Save a folder's landmarks atomically."""
+    names = sorted(store)
+    counts = [len(store[name]["hashes"]) for name in names]
+    bounds = np.zeros(len(names) + 1, dtype=np.int64)
+    bounds[1:] = np.cumsum(counts)
+    empty = np.zeros(0, dtype=np.uint32)
+    arrays = {
+        "version": np.array(LANDMARK_STORE_VERSION),
+        "names": np.array(names, dtype=str),
+        "sizes": np.array([store[n]["size"] for n in names], dtype=np.int64),
+        "mtimes": np.array([store[n]["mtime"] for n in names], dtype=np.int64),
+        "bounds": bounds,
+        "hashes": np.concatenate([store[n]["hashes"] for n in names] or [empty]).astype(np.uint32),
+        "times": np.concatenate([store[n]["times"] for n in names] or [empty]).astype(np.uint32),
+    }
+
+    try:
+        atomic_write_bytes(Path(dirpath) / LANDMARKS_NPZ, lambda f: np.savez(f, **arrays))
+    except Exception as e:
+        print(f"Error saving landmark index: {e}")
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    """(size, mtime) of a file, or (0, 0) if it can't be read."""
+    try:
+        st = path.stat()
+        return st.st_size, int(st.st_mtime)
+    except OSError:
+        return 0, 0
+
+
+def _store_signature(dirpath: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a folder's landmark file, or None if it has none."""
+    try:
+        st = os.stat(Path(dirpath) / LANDMARKS_NPZ)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def discover_landmark_folders(root_path: Path) -> List[Path]:
+    """Return root_path and every subfolder that has a landmark index."""
+    root_path = Path(root_path)
+    if not root_path.is_dir():
+        return []
+    return sorted(listing.path for listing in walk_directories(root_path)
+                  if listing.has_file(LANDMARKS_NPZ))
+
+
+# ========== Inverted index and offset voting ==========
+
+class LandmarkIndex:
+    """
+    Inverted landmark index over any number of files.
+
+    Entries are three parallel arrays sorted by hash (hash, file id, anchor
+    time); bucket_starts[h] is the first entry with hash h, so a lookup is
+    two array reads regardless of how many files are indexed.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._parts: List[Tuple] = []
+        self._hashes = None
+        self._file_ids = None
+        self._times = None
+        self._bucket_starts = None
+
+    @classmethod
+    def from_folders(cls, folders: Iterable[Path], exclude: Iterable[str] = ()) -> "LandmarkIndex":
+        """Build an index from the stored landmarks of several folders."""
+        index = cls()
+        excluded = {str(Path(p)) for p in exclude}
+        for folder in folders:
+            for name, entry in load_landmark_store(folder).items():
+                path = str(Path(folder) / name)
+                if path not in excluded:
+                    index.add(path, entry["hashes"], entry["times"])
+        return index
+
+    def add(self, name: str, hashes, times) -> None:
+        """Add one file's landmarks (the index is rebuilt on the next query)."""
+        file_id = len(self.names)
+        self.names.append(name)
+        self._parts.append((np.asarray(hashes, dtype=np.uint32),
+                            np.full(len(hashes), file_id, dtype=np.int32),
+                            np.asarray(times, dtype=np.uint32)))
+        self._bucket_starts = None
+
+    def __len__(self) -> int:
+        return sum(len(part[0]) for part in self._parts)
+
+    def _build(self) -> None:
+        """Sort all entries by hash and build the bucket table."""
+        if self._parts:
+            hashes = np.concatenate([p[0] for p in self._parts])
+            file_ids = np.concatenate([p[1] for p in self._parts])
+            times = np.concatenate([p[2] for p in self._parts])
+        else:
+            hashes = np.zeros(0, dtype=np.uint32)
+            file_ids = np.zeros(0, dtype=np.int32)
+            times = np.zeros(0, dtype=np.uint32)
+        order = np.argsort(hashes, kind="stable")
+        self._hashes = hashes[order]
+        self._file_ids = file_ids[order]
+        self._times = times[order]
+        self._bucket_starts = np.searchsorted(
+            self._hashes, np.arange((1 << HASH_BITS) + 1, dtype=np.uint32)).astype(np.int64)
+
+    def lookup(self, hashes, times) -> Tuple:
+        """
+        Find every indexed entry sharing a hash with the query.
+
+        Returns:
+            Tuple of (file ids, offsets = t_indexed - t_query, query times)
+        """
+        if self._bucket_starts is None:
+            self._build()
+        hashes = np.asarray(hashes, dtype=np.int64)
+        times = np.asarray(times, dtype=np.int64)
+        starts = self._bucket_starts[hashes]
+        counts = self._bucket_starts[hashes + 1] - starts
+        counts[counts > MAX_BUCKET_HITS] = 0
+
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        query_idx = np.repeat(np.arange(len(hashes)), counts)
+        first_of_run = np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.repeat(starts, counts) + (np.arange(total) - first_of_run)
+        query_times = times[query_idx]
+        offsets = self._times[positions].astype(np.int64) - query_times
+        return self._file_ids[positions].astype(np.int64), offsets, query_times
+
+    def query(self, hashes, times, min_votes: int = MIN_MATCH_VOTES) -> List[Dict]:
+        """Vote on a complete query (see OffsetVotes.occurrences for the result)."""
+        votes = OffsetVotes()
+        votes.add(*self.lookup(hashes, times))
+        return votes.occurrences(self.names, min_votes)
+
+
+# Last merged index and the landmark file signatures it was built from
+_merged_index: Optional[Tuple[Tuple, "LandmarkIndex"]] = None
+_merged_index_lock = threading.Lock()
+
+
+def load_merged_index(folders: Iterable[Path]) -> "LandmarkIndex":
+    """
+    Merged, ready-to-query index of several folders' stored landmarks.
+
+    The last index is reused while every folder's .audio_landmarks.npz is
+    unchanged, so repeated searches skip reloading and re-sorting them.
+    """
+    global _merged_index
+    folders = [Path(f) for f in folders]
+    key = tuple((str(f), _store_signature(f)) for f in folders)
+    with _merged_index_lock:
+        if _merged_index is not None and _merged_index[0] == key:
+            return _merged_index[1]
+    index = LandmarkIndex.from_folders(folders)
+    index._build()
+    with _merged_index_lock:
+        _merged_index = (key, index)
+    return index
+
+
+class OffsetVotes:
+    """
+    Accumulates (file, offset) votes across query chunks.
+
+    Besides the vote counts it keeps the query frame of every vote whose
+    bin got at least two votes within the same chunk. True matches vote
+    densely, so this keeps their timing (where the match sits in the query
+    audio) while dropping nearly all chance collisions.
+    """
+
+    _OFFSET_BIAS = 1 << 31
+    SPAN_PERCENTILES = (2, 98)  # Ignore stray votes at the edges of a match
+
+    def __init__(self):
+        self._counts: List[Tuple] = []
+        self._timed: List[Tuple] = []
+
+    @staticmethod
+    def _reduce(keys, counts) -> Tuple:
+        """Merge duplicate keys, summing their counts."""
+        unique, inverse = np.unique(keys, return_inverse=True)
+        total = np.zeros(len(unique), dtype=np.int64)
+        np.add.at(total, inverse, counts)
+        return unique, total
+
+    def add(self, file_ids, offsets, query_times) -> None:
+        """Add the votes from one lookup."""
+        if len(file_ids) == 0:
+            return
+        keys = (file_ids << 32) | (offsets + self._OFFSET_BIAS)
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        self._counts.append((unique, counts.astype(np.int64)))
+        dense = counts[inverse] >= 2
+        self._timed.append((keys[dense], query_times[dense]))
+
+    def occurrences(self, names: List[str], min_votes: int = MIN_MATCH_VOTES,
+                    tolerance: int = OFFSET_TOLERANCE_FRAMES) -> List[Dict]:
+        """
+        Turn the offset histograms into matches.
+
+        Starting from the strongest bin, neighbouring offsets within tolerance
+        frames are merged into it (timing jitter splits votes across adjacent
+        bins). A file can match more than once, e.g. a song played twice in
+        one recording.
+
+        Returns:
+            List of dicts sorted by query time: file, votes, offset_frames
+            (t_indexed - t_query), query_start_frame and query_end_frame
+        """
+        if not self._counts:
+            return []
+        keys, votes = self._reduce(*(np.concatenate(arrays) for arrays in zip(*self._counts)))
+        self._counts = [(keys, votes)]
+        timed_keys, timed_times = (np.concatenate(arrays) for arrays in zip(*self._timed))
+        order = np.argsort(timed_keys, kind="stable")
+        timed_keys, timed_times = timed_keys[order], timed_times[order]
+        self._timed = [(timed_keys, timed_times)]
+
+        seeds = np.nonzero(votes >= max(2, min_votes // 2))[0]
+        seeds = seeds[np.argsort(-votes[seeds], kind="stable")]
+        claimed = np.zeros(len(keys), dtype=bool)
+        results = []
+        for seed in seeds:
+            if claimed[seed]:
+                continue
+            lo_key, hi_key = keys[seed] - tolerance, keys[seed] + tolerance
+            span = slice(np.searchsorted(keys, lo_key, side="left"),
+                         np.searchsorted(keys, hi_key, side="right"))
+            claimed[span] = True
+            total = int(votes[span].sum())
+            if total < min_votes:
+                continue
+            times = timed_times[np.searchsorted(timed_keys, lo_key, side="left"):
+                                np.searchsorted(timed_keys, hi_key, side="right")]
+            if len(times) == 0:
+                continue
+            first, last = np.percentile(times, self.SPAN_PERCENTILES)
+            results.append({
+                "file": names[int(keys[seed] >> 32)],
+                "votes": total,
+                "offset_frames": int((keys[seed] & 0xFFFFFFFF) - self._OFFSET_BIAS),
+                "query_start_frame": int(round(first)),
+                "query_end_frame": int(round(last)),
+            })
+
+        results.sort(key=lambda r: (r["query_start_frame"], -r["votes"]))
+        return results
+
+
+def match_clip(index: LandmarkIndex, samples, sr: int, min_votes: int = MIN_MATCH_VOTES) -> List[Dict]:
+    """
+    Find which indexed files contain a clip, and where.
+
+    Returns:
+        List of dicts (strongest first): file, votes and offset_s, the time
+        in the matched file where the clip starts
+    """
+    hashes, times = extract_landmarks(samples, sr)
+    matches = index.query(hashes, times, min_votes)
+    matches.sort(key=lambda r: -r["votes"])
+    return [{"file": m["file"], "votes": m["votes"],
+             "offset_s": round(m["offset_frames"] * FRAME_SECONDS, 3)} for m in matches]
+
+
+def find_songs_in_recording(index: LandmarkIndex, recording_path: Path,
+                            min_votes: int = MIN_MATCH_VOTES, progress=None,
+                            should_stop=None, chunk_frames: int = CHUNK_FRAMES) -> List[Dict]:
+    """
+    Locate every indexed song inside a long recording.
+
+    The recording is read chunk by chunk and every chunk's votes are
+    accumulated, so memory use does not grow with the recording length.
+
+    Args:
+        progress: Optional callable(seconds_done, total_seconds_or_None)
+        should_stop: Optional callable returning True to abort (returns [])
+
+    Returns:
+        List of dicts in recording order: file, votes, match_start_s and
+        match_end_s (the matched span in the recording), song_start_s (where
+        the song's own start lines up in the recording; negative if the
+        recording begins mid-song) and song_position_s (the point in the song
+        where the matched span begins)
+    """
+    votes = OffsetVotes()
+    for hashes, times, done_s, total_s in iter_file_landmarks(recording_path, chunk_frames):
+        if should_stop and should_stop():
+            return []
+        votes.add(*index.lookup(hashes, times))
+        if progress:
+            progress(done_s, total_s)
+
+    results = []
+    for m in votes.occurrences(index.names, min_votes):
+        results.append({
+            "file": m["file"],
+            "votes": m["votes"],
+            "match_start_s": round(m["query_start_frame"] * FRAME_SECONDS, 3),
+            "match_end_s": round(m["query_end_frame"] * FRAME_SECONDS, 3),
+            "song_start_s": round(-m["offset_frames"] * FRAME_SECONDS, 3),
+            "song_position_s": round((m["query_start_frame"] + m["offset_frames"]) * FRAME_SECONDS, 3),
+        })
+    return results
+
+
+# ========== Background workers ==========
+
+class LandmarkIndexWorker(QThread):
+    """Worker thread that updates a folder's landmark index."""
+
+    progressUpdate = pyqtSignal(int, int, str)  # current, total, filename
+    finished = pyqtSignal(bool, str)  # success, message
+
+    def __init__(self, directory: Path, files: List[str], excluded_files: Iterable[str] = ()):
+        super().__init__()
+        self.directory = Path(directory)
+        self.files = files
+        self.excluded_files = set(excluded_files)
+        self._should_stop = False
+
+    def stop(self):
+        """Request the worker to stop."""
+        self._should_stop = True
+
+    def run(self):
+        """Index new or changed files; unchanged files keep their landmarks."""
+        try:
+            store = load_landmark_store(self.directory)
+            wanted = {Path(f).name for f in self.files}
+            changed = False
+
+            # Drop files that were deleted or excluded since the last run
+            for name in list(store):
+                if name in self.excluded_files or not (self.directory / name).exists():
+                    del store[name]
+                    changed = True
+
+            total = len(self.files)
+            indexed = 0
+            for idx, filepath in enumerate(self.files):
+                if self._should_stop:
+                    break
+                path = Path(filepath)
+                if path.name in self.excluded_files:
+                    self.progressUpdate.emit(idx + 1, total, f"Skipped (excluded): {path.name}")
+                    continue
+
+                size, mtime = _file_signature(path)
+                entry = store.get(path.name)
+                if entry and entry["size"] == size and entry["mtime"] == mtime:
+                    continue
+
+                duration = get_audio_duration_seconds(path)
+                if duration is not None and duration > MAX_INDEX_SECONDS:
+                    self.progressUpdate.emit(idx + 1, total, f"Skipped (long recording): {path.name}")
+                    continue
+
+                self.progressUpdate.emit(idx + 1, total, f"Indexing: {path.name}")
+                try:
+                    hashes, times = extract_file_landmarks(path)
+                    store[path.name] = {"size": size, "mtime": mtime, "hashes": hashes, "times": times}
+                    indexed += 1
+                    changed = True
+                except Exception as e:
+                    print(f"Error indexing {path.name}: {e}")
+
+            # Keep partial progress on cancel - finished files are still valid
+            if changed:
+                save_landmark_store(self.directory, store)
+
+            if self._should_stop:
+                self.finished.emit(False, "Operation cancelled")
+            else:
+                skipped = len(wanted) - indexed
+                self.finished.emit(True, f"Indexed {indexed} files ({skipped} unchanged or skipped)")
+        except Exception as e:
+            self.finished.emit(False, f"Error: {str(e)}")
+
+
+class LandmarkSearchWorker(QThread):
+    """Worker thread that locates indexed songs inside a long recording."""
+
+    progressUpdate = pyqtSignal(int, int, str)  # seconds done, total seconds, status
+    finished = pyqtSignal(bool, str)  # success, results JSON or error message
+
+    def __init__(self, recording_path: Path, root_path: Path, min_votes: int = MIN_MATCH_VOTES,
+                 folder_ignored: Optional[Callable[[Path], bool]] = None):
+        super().__init__()
+        self.recording_path = Path(recording_path)
+        self.root_path = Path(root_path)
+        self.min_votes = min_votes
+        self.folder_ignored = folder_ignored
+        self._should_stop = False
+
+    def stop(self):
+        """Request the worker to stop."""
+        self._should_stop = True
+
+    def run(self):
+        """Find the indexed folders, load the merged index and scan the recording."""
+        try:
+            self.progressUpdate.emit(0, 0, "Loading landmark index")
+            folders = [f for f in discover_landmark_folders(self.root_path)
+                       if not (self.folder_ignored and self.folder_ignored(f))]
+            index = load_merged_index(folders)
+            recording = str(self.recording_path)
+            if not any(name != recording for name in index.names):
+                self.finished.emit(False, "No landmark index found - index your song folders first")
+                return
+
+            def progress(done_s, total_s):
+                self.progressUpdate.emit(int(done_s), int(total_s or 0),
+                                         f"Scanning: {self.recording_path.name}")
+
+            results = find_songs_in_recording(index, self.recording_path, self.min_votes,
+                                              progress, lambda: self._should_stop)
+            if self._should_stop:
+                self.finished.emit(False, "Operation cancelled")
+                return
+            # The index is shared between searches, so the recording itself is dropped here
+            results = [r for r in results if r["file"] != recording]
+            self.finished.emit(True, json.dumps({"recording": recording, "matches": results}))
+        except Exception as e:
+            self.finished.emit(False, f"Error: {str(e)}")
@@ -0,0 +1,262 @@
+"""
+Library Watcher for AudioBrowser QML
+
+Watches the folder shown in the file list and turns filesystem events into
+incremental updates instead of a full rediscovery:
+- New, deleted, renamed and modified audio files are emitted as lists, so
+  FileListModel can insert, remove or update just those rows
+- Stale durations are dropped from the FileManager cache and the
+  discovered file list is patched in place
+- External edits to the provided names file refresh row metadata
+
+Events are debounced: the folder is rescanned once things have been quiet
+for DEBOUNCE_MS, and at least every MAX_DELAY_MS while events keep coming
+(e.g. a recorder writing a growing WAV).
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal, pyqtSlot
+
+# Import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.dir_walker import scan_directory
+from shared.metadata_constants import NAMES_JSON
+
+from .file_manager import AUDIO_EXTENSIONS
+
+
+# Quiet period before a burst of events is processed
+DEBOUNCE_MS = 500
+
+# Longest a continuous stream of events can hold back a rescan
+MAX_DELAY_MS = 5000
+
+# Audio files watched individually for content changes (directory events
+# only cover creation, deletion and renames on most platforms)
+MAX_WATCHED_FILES = 1000
+
+# Metadata files whose external changes affect what the rows show
+WATCHED_METADATA = {NAMES_JSON}
+
+
+# (inode, size, mtime_ns) of one file
+FileSignature = Tuple[int, int, int]
+
+
+class FolderChanges(NamedTuple):
+    """Differences between two scans of a folder (filenames)."""
+    added: List[str]
+    removed: List[str]
+    renamed: List[Tuple[str, str]]  # (old name, new name)
+    modified: List[str]
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.renamed or self.modified)
+
+
+def diff_snapshots(old: Dict[str, FileSignature], new: Dict[str, FileSignature]) -> FolderChanges:
+    """
+    Compare two folder snapshots.
+
+    A file that disappeared while one with the same inode (or, where the
+    filesystem has no inodes, the same size and mtime) appeared is reported
+    as a rename rather than a removal plus an addition.
+    """
+    gone = sorted(set(old) - set(new))
+    appeared = sorted(set(new) - set(old))
+
+    def identity(sig: FileSignature):
+        return ("inode", sig[0]) if sig[0] else ("stat", sig[1], sig[2])
+
+    appeared_by_identity = {}
+    for name in appeared:
+        appeared_by_identity.setdefault(identity(new[name]), []).append(name)
+
+    renamed, removed = [], []
+    for name in gone:
+        candidates = appeared_by_identity.get(identity(old[name]))
+        if candidates:
+            renamed.append((name, candidates.pop(0)))
+        else:
+            removed.append(name)
+    renamed_to = {new_name for _, new_name in renamed}
+    added = [name for name in appeared if name not in renamed_to]
+
+    modified = [name for name in sorted(set(old) & set(new)) if old[name] != new[name]]
+    return FolderChanges(added, removed, renamed, modified)
+
+
+class LibraryWatcher(QObject):
+    """
+    Watches one folder and reports incremental changes to its audio files.
+
+    Follows FileManager.directoryScanned, so the watched folder is always
+    the one whose files are in the list.
+    """
+
+    filesAdded = pyqtSignal(list)  # New file paths
+    filesRemoved = pyqtSignal(list)  # Deleted file paths
+    filesRenamed = pyqtSignal(list)  # [[old_path, new_path], ...]
+    filesModified = pyqtSignal(list)  # Paths whose contents changed
+    metadataChanged = pyqtSignal(str)  # Directory whose row metadata changed on disk
+
+    def __init__(self, file_manager=None, parent=None):
+        """
+        Initialize the library watcher.
+
+        Args:
+            file_manager: Optional FileManager whose duration cache and
+                discovered file list are kept in step with the changes
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._file_manager = file_manager
+        self._directory: Optional[Path] = None
+        self._audio: Dict[str, FileSignature] = {}
+        self._metadata: Dict[str, FileSignature] = {}
+        self._first_event: Optional[float] = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_event)
+        self._watcher.fileChanged.connect(self._on_event)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DEBOUNCE_MS)
+        self._timer.timeout.connect(self.rescan)
+
+        if file_manager is not None:
+            file_manager.directoryScanned.connect(self.setDirectory)
+
+    @pyqtSlot(str)
+    def setDirectory(self, directory: str) -> None:
+        """
+        Start watching a folder, taking its current contents as the baseline.
+
+        Args:
+            directory: Folder to watch (empty string stops watching)
+        """
+        self.stop()
+        if not directory:
+            return
+        path = Path(directory)
+        try:
+            self._audio, self._metadata = self._snapshot(path)
+        except OSError as e:
+            print(f"Warning: Could not watch {path}: {e}")
+            return
+        self._directory = path
+        self._watcher.addPath(str(path))
+        self._update_watched_files()
+
+    @pyqtSlot()
+    def stop(self) -> None:
+        """Stop watching and drop any pending events."""
+        self._timer.stop()
+        self._first_event = None
+        watched = self._watcher.directories() + self._watcher.files()
+        if watched:
+            self._watcher.removePaths(watched)
+        self._directory = None
+        self._audio, self._metadata = {}, {}
+
+    @pyqtSlot(result=str)
+    def getDirectory(self) -> str:
+        """Get the folder being watched."""
+        return str(self._directory) if self._directory else ""
+
+    def _on_event(self, path: str) -> None:
+        """Debounce a filesystem event into a later rescan."""
+        if self._directory is None:
+            return
+        now = time.monotonic()
+        if self._first_event is None:
+            self._first_event = now
+        # Restart the quiet period, unless events have held the rescan back too long
+        if (now - self._first_event) * 1000 < MAX_DELAY_MS or not self._timer.isActive():
+            self._timer.start()
+
+    def _snapshot(self, directory: Path):
+        """Signatures of the folder's audio files and watched metadata files."""
+        listing = scan_directory(directory, AUDIO_EXTENSIONS, skip_dir=None)
+        audio, metadata = {}, {}
+        audio_names = {entry.name for entry in listing.audio}
+        for entry in listing.files:
+            if entry.name not in audio_names and entry.name not in WATCHED_METADATA:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue  # Removed since the listing
+            signature = (entry.inode(), st.st_size, st.st_mtime_ns)
+            if entry.name in audio_names:
+                audio[entry.name] = signature
+            else:
+                metadata[entry.name] = signature
+        return audio, metadata
+
+    def _update_watched_files(self) -> None:
+        """Watch the folder's audio files (up to MAX_WATCHED_FILES) for content changes."""
+        if self._directory is None:
+            return
+        wanted = {str(self._directory / name) for name in sorted(self._audio)[:MAX_WATCHED_FILES]}
+        watched = set(self._watcher.files())
+        stale = list(watched - wanted)
+        if stale:
+            self._watcher.removePaths(stale)
+        new = sorted(wanted - watched)
+        if new:
+            self._watcher.addPaths(new)
+
+    @pyqtSlot()
+    def rescan(self) -> None:
+        """Compare the folder with the last scan and emit what changed."""
+        self._timer.stop()
+        self._first_event = None
+        directory = self._directory
+        if directory is None:
+            return
+        try:
+            audio, metadata = self._snapshot(directory)
+        except OSError as e:
+            print(f"Warning: Could not rescan {directory}: {e}")
+            return
+
+        changes = diff_snapshots(self._audio, audio)
+        metadata_changed = metadata != self._metadata
+        self._audio, self._metadata = audio, metadata
+        self._update_watched_files()
+
+        if not changes.is_empty():
+            self._apply_to_file_manager(directory, changes)
+            def to_path(name: str) -> str:
+                return str(directory / name)
+            if changes.removed:
+                self.filesRemoved.emit([to_path(n) for n in changes.removed])
+            if changes.renamed:
+                self.filesRenamed.emit([[to_path(old), to_path(new)] for old, new in changes.renamed])
+            if changes.added:
+                self.filesAdded.emit([to_path(n) for n in changes.added])
+            if changes.modified:
+                self.filesModified.emit([to_path(n) for n in changes.modified])
+        if metadata_changed:
+            self.metadataChanged.emit(str(directory))
+
+    def _apply_to_file_manager(self, directory: Path, changes: FolderChanges) -> None:
+        """Invalidate stale durations and patch the discovered file list."""
+        fm = self._file_manager
+        if fm is None:
+            return
+        # A renamed file keeps its duration under the new name
+        durations = fm.getFolderSnapshot(directory)["durations"]
+        carried = {new: durations[old] for old, new in changes.renamed if durations.get(old)}
+        fm.forgetDurations(directory, changes.removed + changes.modified
+                           + [old for old, _ in changes.renamed])
+        fm.cacheDurations(directory, carried)
+        fm.updateDiscoveredFiles(
+            [str(directory / n) for n in changes.added + [new for _, new in changes.renamed]],
+            [str(directory / n) for n in changes.removed + [old for old, _ in changes.renamed]])
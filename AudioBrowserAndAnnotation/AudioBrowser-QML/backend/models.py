@@ -6,13 +6,64 @@ QML-exposed data models for the AudioBrowser application.
 Provides list and table models for file lists, annotations, and clips.
 """
 
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from PyQt6.QtCore import (
-    Qt, QAbstractListModel, QAbstractTableModel, QModelIndex,
-    pyqtSignal, pyqtSlot
+    Qt, QAbstractListModel, QAbstractTableModel, QModelIndex, QThread,
+    pyqtSignal, pyqtSlot, pyqtProperty
 )
 
+from .file_manager import read_duration_ms
+
+
+# Rows filled in by the details worker are delivered in batches of this many
+# files, or sooner if this many seconds pass, so the view updates steadily
+# without a dataChanged per file
+DETAILS_BATCH_SIZE = 25
+DETAILS_BATCH_SECONDS = 0.25
+
+
+class FileDetailsWorker(QThread):
+    """Worker thread that reads durations the metadata cache didn't have."""
+    
+    detailsReady = pyqtSignal(int, list)  # generation, [[file_path, duration_ms], ...]
+    finished = pyqtSignal(bool, str)  # success, message
+    
+    def __init__(self, generation: int, files: List[str]):
+        super().__init__()
+        self.generation = generation
+        self.files = files
+        self._should_stop = False
+    
+    def stop(self):
+        """Request the worker to stop."""
+        self._should_stop = True
+    
+    def run(self):
+        """Probe each file's duration, emitting results in batches."""
+        batch = []
+        last_emit = time.monotonic()
+        try:
+            for file_path in self.files:
+                if self._should_stop:
+                    break
+                batch.append([file_path, read_duration_ms(Path(file_path))])
+                if len(batch) >= DETAILS_BATCH_SIZE or time.monotonic() - last_emit >= DETAILS_BATCH_SECONDS:
+                    self.detailsReady.emit(self.generation, batch)
+                    batch = []
+                    last_emit = time.monotonic()
+            
+            if batch and not self._should_stop:
+                self.detailsReady.emit(self.generation, batch)
+            
+            if self._should_stop:
+                self.finished.emit(False, "File details cancelled")
+            else:
+                self.finished.emit(True, f"Read details for {len(self.files)} files")
+        except Exception as e:
+            self.finished.emit(False, f"Error reading file details: {e}")
+
 
 class FileListModel(QAbstractListModel):
     """
@@ -35,11 +86,23 @@ class FileListModel(QAbstractListModel):
     LibraryNameRole = Qt.ItemDataRole.UserRole + 10
     HasImportantAnnotationRole = Qt.ItemDataRole.UserRole + 11
     IsHiddenRole = Qt.ItemDataRole.UserRole + 12
+    AnnotationCountRole = Qt.ItemDataRole.UserRole + 13
     
     # Signals
     filesChanged = pyqtSignal()
-    
-    def __init__(self, parent=None, file_manager=None, tempo_manager=None, annotation_manager=None):
+    detailsLoadingChanged = pyqtSignal()
+    
+    # Sort keys by sortBy() field name
+    SORT_FIELDS = {
+        "filename": "filename",
+        "name": "filename",
+        "size": "filesize",
+        "filesize": "filesize",
+        "duration": "duration",
+    }
+    
+    def __init__(self, parent=None, file_manager=None, tempo_manager=None, annotation_manager=None,
+                 background_details: bool = False):
         """
         Initialize the file list model.
         
@@ -48,12 +111,24 @@ class FileListModel(QAbstractListModel):
             file_manager: Optional FileManager for extracting file metadata
             tempo_manager: Optional TempoManager for BPM data
             annotation_manager: Optional AnnotationManager for important annotation checking
+            background_details: Read uncached durations on a worker thread
+                after the rows are shown, instead of before setFiles returns.
+                Needs a running event loop to deliver the results.
         """
         super().__init__(parent)
         self._files: List[Dict[str, Any]] = []
+        self._rows_by_path: Dict[str, int] = {}
         self._file_manager = file_manager
         self._tempo_manager = tempo_manager
         self._annotation_manager = annotation_manager
+        if annotation_manager is not None:
+            annotation_manager.annotationSummaryChanged.connect(self._on_annotation_summary_changed)
+            annotation_manager.annotationSetsChanged.connect(self._on_annotation_sets_changed)
+        self._background_details = background_details
+        self._details_worker: Optional[FileDetailsWorker] = None
+        self._details_generation = 0
+        self._sort_key: Optional[str] = None
+        self._sort_ascending = True
     
     def rowCount(self, parent=QModelIndex()) -> int:
         """Return the number of files in the model."""
@@ -90,6 +165,8 @@ class FileListModel(QAbstractListModel):
             return file_data.get("libraryName", "")
         elif role == self.HasImportantAnnotationRole:
             return file_data.get("hasImportantAnnotation", False)
+        elif role == self.AnnotationCountRole:
+            return file_data.get("annotationCount", 0)
         elif role == self.IsHiddenRole:
             return file_data.get("isHidden", False)
         
@@ -111,96 +188,433 @@ class FileListModel(QAbstractListModel):
             self.LibraryNameRole: b"libraryName",
             self.HasImportantAnnotationRole: b"hasImportantAnnotation",
             self.IsHiddenRole: b"isHidden",
+            self.AnnotationCountRole: b"annotationCount",
         }
     
     # ========== QML-accessible methods ==========
     
+    def _folder_snapshot(self, directory: Path) -> Dict[str, Any]:
+        """
+        Gather the row metadata for one directory from the managers.
+        
+        Each manager is asked once per directory rather than once per file.
+        """
+        snapshot: Dict[str, Any] = {}
+        if self._file_manager is not None:
+            snapshot.update(self._file_manager.getFolderSnapshot(directory))
+        if self._tempo_manager is not None:
+            snapshot["tempo"] = self._tempo_manager.getAllTempoData()
+        if self._annotation_manager is not None:
+            try:
+                snapshot["annotations"] = self._annotation_manager.getAnnotationSummaries()
+            except Exception:
+                snapshot["annotations"] = None
+        return snapshot
+    
+    def _build_file_info(self, path: Path, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Build one row from a directory snapshot."""
+        file_path = str(path)
+        try:
+            filesize = path.stat().st_size
+        except OSError:
+            filesize = 0
+        
+        duration_ms = 0
+        library_name = ""
+        if self._file_manager is not None:
+            # Cached entries may be keyed with or without the extension
+            # Uncached durations are filled in afterwards by the details worker
+            durations = snapshot.get("durations", {})
+            duration_ms = durations.get(path.name) or durations.get(path.stem) or 0
+            
+            # Library/song name from provided names (from fingerprinting)
+            names = snapshot.get("names", {})
+            library_name = names.get(path.name) or names.get(path.stem) or ""
+        
+        annotation_summary = {}
+        if self._annotation_manager is not None:
+            summaries = snapshot.get("annotations")
+            if summaries is not None:
+                annotation_summary = summaries.get(path.name, {})
+            else:
+                # Legacy per-file annotations
+                try:
+                    annotation_summary = self._annotation_manager.getAnnotationSummary(file_path)
+                except Exception:
+                    annotation_summary = {}
+        
+        return {
+            "filepath": file_path,
+            "filename": path.name,  # Always use actual filename for display
+            "basename": path.stem,
+            "extension": path.suffix,
+            "filesize": filesize,
+            "duration": duration_ms,
+            "isBestTake": file_path in snapshot.get("best_takes", ()),
+            "isPartialTake": file_path in snapshot.get("partial_takes", ()),
+            "bpm": snapshot.get("tempo", {}).get(path.name, 0),
+            "libraryName": library_name,
+            "hasImportantAnnotation": annotation_summary.get("important", 0) > 0,
+            "annotationCount": annotation_summary.get("count", 0),
+            "isHidden": file_path in snapshot.get("hidden", ()),
+        }
+    
     @pyqtSlot(list)
     def setFiles(self, file_paths: List[str]) -> None:
         """
         Set the list of files in the model.
         
+        Rows are built from one metadata snapshot per directory (see
+        FileManager.getFolderSnapshot) and shown straight away. Durations
+        missing from the cache are then read by FileDetailsWorker and applied
+        with batched dataChanged updates. The last sortBy() order is kept.
+        
         Args:
             file_paths: List of file paths
         """
+        self._cancel_details()
         self.beginResetModel()
         
         self._files = []
+        snapshots: Dict[Path, Dict[str, Any]] = {}
         for file_path in file_paths:
             try:
                 path = Path(file_path)
-                
-                # Extract duration if file_manager is available
-                duration_ms = 0
-                if self._file_manager is not None:
-                    # Try to get cached duration from .duration_cache.json
-                    duration_ms = self._file_manager.getCachedDuration(file_path)
-                    # If not cached, extract it now
-                    if duration_ms == 0:
-                        duration_ms = self._file_manager.extractDuration(file_path)
-                
-                # Always use actual filename for display
-                display_name = path.name
-                
-                # Get library/song name from provided names (from fingerprinting)
-                library_name = ""
-                if self._file_manager is not None:
-                    provided_name = self._file_manager.getProvidedName(file_path)
-                    if provided_name:
-                        library_name = provided_name
-                
-                # Get best/partial take status
-                is_best_take = False
-                is_partial_take = False
-                is_hidden = False
-                if self._file_manager is not None:
-                    is_best_take = self._file_manager.isBestTake(file_path)
-                    is_partial_take = self._file_manager.isPartialTake(file_path)
-                    is_hidden = self._file_manager.isHidden(file_path)
-                
-                # Get BPM from tempo manager
-                bpm = 0
-                if self._tempo_manager is not None:
-                    bpm = self._tempo_manager.getBPM(path.name)
-                
-                # Check for important annotations
-                has_important_annotation = False
-                if self._annotation_manager is not None:
-                    # Check if file has any important annotations
-                    try:
-                        important_annotations = self._annotation_manager.getImportantAnnotationsForFile(file_path)
-                        has_important_annotation = len(important_annotations) > 0
-                    except:
-                        # If method doesn't exist or errors, default to False
-                        has_important_annotation = False
-                
-                file_info = {
-                    "filepath": str(path),
-                    "filename": display_name,  # Use provided name if available
-                    "basename": path.stem,
-                    "extension": path.suffix,
-                    "filesize": path.stat().st_size if path.exists() else 0,
-                    "duration": duration_ms,
-                    "isBestTake": is_best_take,
-                    "isPartialTake": is_partial_take,
-                    "bpm": bpm,
-                    "libraryName": library_name,
-                    "hasImportantAnnotation": has_important_annotation,
-                    "isHidden": is_hidden,
-                }
-                self._files.append(file_info)
+                snapshot = snapshots.get(path.parent)
+                if snapshot is None:
+                    snapshot = snapshots[path.parent] = self._folder_snapshot(path.parent)
+                self._files.append(self._build_file_info(path, snapshot))
             except Exception:
                 # Skip files that can't be processed
                 continue
+        self._apply_sort()
         
         self.endResetModel()
         self.filesChanged.emit()
+        
+        self._start_details()
+    
+    @pyqtSlot(list)
+    def insertFiles(self, file_paths: List[str]) -> None:
+        """
+        Add rows for new files without rebuilding the model.
+        
+        Each file is inserted where it belongs in the current sort order (by
+        name when unsorted). Files already in the model are ignored.
+        
+        Args:
+            file_paths: Paths of the new files
+        """
+        snapshots: Dict[Path, Dict[str, Any]] = {}
+        inserted = False
+        for file_path in file_paths:
+            if file_path in self._rows_by_path:
+                continue
+            try:
+                path = Path(file_path)
+                snapshot = snapshots.get(path.parent)
+                if snapshot is None:
+                    snapshot = snapshots[path.parent] = self._folder_snapshot(path.parent)
+                file_info = self._build_file_info(path, snapshot)
+            except Exception:
+                continue
+            row = self._insert_position(file_info)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._files.insert(row, file_info)
+            self._reindex_rows()
+            self.endInsertRows()
+            inserted = True
+        
+        if inserted:
+            self.filesChanged.emit()
+            self._start_details()
+    
+    @pyqtSlot(list)
+    def removeFiles(self, file_paths: List[str]) -> None:
+        """
+        Remove the rows of deleted files.
+        
+        Args:
+            file_paths: Paths of the files to remove (unknown paths are ignored)
+        """
+        rows = sorted({self._rows_by_path[p] for p in file_paths if p in self._rows_by_path})
+        if not rows:
+            return
+        # Remove contiguous runs, last first, so earlier row numbers stay valid
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._files[first:last + 1]
+            self.endRemoveRows()
+        self._reindex_rows()
+        self.filesChanged.emit()
+    
+    @pyqtSlot(list)
+    def renameFiles(self, renames: List[List[str]]) -> None:
+        """
+        Point rows at their files' new names.
+        
+        Args:
+            renames: [old_path, new_path] pairs
+        """
+        rows = []
+        for old_path, new_path in renames:
+            row = self._rows_by_path.pop(old_path, None)
+            if row is None:
+                continue
+            path = Path(new_path)
+            self._files[row].update({
+                "filepath": new_path,
+                "filename": path.name,
+                "basename": path.stem,
+                "extension": path.suffix,
+            })
+            self._rows_by_path[new_path] = row
+            rows.append(row)
+        if not rows:
+            return
+        
+        if self._sort_key == "filename":
+            self._resort_rows()
+        else:
+            for row in rows:
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index, [
+                    Qt.ItemDataRole.DisplayRole, self.FilePathRole, self.FileNameRole,
+                    self.BasNameRole, self.ExtensionRole])
+        self.filesChanged.emit()
+    
+    @pyqtSlot(list)
+    def refreshFiles(self, file_paths: List[str]) -> None:
+        """
+        Rebuild the rows of files whose contents changed.
+        
+        Size and metadata are re-read; durations missing from the cache
+        (the watcher drops stale ones) are probed again by the details worker.
+        
+        Args:
+            file_paths: Paths of the changed files (unknown paths are ignored)
+        """
+        rows = []
+        snapshots: Dict[Path, Dict[str, Any]] = {}
+        for file_path in file_paths:
+            row = self._rows_by_path.get(file_path)
+            if row is None:
+                continue
+            path = Path(file_path)
+            snapshot = snapshots.get(path.parent)
+            if snapshot is None:
+                snapshot = snapshots[path.parent] = self._folder_snapshot(path.parent)
+            self._files[row] = self._build_file_info(path, snapshot)
+            rows.append(row)
+        if not rows:
+            return
+        
+        if self._sort_key in ("filesize", "duration"):
+            self._resort_rows()
+        else:
+            for row in rows:
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index)
+        self._start_details()
+    
+    @pyqtSlot()
+    def refreshMetadata(self) -> None:
+        """
+        Re-read the metadata shown in every row (names, takes, tempo, ...).
+        
+        Durations already shown are kept. Used when metadata files change
+        on disk, without rebuilding the model.
+        """
+        if not self._files:
+            return
+        snapshots: Dict[Path, Dict[str, Any]] = {}
+        for row, file_data in enumerate(self._files):
+            path = Path(file_data["filepath"])
+            snapshot = snapshots.get(path.parent)
+            if snapshot is None:
+                snapshot = snapshots[path.parent] = self._folder_snapshot(path.parent)
+            file_info = self._build_file_info(path, snapshot)
+            file_info["duration"] = file_info["duration"] or file_data.get("duration", 0)
+            self._files[row] = file_info
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self._files) - 1, 0))
+    
+    def _on_annotation_summary_changed(self, file_path: str) -> None:
+        """Update a row's annotation badges after its annotations changed."""
+        row = self._rows_by_path.get(file_path)
+        if row is None:
+            return
+        summary = self._annotation_manager.getAnnotationSummary(file_path)
+        self._files[row]["hasImportantAnnotation"] = summary["important"] > 0
+        self._files[row]["annotationCount"] = summary["count"]
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index, [self.HasImportantAnnotationRole, self.AnnotationCountRole])
+    
+    def _on_annotation_sets_changed(self) -> None:
+        """Update every row's annotation badges after the annotation sets changed."""
+        if not self._files:
+            return
+        summaries = self._annotation_manager.getAnnotationSummaries()
+        changed = []
+        for row, file_data in enumerate(self._files):
+            if summaries is not None:
+                summary = summaries.get(file_data["filename"], {})
+            else:
+                try:
+                    summary = self._annotation_manager.getAnnotationSummary(file_data["filepath"])
+                except Exception:
+                    summary = {}
+            important = summary.get("important", 0) > 0
+            count = summary.get("count", 0)
+            if file_data.get("hasImportantAnnotation") != important or file_data.get("annotationCount") != count:
+                file_data["hasImportantAnnotation"] = important
+                file_data["annotationCount"] = count
+                changed.append(row)
+        if changed:
+            self.dataChanged.emit(self.index(changed[0], 0), self.index(changed[-1], 0),
+                                  [self.HasImportantAnnotationRole, self.AnnotationCountRole])
+    
+    def _insert_position(self, file_data: Dict[str, Any]) -> int:
+        """Row where a new file belongs in the current order."""
+        if self._sort_key is None:
+            # Unsorted lists are in discovery order, which is by name
+            def sort_key(f):
+                return f.get("filename", "").lower()
+            descending = False
+        else:
+            sort_key = self._row_sort_key
+            descending = not self._sort_ascending
+        key = sort_key(file_data)
+        lo, hi = 0, len(self._files)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = sort_key(self._files[mid])
+            if (key > other) if descending else (key < other):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+    
+    def _reindex_rows(self) -> None:
+        """Rebuild the path-to-row map after rows were inserted or removed."""
+        self._rows_by_path = {f["filepath"]: i for i, f in enumerate(self._files)}
+    
+    @pyqtProperty(bool, notify=detailsLoadingChanged)
+    def detailsLoading(self) -> bool:
+        """Whether durations are still being read for some rows."""
+        return self._details_worker is not None
+    
+    @pyqtSlot()
+    def cancelDetails(self) -> None:
+        """Stop reading file details (e.g. on shutdown)."""
+        self._cancel_details()
+    
+    def _start_details(self) -> None:
+        """Read the durations the snapshot didn't have, in the background if enabled."""
+        if self._file_manager is None:
+            return
+        # Restart with everything still missing, including rows added since
+        self._cancel_details()
+        # Missing or empty files (filesize 0) have nothing to probe
+        pending = [f["filepath"] for f in self._files if f["duration"] == 0 and f["filesize"] > 0]
+        if not pending:
+            return
+        
+        self._details_generation += 1
+        worker = FileDetailsWorker(self._details_generation, pending)
+        worker.detailsReady.connect(self._on_details_ready)
+        worker.finished.connect(self._on_details_finished)
+        self._details_worker = worker
+        self.detailsLoadingChanged.emit()
+        
+        if self._background_details:
+            worker.start()
+        else:
+            worker.run()
+    
+    def _cancel_details(self) -> None:
+        """Stop the running details worker, discarding anything it still sends."""
+        worker = self._details_worker
+        if worker is None:
+            return
+        self._details_worker = None
+        self._details_generation += 1
+        worker.stop()
+        if worker.isRunning():
+            worker.wait()
+        self.detailsLoadingChanged.emit()
+    
+    def _on_details_ready(self, generation: int, details: list) -> None:
+        """Apply a batch of durations from the details worker."""
+        if generation != self._details_generation:
+            return  # Results for a file list that has since been replaced
+        
+        rows = []
+        to_cache: Dict[Path, Dict[str, int]] = {}
+        for file_path, duration_ms in details:
+            row = self._rows_by_path.get(file_path)
+            if row is None or duration_ms <= 0:
+                continue
+            self._files[row]["duration"] = duration_ms
+            rows.append(row)
+            path = Path(file_path)
+            to_cache.setdefault(path.parent, {})[path.name] = duration_ms
+        
+        if rows:
+            if self._sort_key == "duration":
+                self._resort_rows()
+            else:
+                self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), 0),
+                                      [self.DurationRole])
+        
+        if self._file_manager is not None:
+            for directory, durations in to_cache.items():
+                self._file_manager.cacheDurations(directory, durations)
+    
+    def _on_details_finished(self, success: bool, message: str) -> None:
+        """Handle details worker completion."""
+        worker = self.sender()
+        if worker is None or worker is self._details_worker:
+            self._details_worker = None
+            self.detailsLoadingChanged.emit()
+        if worker is not None and self._background_details:
+            # finished is emitted from run(); let the thread exit before release
+            worker.wait()
+            worker.deleteLater()
+    
+    def _row_sort_key(self, file_data: Dict[str, Any]):
+        if self._sort_key == "filename":
+            return file_data.get("filename", "").lower()
+        return file_data.get(self._sort_key, 0)
+    
+    def _apply_sort(self) -> None:
+        """Sort rows by the current sort field (if any) and reindex them."""
+        if self._sort_key is not None:
+            self._files.sort(key=self._row_sort_key, reverse=not self._sort_ascending)
+        self._reindex_rows()
+    
+    def _resort_rows(self) -> None:
+        """Re-sort after values changed, keeping selections attached to their files."""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        paths = [self._files[index.row()]["filepath"] for index in persistent]
+        self._apply_sort()
+        self.changePersistentIndexList(
+            persistent, [self.index(self._rows_by_path[path], 0) for path in paths])
+        self.layoutChanged.emit()
     
     @pyqtSlot()
     def clear(self) -> None:
         """Clear all files from the model."""
+        self._cancel_details()
         self.beginResetModel()
         self._files.clear()
+        self._rows_by_path.clear()
         self.endResetModel()
         self.filesChanged.emit()
     
@@ -240,10 +654,7 @@ class FileListModel(QAbstractListModel):
         Returns:
             Row index or -1 if not found
         """
-        for i, file_data in enumerate(self._files):
-            if file_data.get("filepath") == file_path:
-                return i
-        return -1
+        return self._rows_by_path.get(file_path, -1)
     
     @pyqtSlot(str, bool)
     def sortBy(self, field: str, ascending: bool = True) -> None:
@@ -257,23 +668,9 @@ class FileListModel(QAbstractListModel):
         self.beginResetModel()
         
         try:
-            # Map field names to dict keys
-            field_map = {
-                "filename": "filename",
-                "name": "filename",
-                "size": "filesize",
-                "filesize": "filesize",
-                "duration": "duration",
-            }
-            
-            sort_key = field_map.get(field.lower(), "filename")
-            
-            # Sort the files
-            self._files.sort(
-                key=lambda f: f.get(sort_key, 0) if sort_key != "filename" else f.get(sort_key, "").lower(),
-                reverse=not ascending
-            )
-            
+            self._sort_key = self.SORT_FIELDS.get(field.lower(), "filename")
+            self._sort_ascending = ascending
+            self._apply_sort()
         except Exception as e:
             print(f"Error sorting files: {e}")
         
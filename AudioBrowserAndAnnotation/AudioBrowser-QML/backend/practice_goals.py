@@ -6,6 +6,7 @@ Manages practice goal creation, tracking, and progress calculation.
 Supports time-based goals, session-based goals, and song-specific goals.
 """
 
+import sys
 import json
 import uuid
 from pathlib import Path
@@ -13,6 +14,11 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import json_io
+
 
 # Constants
 PRACTICE_GOALS_JSON = ".practice_goals.json"
@@ -22,9 +28,8 @@ def save_json(path: Path, data: Any):
     """Save data to JSON file."""
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-    except (IOError, OSError) as e:
+        json_io.write_json(path, data)
+    except (OSError, TypeError, ValueError) as e:
         print(f"Error saving JSON to {path}: {e}")
 
 
@@ -33,9 +38,8 @@ def load_json(path: Path, default: Any = None) -> Any:
     if not path.exists():
         return default
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        return json_io.read_json(path)
+    except (ValueError, OSError):
         return default
 
 
@@ -6,14 +6,25 @@ Analyzes practice folders and audio recordings to generate statistics
 about practice sessions, song frequency, and practice consistency.
 """
 
+import os
 import re
+import sys
 import json
+import fnmatch
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import json_io, metadata_cache
+from shared.dir_walker import WalkStats, scan_directory, skip_dirs_named, walk_directories
+from shared.metadata_constants import LIBRARY_CACHE_DIR, PRACTICE_STATS_CACHE_JSON
+
 
 # Set up module logger
 logger = logging.getLogger(__name__)
@@ -24,6 +35,9 @@ AUDIO_EXTS = {".wav", ".wave", ".mp3"}
 NAMES_JSON = ".provided_names.json"
 NOTES_JSON_PATTERN = ".audio_notes*.json"
 TAKES_METADATA_JSON = ".takes_metadata.json"
+SKIPPED_DIRS = {"__pycache__", "node_modules"}
+SCAN_WORKERS = 8  # Folders listed concurrently (hides network share latency)
+STATS_CACHE_VERSION = 1  # Bump when the cached per-folder statistics change
 
 
 def discover_directories_with_audio_files(root_path: Path) -> List[Path]:
@@ -35,44 +49,41 @@ def discover_directories_with_audio_files(root_path: Path) -> List[Path]:
     if not root_path.exists() or not root_path.is_dir():
         return directories_with_audio
     
-    def scan_directory(directory: Path):
-        """Recursively scan directory for audio files."""
-        try:
-            has_audio_files = False
-            subdirectories = []
-            
-            for item in directory.iterdir():
-                if item.is_file() and item.suffix.lower() in AUDIO_EXTS:
-                    has_audio_files = True
-                elif item.is_dir():
-                    # Skip hidden directories and common non-audio directories
-                    if not item.name.startswith('.') and item.name.lower() not in {'__pycache__', 'node_modules', '.git'}:
-                        subdirectories.append(item)
-            
-            # Add this directory if it contains audio files
-            if has_audio_files:
-                directories_with_audio.append(directory)
-            
-            # Recursively scan subdirectories
-            for subdir in subdirectories:
-                scan_directory(subdir)
-                
-        except (OSError, PermissionError):
-            pass  # Skip directories we can't access
+    # Skip hidden directories and common non-audio directories
+    stats = WalkStats()
+    for listing in walk_directories(root_path, AUDIO_EXTS, skip_dirs_named(SKIPPED_DIRS),
+                                    workers=SCAN_WORKERS, stats=stats):
+        if listing.audio:
+            directories_with_audio.append(listing.path)
+    logger.debug(f"Scanned {root_path}: {stats}")
     
-    scan_directory(root_path)
     return directories_with_audio
 
 
 def load_json(path: Path, default: Any = None) -> Any:
-    """Load JSON file, returning default if file doesn't exist or is invalid."""
-    if not path.exists():
-        return default
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return default
+    """
+    Load JSON file, returning default if file doesn't exist or is invalid.
+    
+    Reads go through the shared metadata cache; do not mutate the result.
+    """
+    return metadata_cache.load_json(path, default)
+
+
+def _is_statistics_metadata(name: str) -> bool:
+    """Whether a file is read for a folder's statistics (names, takes, annotation sets)."""
+    return name in (NAMES_JSON, TAKES_METADATA_JSON) or fnmatch.fnmatch(name, NOTES_JSON_PATTERN)
+
+
+def _metadata_signature(folder: str, names) -> Dict[str, List[int]]:
+    """[size, mtime_ns] of each named metadata file that still exists."""
+    signature = {}
+    for name in names:
+        try:
+            st = os.stat(os.path.join(folder, name))
+        except OSError:
+            continue
+        signature[name] = [st.st_size, st.st_mtime_ns]
+    return signature
 
 
 class PracticeStatistics(QObject):
@@ -90,8 +101,13 @@ class PracticeStatistics(QObject):
     def __init__(self):
         super().__init__()
         self._root_path: Optional[Path] = None
+        self._catalog = None  # Optional shared.library_catalog.LibraryCatalog
         logger.info("PracticeStatistics initialized")
     
+    def setLibraryCatalog(self, catalog) -> None:
+        """Use a library catalog instead of walking the root (None to walk it)."""
+        self._catalog = catalog
+    
     @pyqtSlot(str)
     def setRootPath(self, path: str):
         """Set the root path for discovering practice folders."""
@@ -142,6 +158,9 @@ class PracticeStatistics(QObject):
     def _generate_practice_folder_statistics(self) -> Dict[str, Any]:
         """Generate statistics by analyzing practice folders and their audio files.
         
+        Merges the per-folder statistics from _practice_folder_partials, which
+        only recomputes folders that changed since the last call.
+        
         Returns dictionary with:
             - practice_sessions: list of practice session info (date, folder, file count, songs)
             - songs: dict of song names with practice count and dates
@@ -159,54 +178,16 @@ class PracticeStatistics(QObject):
             }
         }
         
-        # Discover all directories with audio files
-        practice_folders = discover_directories_with_audio_files(self._root_path)
-        logger.debug(f"Discovered {len(practice_folders)} practice folders with audio files")
-        
         all_session_dates = []
         
-        for folder in practice_folders:
-            # Get audio files in this folder
-            audio_files = []
-            for ext in AUDIO_EXTS:
-                audio_files.extend(list(folder.glob(f"*{ext}")))
-            
-            if not audio_files:
-                logger.debug(f"Skipping folder with no audio files: {folder}")
-                continue
-            
-            # Get folder date (use folder modification time or name)
-            folder_date = self._extract_folder_date(folder)
+        for partial in self._practice_folder_partials():
+            session_info = partial["session"]
+            folder_date = datetime.fromisoformat(session_info["date"]) if session_info["date"] else None
             
             if folder_date:
                 all_session_dates.append(folder_date)
             
-            # Load provided names for this folder
-            names_json_path = folder / NAMES_JSON
-            provided_names = load_json(names_json_path, {}) or {}
-            
-            # Load notes to check for best takes and partial takes
-            notes_data = self._load_takes_metadata(folder)
-            
-            # Analyze files in this folder
-            folder_songs = {}
-            best_takes = []
-            partial_takes = []
-            
-            for audio_file in audio_files:
-                filename = audio_file.name
-                
-                # Get song name (provided name or filename)
-                song_name = provided_names.get(filename, filename)
-                if not song_name or song_name.strip() == "":
-                    song_name = filename
-                
-                # Track song in folder
-                if song_name not in folder_songs:
-                    folder_songs[song_name] = 0
-                folder_songs[song_name] += 1
-                
-                # Track globally
+            for song_name, (takes, best_takes, partial_takes) in partial["songs"].items():
                 if song_name not in stats["songs"]:
                     stats["songs"][song_name] = {
                         "practice_count": 0,
@@ -216,43 +197,20 @@ class PracticeStatistics(QObject):
                         "best_takes": 0,
                         "partial_takes": 0
                     }
-                
-                stats["songs"][song_name]["practice_count"] += 1
-                stats["songs"][song_name]["total_takes"] += 1
+                song_stats = stats["songs"][song_name]
+                song_stats["practice_count"] += takes
+                song_stats["total_takes"] += takes
+                song_stats["best_takes"] += best_takes
+                song_stats["partial_takes"] += partial_takes
                 
                 if folder_date:
-                    if stats["songs"][song_name]["first_practiced"] is None:
-                        stats["songs"][song_name]["first_practiced"] = folder_date
-                    stats["songs"][song_name]["last_practiced"] = folder_date
-                    
-                    # Update with earlier date if found
-                    if stats["songs"][song_name]["first_practiced"] > folder_date:
-                        stats["songs"][song_name]["first_practiced"] = folder_date
-                    # Update with later date if found
-                    if stats["songs"][song_name]["last_practiced"] < folder_date:
-                        stats["songs"][song_name]["last_practiced"] = folder_date
-                
-                # Check if this file is marked as best take or partial take
-                file_metadata = notes_data.get(filename, {})
-                if isinstance(file_metadata, dict):
-                    if file_metadata.get("best_take", False):
-                        best_takes.append(song_name)
-                        stats["songs"][song_name]["best_takes"] += 1
-                    if file_metadata.get("partial_take", False):
-                        partial_takes.append(song_name)
-                        stats["songs"][song_name]["partial_takes"] += 1
+                    if song_stats["first_practiced"] is None or song_stats["first_practiced"] > folder_date:
+                        song_stats["first_practiced"] = folder_date
+                    if song_stats["last_practiced"] is None or song_stats["last_practiced"] < folder_date:
+                        song_stats["last_practiced"] = folder_date
             
-            # Add session info
-            session_info = {
-                "date": folder_date.isoformat() if folder_date else None,
-                "folder": folder.name,
-                "file_count": len(audio_files),
-                "unique_songs": len(folder_songs),
-                "songs": list(folder_songs.keys()),
-                "best_takes": best_takes,
-                "partial_takes": partial_takes
-            }
-            stats["practice_sessions"].append(session_info)
+            # Copied: cached partials are shared
+            stats["practice_sessions"].append(dict(session_info))
         
         # Sort sessions by date (most recent first)
         stats["practice_sessions"].sort(
@@ -293,6 +251,197 @@ class PracticeStatistics(QObject):
         
         return stats
     
+    def _folder_partial(self, folder: Path, audio_files: List[Tuple[str, str, bool, bool]]) -> Dict[str, Any]:
+        """
+        Statistics of one practice folder, merged into the totals by
+        _generate_practice_folder_statistics.
+        
+        Args:
+            folder: Practice folder
+            audio_files: [(filename, provided name, best take, partial take), ...]
+        
+        Returns:
+            {"session": session info, "songs": {song name: [takes, best takes, partial takes]}}
+        """
+        # Get folder date (use folder modification time or name)
+        folder_date = self._extract_folder_date(folder)
+        
+        folder_songs = {}
+        best_takes = []
+        partial_takes = []
+        
+        for filename, provided_name, is_best, is_partial in audio_files:
+            # Get song name (provided name or filename)
+            song_name = provided_name
+            if not song_name or song_name.strip() == "":
+                song_name = filename
+            
+            counts = folder_songs.setdefault(song_name, [0, 0, 0])
+            counts[0] += 1
+            
+            # Check if this file is marked as best take or partial take
+            if is_best:
+                best_takes.append(song_name)
+                counts[1] += 1
+            if is_partial:
+                partial_takes.append(song_name)
+                counts[2] += 1
+        
+        session_info = {
+            "date": folder_date.isoformat() if folder_date else None,
+            "folder": folder.name,
+            "file_count": len(audio_files),
+            "unique_songs": len(folder_songs),
+            "songs": list(folder_songs.keys()),
+            "best_takes": best_takes,
+            "partial_takes": partial_takes
+        }
+        return {"session": session_info, "songs": folder_songs}
+    
+    def _practice_folder_partials(self) -> List[Dict[str, Any]]:
+        """Statistics of every practice folder under the root (see _folder_partial), parents first."""
+        prefix = self._catalog.relative_path(self._root_path) if self._catalog is not None else None
+        if prefix is not None:
+            partials = []
+            for folder in self._catalog.folders():
+                relative = folder["relative"]
+                if prefix and relative != prefix and not relative.startswith(prefix + "/"):
+                    continue
+                if any(part in SKIPPED_DIRS for part in relative.split("/")):
+                    continue
+                files = [(f["name"], f["provided_name"] or f["name"], f["best_take"], f["partial_take"])
+                         for f in self._catalog.folder_files(relative)]
+                if files:
+                    partials.append(self._folder_partial(Path(folder["path"]), files))
+            logger.debug(f"Catalog returned {len(partials)} practice folders with audio files")
+            return partials
+        
+        return self._scan_folder_partials()
+    
+    def _scan_folder_partials(self) -> List[Dict[str, Any]]:
+        """
+        Walk the root, recomputing only the folders that changed since the last walk.
+        
+        The root's .library_cache/.practice_stats_cache.json keeps, per
+        directory, its mtime, subfolders, audio files, the [size, mtime_ns]
+        of its metadata files and its statistics. A directory whose mtime is
+        unchanged costs a stat instead of a listing, and a folder whose
+        metadata files are unchanged a stat per file instead of reading them.
+        Deleting the cache is always safe: a missing or unreadable cache just
+        lists every folder again.
+        
+        The cache sits in a hidden subfolder (created before the walk) so
+        saving it doesn't change the root's mtime.
+        """
+        cache_dir = self._root_path / LIBRARY_CACHE_DIR
+        try:
+            cache_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.debug(f"Could not create {cache_dir}: {e}")
+        cache_path = cache_dir / PRACTICE_STATS_CACHE_JSON
+        cached = load_json(cache_path, {})
+        old_dirs = {}
+        if isinstance(cached, dict) and cached.get("version") == STATS_CACHE_VERSION:
+            old_dirs = cached.get("dirs", {})
+        
+        dirs: Dict[str, Dict[str, Any]] = {}
+        partials = {}
+        counts = {"listed": 0, "recomputed": 0, "reused": 0}
+        visited = set()
+        level = [""]
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            while level:
+                # One task per worker: most folders only cost a stat or two
+                batches = [level[i::SCAN_WORKERS] for i in range(min(SCAN_WORKERS, len(level)))]
+                scanned = pool.map(lambda batch: [self._scan_folder(relative, old_dirs.get(relative))
+                                                  for relative in batch], batches)
+                next_level = []
+                for relative, result in ((r, res) for batch, results in zip(batches, scanned)
+                                         for r, res in zip(batch, results)):
+                    if result is None:
+                        continue
+                    key, entry, partial, outcome = result
+                    if key in visited:
+                        continue  # Symlink loop
+                    visited.add(key)
+                    dirs[relative] = entry
+                    counts[outcome] += 1
+                    if partial is not None:
+                        partials[relative] = partial
+                    next_level.extend(f"{relative}/{name}" if relative else name for name in entry["subdirs"])
+                level = next_level
+        logger.debug(f"Scanned {self._root_path}: {counts}, {len(partials)} practice folders")
+        
+        if dirs != old_dirs:
+            self._save_stats_cache(cache_path, dirs)
+        
+        # Walk order (parents first, then subfolders by name)
+        return [partials[relative] for relative in sorted(partials, key=lambda r: r.split("/"))]
+    
+    def _save_stats_cache(self, cache_path: Path, dirs: Dict[str, Dict[str, Any]]) -> None:
+        """Save the statistics cache (a read-only library just goes without)."""
+        try:
+            json_io.write_json(cache_path, {"version": STATS_CACHE_VERSION, "dirs": dirs})
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not save practice statistics cache {cache_path}: {e}")
+    
+    def _scan_folder(self, relative: str, old: Optional[Dict[str, Any]]):
+        """
+        Reuse or rebuild one directory's cache entry.
+        
+        Returns:
+            ((device, inode), entry, statistics or None, 'listed'/'recomputed'/'reused'),
+            or None if the directory can't be read
+        """
+        # Plain strings: pathlib would cost more than the stats on an unchanged folder
+        path = os.path.join(self._root_path, relative) if relative else str(self._root_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_dev, st.st_ino)
+        
+        if old is not None and old.get("mtime") == st.st_mtime_ns:
+            metadata = _metadata_signature(path, old["metadata"])
+            if metadata == old["metadata"]:
+                return key, old, old["stats"], "reused"
+            outcome = "recomputed"
+            entry = dict(old, metadata=metadata)
+        else:
+            try:
+                listing = scan_directory(path, AUDIO_EXTS, skip_dirs_named(SKIPPED_DIRS))
+            except OSError:
+                return None
+            outcome = "listed"
+            entry = {
+                "mtime": st.st_mtime_ns,
+                "subdirs": [e.name for e in listing.dirs],
+                "audio": [e.name for e in listing.audio],
+                "metadata": _metadata_signature(path, (e.name for e in listing.files
+                                                       if _is_statistics_metadata(e.name))),
+            }
+        
+        entry["stats"] = None
+        if entry["audio"]:
+            folder = Path(path)
+            entry["stats"] = self._folder_partial(folder, self._folder_audio_files(folder, entry["audio"]))
+        return key, entry, entry["stats"], outcome
+    
+    def _folder_audio_files(self, folder: Path, filenames: List[str]) -> List[Tuple[str, str, bool, bool]]:
+        """(filename, provided name, best take, partial take) of a folder's audio files."""
+        # Load provided names and best/partial take markers for this folder
+        provided_names = load_json(folder / NAMES_JSON, {}) or {}
+        notes_data = self._load_takes_metadata(folder)
+        files = []
+        for filename in filenames:
+            file_metadata = notes_data.get(filename, {})
+            if not isinstance(file_metadata, dict):
+                file_metadata = {}
+            files.append((filename, provided_names.get(filename, filename),
+                          bool(file_metadata.get("best_take", False)),
+                          bool(file_metadata.get("partial_take", False))))
+        return files
+    
     def _extract_folder_date(self, folder: Path) -> Optional[datetime]:
         """Extract date from folder name or modification time."""
         try:
@@ -8,6 +8,7 @@ Author: AI-assisted development
 Date: January 2025
 """
 
+import sys
 import json
 import uuid
 from datetime import datetime
@@ -16,6 +17,11 @@ from typing import Dict, List, Any, Optional
 
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import json_io, metadata_cache
+
 
 class SetlistManager(QObject):
     """
@@ -50,8 +56,18 @@ class SetlistManager(QObject):
         self.root_path = root_path
         self.setlists: Dict[str, Dict[str, Any]] = {}
         self.current_setlist_id: Optional[str] = None
+        self._catalog = None  # Optional shared.library_catalog.LibraryCatalog
         self._load_setlists()
     
+    def setLibraryCatalog(self, catalog) -> None:
+        """
+        Look up song details in a library catalog instead of each folder's files.
+        
+        Args:
+            catalog: LibraryCatalog, or None to read the folders directly
+        """
+        self._catalog = catalog
+    
     def _setlists_json_path(self) -> Path:
         """Return path to setlists JSON file."""
         return self.root_path / ".setlists.json"
@@ -77,9 +93,8 @@ class SetlistManager(QObject):
         json_path = self._setlists_json_path()
         if json_path.exists():
             try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    self.setlists = json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
+                self.setlists = json_io.read_json(json_path)
+            except (ValueError, OSError) as e:
                 print(f"Error loading setlists: {e}")
                 self.setlists = {}
         else:
@@ -89,9 +104,8 @@ class SetlistManager(QObject):
         """Save setlists to JSON file."""
         json_path = self._setlists_json_path()
         try:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(self.setlists, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            json_io.write_json(json_path, self.setlists)
+        except (OSError, TypeError, ValueError) as e:
             print(f"Error saving setlists: {e}")
     
     @pyqtSlot(result=str)
@@ -168,44 +182,36 @@ class SetlistManager(QObject):
             # Check if file exists
             folder_path = self.root_path / folder
             file_path = folder_path / filename
+            
+            details = self._catalog_song_details(folder_path, filename)
+            if details is not None:
+                songs_details.append({"folder": folder, "filename": filename, **details})
+                continue
+            
             exists = file_path.exists()
             
             # Load provided name from that folder
             provided_name = filename
             if exists:
-                names_path = folder_path / ".names.json"
-                if names_path.exists():
-                    try:
-                        with open(names_path, 'r', encoding='utf-8') as f:
-                            names_data = json.load(f)
-                            provided_name = names_data.get(filename, filename)
-                    except (json.JSONDecodeError, IOError):
-                        pass
+                names_data = metadata_cache.load_json(folder_path / ".names.json")
+                if isinstance(names_data, dict):
+                    provided_name = names_data.get(filename, filename)
             
             # Get duration
             duration_ms = 0
             if exists:
-                duration_path = folder_path / ".durations.json"
-                if duration_path.exists():
-                    try:
-                        with open(duration_path, 'r', encoding='utf-8') as f:
-                            duration_data = json.load(f)
-                            duration_ms = duration_data.get(filename, 0)
-                    except (json.JSONDecodeError, IOError):
-                        pass
+                duration_data = metadata_cache.load_json(folder_path / ".durations.json")
+                if isinstance(duration_data, dict):
+                    duration_ms = duration_data.get(filename, 0)
             
             # Check if best take
             is_best_take = False
             if exists:
-                takes_path = folder_path / ".takes_metadata.json"
-                if takes_path.exists():
-                    try:
-                        with open(takes_path, 'r', encoding='utf-8') as f:
-                            takes_data = json.load(f)
-                            file_takes = takes_data.get(filename, {})
-                            is_best_take = file_takes.get("is_best_take", False)
-                    except (json.JSONDecodeError, IOError):
-                        pass
+                takes_data = metadata_cache.load_json(folder_path / ".takes_metadata.json")
+                if isinstance(takes_data, dict):
+                    file_takes = takes_data.get(filename, {})
+                    if isinstance(file_takes, dict):
+                        is_best_take = file_takes.get("is_best_take", False)
             
             songs_details.append({
                 "folder": folder,
@@ -219,6 +225,27 @@ class SetlistManager(QObject):
         
         return songs_details
     
+    def _catalog_song_details(self, folder_path: Path, filename: str) -> Optional[Dict[str, Any]]:
+        """Song details from the library catalog, or None if there's no catalog for this folder."""
+        if self._catalog is None:
+            return None
+        relative = self._catalog.relative_path(folder_path)
+        if relative is None:
+            return None
+        
+        info = self._catalog.file_info(relative, filename)
+        if info is None:
+            return {"provided_name": filename, "duration_ms": 0, "duration_sec": 0,
+                    "is_best_take": False, "exists": False}
+        duration_ms = info["duration_ms"]
+        return {
+            "provided_name": info["provided_name"] or filename,
+            "duration_ms": duration_ms,
+            "duration_sec": duration_ms // 1000 if duration_ms > 0 else 0,
+            "is_best_take": info["best_take"],
+            "exists": True
+        }
+    
     @pyqtSlot(str, result=bool)
     def createSetlist(self, name: str) -> bool:
         """
@@ -30,6 +30,9 @@ SETTINGS_KEY_PARALLEL_WORKERS = "preferences/parallel_workers"
 SETTINGS_KEY_DEFAULT_ZOOM = "preferences/default_zoom"
 SETTINGS_KEY_WAVEFORM_QUALITY = "preferences/waveform_quality"
 SETTINGS_KEY_AUTO_SWITCH_ANNOTATIONS = "preferences/auto_switch_annotations"
+SETTINGS_KEY_LIBRARY_CATALOG = "preferences/library_catalog"
+SETTINGS_KEY_ANNOTATION_JOURNAL = "preferences/annotation_journal"
+SETTINGS_KEY_FOLDER_STORE = "preferences/folder_store"
 
 
 class SettingsManager(QObject):
@@ -303,6 +306,48 @@ class SettingsManager(QObject):
         """Set whether to auto-switch to Annotations tab when selecting a file."""
         self.settings.setValue(SETTINGS_KEY_AUTO_SWITCH_ANNOTATIONS, enabled)
     
+    @pyqtSlot(result=bool)
+    def getUseLibraryCatalog(self) -> bool:
+        """Get whether to index the library root in a catalog database (default False)."""
+        use_catalog = self.settings.value(SETTINGS_KEY_LIBRARY_CATALOG, False)
+        # Handle string values from QSettings
+        if isinstance(use_catalog, str):
+            return use_catalog.lower() in ('true', '1', 'yes')
+        return bool(use_catalog)
+    
+    @pyqtSlot(bool)
+    def setUseLibraryCatalog(self, enabled: bool):
+        """Set whether to index the library root in a catalog database."""
+        self.settings.setValue(SETTINGS_KEY_LIBRARY_CATALOG, enabled)
+    
+    @pyqtSlot(result=bool)
+    def getUseAnnotationJournal(self) -> bool:
+        """Get whether annotation edits are journaled instead of rewriting the file (default False)."""
+        journal = self.settings.value(SETTINGS_KEY_ANNOTATION_JOURNAL, False)
+        # Handle string values from QSettings
+        if isinstance(journal, str):
+            return journal.lower() in ('true', '1', 'yes')
+        return bool(journal)
+    
+    @pyqtSlot(bool)
+    def setUseAnnotationJournal(self, enabled: bool):
+        """Set whether annotation edits are journaled instead of rewriting the file."""
+        self.settings.setValue(SETTINGS_KEY_ANNOTATION_JOURNAL, enabled)
+    
+    @pyqtSlot(result=bool)
+    def getUseFolderStore(self) -> bool:
+        """Get whether per-folder metadata is kept in one store file per folder (default False)."""
+        store = self.settings.value(SETTINGS_KEY_FOLDER_STORE, False)
+        # Handle string values from QSettings
+        if isinstance(store, str):
+            return store.lower() in ('true', '1', 'yes')
+        return bool(store)
+    
+    @pyqtSlot(bool)
+    def setUseFolderStore(self, enabled: bool):
+        """Set whether per-folder metadata is kept in one store file per folder."""
+        self.settings.setValue(SETTINGS_KEY_FOLDER_STORE, enabled)
+    
     @pyqtSlot(result=str)
     def getCurrentUser(self) -> str:
         """
@@ -6,11 +6,16 @@ Handles tempo/BPM tracking and persistence for audio files.
 Stores tempo data in .tempo.json file per directory.
 """
 
-import json
+import sys
 from pathlib import Path
 from typing import Dict, Optional
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import metadata_cache
+
 
 class TempoManager(QObject):
     """
@@ -135,8 +140,7 @@ class TempoManager(QObject):
             return
         
         try:
-            with open(tempo_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = metadata_cache.load_json(tempo_path)
             
             # Validate data structure
             if isinstance(data, dict):
@@ -149,7 +153,7 @@ class TempoManager(QObject):
             else:
                 self._tempo_data = {}
                 
-        except (json.JSONDecodeError, IOError, ValueError) as e:
+        except (TypeError, ValueError) as e:
             # Handle corrupted or invalid JSON files
             print(f"Warning: Could not load tempo data from {tempo_path}: {e}")
             self._tempo_data = {}
@@ -161,9 +165,8 @@ class TempoManager(QObject):
             return
         
         try:
-            with open(tempo_path, 'w', encoding='utf-8') as f:
-                json.dump(self._tempo_data, f, indent=2)
-        except IOError as e:
+            metadata_cache.save_json(tempo_path, self._tempo_data)
+        except (OSError, TypeError, ValueError) as e:
             print(f"Error: Could not save tempo data to {tempo_path}: {e}")
     
     # ========== Utility Methods ==========
@@ -15,8 +15,7 @@ import logging
 from array import array
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
-from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QThread, QRunnable, QThreadPool
-import json
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QThread
 
 # Try to import optional dependencies
 try:
@@ -34,6 +33,12 @@ except ImportError:
     AudioSegment = None
     pydub_which = None
 
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared import json_io
+from shared.audio_probe import probe_duration
+
 
 # Constants
 WAVEFORM_COLUMNS = 2000
@@ -173,6 +178,469 @@ def convert_audio_samples(data: bytes, old_width: int, new_width: int) -> bytes:
         return struct.pack(f'<{num_samples}{new_fmt}', *samples)
 
 
+def decode_audio_array(path: Path) -> Tuple[Any, int, int]:
+    """
+    Decode an audio file to mono samples normalized to -1.0..1.0.
+    
+    This is the single decode entry point shared by waveform generation,
+    fingerprinting and the ingest pipeline. With numpy available the samples
+    are returned as a float32 array so callers can avoid list conversions.
+    
+    Returns:
+        Tuple of (samples, sample_rate, duration_ms)
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    # Try WAV first (native support)
+    if suffix in (".wav", ".wave"):
+        try:
+            with wave.open(str(path), "rb") as wf:
+                nch = wf.getnchannels()
+                sw = wf.getsampwidth()
+                sr = wf.getframerate()
+                nframes = wf.getnframes()
+                raw = wf.readframes(nframes)
+
+            # Convert to 16-bit if needed
+            if sw != 2:
+                try:
+                    raw = convert_audio_samples(raw, sw, 2)
+                    sw = 2
+                except Exception:
+                    pass
+
+            if HAVE_NUMPY:
+                arr = np.frombuffer(raw[: (len(raw)//2)*2], dtype=np.int16).astype(np.float32)
+                if nch > 1:
+                    arr = arr[: (len(arr)//nch)*nch].reshape((-1, nch)).mean(axis=1)
+                samples = arr / 32768.0
+                dur_ms = int((len(samples) / sr) * 1000)
+                return samples, sr, dur_ms
+
+            # Convert to array
+            data = array("h")
+            data.frombytes(raw[: (len(raw)//2)*2])
+
+            # Convert to mono if stereo
+            if nch > 1:
+                total = len(data) // nch
+                mono = array("h", [0]) * total
+                for i in range(total):
+                    s = 0
+                    base = i * nch
+                    for c in range(nch):
+                        s += data[base + c]
+                    mono[i] = int(s / nch)
+                data = mono
+
+            # Normalize to -1.0 to 1.0
+            samples = [s / 32768.0 for s in data]
+
+            dur_ms = int((len(samples) / sr) * 1000)
+            return samples, sr, dur_ms
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to decode WAV file: {e}")
+
+    # Try MP3 using pydub
+    if HAVE_PYDUB:
+        # Ensure FFmpeg is found and configured for pydub
+        ffmpeg_path = find_ffmpeg()
+
+        try:
+            seg = AudioSegment.from_file(str(path))
+            sr = seg.frame_rate
+            dur_ms = len(seg)
+            ch = seg.channels
+            raw = seg.get_array_of_samples()
+
+            if HAVE_NUMPY:
+                arr = np.array(raw, dtype=np.int16).astype(np.float32)
+                if ch > 1:
+                    arr = arr.reshape((-1, ch)).mean(axis=1)
+                samples = arr / 32768.0
+            else:
+                ints = list(raw)
+                if ch > 1:
+                    mono = []
+                    for i in range(0, len(ints), ch):
+                        s = 0
+                        for c in range(ch):
+                            s += ints[i + c]
+                        mono.append(s / ch)
+                    samples = [v / 32768.0 for v in mono]
+                else:
+                    samples = [v / 32768.0 for v in ints]
+
+            return samples, sr, dur_ms
+
+        except Exception as e:
+            # Check if this is an FFmpeg-related error
+            error_msg = str(e).lower()
+            if "ffmpeg" in error_msg or "decoder" in error_msg or "not found" in error_msg:
+                if ffmpeg_path:
+                    # FFmpeg was found but pydub still failed
+                    raise RuntimeError(
+                        f"FFmpeg was found at '{ffmpeg_path}' but MP3 decoding still failed.\n"
+                        f"This may indicate a corrupted FFmpeg installation or an incompatible file format.\n\n"
+                        f"Error: {e}\n\n"
+                        f"Try reinstalling FFmpeg:\n"
+                        "• Windows: winget install ffmpeg\n"
+                        "• Linux: sudo apt install ffmpeg\n"
+                        "• macOS: brew install ffmpeg"
+                    )
+                else:
+                    # FFmpeg was not found
+                    raise RuntimeError(
+                        "No MP3 decoder found. FFmpeg is required for MP3 support.\n\n"
+                        "Note: While Qt Multimedia may have built-in FFmpeg for playback, "
+                        "waveform generation requires a separate FFmpeg installation.\n\n"
+                        "Install FFmpeg:\n"
+                        "• Windows: winget install ffmpeg\n"
+                        "• Linux: sudo apt install ffmpeg\n"
+                        "• macOS: brew install ffmpeg"
+                    )
+            else:
+                raise RuntimeError(f"Failed to decode audio file: {e}")
+
+    raise RuntimeError(
+        "Audio format not supported. WAV files work without pydub; MP3/other formats require pydub and FFmpeg.\n\n"
+        "Note: While Qt Multimedia may have built-in FFmpeg for playback, "
+        "waveform generation requires a separate FFmpeg installation.\n\n"
+        "Install FFmpeg:\n"
+        "• Windows: winget install ffmpeg\n"
+        "• Linux: sudo apt install ffmpeg\n"
+        "• macOS: brew install ffmpeg"
+    )
+
+
+def decode_audio_samples(path: Path) -> Tuple[List[float], int, int]:
+    """
+    Decode audio samples from file.
+    
+    Returns:
+        Tuple of (samples, sample_rate, duration_ms)
+    """
+    samples, sr, dur_ms = decode_audio_array(path)
+    if HAVE_NUMPY and isinstance(samples, np.ndarray):
+        samples = samples.tolist()
+    return samples, sr, dur_ms
+
+
+def load_audio_data(path: Path) -> Tuple[Any, int]:
+    """
+    Load mono samples for analysis (fingerprinting, ingest).
+    
+    Returns:
+        Tuple of (samples, sample_rate)
+    """
+    samples, sr, _ = decode_audio_array(path)
+    return samples, sr
+
+
+# ========== Windowed decoding ==========
+
+# WAVE format tags
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def read_wav_layout(path: Path) -> Optional[Dict[str, int]]:
+    """
+    Parse the RIFF chunks of a WAV file without reading sample data.
+    
+    Returns:
+        Dictionary with format, channels, sample_rate, bits, data_offset and
+        frames, or None if the file is not a PCM/float WAV
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+                return None
+            
+            fmt = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+                
+                if chunk_id == b"fmt ":
+                    body = f.read(chunk_size)
+                    tag, nch, sr, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                    if tag == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                        tag = struct.unpack("<H", body[24:26])[0]
+                    fmt = {"format": tag, "channels": nch, "sample_rate": sr, "bits": bits}
+                elif chunk_id == b"data":
+                    if fmt is None or fmt["channels"] == 0:
+                        return None
+                    data_offset = f.tell()
+                    # Streaming writers may leave the size unset; trust the file length instead
+                    available = os.path.getsize(path) - data_offset
+                    if chunk_size == 0 or chunk_size > available:
+                        chunk_size = available
+                    frame_bytes = fmt["channels"] * (fmt["bits"] // 8)
+                    fmt["data_offset"] = data_offset
+                    fmt["frames"] = chunk_size // frame_bytes if frame_bytes else 0
+                    return fmt
+                else:
+                    f.seek(chunk_size, 1)
+                
+                # Chunks are word aligned
+                if chunk_size % 2:
+                    f.seek(1, 1)
+    except Exception:
+        return None
+
+
+def get_audio_duration_seconds(path: Path) -> Optional[float]:
+    """
+    Get a file's duration without decoding it.
+    
+    Returns:
+        Duration in seconds, or None if it cannot be determined cheaply
+    """
+    path = Path(path)
+    layout = read_wav_layout(path)
+    if layout and layout["sample_rate"] > 0:
+        return layout["frames"] / layout["sample_rate"]
+    return probe_duration(path)
+
+
+def resample_audio(samples, sr: int, target_sr: int):
+    """
+    Resample mono samples to target_sr.
+    
+    Downsampling applies a boxcar low-pass before linear interpolation, which
+    is enough to keep aliasing out of the spectral fingerprints.
+    """
+    if not target_sr or sr == target_sr or samples is None or len(samples) == 0:
+        return samples
+    
+    arr = np.asarray(samples, dtype=np.float32)
+    if sr > target_sr:
+        width = int(round(sr / target_sr))
+        if width > 1:
+            kernel = np.ones(width, dtype=np.float32) / width
+            arr = np.convolve(arr, kernel, mode="same").astype(np.float32)
+    
+    n_out = int(len(arr) * target_sr / sr)
+    positions = np.arange(n_out, dtype=np.float64) * (sr / target_sr)
+    return np.interp(positions, np.arange(len(arr)), arr).astype(np.float32)
+
+
+def resolve_decode_window(duration_s: Optional[float], window_s: Optional[float],
+                          position: str = "middle") -> Tuple[float, Optional[float]]:
+    """
+    Work out (start, length) in seconds for a decode window.
+    
+    A length of None means the whole file. An unknown duration also yields the
+    whole file, since the middle cannot be located; use trim_to_window after
+    decoding in that case. A numeric position is an explicit start time in
+    seconds (used to read long recordings chunk by chunk).
+    """
+    if isinstance(position, (int, float)):
+        start_s = max(0.0, float(position))
+        if duration_s is not None:
+            start_s = min(start_s, duration_s)
+        return start_s, window_s or None
+    if not window_s or duration_s is None or duration_s <= window_s:
+        return 0.0, None
+    if position == "start":
+        return 0.0, window_s
+    return (duration_s - window_s) / 2.0, window_s
+
+
+def trim_to_window(samples, sr: int, window_s: Optional[float], position: str = "middle"):
+    """Trim already-decoded samples to a decode window."""
+    if samples is None or not window_s or sr <= 0:
+        return samples
+    start_s, length_s = resolve_decode_window(len(samples) / sr, window_s, position)
+    if length_s is None:
+        return samples
+    first = int(start_s * sr)
+    return samples[first:first + int(length_s * sr)]
+
+
+def _decode_wav_window(path: Path, layout: Dict[str, int], start_s: float,
+                       length_s: Optional[float]) -> Tuple[Any, int]:
+    """Read a window of a WAV file through a memmap, mixing down to mono."""
+    sr = layout["sample_rate"]
+    nch = layout["channels"]
+    width = layout["bits"] // 8
+    total = layout["frames"]
+    
+    first = min(total, int(start_s * sr))
+    last = total if length_s is None else min(total, first + int(length_s * sr))
+    count = last - first
+    if count <= 0:
+        return np.zeros(0, dtype=np.float32), sr
+    
+    offset = layout["data_offset"] + first * nch * width
+    tag = layout["format"]
+    
+    if tag == _WAVE_FORMAT_IEEE_FLOAT and width in (4, 8):
+        raw = np.memmap(path, dtype="<f4" if width == 4 else "<f8", mode="r",
+                        offset=offset, shape=(count, nch))
+        frames = np.asarray(raw, dtype=np.float32)
+    elif tag == _WAVE_FORMAT_PCM and width == 1:
+        raw = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(count, nch))
+        frames = (raw.astype(np.float32) - 128.0) / 128.0
+    elif tag == _WAVE_FORMAT_PCM and width == 2:
+        raw = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(count, nch))
+        frames = raw.astype(np.float32) / 32768.0
+    elif tag == _WAVE_FORMAT_PCM and width == 3:
+        raw = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(count, nch, 3))
+        ints = (raw[..., 0].astype(np.int32) | (raw[..., 1].astype(np.int32) << 8)
+                | (raw[..., 2].astype(np.int32) << 16))
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        frames = ints.astype(np.float32) / float(1 << 23)
+    elif tag == _WAVE_FORMAT_PCM and width == 4:
+        raw = np.memmap(path, dtype="<i4", mode="r", offset=offset, shape=(count, nch))
+        frames = (raw.astype(np.float64) / float(1 << 31)).astype(np.float32)
+    else:
+        raise RuntimeError(f"Unsupported WAV encoding (format {tag}, {layout['bits']} bits)")
+    
+    mono = frames.mean(axis=1) if nch > 1 else frames[:, 0]
+    return np.ascontiguousarray(mono, dtype=np.float32), sr
+
+
+def _decode_ffmpeg_window(ffmpeg: str, path: Path, start_s: float,
+                          length_s: Optional[float], target_sr: Optional[int]) -> Tuple[Any, int]:
+    """Seek and decode a window with ffmpeg, resampled to mono s16 at target_sr."""
+    import subprocess
+    
+    sr = target_sr or 44100
+    cmd = [ffmpeg, "-v", "error", "-nostdin"]
+    if start_s > 0:
+        cmd += ["-ss", f"{start_s:.3f}"]
+    cmd += ["-i", str(path)]
+    if length_s is not None:
+        cmd += ["-t", f"{length_s:.3f}"]
+    cmd += ["-ac", "1", "-ar", str(sr), "-f", "s16le", "-"]
+    
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.decode('utf-8', 'replace').strip()}")
+    
+    data = proc.stdout[: (len(proc.stdout) // 2) * 2]
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0, sr
+
+
+def decode_audio_window(path: Path, window_s: Optional[float] = None,
+                        target_sr: Optional[int] = None,
+                        position: str = "middle") -> Tuple[Any, int]:
+    """
+    Decode only the part of a file an analysis needs, at the rate it needs.
+    
+    WAV files are read through a memmap so only the window is touched;
+    compressed files are seeked and resampled by ffmpeg (-ss/-t/-ar). Without
+    numpy or ffmpeg this falls back to a full decode followed by slicing.
+    
+    Args:
+        path: Audio file
+        window_s: Window length in seconds (None for the whole file)
+        target_sr: Output sample rate (None keeps the native rate)
+        position: "middle", "start", or a start time in seconds
+    
+    Returns:
+        Tuple of (mono samples, sample_rate)
+    """
+    path = Path(path)
+    
+    if HAVE_NUMPY:
+        layout = read_wav_layout(path) if path.suffix.lower() in (".wav", ".wave") else None
+        if layout and layout["sample_rate"] > 0:
+            start_s, length_s = resolve_decode_window(
+                layout["frames"] / layout["sample_rate"], window_s, position)
+            try:
+                samples, sr = _decode_wav_window(path, layout, start_s, length_s)
+                if target_sr and sr != target_sr:
+                    samples, sr = resample_audio(samples, sr, target_sr), target_sr
+                return samples, sr
+            except RuntimeError:
+                pass  # Unusual encoding - let the full decoder handle it
+        else:
+            ffmpeg = find_ffmpeg()
+            if ffmpeg:
+                start_s, length_s = resolve_decode_window(
+                    get_audio_duration_seconds(path), window_s, position)
+                samples, sr = _decode_ffmpeg_window(ffmpeg, path, start_s, length_s, target_sr)
+                if length_s is None:
+                    # Duration was unknown, so the whole file was decoded
+                    samples = trim_to_window(samples, sr, window_s, position)
+                return samples, sr
+    
+    # Fallback: full decode, then trim and resample in memory
+    samples, sr, _ = decode_audio_array(path)
+    samples = trim_to_window(samples, sr, window_s, position)
+    if HAVE_NUMPY and target_sr and sr != target_sr:
+        samples, sr = resample_audio(samples, sr, target_sr), target_sr
+    return samples, sr
+
+
+def compute_peaks_progressive(samples: List[float], columns: int, chunk: int):
+    """
+    Compute peaks progressively for mono audio.
+
+    Yields:
+        (start_index, peaks_data) where peaks_data = [[min, max], ...]
+    """
+    n = len(samples)
+    if n == 0 or columns <= 0:
+        yield 0, [[0.0, 0.0] for _ in range(max(1, columns))]
+        return
+
+    if HAVE_NUMPY:
+        arr = np.asarray(samples, dtype=np.float32)
+        idx = np.linspace(0, n, num=columns+1, dtype=np.int64)
+
+        for start in range(0, columns, chunk):
+            end = min(columns, start + chunk)
+            out = []
+            for i in range(start, end):
+                a, b = idx[i], idx[i+1]
+                if b > a:
+                    seg = arr[a:b]
+                    out.append([float(seg.min()), float(seg.max())])
+                else:
+                    val = float(arr[min(a, n-1)])
+                    out.append([val, val])
+            yield start, out
+    else:
+        # Non-numpy implementation
+        for start in range(0, columns, chunk):
+            end = min(columns, start + chunk)
+            out = []
+            for i in range(start, end):
+                a = int((i * n) / columns)
+                b = int(((i+1) * n) / columns)
+                if b > a:
+                    seg = samples[a:b]
+                    out.append([min(seg), max(seg)])
+                else:
+                    val = samples[min(a, n-1)]
+                    out.append([val, val])
+            yield start, out
+
+
+def compute_waveform_peaks(samples: List[float], columns: int = WAVEFORM_COLUMNS) -> List[List[float]]:
+    """
+    Compute the full [min, max] peak list for mono audio in one call.
+    
+    Returns:
+        List of [min, max] pairs, one per column
+    """
+    peaks = []
+    for _, chunk_peaks in compute_peaks_progressive(samples, columns, columns or 1):
+        for min_val, max_val in chunk_peaks:
+            peaks.append([float(min_val), float(max_val)])
+    return peaks
+
+
 class WaveformWorker(QObject):
     """Worker for generating waveform data in a background thread."""
     
@@ -243,125 +711,7 @@ class WaveformWorker(QObject):
         Returns:
             Tuple of (samples, sample_rate, duration_ms)
         """
-        suffix = path.suffix.lower()
-        
-        # Try WAV first (native support)
-        if suffix in (".wav", ".wave"):
-            try:
-                with wave.open(str(path), "rb") as wf:
-                    nch = wf.getnchannels()
-                    sw = wf.getsampwidth()
-                    sr = wf.getframerate()
-                    nframes = wf.getnframes()
-                    raw = wf.readframes(nframes)
-                
-                # Convert to 16-bit if needed
-                if sw != 2:
-                    try:
-                        raw = convert_audio_samples(raw, sw, 2)
-                        sw = 2
-                    except Exception:
-                        pass
-                
-                # Convert to array
-                data = array("h")
-                data.frombytes(raw[: (len(raw)//2)*2])
-                
-                # Convert to mono if stereo
-                if nch > 1:
-                    total = len(data) // nch
-                    mono = array("h", [0]) * total
-                    for i in range(total):
-                        s = 0
-                        base = i * nch
-                        for c in range(nch):
-                            s += data[base + c]
-                        mono[i] = int(s / nch)
-                    data = mono
-                
-                # Normalize to -1.0 to 1.0
-                if HAVE_NUMPY:
-                    arr = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-                    samples = arr.tolist()
-                else:
-                    samples = [s / 32768.0 for s in data]
-                
-                dur_ms = int((len(samples) / sr) * 1000)
-                return samples, sr, dur_ms
-                
-            except Exception as e:
-                raise RuntimeError(f"Failed to decode WAV file: {e}")
-        
-        # Try MP3 using pydub
-        if HAVE_PYDUB:
-            # Ensure FFmpeg is found and configured for pydub
-            ffmpeg_path = find_ffmpeg()
-            
-            try:
-                seg = AudioSegment.from_file(str(path))
-                sr = seg.frame_rate
-                dur_ms = len(seg)
-                ch = seg.channels
-                raw = seg.get_array_of_samples()
-                
-                if HAVE_NUMPY:
-                    arr = np.array(raw, dtype=np.int16).astype(np.float32)
-                    if ch > 1:
-                        arr = arr.reshape((-1, ch)).mean(axis=1)
-                    samples = (arr / 32768.0).tolist()
-                else:
-                    ints = list(raw)
-                    if ch > 1:
-                        mono = []
-                        for i in range(0, len(ints), ch):
-                            s = 0
-                            for c in range(ch):
-                                s += ints[i + c]
-                            mono.append(s / ch)
-                        samples = [v / 32768.0 for v in mono]
-                    else:
-                        samples = [v / 32768.0 for v in ints]
-                
-                return samples, sr, dur_ms
-                
-            except Exception as e:
-                # Check if this is an FFmpeg-related error
-                error_msg = str(e).lower()
-                if "ffmpeg" in error_msg or "decoder" in error_msg or "not found" in error_msg:
-                    if ffmpeg_path:
-                        # FFmpeg was found but pydub still failed
-                        raise RuntimeError(
-                            f"FFmpeg was found at '{ffmpeg_path}' but MP3 decoding still failed.\n"
-                            f"This may indicate a corrupted FFmpeg installation or an incompatible file format.\n\n"
-                            f"Error: {e}\n\n"
-                            f"Try reinstalling FFmpeg:\n"
-                            "• Windows: winget install ffmpeg\n"
-                            "• Linux: sudo apt install ffmpeg\n"
-                            "• macOS: brew install ffmpeg"
-                        )
-                    else:
-                        # FFmpeg was not found
-                        raise RuntimeError(
-                            "No MP3 decoder found. FFmpeg is required for MP3 support.\n\n"
-                            "Note: While Qt Multimedia may have built-in FFmpeg for playback, "
-                            "waveform generation requires a separate FFmpeg installation.\n\n"
-                            "Install FFmpeg:\n"
-                            "• Windows: winget install ffmpeg\n"
-                            "• Linux: sudo apt install ffmpeg\n"
-                            "• macOS: brew install ffmpeg"
-                        )
-                else:
-                    raise RuntimeError(f"Failed to decode audio file: {e}")
-        
-        raise RuntimeError(
-            "Audio format not supported. WAV files work without pydub; MP3/other formats require pydub and FFmpeg.\n\n"
-            "Note: While Qt Multimedia may have built-in FFmpeg for playback, "
-            "waveform generation requires a separate FFmpeg installation.\n\n"
-            "Install FFmpeg:\n"
-            "• Windows: winget install ffmpeg\n"
-            "• Linux: sudo apt install ffmpeg\n"
-            "• macOS: brew install ffmpeg"
-        )
+        return decode_audio_samples(path)
     
     def _compute_peaks_progressive(self, samples: List[float], columns: int, chunk: int):
         """
@@ -370,42 +720,7 @@ class WaveformWorker(QObject):
         Yields:
             (start_index, peaks_data) where peaks_data = [[min, max], ...]
         """
-        n = len(samples)
-        if n == 0 or columns <= 0:
-            yield 0, [[0.0, 0.0] for _ in range(max(1, columns))]
-            return
-        
-        if HAVE_NUMPY:
-            arr = np.asarray(samples, dtype=np.float32)
-            idx = np.linspace(0, n, num=columns+1, dtype=np.int64)
-            
-            for start in range(0, columns, chunk):
-                end = min(columns, start + chunk)
-                out = []
-                for i in range(start, end):
-                    a, b = idx[i], idx[i+1]
-                    if b > a:
-                        seg = arr[a:b]
-                        out.append([float(seg.min()), float(seg.max())])
-                    else:
-                        val = float(arr[min(a, n-1)])
-                        out.append([val, val])
-                yield start, out
-        else:
-            # Non-numpy implementation
-            for start in range(0, columns, chunk):
-                end = min(columns, start + chunk)
-                out = []
-                for i in range(start, end):
-                    a = int((i * n) / columns)
-                    b = int(((i+1) * n) / columns)
-                    if b > a:
-                        seg = samples[a:b]
-                        out.append([min(seg), max(seg)])
-                    else:
-                        val = samples[min(a, n-1)]
-                        out.append([val, val])
-                yield start, out
+        yield from compute_peaks_progressive(samples, columns, chunk)
 
 
 class WaveformEngine(QObject):
@@ -428,6 +743,7 @@ class WaveformEngine(QObject):
         # Waveform cache: {file_path: {peaks, duration_ms, size, mtime}}
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._cache_dir: Optional[Path] = None
+        self._cache_dirty = False  # Stored waveforms not yet saved (see flushCache)
         
         # Worker management
         self._workers: Dict[str, WaveformWorker] = {}
@@ -445,6 +761,7 @@ class WaveformEngine(QObject):
         Args:
             directory: Directory path where cache file will be stored
         """
+        self.flushCache()
         self._cache_dir = Path(directory) if directory else None
         if self._cache_dir:
             self._load_cache()
@@ -553,6 +870,36 @@ class WaveformEngine(QObject):
             return self._cache[file_path].get("duration_ms", 0)
         return 0
     
+    def storeWaveform(self, file_path: str, peaks: List[List[float]],
+                      duration_ms: int, size: int, mtime: int) -> None:
+        """
+        Store waveform data produced outside the engine (e.g. by the ingest pipeline).
+        
+        The cache is saved by the next flushCache (the ingest pipeline flushes
+        at each checkpoint), not once per file.
+        
+        Args:
+            file_path: Path to the audio file
+            peaks: List of [min, max] peak pairs
+            duration_ms: Duration in milliseconds
+            size: File size used for cache validation
+            mtime: File modification time used for cache validation
+        """
+        self._cache[file_path] = {
+            "peaks": peaks,
+            "duration_ms": duration_ms,
+            "size": size,
+            "mtime": mtime
+        }
+        self._cache_dirty = True
+        self.waveformReady.emit(file_path)
+    
+    @pyqtSlot()
+    def flushCache(self) -> None:
+        """Save the cache if waveforms were stored since it was last saved."""
+        if self._cache_dirty:
+            self._save_cache()
+    
     @pyqtSlot()
     def clearCache(self) -> None:
         """Clear the waveform cache."""
@@ -631,39 +978,32 @@ class WaveformEngine(QObject):
         # Save cache
         self._save_cache()
         
-        # Clean up worker and thread
-        worker = self._workers.pop(file_path, None)
-        thread = self._threads.pop(file_path, None)
-        
-        if thread:
-            thread.deleteLater()
-        if worker:
-            worker.deleteLater()
+        self._finish_thread(file_path)
         
         # Emit ready signal
         self.waveformReady.emit(file_path)
     
     def _on_waveform_error(self, file_path: str, error_message: str) -> None:
         """Handle waveform generation error."""
-        # Clean up worker and thread
-        worker = self._workers.pop(file_path, None)
-        thread = self._threads.pop(file_path, None)
-        
-        if thread:
-            thread.deleteLater()
-        if worker:
-            worker.deleteLater()
+        self._finish_thread(file_path)
         
         # Emit error signal
         self.waveformError.emit(file_path, error_message)
     
     def _on_waveform_cancelled(self, file_path: str) -> None:
         """Handle waveform generation cancellation."""
-        # Clean up worker and thread
+        self._finish_thread(file_path)
+    
+    def _finish_thread(self, file_path: str) -> None:
+        """Stop and release the worker and thread that generated a file's waveform."""
         worker = self._workers.pop(file_path, None)
         thread = self._threads.pop(file_path, None)
         
         if thread:
+            # The worker signal is queued before thread.quit() takes effect, so the
+            # thread may still be running; deleting it then would abort the process
+            thread.quit()
+            thread.wait(2000)
             thread.deleteLater()
         if worker:
             worker.deleteLater()
@@ -678,8 +1018,7 @@ class WaveformEngine(QObject):
             return
         
         try:
-            with open(cache_file, "r") as f:
-                self._cache = json.load(f)
+            self._cache = json_io.read_json(cache_file)
         except Exception:
             self._cache = {}
     
@@ -690,7 +1029,7 @@ class WaveformEngine(QObject):
         
         cache_file = self._cache_dir / WAVEFORM_CACHE_FILE
         try:
-            with open(cache_file, "w") as f:
-                json.dump(self._cache, f, indent=2)
+            json_io.write_json(cache_file, self._cache)
+            self._cache_dirty = False
         except Exception:
             pass  # Ignore cache save errors
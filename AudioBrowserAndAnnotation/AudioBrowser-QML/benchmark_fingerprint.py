@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Fingerprint accuracy and throughput benchmark.
+
+Generates a deterministic synthetic corpus (songs built from chord
+progressions, bass, melody and drum patterns, each rendered as several
+"takes" with tempo, gain, noise and truncation variations) and measures,
+per fingerprint algorithm:
+- Fingerprint time per file and real-time factor
+- Peak memory while fingerprinting (tracemalloc)
+- Match precision / recall / F1 across thresholds, using
+  find_best_cross_folder_match exactly as the app does
+- find_best_cross_folder_match time at library sizes from 100 to 100k
+
+Some songs are held out of the reference library so their takes measure
+false positives. Results can be written as JSON and compared against an
+earlier run to catch regressions.
+
+Usage:
+    python benchmark_fingerprint.py                      # full run
+    python benchmark_fingerprint.py --quick              # smaller corpus, sizes up to 10k
+    python benchmark_fingerprint.py --output run.json
+    python benchmark_fingerprint.py --compare run.json   # exit 1 on regression
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from backend.fingerprint_engine import (
+    FINGERPRINT_ALGORITHMS,
+    compute_multiple_fingerprints,
+    find_best_cross_folder_match,
+)
+
+BENCHMARK_VERSION = 1
+SAMPLE_RATE = 22050
+THRESHOLDS = [0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 0.97, 0.99]
+LIBRARY_SIZES = [100, 1000, 10000, 100000]
+QUICK_LIBRARY_SIZES = [100, 1000, 10000]
+
+# Regression limits for --compare
+MAX_TIME_RATIO = 1.25      # Slower than this multiple of the baseline is a regression
+MAX_ACCURACY_DROP = 0.02   # Precision/recall/F1 drop beyond this is a regression
+
+# Scale degrees of common progressions (I-V-vi-IV, I-vi-IV-V, ...)
+PROGRESSIONS = [[0, 4, 5, 3], [0, 5, 3, 4], [5, 3, 0, 4], [0, 3, 4, 4], [1, 4, 0, 0], [0, 3, 0, 4]]
+MAJOR_SCALE = [0, 2, 4, 5, 7, 9, 11]
+
+# 8th-note kick patterns (one bar)
+KICK_PATTERNS = [
+    [1, 0, 0, 0, 1, 0, 0, 0],
+    [1, 0, 0, 1, 0, 0, 1, 0],
+    [1, 0, 1, 0, 0, 0, 1, 0],
+    [1, 1, 0, 0, 1, 0, 0, 1],
+]
+
+# Take variations: (label, tempo scale, gain dB, SNR dB or None, trim start s, trim end s)
+TAKE_VARIATIONS = [
+    ("clean", 1.00, 0.0, None, 0.0, 0.0),
+    ("faster", 1.04, -3.0, 30.0, 0.0, 0.0),
+    ("slower_quiet", 0.96, -9.0, 25.0, 0.0, 0.0),
+    ("noisy", 1.00, 0.0, 12.0, 0.0, 0.0),
+    ("truncated", 1.00, 2.0, 30.0, 4.0, 6.0),
+]
+
+
+# ========== Synthetic corpus ==========
+
+def _midi_to_hz(note: float) -> float:
+    return 440.0 * 2 ** ((note - 69) / 12.0)
+
+
+def make_song_spec(seed: int, seconds: float) -> dict:
+    """Pick the musical content of one song (deterministic per seed)."""
+    rng = np.random.default_rng(seed)
+    bars = max(1, int(seconds / (4 * 60.0 / 100)))
+    return {
+        "seed": seed,
+        "key": int(rng.integers(40, 52)),
+        "bpm": float(rng.integers(80, 140)),
+        "progression": PROGRESSIONS[int(rng.integers(len(PROGRESSIONS)))],
+        "kick": KICK_PATTERNS[int(rng.integers(len(KICK_PATTERNS)))],
+        # One melody note (chord-tone index and octave) per 8th note
+        "melody": rng.integers(0, 3, size=(bars * 8, 2)).tolist(),
+        "seconds": seconds,
+    }
+
+
+def _add_tone(out, start, length, freq, amp, sr, harmonics=(1.0, 0.5, 0.25), decay=3.0):
+    """Mix a decaying harmonic tone into out[start:start+length]."""
+    length = min(length, len(out) - start)
+    if length <= 0:
+        return
+    t = np.arange(length) / sr
+    envelope = np.minimum(1.0, t * 200.0) * np.exp(-decay * t)
+    tone = sum(a * np.sin(2 * np.pi * freq * (h + 1) * t) for h, a in enumerate(harmonics))
+    out[start:start + length] += amp * envelope * tone
+
+
+def _add_noise_hit(out, start, length, amp, rng, decay, highpass=False):
+    """Mix a decaying noise burst (snare/hi-hat) into out."""
+    length = min(length, len(out) - start)
+    if length <= 0:
+        return
+    noise = rng.standard_normal(length)
+    if highpass:
+        noise = np.diff(noise, prepend=0.0)
+    t = np.arange(length)
+    out[start:start + length] += amp * noise * np.exp(-decay * t / length)
+
+
+def render_song(spec: dict, tempo_scale: float = 1.0, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Render a song spec to mono float32 samples."""
+    rng = np.random.default_rng(spec["seed"] + 1000)  # Drum noise is part of the song
+    beat = 60.0 / (spec["bpm"] * tempo_scale)
+    eighth = int(beat / 2 * sr)
+    bars = max(1, int(spec["seconds"] / (4 * 60.0 / spec["bpm"])))
+    out = np.zeros(bars * 8 * eighth + sr, dtype=np.float64)
+
+    for bar in range(bars):
+        degree = spec["progression"][bar % len(spec["progression"])]
+        chord = [spec["key"] + MAJOR_SCALE[(degree + i) % 7] + 12 * ((degree + i) // 7) for i in (0, 2, 4)]
+        bar_start = bar * 8 * eighth
+
+        # Pad chord and bass, one per bar
+        for note in chord:
+            _add_tone(out, bar_start, 8 * eighth, _midi_to_hz(note + 12), 0.08, sr, decay=0.8)
+        _add_tone(out, bar_start, 4 * eighth, _midi_to_hz(chord[0] - 12), 0.25, sr, decay=1.5)
+        _add_tone(out, bar_start + 4 * eighth, 4 * eighth, _midi_to_hz(chord[0] - 12), 0.25, sr, decay=1.5)
+
+        for step in range(8):
+            pos = bar_start + step * eighth
+            tone_idx, octave = spec["melody"][(bar * 8 + step) % len(spec["melody"])]
+            _add_tone(out, pos, eighth, _midi_to_hz(chord[tone_idx] + 24 + 12 * (octave == 2)), 0.12, sr,
+                      harmonics=(1.0, 0.3), decay=6.0)
+            if spec["kick"][step]:
+                _add_tone(out, pos, int(0.15 * sr), 55.0, 0.5, sr, harmonics=(1.0,), decay=25.0)
+            if step in (2, 6):
+                _add_noise_hit(out, pos, int(0.12 * sr), 0.2, rng, decay=6.0)
+            _add_noise_hit(out, pos, int(0.04 * sr), 0.05, rng, decay=8.0, highpass=True)
+
+    out /= max(1e-9, np.max(np.abs(out))) / 0.7
+    return out.astype(np.float32)
+
+
+def make_take(samples: np.ndarray, gain_db: float, snr_db, trim_start: float, trim_end: float,
+              seed: int, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Apply gain, additive noise and truncation to a rendered song."""
+    out = samples.astype(np.float64) * 10 ** (gain_db / 20.0)
+    if snr_db is not None:
+        rms = np.sqrt(np.mean(out ** 2)) or 1e-9
+        noise = np.random.default_rng(seed).standard_normal(len(out))
+        out += noise * rms / 10 ** (snr_db / 20.0)
+    start = int(trim_start * sr)
+    end = len(out) - int(trim_end * sr)
+    return np.clip(out[start:end], -1.0, 1.0).astype(np.float32)
+
+
+def generate_corpus(num_songs: int = 16, seconds: float = 30.0, holdout: float = 0.25, seed: int = 1234) -> dict:
+    """
+    Build the benchmark corpus.
+
+    Returns:
+        Dictionary with "references" (song_id -> samples, the clean takes of
+        songs in the library) and "queries" (list of dicts: song_id,
+        variation, samples, in_library)
+    """
+    num_holdout = int(round(num_songs * holdout))
+    references = {}
+    queries = []
+    for index in range(num_songs):
+        song_id = f"song_{index:03d}"
+        spec = make_song_spec(seed + index, seconds)
+        in_library = index >= num_holdout
+        rendered = {}
+        for v_index, (label, tempo, gain, snr, trim_start, trim_end) in enumerate(TAKE_VARIATIONS):
+            if tempo not in rendered:
+                rendered[tempo] = render_song(spec, tempo)
+            samples = make_take(rendered[tempo], gain, snr, trim_start, trim_end, seed * 31 + index * 7 + v_index)
+            if label == "clean" and in_library:
+                references[song_id] = samples
+            else:
+                queries.append({"song_id": song_id, "variation": label,
+                                "samples": samples, "in_library": in_library})
+    return {"references": references, "queries": queries}
+
+
+# ========== Measurements ==========
+
+def measure_fingerprinting(algorithm: str, clips: list, sr: int = SAMPLE_RATE):
+    """
+    Fingerprint each clip, timing each call and tracking peak memory.
+
+    Returns:
+        Tuple of (fingerprints list, stats dict)
+    """
+    fingerprints = []
+    timings = []
+    tracemalloc.start()
+    peak = 0
+    for samples in clips:
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        fp = compute_multiple_fingerprints(samples, sr, [algorithm]).get(algorithm)
+        timings.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        fingerprints.append(fp)
+    tracemalloc.stop()
+
+    audio_seconds = sum(len(c) for c in clips) / sr
+    vector_length = len(fingerprints[0]) if fingerprints and fingerprints[0] else 0
+    stats = {
+        "files": len(clips),
+        "mean_s": float(np.mean(timings)),
+        "p95_s": float(np.percentile(timings, 95)),
+        "realtime_factor": float(audio_seconds / max(1e-9, sum(timings))),
+        "peak_memory_kb": round(peak / 1024.0, 1),
+        "vector_length": vector_length,
+    }
+    return fingerprints, stats
+
+
+def _fingerprint_map(fingerprints: dict, folder: Path) -> dict:
+    """Shape {name: fingerprint} like collect_fingerprints_from_folders output."""
+    return {
+        name: [{"fingerprint": fp, "folder": folder, "provided_name": name,
+                "is_global_reference_folder": False, "is_per_folder_reference": False,
+                "is_reference_song": False}]
+        for name, fp in fingerprints.items() if fp
+    }
+
+
+def measure_accuracy(reference_fps: dict, queries: list, query_fps: list, thresholds=THRESHOLDS) -> dict:
+    """
+    Precision / recall / F1 of find_best_cross_folder_match at each threshold.
+
+    A query of a library song is a true positive when the returned match is
+    its own song. Any other returned match (wrong song, or a match for a
+    held-out song) is a false positive.
+    """
+    fp_map = _fingerprint_map(reference_fps, Path("library"))
+    best = []
+    for query, fp in zip(queries, query_fps):
+        match = find_best_cross_folder_match(fp, fp_map, 0.0) if fp else None
+        best.append((match[0], match[1]) if match else (None, 0.0))
+
+    positives = sum(1 for q in queries if q["in_library"])
+    results = {}
+    for threshold in thresholds:
+        tp = fp_count = 0
+        for query, (name, score) in zip(queries, best):
+            if name is None or score < threshold:
+                continue
+            if query["in_library"] and name == query["song_id"]:
+                tp += 1
+            else:
+                fp_count += 1
+        precision = tp / (tp + fp_count) if tp + fp_count else 1.0
+        recall = tp / positives if positives else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        results[f"{threshold:.2f}"] = {
+            "precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4),
+            "true_positives": tp, "false_positives": fp_count,
+        }
+
+    best_threshold = max(results, key=lambda t: (results[t]["f1"], float(t)))
+    return {"thresholds": results, "best_threshold": float(best_threshold),
+            "best_f1": results[best_threshold]["f1"]}
+
+
+def measure_match_scaling(vector_length: int, sizes, repeats: int = 3, seed: int = 99) -> dict:
+    """Time find_best_cross_folder_match against synthetic libraries of each size."""
+    rng = np.random.default_rng(seed)
+    results = {}
+    for size in sizes:
+        vectors = rng.random((size, vector_length)).astype(np.float32)
+        fp_map = _fingerprint_map({f"file_{i:06d}": vectors[i].tolist() for i in range(size)}, Path("library"))
+        target = rng.random(vector_length).astype(np.float32).tolist()
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            find_best_cross_folder_match(target, fp_map, 0.99)
+            timings.append(time.perf_counter() - started)
+        results[str(size)] = {"median_s": float(np.median(timings)),
+                              "per_entry_us": float(np.median(timings) / size * 1e6)}
+        print(f"    {size:>7} entries: {np.median(timings) * 1000:9.1f} ms")
+    return results
+
+
+# ========== Runner ==========
+
+def run_benchmark(algorithms=None, num_songs: int = 16, seconds: float = 30.0,
+                  sizes=LIBRARY_SIZES, seed: int = 1234) -> dict:
+    """Run every measurement and return the JSON-serializable report."""
+    algorithms = algorithms or list(FINGERPRINT_ALGORITHMS.keys())
+    print(f"Generating corpus: {num_songs} songs x {len(TAKE_VARIATIONS)} takes, {seconds:.0f}s each...")
+    corpus = generate_corpus(num_songs, seconds, seed=seed)
+    ref_names = list(corpus["references"].keys())
+    queries = corpus["queries"]
+
+    report = {
+        "meta": {
+            "benchmark_version": BENCHMARK_VERSION,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "songs": num_songs,
+            "seconds": seconds,
+            "references": len(ref_names),
+            "queries": len(queries),
+            "variations": [v[0] for v in TAKE_VARIATIONS],
+        },
+        "algorithms": {},
+    }
+
+    for algorithm in algorithms:
+        print(f"\n[{algorithm}]")
+        clips = [corpus["references"][n] for n in ref_names] + [q["samples"] for q in queries]
+        fingerprints, fp_stats = measure_fingerprinting(algorithm, clips)
+        reference_fps = dict(zip(ref_names, fingerprints[:len(ref_names)]))
+        query_fps = fingerprints[len(ref_names):]
+        print(f"  fingerprint: {fp_stats['mean_s'] * 1000:.1f} ms/file, "
+              f"{fp_stats['realtime_factor']:.0f}x realtime, peak {fp_stats['peak_memory_kb']:.0f} KB")
+
+        accuracy = measure_accuracy(reference_fps, queries, query_fps)
+        best = accuracy["thresholds"][f"{accuracy['best_threshold']:.2f}"]
+        print(f"  accuracy: best F1 {accuracy['best_f1']:.3f} at threshold {accuracy['best_threshold']:.2f} "
+              f"(precision {best['precision']:.3f}, recall {best['recall']:.3f})")
+
+        print("  match scaling:")
+        scaling = measure_match_scaling(fp_stats["vector_length"], sizes)
+
+        report["algorithms"][algorithm] = {
+            "fingerprint": fp_stats,
+            "accuracy": accuracy,
+            "match_scaling": scaling,
+        }
+    return report
+
+
+def compare_reports(baseline: dict, current: dict) -> list:
+    """
+    List regressions of current against baseline.
+
+    Times may grow by at most MAX_TIME_RATIO; precision, recall and F1 at
+    every threshold may drop by at most MAX_ACCURACY_DROP.
+    """
+    regressions = []
+    for algorithm, now in current.get("algorithms", {}).items():
+        before = baseline.get("algorithms", {}).get(algorithm)
+        if not before:
+            continue
+
+        checks = [("fingerprint mean_s", before["fingerprint"]["mean_s"], now["fingerprint"]["mean_s"])]
+        for size, stats in now.get("match_scaling", {}).items():
+            if size in before.get("match_scaling", {}):
+                checks.append((f"match {size} median_s", before["match_scaling"][size]["median_s"], stats["median_s"]))
+        for label, old, new in checks:
+            if old > 0 and new / old > MAX_TIME_RATIO:
+                regressions.append(f"{algorithm}: {label} {old:.4f}s -> {new:.4f}s ({new / old:.2f}x)")
+
+        for threshold, stats in now["accuracy"]["thresholds"].items():
+            old_stats = before["accuracy"]["thresholds"].get(threshold)
+            if not old_stats:
+                continue
+            for metric in ("precision", "recall", "f1"):
+                if old_stats[metric] - stats[metric] > MAX_ACCURACY_DROP:
+                    regressions.append(f"{algorithm}: {metric}@{threshold} "
+                                       f"{old_stats[metric]:.3f} -> {stats[metric]:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint accuracy and throughput benchmark")
+    parser.add_argument("--quick", action="store_true", help="Smaller corpus and library sizes up to 10k")
+    parser.add_argument("--algorithms", nargs="+", choices=list(FINGERPRINT_ALGORITHMS.keys()),
+                        help="Algorithms to benchmark (default: all)")
+    parser.add_argument("--songs", type=int, help="Number of synthetic songs")
+    parser.add_argument("--seconds", type=float, help="Song length in seconds")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Library sizes for match scaling")
+    parser.add_argument("--seed", type=int, default=1234, help="Corpus seed")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON report; exit 1 on regression")
+    args = parser.parse_args()
+
+    songs = args.songs or (8 if args.quick else 16)
+    seconds = args.seconds or (20.0 if args.quick else 30.0)
+    sizes = args.sizes or (QUICK_LIBRARY_SIZES if args.quick else LIBRARY_SIZES)
+
+    print("=" * 60)
+    print("Fingerprint Benchmark")
+    print("=" * 60)
+    report = run_benchmark(args.algorithms, songs, seconds, sizes, args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("seed") != report["meta"]["seed"]:
+            print("\nWarning: baseline was generated with a different corpus seed")
+        regressions = compare_reports(baseline, report)
+        print("\n" + "=" * 60)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"✓ No regressions against {args.compare}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+JSON load/save benchmark.
+
+Builds synthetic metadata files at realistic sizes (a duration cache, an
+analysis cache, a JSON fingerprint cache and an annotation sets file) and
+times saving and loading each through the shared json_io layer, for every
+available backend (json, orjson) with readable and compact encoding.
+
+Usage:
+    python benchmark_json_io.py
+    python benchmark_json_io.py --files 2000 --repeat 7
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add repository root to path for the shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared import json_io
+
+
+def build_payloads(files: int, seed: int) -> dict:
+    """Synthetic metadata for a folder with the given number of takes."""
+    rng = random.Random(seed)
+    names = [f"2024-05-{i % 28 + 1:02d} take {i:04d} - Song Title ü.wav" for i in range(files)]
+    return {
+        "duration cache": {name: rng.randrange(60000, 420000) for name in names},
+        "analysis cache": {"version": 1, "files": {
+            name: {"size": rng.randrange(10**6, 10**8), "mtime": rng.randrange(10**9, 2 * 10**9),
+                   "lufs": round(rng.uniform(-30, -8), 2), "peak_db": round(rng.uniform(-6, 0), 2),
+                   "spectrum": [round(rng.random(), 4) for _ in range(32)]}
+            for name in names}},
+        "fingerprint cache": {"version": 1, "excluded_files": [], "files": {
+            name: {"size": rng.randrange(10**6, 10**8), "mtime": rng.randrange(10**9, 2 * 10**9),
+                   "fingerprints": {algorithm: [rng.random() for _ in range(144)]
+                                    for algorithm in ("spectral", "lightweight", "chromaprint")}}
+            for name in names}},
+        "annotation sets": {"version": 3, "current_set_id": "a1b2c3d4", "sets": [{
+            "id": "a1b2c3d4", "name": "band", "color": "#00cc66", "visible": True, "folder_notes": "",
+            "files": {name: {"general": "", "best_take": rng.random() < 0.1, "notes": [
+                {"uid": n, "ms": rng.randrange(0, 400000), "text": f"Note {n}: tighten the bridge",
+                 "important": rng.random() < 0.2, "created_at": "2024-05-01T20:15:00"}
+                for n in range(rng.randrange(0, 12))]} for name in names}}]},
+    }
+
+
+def time_best(function, repeat: int) -> float:
+    """Fastest of repeat runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON load/save benchmark")
+    parser.add_argument("--files", type=int, default=1000, help="Takes per synthetic folder")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (fastest is reported)")
+    parser.add_argument("--seed", type=int, default=1234, help="Data seed")
+    args = parser.parse_args()
+
+    backends = ["json"] + (["orjson"] if json_io.HAVE_ORJSON else [])
+    default_backend = json_io.get_backend()
+    payloads = build_payloads(args.files, args.seed)
+
+    print("=" * 72)
+    print("JSON I/O Benchmark")
+    print("=" * 72)
+    print(f"{args.files} takes per file; backends: {', '.join(backends)}")
+    if not json_io.HAVE_ORJSON:
+        print("(pip install orjson to compare the faster backend)")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "bench.json"
+        for label, data in payloads.items():
+            print(f"\n{label}")
+            print(f"  {'backend':8s} {'encoding':9s} {'size':>9s} {'save ms':>9s} {'load ms':>9s}")
+            for backend in backends:
+                json_io.set_backend(backend)
+                for compact in (False, True):
+                    save_ms = time_best(lambda: json_io.write_json(path, data, compact=compact), args.repeat)
+                    load_ms = time_best(lambda: json_io.read_json(path), args.repeat)
+                    size_kb = path.stat().st_size / 1024
+                    print(f"  {backend:8s} {'compact' if compact else 'readable':9s} "
+                          f"{size_kb:7.0f}KB {save_ms:9.1f} {load_ms:9.1f}")
+    json_io.set_backend(default_backend)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -90,12 +90,16 @@ from backend.practice_goals import PracticeGoals
 from backend.setlist_manager import SetlistManager
 from backend.tempo_manager import TempoManager
 from backend.fingerprint_engine import FingerprintEngine
+from backend.audio_ingest import AudioIngestPipeline
+from backend.library_watcher import LibraryWatcher
 from backend.backup_manager import BackupManager
 from backend.export_manager import ExportManager
 from backend.documentation_manager import DocumentationManager
 from backend.undo_manager import UndoManager
 from backend.sync_manager import SyncManager
 from backend.log_viewer import LogViewer
+from shared.library_catalog import open_catalog  # shared/ is on sys.path via the backend modules
+from shared.metadata_cache import get_metadata_cache
 
 
 class ApplicationViewModel(QObject):
@@ -223,6 +227,7 @@ def main():
 
     setlist_manager = safe_create("SetlistManager", lambda: SetlistManager(Path.home()))
     fingerprint_engine = safe_create("FingerprintEngine", FingerprintEngine)
+    audio_ingest = safe_create("AudioIngestPipeline", AudioIngestPipeline)
     backup_manager = safe_create("BackupManager", BackupManager)
     export_manager = safe_create("ExportManager", ExportManager)
     documentation_manager = safe_create("DocumentationManager", DocumentationManager)
@@ -242,6 +247,8 @@ def main():
         logging.info("Connecting AnnotationManager to UndoManager...")
         annotation_manager.setUndoManager(undo_manager)
         logging.info("AnnotationManager connected to UndoManager successfully")
+        annotation_manager.setJournalEnabled(settings_manager.getUseAnnotationJournal())
+        annotation_manager.setFolderStoreEnabled(settings_manager.getUseFolderStore())
     except Exception as e:
         error_msg = f"Failed to connect AnnotationManager to UndoManager: {e}"
         logging.error(error_msg, exc_info=True)
@@ -250,7 +257,7 @@ def main():
     config_dir = Path.home() / ".audiobrowser"
     sync_manager = safe_create("SyncManager", lambda: SyncManager(config_dir))
     log_viewer = safe_create("LogViewer", LogViewer)
-    file_list_model = safe_create("FileListModel", lambda: FileListModel(file_manager=file_manager, tempo_manager=tempo_manager, annotation_manager=annotation_manager))
+    file_list_model = safe_create("FileListModel", lambda: FileListModel(file_manager=file_manager, tempo_manager=tempo_manager, annotation_manager=annotation_manager, background_details=True))
     annotations_model = safe_create("AnnotationsModel", AnnotationsModel)
     view_model = safe_create("ApplicationViewModel", ApplicationViewModel)
     def update_tempo_directory(directory):
@@ -298,6 +305,8 @@ def main():
     
     # Connect fingerprint engine to file manager
     file_manager.currentDirectoryChanged.connect(fingerprint_engine.setCurrentDirectory)
+    # Legacy fingerprint caches of opened practice folders are converted in background
+    file_manager.directoryScanned.connect(fingerprint_engine.compactFolderCache)
     
     # Connect backup manager to file manager (update current folder and root path)
     file_manager.currentDirectoryChanged.connect(backup_manager.setCurrentFolder)
@@ -325,6 +334,52 @@ def main():
 
     fingerprint_engine.setAudioLoader(load_audio_for_fingerprinting)
 
+    # Decode-once ingest: peaks, fingerprints, duration and analysis from a single decode
+    audio_ingest.setWaveformEngine(waveform_engine)
+    file_manager.currentDirectoryChanged.connect(audio_ingest.setCurrentDirectory)
+    def ingest_discovered_files(files):
+        if settings_manager.getAutoWaveforms() or settings_manager.getAutoFingerprints():
+            audio_ingest.ingestFiles(files)
+    file_manager.filesDiscovered.connect(ingest_discovered_files)
+
+    # Incremental file list updates from filesystem events (rows are updated in LibraryTab)
+    library_watcher = safe_create("LibraryWatcher", lambda: LibraryWatcher(file_manager=file_manager))
+    library_watcher.filesAdded.connect(ingest_discovered_files)
+    # Keep the note search index current (searches themselves never reconcile it)
+    library_watcher.metadataChanged.connect(file_manager.refreshNoteIndex)
+    annotation_manager.saveStateChanged.connect(lambda pending: pending or file_manager.refreshNoteIndex())
+    app.aboutToQuit.connect(library_watcher.stop)
+    app.aboutToQuit.connect(file_manager.cancelNoteIndex)
+    app.aboutToQuit.connect(audio_ingest.finishIngest)
+    app.aboutToQuit.connect(waveform_engine.flushCache)
+    app.aboutToQuit.connect(fingerprint_engine.cancelLandmarkWork)
+    app.aboutToQuit.connect(fingerprint_engine.finishCacheCompaction)
+    app.aboutToQuit.connect(file_list_model.cancelDetails)
+    app.aboutToQuit.connect(file_manager.flushDurationCache)
+    app.aboutToQuit.connect(annotation_manager.compactAnnotationSets)
+    app.aboutToQuit.connect(annotation_manager.exportFolderStores)
+    # Hit rate of the shared parsed-JSON cache, for tuning
+    app.aboutToQuit.connect(lambda: logging.info(f"Metadata cache: {get_metadata_cache().stats()}"))
+
+    # Optional library catalog: folder tree, search, statistics and setlists query
+    # one database for the whole root instead of walking it (JSON files stay authoritative)
+    library_catalog = [None]
+    def close_library_catalog():
+        if library_catalog[0] is not None:
+            library_catalog[0].close()
+            library_catalog[0] = None
+    def update_library_catalog(directory):
+        close_library_catalog()
+        if directory and settings_manager.getUseLibraryCatalog():
+            library_catalog[0] = open_catalog(Path(directory))
+            if library_catalog[0] is not None:
+                # Index new and changed folders (incl. the note search index) up front
+                library_catalog[0].refresh_in_background()
+        for backend in (file_manager, practice_statistics, setlist_manager):
+            backend.setLibraryCatalog(library_catalog[0])
+    file_manager.currentDirectoryChanged.connect(update_library_catalog)
+    app.aboutToQuit.connect(close_library_catalog)
+
     # Set initial volume from settings
     audio_engine.setVolume(settings_manager.getVolume())
     
@@ -349,6 +404,7 @@ def main():
     ctx.setContextProperty("fileManager", file_manager)
     ctx.setContextProperty("tempoManager", tempo_manager)
     ctx.setContextProperty("fileListModel", file_list_model)
+    ctx.setContextProperty("libraryWatcher", library_watcher)
     ctx.setContextProperty("annotationsModel", annotations_model)
     ctx.setContextProperty("waveformEngine", waveform_engine)
     ctx.setContextProperty("annotationManager", annotation_manager)
@@ -359,6 +415,7 @@ def main():
     ctx.setContextProperty("practiceGoals", practice_goals)
     ctx.setContextProperty("setlistManager", setlist_manager)
     ctx.setContextProperty("fingerprintEngine", fingerprint_engine)
+    ctx.setContextProperty("audioIngest", audio_ingest)
     ctx.setContextProperty("backupManager", backup_manager)
     ctx.setContextProperty("exportManager", export_manager)
     ctx.setContextProperty("documentationManager", documentation_manager)
@@ -34,6 +34,9 @@ Dialog {
     property bool tempAutoFingerprints: false
     property int tempDefaultZoomLevel: 1
     property string tempWaveformQuality: "medium"
+    property bool tempUseLibraryCatalog: false
+    property bool tempUseAnnotationJournal: false
+    property bool tempUseFolderStore: false
     
     // Load settings when dialog opens
     onAboutToShow: {
@@ -60,6 +63,9 @@ Dialog {
         tempAutoFingerprints = settingsManager.getAutoFingerprints()
         tempDefaultZoomLevel = settingsManager.getDefaultZoom()
         tempWaveformQuality = settingsManager.getWaveformQuality()
+        tempUseLibraryCatalog = settingsManager.getUseLibraryCatalog()
+        tempUseAnnotationJournal = settingsManager.getUseAnnotationJournal()
+        tempUseFolderStore = settingsManager.getUseFolderStore()
         
         // Update UI controls
         undoLimitSlider.value = tempUndoLimit
@@ -68,6 +74,9 @@ Dialog {
         autoFingerprintsCheck.checked = tempAutoFingerprints
         defaultZoomSlider.value = tempDefaultZoomLevel
         waveformQualityCombo.currentIndex = waveformQualityCombo.indexOfValue(tempWaveformQuality)
+        libraryCatalogCheck.checked = tempUseLibraryCatalog
+        annotationJournalCheck.checked = tempUseAnnotationJournal
+        folderStoreCheck.checked = tempUseFolderStore
     }
     
     function applySettings() {
@@ -77,6 +86,11 @@ Dialog {
         settingsManager.setAutoFingerprints(tempAutoFingerprints)
         settingsManager.setDefaultZoom(tempDefaultZoomLevel)
         settingsManager.setWaveformQuality(tempWaveformQuality)
+        settingsManager.setUseLibraryCatalog(tempUseLibraryCatalog)
+        settingsManager.setUseAnnotationJournal(tempUseAnnotationJournal)
+        annotationManager.setJournalEnabled(tempUseAnnotationJournal)
+        settingsManager.setUseFolderStore(tempUseFolderStore)
+        annotationManager.setFolderStoreEnabled(tempUseFolderStore)
         
         console.log("Settings applied:", tempUndoLimit, tempParallelWorkers, tempAutoWaveforms, tempAutoFingerprints, tempDefaultZoomLevel, tempWaveformQuality)
     }
@@ -88,6 +102,9 @@ Dialog {
         tempAutoFingerprints = false
         tempDefaultZoomLevel = 1
         tempWaveformQuality = "medium"
+        tempUseLibraryCatalog = false
+        tempUseAnnotationJournal = false
+        tempUseFolderStore = false
         loadSettings()
     }
     
@@ -238,6 +255,135 @@ Dialog {
                             Layout.preferredWidth: 50
                         }
                     }
+                    
+                    CheckBox {
+                        id: libraryCatalogCheck
+                        text: "Keep a library catalog (faster folder tree, search and statistics)"
+                        checked: tempUseLibraryCatalog
+                        
+                        onCheckedChanged: {
+                            tempUseLibraryCatalog = checked
+                        }
+                        
+                        contentItem: Text {
+                            text: parent.text
+                            font.pixelSize: Theme.fontSizeNormal
+                            color: Theme.textColor
+                            leftPadding: parent.indicator.width + Theme.spacingSmall
+                            verticalAlignment: Text.AlignVCenter
+                        }
+                        
+                        indicator: Rectangle {
+                            implicitWidth: 20
+                            implicitHeight: 20
+                            radius: 3
+                            border.color: Theme.borderColor
+                            border.width: 1
+                            color: libraryCatalogCheck.checked ? Theme.accentColor : Theme.backgroundColor
+                            
+                            Text {
+                                anchors.centerIn: parent
+                                text: "✓"
+                                font.pixelSize: Theme.fontSizeNormal
+                                color: Theme.textColor
+                                visible: libraryCatalogCheck.checked
+                            }
+                        }
+                    }
+                    
+                    Label {
+                        text: "Stored as .library_catalog.db in the library folder; takes effect when a folder is opened."
+                        font.pixelSize: Theme.fontSizeSmall
+                        color: Theme.textMuted
+                        wrapMode: Text.WordWrap
+                        Layout.fillWidth: true
+                    }
+                    
+                    CheckBox {
+                        id: annotationJournalCheck
+                        text: "Journal annotation edits (append changes instead of rewriting the file)"
+                        checked: tempUseAnnotationJournal
+                        
+                        onCheckedChanged: {
+                            tempUseAnnotationJournal = checked
+                        }
+                        
+                        contentItem: Text {
+                            text: parent.text
+                            font.pixelSize: Theme.fontSizeNormal
+                            color: Theme.textColor
+                            leftPadding: parent.indicator.width + Theme.spacingSmall
+                            verticalAlignment: Text.AlignVCenter
+                        }
+                        
+                        indicator: Rectangle {
+                            implicitWidth: 20
+                            implicitHeight: 20
+                            radius: 3
+                            border.color: Theme.borderColor
+                            border.width: 1
+                            color: annotationJournalCheck.checked ? Theme.accentColor : Theme.backgroundColor
+                            
+                            Text {
+                                anchors.centerIn: parent
+                                text: "✓"
+                                font.pixelSize: Theme.fontSizeNormal
+                                color: Theme.textColor
+                                visible: annotationJournalCheck.checked
+                            }
+                        }
+                    }
+                    
+                    Label {
+                        text: "For large annotation files. The journal is folded back into the annotation file when idle, when switching folders and on exit."
+                        font.pixelSize: Theme.fontSizeSmall
+                        color: Theme.textMuted
+                        wrapMode: Text.WordWrap
+                        Layout.fillWidth: true
+                    }
+                    
+                    CheckBox {
+                        id: folderStoreCheck
+                        text: "Keep folder metadata in one file (.folder_store.json)"
+                        checked: tempUseFolderStore
+                        
+                        onCheckedChanged: {
+                            tempUseFolderStore = checked
+                        }
+                        
+                        contentItem: Text {
+                            text: parent.text
+                            font.pixelSize: Theme.fontSizeNormal
+                            color: Theme.textColor
+                            leftPadding: parent.indicator.width + Theme.spacingSmall
+                            verticalAlignment: Text.AlignVCenter
+                        }
+                        
+                        indicator: Rectangle {
+                            implicitWidth: 20
+                            implicitHeight: 20
+                            radius: 3
+                            border.color: Theme.borderColor
+                            border.width: 1
+                            color: folderStoreCheck.checked ? Theme.accentColor : Theme.backgroundColor
+                            
+                            Text {
+                                anchors.centerIn: parent
+                                text: "✓"
+                                font.pixelSize: Theme.fontSizeNormal
+                                color: Theme.textColor
+                                visible: folderStoreCheck.checked
+                            }
+                        }
+                    }
+                    
+                    Label {
+                        text: "Names, durations, takes, tempo and annotations are saved to one file per folder, for fewer reads and sync uploads. The individual files used by the original AudioBrowser are updated when switching folders and on exit."
+                        font.pixelSize: Theme.fontSizeSmall
+                        color: Theme.textMuted
+                        wrapMode: Text.WordWrap
+                        Layout.fillWidth: true
+                    }
                 }
             }
             
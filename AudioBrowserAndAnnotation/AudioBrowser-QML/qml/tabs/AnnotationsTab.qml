@@ -86,6 +86,13 @@ Item {
                         color: Theme.textColor
                     }
                     
+                    Label {
+                        id: saveStateLabel
+                        text: ""
+                        font.pixelSize: Theme.fontSizeSmall
+                        color: Theme.textMuted
+                    }
+                    
                     Item { Layout.fillWidth: true }
                     
                     StyledButton {
@@ -486,6 +493,10 @@ Item {
             showAllSetsCheckbox.checked = showAll
             refreshAnnotations()
         }
+        
+        function onSaveStateChanged(pending) {
+            saveStateLabel.text = pending ? "Unsaved changes..." : "Saved"
+        }
     }
     
     // Update when annotations change
@@ -18,6 +18,7 @@ Item {
     property bool showHiddenSongs: false
     property var batchRenameDialogRef: null
     property var batchConvertDialogRef: null
+    property var noteSearchResults: []
     
     // Signals for context menu actions that need to switch tabs
     signal requestAnnotationTab(string filePath)
@@ -92,7 +93,24 @@ Item {
                     ToolTip.delay: 500
                 }
                 
-                Item { Layout.fillWidth: true }
+                // Full-text search of every folder's notes
+                StyledTextField {
+                    id: noteSearchField
+                    Layout.fillWidth: true
+                    placeholderText: "🔎 Search notes"
+                    selectByMouse: true
+                    onTextChanged: noteSearchTimer.restart()
+                    Keys.onEscapePressed: text = ""
+                    ToolTip.visible: hovered && text.length === 0
+                    ToolTip.text: "Search notes, sections and song names in every folder"
+                    ToolTip.delay: 500
+                }
+                
+                Timer {
+                    id: noteSearchTimer
+                    interval: 150
+                    onTriggered: runNoteSearch()
+                }
                 
                 // More menu button
                 StyledButton {
@@ -201,10 +219,96 @@ Item {
             }
         }
         
+        // Note search results (replace the folder and file lists while searching)
+        Rectangle {
+            Layout.fillWidth: true
+            Layout.fillHeight: true
+            visible: noteSearchField.text.trim().length > 0
+            color: Theme.backgroundColor
+            border.color: Theme.borderColor
+            border.width: 1
+            radius: Theme.radiusSmall
+            
+            ColumnLayout {
+                anchors.fill: parent
+                anchors.margins: Theme.spacingSmall
+                spacing: 0
+                
+                Rectangle {
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: 24
+                    color: Theme.backgroundLight
+                    
+                    Label {
+                        anchors.fill: parent
+                        anchors.leftMargin: Theme.spacingSmall
+                        text: noteSearchResults.length > 0 ? "Notes (" + noteSearchResults.length + ")"
+                              : (fileManager.isNoteIndexBuilding() ? "Indexing notes..." : "No matching notes")
+                        font.pixelSize: Theme.fontSizeSmall
+                        font.bold: true
+                        color: Theme.textColor
+                        verticalAlignment: Text.AlignVCenter
+                    }
+                }
+                
+                ListView {
+                    id: noteSearchListView
+                    Layout.fillWidth: true
+                    Layout.fillHeight: true
+                    clip: true
+                    model: noteSearchResults
+                    
+                    delegate: Rectangle {
+                        width: noteSearchListView.width
+                        height: 40
+                        color: noteMouseArea.containsMouse ? Theme.backgroundLight
+                               : (index % 2 === 0 ? Theme.backgroundColor : Theme.backgroundMedium)
+                        
+                        ColumnLayout {
+                            anchors.fill: parent
+                            anchors.leftMargin: Theme.spacingSmall
+                            anchors.rightMargin: Theme.spacingSmall
+                            spacing: 0
+                            
+                            Label {
+                                text: modelData.text
+                                font.pixelSize: Theme.fontSizeSmall
+                                color: Theme.textColor
+                                Layout.fillWidth: true
+                                elide: Text.ElideRight
+                            }
+                            
+                            Label {
+                                text: (modelData.timestampMs >= 0 ? formatDuration(modelData.timestampMs) + "  " : "")
+                                      + (modelData.folder ? modelData.folder + "/" : "") + modelData.name
+                                      + (modelData.owner ? "  (" + modelData.owner + ")" : "")
+                                font.pixelSize: Theme.fontSizeSmall
+                                color: Theme.textSecondary
+                                Layout.fillWidth: true
+                                elide: Text.ElideMiddle
+                            }
+                        }
+                        
+                        MouseArea {
+                            id: noteMouseArea
+                            anchors.fill: parent
+                            hoverEnabled: true
+                            onClicked: openNoteSearchResult(modelData)
+                        }
+                    }
+                    
+                    ScrollBar.vertical: ScrollBar {
+                        policy: ScrollBar.AsNeeded
+                    }
+                }
+            }
+        }
+        
         // Compact split view: Folders on top, Files on bottom (vertical stacking for side panel)
         ColumnLayout {
             Layout.fillWidth: true
             Layout.fillHeight: true
+            visible: noteSearchField.text.trim().length === 0
             spacing: Theme.spacingSmall
             
             // Folders panel (top, compact)
@@ -492,6 +596,28 @@ Item {
         }  // End of RowLayout (split view)
     }
     
+    // Search every folder's notes (answered from an index, so it can run per keystroke)
+    function runNoteSearch() {
+        var text = noteSearchField.text.trim()
+        noteSearchResults = text.length > 0 ? fileManager.searchNotes(text) : []
+    }
+    
+    // Open a note search result: its folder, then the file at the note's time
+    function openNoteSearchResult(result) {
+        fileManager.discoverAudioFiles(result.directory)
+        if (result.kind === "folder_note") {
+            return
+        }
+        if (result.timestampMs >= 0) {
+            audioEngine.loadAndPlayAt(result.path, result.timestampMs)
+        } else {
+            audioEngine.loadAndPlay(result.path)
+        }
+        if (settingsManager && settingsManager.getAutoSwitchAnnotations()) {
+            libraryTab.switchToAnnotationsTab()
+        }
+    }
+    
     // Prompt user to select a directory
     function promptForDirectory() {
         noDirectoryDialog.open()
@@ -603,6 +729,41 @@ Item {
         function onErrorOccurred(errorMessage) {
             console.error("File Manager Error:", errorMessage)
         }
+        
+        function onNoteIndexChanged() {
+            // Show results from the rebuilt index
+            if (noteSearchField.text.trim().length > 0) {
+                runNoteSearch()
+            }
+        }
+    }
+    
+    // Incremental updates when files change on disk (no full rediscovery)
+    Connections {
+        target: libraryWatcher
+        
+        function onFilesAdded(files) {
+            // New files have no take marks, so they only belong in an unfiltered list
+            if (!filterBestTakes && !filterPartialTakes) {
+                fileListModel.insertFiles(files)
+            }
+        }
+        
+        function onFilesRemoved(files) {
+            fileListModel.removeFiles(files)
+        }
+        
+        function onFilesRenamed(renames) {
+            fileListModel.renameFiles(renames)
+        }
+        
+        function onFilesModified(files) {
+            fileListModel.refreshFiles(files)
+        }
+        
+        function onMetadataChanged(directory) {
+            fileListModel.refreshMetadata()
+        }
     }
     
     // ========== File Context Menu ==========
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Test suite for the timestamp-sorted annotation index and per-file summaries.
+"""
+
+import sys
+import random
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def test_timeline_lookups():
+    """Test nearest, range and next/previous lookups against a linear scan."""
+    print("Testing timeline lookups...")
+    try:
+        from backend.annotation_index import AnnotationTimeline
+
+        rng = random.Random(7)
+        notes = [{"ms": rng.randrange(0, 60000, 250), "text": str(i)} for i in range(300)]
+        timeline = AnnotationTimeline(notes)
+        times = [n["ms"] for n in timeline.notes]
+        if times != sorted(times) or timeline.notes is not notes:
+            print("  ✗ Notes not sorted in place")
+            return False
+
+        for t in range(-500, 61000, 137):
+            best = min(range(len(times)), key=lambda i: (abs(times[i] - t), i))
+            expected = best if abs(times[best] - t) <= 100 else -1
+            if timeline.nearest(t, 100) != expected:
+                print(f"  ✗ nearest({t}) = {timeline.nearest(t, 100)}, expected {expected}")
+                return False
+            after = [i for i, x in enumerate(times) if x > t]
+            before = [i for i, x in enumerate(times) if x < t]
+            if timeline.next_index(t) != (after[0] if after else -1) or \
+                    timeline.previous_index(t) != (before[-1] if before else -1):
+                print(f"  ✗ next/previous wrong at {t}")
+                return False
+            if timeline.in_range(t, t + 5000) != [n for n in timeline.notes if t <= n["ms"] <= t + 5000]:
+                print(f"  ✗ in_range wrong at {t}")
+                return False
+
+        index = timeline.insert({"ms": times[10], "text": "new"})
+        if timeline.notes[index]["text"] != "new" or timeline.notes[index - 1]["ms"] != times[10] \
+                or not timeline.indexes(notes):
+            print("  ✗ Insert did not keep order after equal timestamps")
+            return False
+
+        print("  ✓ Lookups match a linear scan")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_manager_merged_view():
+    """Test that the manager's merged view follows edits without a rebuild."""
+    print("\nTesting merged view maintenance...")
+    try:
+        from backend.annotation_manager import AnnotationManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            manager = AnnotationManager()
+            manager.setCurrentUser("tester")
+            manager.setCurrentDirectory(folder)
+            manager.setCurrentFile(str(folder / "take.wav"))
+            for t in [5000, 1000, 3000]:
+                manager.addAnnotation(t, f"note {t}", "timing" if t == 3000 else "", False, "#3498db")
+
+            second = manager.addAnnotationSet("band", "")
+            manager.addAnnotation(2000, "band note", "", False, "#3498db")
+            manager.setShowAllSets(True)
+            merged = manager._merged_timeline("take.wav")
+
+            manager.addAnnotation(4000, "band note 2", "", False, "#3498db")
+            if manager._merged_timeline("take.wav") is not merged:
+                print("  ✗ Merged view rebuilt after an add")
+                return False
+            view = [(a["timestamp_ms"], a["_set_name"]) for a in manager.getAnnotations()]
+            expected = [(1000, "tester"), (2000, "band"), (3000, "tester"), (4000, "band"), (5000, "tester")]
+            if view != expected:
+                print(f"  ✗ Unexpected merged view: {view}")
+                return False
+
+            if manager.findAnnotationAtTime(3900) != 3 or manager.findNextAnnotation(2000) != 2 \
+                    or manager.findPreviousAnnotation(2000) != 0:
+                print("  ✗ Marker lookups wrong in merged view")
+                return False
+            if [a["timestamp_ms"] for a in manager.getAnnotationsInRange(2000, 4000)] != [2000, 3000, 4000]:
+                print("  ✗ Range query wrong in merged view")
+                return False
+
+            manager.setAnnotationSetVisibility(second, False)
+            if [a["timestamp_ms"] for a in manager.getAnnotations()] != [1000, 3000, 5000]:
+                print("  ✗ Hidden set still in merged view")
+                return False
+            if [a["timestamp_ms"] for a in manager.filterByCategory("timing")] != [3000]:
+                print("  ✗ Category filter wrong")
+                return False
+            manager.flushPendingSaves()
+
+        print("  ✓ Merged view updated incrementally and rebuilt on set changes")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_summary_badges():
+    """Test that file rows get annotation badges from the summary index."""
+    print("\nTesting annotation summaries...")
+    try:
+        from backend.annotation_manager import AnnotationManager
+        from backend.models import FileListModel
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            for name in ["a.wav", "b.wav", "c.wav"]:
+                (folder / name).write_bytes(b"")
+            manager = AnnotationManager()
+            manager.setCurrentUser("tester")
+            manager.setCurrentDirectory(folder)
+            manager.setCurrentFile(str(folder / "a.wav"))
+            manager.addAnnotation(1000, "loud", "", True, "#3498db")
+            manager.addSubsection(2000, 9000, "Verse")
+            second = manager.addAnnotationSet("band", "")
+            manager.setCurrentFile(str(folder / "b.wav"))
+            manager.addAnnotation(500, "fine", "", False, "#3498db")
+
+            summary = manager.getAnnotationSummary(str(folder / "a.wav"))
+            if (summary["count"], summary["important"], summary["subsections"]) != (2, 1, 1) or not summary["updated"]:
+                print(f"  ✗ Unexpected summary for a.wav: {summary}")
+                return False
+
+            model = FileListModel(annotation_manager=manager)
+            model.setFiles([str(folder / n) for n in ["a.wav", "b.wav", "c.wav"]])
+            badges = [(model._files[i]["annotationCount"], model._files[i]["hasImportantAnnotation"]) for i in range(3)]
+            if badges != [(2, True), (1, False), (0, False)]:
+                print(f"  ✗ Unexpected row badges: {badges}")
+                return False
+
+            # An edit updates the summary in place and refreshes just that row
+            built = manager.getAnnotationSummaries()
+            changed, resets = [], []
+            model.dataChanged.connect(lambda first, last, roles: changed.append(first.row()))
+            model.modelReset.connect(lambda: resets.append(1))
+            manager.addAnnotation(800, "rushed", "", True, "#3498db")
+            if manager.getAnnotationSummaries() is not built or changed != [1] or resets:
+                print(f"  ✗ Summary not updated in place (rows changed: {changed})")
+                return False
+            if (model._files[1]["annotationCount"], model._files[1]["hasImportantAnnotation"]) != (2, True):
+                print("  ✗ Row badges not refreshed")
+                return False
+
+            # Hiding a set rebuilds the summaries without its notes
+            changed.clear()
+            manager.setAnnotationSetVisibility(second, False)
+            if manager.getAnnotationSummary(str(folder / "b.wav"))["count"] != 0:
+                print("  ✗ Hidden set still counted")
+                return False
+            badges = [(model._files[i]["annotationCount"], model._files[i]["hasImportantAnnotation"]) for i in range(3)]
+            if badges != [(2, True), (0, False), (0, False)] or changed != [1] or resets:
+                print(f"  ✗ Row badges stale after the sets changed: {badges} (rows changed: {changed})")
+                return False
+            manager.flushPendingSaves()
+
+        print("  ✓ Row badges served from summaries and updated incrementally")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_legacy_edits_refresh_index():
+    """Test that undo/redo edits of legacy annotations aren't hidden by a stale index."""
+    print("\nTesting legacy edits refresh the index...")
+    try:
+        from backend.annotation_manager import AnnotationManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            take = str(folder / "take.wav")
+            manager = AnnotationManager()
+            manager.setCurrentUser("tester")
+            manager.setCurrentDirectory(folder)
+            manager.setCurrentFile(take)
+            for uid, t, category in [(1, 1000, "solo"), (2, 2000, "solo"), (3, 3000, "")]:
+                manager.addAnnotationDirect(take, {"uid": uid, "timestamp_ms": t, "ms": t,
+                                                   "text": f"note {t}", "category": category})
+
+            # Build the category view, then change a category as redo would
+            manager.filterByCategory("solo")
+            manager.updateAnnotationField(take, 1, "category", "verse")
+            if [a["uid"] for a in manager.filterByCategory("solo")] != [2] \
+                    or [a["uid"] for a in manager.filterByCategory("verse")] != [1]:
+                print("  ✗ Category filter stale after a field update")
+                return False
+
+            # Delete then add (same length) as undoing a move would
+            manager.getAnnotationsInRange(0, 800)
+            manager.deleteAnnotationByUid(take, 3)
+            manager.addAnnotationDirect(take, {"uid": 3, "timestamp_ms": 500, "ms": 500,
+                                               "text": "moved", "category": ""})
+            if [a["uid"] for a in manager.getAnnotationsInRange(0, 800)] != [3]:
+                print("  ✗ Range query stale after delete + add")
+                return False
+
+            manager.clearAnnotations()
+            if manager.getAnnotationsInRange(0, 5000) or manager.findAnnotationAtTime(1000) != -1:
+                print("  ✗ Cleared annotations still found")
+                return False
+            manager.flushPendingSaves()
+
+        print("  ✓ Field updates, deletes, adds and clears refresh the index")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Annotation Index Tests")
+    print("=" * 60)
+
+    results = [
+        test_timeline_lookups(),
+        test_manager_merged_view(),
+        test_summary_badges(),
+        test_legacy_edits_refresh_index(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test suite for write-behind saving of annotation edits.
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _make_manager(folder: Path):
+    from backend.annotation_manager import AnnotationManager
+
+    manager = AnnotationManager()
+    manager.setCurrentUser("tester")
+    manager.setCurrentDirectory(folder)
+    manager.flushPendingSaves()  # Default set created on load
+    manager._save_timer.setInterval(100)
+    return manager
+
+
+def test_edits_are_coalesced():
+    """Test that a burst of edits is written once, after the idle period."""
+    print("Testing coalesced saves...")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            manager = _make_manager(folder)
+            manager.setCurrentFile(str(folder / "take.wav"))
+            states = []
+            manager.saveStateChanged.connect(states.append)
+
+            with mock.patch.object(manager._metadata_manager, "save_annotation_sets",
+                                   wraps=manager._metadata_manager.save_annotation_sets) as save:
+                for i in range(20):
+                    manager.addAnnotation(i * 1000, f"note {i}", "", False, "#3498db")
+                if save.call_count != 0:
+                    print(f"  ✗ Edits written immediately ({save.call_count} writes)")
+                    return False
+                if not manager.hasUnsavedChanges() or states != [True]:
+                    print(f"  ✗ Pending state not reported: {states}")
+                    return False
+
+                if not _wait_for(lambda: not manager.hasUnsavedChanges()):
+                    print("  ✗ Edits never flushed")
+                    return False
+                if save.call_count != 1 or states != [True, False]:
+                    print(f"  ✗ Expected one write (got {save.call_count}), states {states}")
+                    return False
+
+            reloaded = _make_manager(folder)
+            reloaded.setCurrentFile(str(folder / "take.wav"))
+            if reloaded.getAnnotationCount() != 20:
+                print(f"  ✗ Reloaded {reloaded.getAnnotationCount()} annotations, expected 20")
+                return False
+
+        print("  ✓ 20 edits written in one save")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_flush_on_switch():
+    """Test that pending edits are written before switching file or folder."""
+    print("\nTesting flush on file and folder switch...")
+    try:
+        with tempfile.TemporaryDirectory() as tmp1, tempfile.TemporaryDirectory() as tmp2:
+            folder = Path(tmp1)
+            manager = _make_manager(folder)
+            manager._save_timer.setInterval(60000)  # Only switches should flush
+            sets_file = manager._get_annotation_sets_file_path()
+
+            manager.setCurrentFile(str(folder / "a.wav"))
+            manager.addAnnotation(500, "first", "", False, "#3498db")
+            manager.setCurrentFile(str(folder / "b.wav"))
+            if manager.hasUnsavedChanges() or "first" not in sets_file.read_text(encoding="utf-8"):
+                print("  ✗ Edit not written on file switch")
+                return False
+
+            manager.addAnnotation(700, "second", "", False, "#3498db")
+            manager.setCurrentDirectory(Path(tmp2))
+            if "second" not in sets_file.read_text(encoding="utf-8"):
+                print("  ✗ Edit not written to the previous folder on folder switch")
+                return False
+            manager.flushPendingSaves()
+
+        print("  ✓ Pending edits flushed before switching")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_journal_compaction():
+    """Test that journaled saves leave the main file alone until compaction."""
+    print("\nTesting journaled saves and compaction...")
+    try:
+        with tempfile.TemporaryDirectory() as tmp1, tempfile.TemporaryDirectory() as tmp2:
+            folder = Path(tmp1)
+            manager = _make_manager(folder)
+            manager.setCurrentFile(str(folder / "take.wav"))
+            manager.addAnnotation(100, "full save", "", False, "#3498db")
+            manager.flushPendingSaves()
+            manager.setJournalEnabled(True)
+            manager._compact_timer.setInterval(200)
+            sets_file = manager._get_annotation_sets_file_path()
+            journal = manager._metadata_manager.get_annotation_journal_path(folder, "tester")
+            before = sets_file.read_bytes()
+
+            manager.addAnnotation(500, "journaled", "", False, "#3498db")
+            manager.flushPendingSaves()
+            if sets_file.read_bytes() != before or not journal.exists():
+                print("  ✗ Save rewrote the main file instead of appending to the journal")
+                return False
+
+            if not _wait_for(lambda: not journal.exists()):
+                print("  ✗ Journal not compacted when idle")
+                return False
+            if "journaled" not in sets_file.read_text(encoding="utf-8"):
+                print("  ✗ Compacted file is missing the edit")
+                return False
+
+            manager.addAnnotation(900, "on switch", "", False, "#3498db")
+            manager.setCurrentDirectory(Path(tmp2))
+            if journal.exists() or "on switch" not in sets_file.read_text(encoding="utf-8"):
+                print("  ✗ Journal not compacted on folder switch")
+                return False
+            manager.setJournalEnabled(False)
+
+        print("  ✓ Edits journaled, then compacted when idle and on folder switch")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Annotation Write-Behind Tests")
+    print("=" * 60)
+
+    results = [
+        test_edits_are_coalesced(),
+        test_flush_on_switch(),
+        test_journal_compaction(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
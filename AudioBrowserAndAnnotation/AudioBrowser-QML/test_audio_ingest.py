@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Test suite for the decode-once audio ingest pipeline.
+"""
+
+import sys
+import math
+import wave
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def _write_test_wav(path: Path, seconds: float = 3.0, sr: int = 22050, freq: float = 440.0):
+    """Write a stereo 16-bit sine wave."""
+    frames = bytearray()
+    for i in range(int(seconds * sr)):
+        v = int(12000 * math.sin(2 * math.pi * freq * i / sr))
+        frames += struct.pack('<hh', v, v)
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(2)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        wf.writeframes(bytes(frames))
+
+
+def test_imports():
+    """Test that the ingest module and the shared decoder import."""
+    print("Testing imports...")
+    try:
+        from backend.audio_ingest import (
+            AudioIngestPipeline, IngestWorker, ingest_file, needs_ingest,
+            compute_loudness, compute_spectrum_summary
+        )
+        from backend.waveform_engine import load_audio_data, decode_audio_samples
+        print("  ✓ All imports successful")
+        return True
+    except ImportError as e:
+        print(f"  ✗ Import failed: {e}")
+        return False
+
+
+def test_ingest_file_outputs():
+    """Test that one ingest produces every output from a single decode."""
+    print("\nTesting ingest_file outputs...")
+    try:
+        from backend.audio_ingest import ingest_file
+        from backend.fingerprint_engine import FINGERPRINT_ALGORITHMS
+
+        with tempfile.TemporaryDirectory() as tmp:
+            wav = Path(tmp) / "song.wav"
+            _write_test_wav(wav)
+            result = ingest_file(wav, columns=200)
+
+            if abs(result["duration_ms"] - 3000) > 5:
+                print(f"  ✗ Unexpected duration: {result['duration_ms']}")
+                return False
+            if len(result["peaks"]) != 200:
+                print(f"  ✗ Expected 200 peak columns, got {len(result['peaks'])}")
+                return False
+            if set(result["fingerprints"]) != set(FINGERPRINT_ALGORITHMS):
+                print(f"  ✗ Missing fingerprints: {set(FINGERPRINT_ALGORITHMS) - set(result['fingerprints'])}")
+                return False
+            # 12000/32768 sine: peak about -8.7 dBFS, RMS 3 dB lower
+            if not (-9.5 < result["loudness"]["peak_dbfs"] < -8.0):
+                print(f"  ✗ Unexpected peak level: {result['loudness']}")
+                return False
+            if not (300 < result["spectrum"]["centroid_hz"] < 600):
+                print(f"  ✗ Unexpected spectral centroid: {result['spectrum']['centroid_hz']}")
+                return False
+
+        print("  ✓ Peaks, fingerprints, duration, loudness and spectrum computed")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_worker_writes_caches_and_skips():
+    """Test that the worker writes all caches and skips fully cached files."""
+    print("\nTesting IngestWorker caching...")
+    try:
+        from backend.audio_ingest import (
+            IngestWorker, load_analysis_cache, load_duration_cache, needs_ingest
+        )
+        from backend.fingerprint_engine import load_fingerprint_cache, FINGERPRINT_ALGORITHMS
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            files = []
+            for name in ("a.wav", "b.wav"):
+                _write_test_wav(folder / name, seconds=1.0)
+                files.append(str(folder / name))
+
+            ingested = []
+            messages = []
+            worker = IngestWorker(folder, files)
+            worker.fileIngested.connect(lambda path, *rest: ingested.append(path))
+            worker.finished.connect(lambda ok, msg: messages.append((ok, msg)))
+            worker.run()
+
+            if len(ingested) != 2 or not messages or not messages[-1][0]:
+                print(f"  ✗ First pass did not ingest both files: {ingested} {messages}")
+                return False
+
+            fp_cache = load_fingerprint_cache(folder)
+            durations = load_duration_cache(folder)
+            analysis = load_analysis_cache(folder)
+            entry = fp_cache["files"].get("a.wav", {})
+            if set(entry.get("fingerprints", {})) != set(FINGERPRINT_ALGORITHMS) or "size" not in entry:
+                print("  ✗ Fingerprint cache incomplete")
+                return False
+            if durations.get("a.wav") != 1000 or "a.wav" not in analysis["files"]:
+                print("  ✗ Duration or analysis cache incomplete")
+                return False
+            if needs_ingest(folder / "a.wav", fp_cache, durations, analysis):
+                print("  ✗ Fully cached file still needs ingest")
+                return False
+
+            # Second pass should not decode anything
+            ingested.clear()
+            worker = IngestWorker(folder, files)
+            worker.fileIngested.connect(lambda path, *rest: ingested.append(path))
+            worker.run()
+            if ingested:
+                print(f"  ✗ Second pass decoded cached files: {ingested}")
+                return False
+
+        print("  ✓ All caches written; cached files skipped on second pass")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_checkpoint_keeps_concurrent_durations():
+    """Test that ingest checkpoints merge into durations written meanwhile."""
+    print("\nTesting checkpoints keep concurrently flushed durations...")
+    try:
+        import json
+        from backend.audio_ingest import IngestWorker, load_duration_cache
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            files = []
+            for name in ("a.wav", "b.wav"):
+                _write_test_wav(folder / name, seconds=1.0)
+                files.append(str(folder / name))
+
+            def flush_meanwhile(path, *rest):
+                # What FileManager.flushDurationCache does while ingest runs
+                cache_file = folder / ".duration_cache.json"
+                durations = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+                durations[f"other-{Path(path).name}"] = 1234
+                cache_file.write_text(json.dumps(durations))
+
+            worker = IngestWorker(folder, files)
+            worker.fileIngested.connect(flush_meanwhile)
+            worker.run()
+
+            durations = load_duration_cache(folder)
+            expected = {"a.wav": 1000, "b.wav": 1000, "other-a.wav": 1234, "other-b.wav": 1234}
+            if durations != expected:
+                print(f"  ✗ Unexpected duration cache: {durations}")
+                return False
+
+        print("  ✓ Durations flushed during ingest survive its checkpoints")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_waveforms_saved_per_checkpoint():
+    """Test that ingested waveforms are saved once per checkpoint, not per file."""
+    print("\nTesting waveform cache saves per checkpoint...")
+    try:
+        from backend import audio_ingest
+        from backend.audio_ingest import AudioIngestPipeline, IngestWorker
+        from backend.waveform_engine import WaveformEngine
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            files = []
+            for i in range(5):
+                _write_test_wav(folder / f"take{i}.wav", seconds=0.5)
+                files.append(str(folder / f"take{i}.wav"))
+
+            engine = WaveformEngine()
+            engine.setCacheDirectory(str(folder))
+            saves = []
+            original_save = engine._save_cache
+            engine._save_cache = lambda: (saves.append(len(engine._cache)), original_save())
+            pipeline = AudioIngestPipeline()
+            pipeline.setWaveformEngine(engine)
+
+            checkpoint_every = audio_ingest.CHECKPOINT_EVERY_FILES
+            audio_ingest.CHECKPOINT_EVERY_FILES = 2
+            try:
+                # Run on this thread, wired the way ingestFiles wires it
+                worker = IngestWorker(folder, files)
+                worker.fileIngested.connect(pipeline._on_file_ingested)
+                worker.checkpointed.connect(pipeline._flush_waveforms)
+                worker.run()
+                pipeline._flush_waveforms()
+            finally:
+                audio_ingest.CHECKPOINT_EVERY_FILES = checkpoint_every
+
+            if saves != [2, 4, 5]:
+                print(f"  ✗ Expected saves after 2, 4 and 5 files, got {saves}")
+                return False
+            if not (folder / ".waveform_cache.json").exists():
+                print("  ✗ Waveform cache not written")
+                return False
+
+        print("  ✓ Waveform cache saved per checkpoint")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_folder_switch_does_not_block():
+    """Test that switching folders abandons the running ingest without waiting for it."""
+    print("\nTesting folder switch during ingest...")
+    try:
+        from PyQt6.QtCore import QCoreApplication
+        from backend import audio_ingest
+        from backend.audio_ingest import AudioIngestPipeline, load_duration_cache
+
+        app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+        def wait_for(condition, timeout=10.0):
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                app.processEvents()
+                if condition():
+                    return True
+                time.sleep(0.01)
+            return False
+
+        with tempfile.TemporaryDirectory() as tmp:
+            old_folder = Path(tmp) / "old"
+            new_folder = Path(tmp) / "new"
+            for folder in (old_folder, new_folder):
+                folder.mkdir()
+                for i in range(3):
+                    _write_test_wav(folder / f"take{i}.wav", seconds=0.5)
+
+            pipeline = AudioIngestPipeline()
+            messages = []
+            pipeline.ingestFinished.connect(lambda ok, message: messages.append(message))
+
+            # Slow each file down so the switch lands mid-ingest
+            original_ingest = audio_ingest.ingest_file
+            audio_ingest.ingest_file = lambda *args: (time.sleep(0.5), original_ingest(*args))[1]
+            try:
+                pipeline.ingestFiles([str(old_folder / f"take{i}.wav") for i in range(3)])
+                time.sleep(0.1)
+                start = time.perf_counter()
+                pipeline.ingestFiles([str(new_folder / f"take{i}.wav") for i in range(3)])
+                switch_ms = (time.perf_counter() - start) * 1000
+                done = wait_for(lambda: not pipeline.isIngesting() and len(messages) == 2)
+                wait_for(lambda: not audio_ingest._ingest_workers)
+            finally:
+                pipeline.finishIngest()
+                audio_ingest.ingest_file = original_ingest
+
+            if switch_ms >= 100:
+                print(f"  ✗ Switching folders blocked for {switch_ms:.0f} ms")
+                return False
+            if not done or messages != ["Operation cancelled", "Ingested 3 files"]:
+                print(f"  ✗ Unexpected completion messages: {messages}")
+                return False
+            if len(load_duration_cache(new_folder)) != 3:
+                print("  ✗ New folder not fully ingested")
+                return False
+            if len(load_duration_cache(old_folder)) != 1:
+                print("  ✗ Abandoned worker did not save its finished file")
+                return False
+
+        print(f"  ✓ Folder switch returned in {switch_ms:.1f} ms")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_load_audio_data():
+    """Test the loader used for fingerprinting returns mono samples."""
+    print("\nTesting load_audio_data...")
+    try:
+        from backend.waveform_engine import load_audio_data
+
+        with tempfile.TemporaryDirectory() as tmp:
+            wav = Path(tmp) / "song.wav"
+            _write_test_wav(wav, seconds=0.5, sr=8000)
+            samples, sr = load_audio_data(wav)
+            if sr != 8000 or len(samples) != 4000:
+                print(f"  ✗ Unexpected result: sr={sr}, len={len(samples)}")
+                return False
+
+        print("  ✓ Mono samples loaded")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Audio Ingest Pipeline Tests")
+    print("=" * 60)
+
+    results = [
+        test_imports(),
+        test_ingest_file_outputs(),
+        test_worker_writes_caches_and_skips(),
+        test_checkpoint_keeps_concurrent_durations(),
+        test_waveforms_saved_per_checkpoint(),
+        test_folder_switch_does_not_block(),
+        test_load_audio_data(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
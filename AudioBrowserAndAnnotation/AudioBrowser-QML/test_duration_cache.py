@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test suite for the write-behind duration cache in FileManager.
+"""
+
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _count_writes(file_manager_module):
+    """Wrap the metadata cache writes used by file_manager so they can be counted."""
+    writes = []
+    original = file_manager_module.metadata_cache.save_json
+
+    def counting_write(path, data, indent=2):
+        writes.append(Path(path).name)
+        original(path, data, indent)
+
+    file_manager_module.metadata_cache.save_json = counting_write
+    return writes, original
+
+
+def test_coalesced_writes():
+    """Test that many updates become one write, visible before it happens."""
+    print("Testing coalesced writes...")
+    try:
+        from backend import file_manager as fm_module
+        from backend.file_manager import FileManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            fm = FileManager()
+            writes, original = _count_writes(fm_module)
+            try:
+                for i in range(200):
+                    fm.cacheDurations(folder, {f"take{i}.wav": 100000 + i})
+                if (folder / ".duration_cache.json").exists():
+                    print("  ✗ Cache written before the flush")
+                    return False
+                if fm.getFolderSnapshot(folder)["durations"].get("take150.wav") != 100150:
+                    print("  ✗ Buffered duration not visible to lookups")
+                    return False
+                fm.flushDurationCache()
+            finally:
+                fm_module.metadata_cache.save_json = original
+
+            saved = json.loads((folder / ".duration_cache.json").read_text())
+            if len(writes) != 1 or len(saved) != 200:
+                print(f"  ✗ Expected 1 write of 200 entries, got {len(writes)} writes, {len(saved)} entries")
+                return False
+
+        print("  ✓ 200 updates saved in a single write")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_flush_triggers():
+    """Test the debounce timer and directory changes flush the buffer."""
+    print("\nTesting flush triggers...")
+    try:
+        from backend.file_manager import FileManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            first = Path(tmp) / "first"
+            second = Path(tmp) / "second"
+            first.mkdir()
+            second.mkdir()
+
+            fm = FileManager()
+            fm._duration_flush_timer.setInterval(50)
+            fm.cacheDurations(first, {"a.wav": 123400})
+            deadline = time.monotonic() + 5
+            while not (first / ".duration_cache.json").exists() and time.monotonic() < deadline:
+                app.processEvents()
+                time.sleep(0.01)
+            if not (first / ".duration_cache.json").exists():
+                print("  ✗ Timer did not flush the buffer")
+                return False
+
+            fm._duration_flush_timer.setInterval(60_000)
+            fm.cacheDurations(first, {"b.wav": 567800})
+            fm.setCurrentDirectory(str(second))
+            saved = json.loads((first / ".duration_cache.json").read_text())
+            if saved != {"a.wav": 123400, "b.wav": 567800}:
+                print(f"  ✗ Directory change did not flush: {saved}")
+                return False
+
+        print("  ✓ Flushed by the timer and on directory change")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_crash_consistency():
+    """Test that a failed flush never damages the cache on disk."""
+    print("\nTesting crash consistency...")
+    try:
+        import shared.file_utils as file_utils
+        from backend.file_manager import FileManager
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            cache_file = folder / ".duration_cache.json"
+            cache_file.write_text(json.dumps({"old.wav": 42000}))
+
+            fm = FileManager()
+            fm.cacheDurations(folder, {f"new{i}.wav": 60000 + i for i in range(1, 50)})
+
+            # Die after the temp file is written but before it replaces the cache
+            original_fsync = file_utils.os.fsync
+
+            def crash(fd):
+                raise OSError("simulated power loss")
+
+            file_utils.os.fsync = crash
+            try:
+                fm.flushDurationCache()
+            finally:
+                file_utils.os.fsync = original_fsync
+
+            if json.loads(cache_file.read_text()) != {"old.wav": 42000}:
+                print("  ✗ Cache file damaged by an interrupted flush")
+                return False
+            if list(folder.glob("*.tmp")):
+                print("  ✗ Temporary file left behind")
+                return False
+
+            # A process that dies with unsaved durations leaves the last good file
+            if FileManager().getFolderSnapshot(folder)["durations"] != {"old.wav": 42000}:
+                print("  ✗ Fresh reader should see the previous cache")
+                return False
+
+            # The buffered entries survive for the next flush
+            fm.flushDurationCache()
+            saved = json.loads(cache_file.read_text())
+            if len(saved) != 50 or saved["old.wav"] != 42000 or saved["new7.wav"] != 60007:
+                print(f"  ✗ Retry did not save the merged cache ({len(saved)} entries)")
+                return False
+
+        print("  ✓ Interrupted flush left the old cache intact; retry saved everything")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Duration Cache Tests")
+    print("=" * 60)
+
+    results = [
+        test_coalesced_writes(),
+        test_flush_triggers(),
+        test_crash_consistency(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
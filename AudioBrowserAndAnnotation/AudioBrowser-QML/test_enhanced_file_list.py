@@ -6,9 +6,16 @@ This script tests the enhanced file list functionality including:
 - Audio duration extraction
 - Duration formatting
 - Column sorting
+- Per-folder metadata snapshot
+- Background duration loading
 """
 
 import sys
+import json
+import os
+import tempfile
+import time
+import wave
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -97,6 +104,113 @@ def test_model_integration():
     print("\n✓ Integration tests passed")
 
 
+def test_folder_snapshot():
+    """Test that rows are built from one memoized snapshot per folder."""
+    print("\n=== Testing Folder Metadata Snapshot ===")
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = Path(tmpdir)
+        files = []
+        for i in range(3):
+            path = folder / f"take{i}.wav"
+            with wave.open(str(path), "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(8000)
+                wf.writeframes(b"\x00\x00" * 8000)
+            files.append(str(path))
+        names_file = folder / ".provided_names.json"
+        names_file.write_text(json.dumps({"take0.wav": "Song A", "take1": "Song B"}))
+        (folder / ".duration_cache.json").write_text(json.dumps({"take0.wav": 61000, "take1.wav": 62000}))
+        
+        fm = FileManager()
+        fm.setCurrentDirectory(str(folder))
+        fm.markAsBestTake(files[1])
+        model = FileListModel(file_manager=fm)
+        model.setFiles(files)
+        
+        rows = {Path(row["filepath"]).name: row for row in model._files}
+        assert rows["take0.wav"]["libraryName"] == "Song A", "Provided name not applied"
+        assert rows["take1.wav"]["libraryName"] == "Song B", "Stem-keyed provided name not applied"
+        assert rows["take0.wav"]["duration"] == 61000, "Cached duration not applied"
+        assert rows["take2.wav"]["duration"] == 1000, "Uncached duration should be extracted"
+        assert rows["take1.wav"]["isBestTake"] and not rows["take0.wav"]["isBestTake"], "Best take flag wrong"
+        print("  ✓ Rows built from the folder snapshot")
+        
+        # Unchanged files are served from the memo
+        before = fm._metadata_memo[str(names_file)]
+        fm.getProvidedName(files[0])
+        assert fm._metadata_memo[str(names_file)] is before, "Unchanged names file was re-parsed"
+        
+        # Edits on disk are picked up through the mtime/size signature
+        names_file.write_text(json.dumps({"take0.wav": "Renamed Song"}))
+        st = names_file.stat()
+        os.utime(names_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        model.setFiles(files)
+        assert model._files[0]["libraryName"] == "Renamed Song", "Snapshot not refreshed after edit"
+        print("  ✓ Snapshot refreshed when the metadata file changes")
+    
+    print("\n✓ Folder snapshot tests passed")
+
+
+def _write_silence(path, seconds):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(8000)
+        wf.writeframes(b"\x00\x00" * int(8000 * seconds))
+
+
+def test_background_details():
+    """Test that rows appear at once and durations arrive in sorted batches."""
+    print("\n=== Testing Background Duration Loading ===")
+    
+    from PyQt6.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = Path(tmpdir)
+        files = []
+        for i in range(40):
+            # Name order is the reverse of duration order
+            path = folder / f"take{i:02d}.wav"
+            _write_silence(path, (40 - i) * 0.05)
+            files.append(str(path))
+        
+        fm = FileManager()
+        model = FileListModel(file_manager=fm, background_details=True)
+        updates = []
+        model.dataChanged.connect(lambda *args: updates.append("data"))
+        model.layoutChanged.connect(lambda *args: updates.append("layout"))
+        
+        model.sortBy("duration", True)
+        model.setFiles(files)
+        assert model.count() == 40, "Rows should be inserted before durations are known"
+        assert model.detailsLoading, "Details should still be loading"
+        assert all(row["duration"] == 0 for row in model._files), "Durations should arrive later"
+        
+        deadline = time.monotonic() + 20
+        while model.detailsLoading and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        assert not model.detailsLoading, "Details worker did not finish"
+        
+        durations = [row["duration"] for row in model._files]
+        assert all(d > 0 for d in durations), "Some durations were not filled in"
+        assert durations == sorted(durations), "Rows should stay sorted by duration"
+        assert model.getFilePath(0).endswith("take39.wav"), "Shortest take should be first"
+        assert model.findFileIndex(files[0]) == 39, "Row index not updated after re-sort"
+        assert 0 < len(updates) < 40, f"Expected batched updates, got {len(updates)}"
+        print(f"  ✓ 40 durations applied in {len(updates)} batched update(s)")
+        
+        fm.flushDurationCache()
+        cache = json.loads((folder / ".duration_cache.json").read_text())
+        assert len(cache) == 40, "Probed durations should be cached"
+        print("  ✓ Probed durations written to the duration cache")
+    
+    print("\n✓ Background details tests passed")
+
+
 def main():
     """Run all tests."""
     print("=" * 60)
@@ -107,6 +221,8 @@ def main():
         test_duration_extraction()
         test_file_sorting()
         test_model_integration()
+        test_folder_snapshot()
+        test_background_details()
         
         print("\n" + "=" * 60)
         print("All tests passed! ✓")
@@ -116,6 +232,8 @@ def main():
         print("  • Duration formatting (MM:SS)")
         print("  • File list sorting (name, duration, size)")
         print("  • Model-Manager integration")
+        print("  • Per-folder metadata snapshot")
+        print("  • Background duration loading")
         
         return 0
         
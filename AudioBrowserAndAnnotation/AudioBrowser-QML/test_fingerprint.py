@@ -153,6 +153,296 @@ def test_engine_instantiation():
         return False
 
 
+def test_partial_decode():
+    """Test that windowed decoding matches trimming a full decode."""
+    print("\nTesting partial decode for windowed algorithms...")
+    try:
+        import math
+        import struct
+        import tempfile
+        import wave
+        from backend.fingerprint_engine import (
+            compare_fingerprints,
+            compute_lightweight_fingerprint,
+            load_audio_for_algorithm,
+            prepare_samples_for_algorithm,
+        )
+        from backend.waveform_engine import decode_audio_array, decode_audio_window
+        
+        sr = 44100
+        seconds = 70  # longer than the 60 s lightweight window
+        frames = bytearray()
+        for i in range(sr * seconds):
+            freq = 220.0 if i < sr * 35 else 330.0
+            v = int(10000 * math.sin(2 * math.pi * freq * i / sr))
+            frames += struct.pack('<hh', v, v // 2)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_path = Path(tmp) / "take.wav"
+            with wave.open(str(wav_path), 'wb') as wf:
+                wf.setnchannels(2)
+                wf.setsampwidth(2)
+                wf.setframerate(sr)
+                wf.writeframes(bytes(frames))
+            
+            windowed, wsr = load_audio_for_algorithm(str(wav_path), "lightweight")
+            if wsr != 11025 or abs(len(windowed) - 60 * 11025) > 2:
+                print(f"  ✗ Unexpected window: sr={wsr}, len={len(windowed)}")
+                return False
+            print(f"  ✓ Decoded {len(windowed) / wsr:.1f}s window at {wsr} Hz")
+            
+            full, fsr, _ = decode_audio_array(wav_path)
+            prepared, psr = prepare_samples_for_algorithm(full, fsr, "lightweight")
+            similarity = compare_fingerprints(
+                compute_lightweight_fingerprint(windowed, wsr),
+                compute_lightweight_fingerprint(prepared, psr))
+            if similarity < 0.999:
+                print(f"  ✗ Windowed and full-decode fingerprints differ: {similarity:.4f}")
+                return False
+            print(f"  ✓ Windowed decode matches full decode (similarity {similarity:.4f})")
+            
+            # Native-rate window straight from the memmap reader
+            start_window, _ = decode_audio_window(wav_path, window_s=1.0, position="start")
+            if len(start_window) != sr:
+                print(f"  ✗ Start window has {len(start_window)} samples")
+                return False
+            print("  ✓ Start window read at native rate")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_cache_memoization():
+    """Test memoized cache reads, write-through and mtime invalidation."""
+    print("\nTesting fingerprint cache memoization...")
+    try:
+        import json
+        import os
+        import tempfile
+        from backend import fingerprint_engine as fe
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            fe.save_fingerprint_cache(folder, {
+                "version": 1,
+                "files": {"a.wav": {"fingerprints": {"spectral": [0.1, 0.2]}}},
+                "excluded_files": ["b.wav"],
+            })
+            
+            first = fe.load_fingerprint_cache(folder, readonly=True)
+            second = fe.load_fingerprint_cache(folder, readonly=True)
+            if first is not second:
+                print("  ✗ Unchanged cache was re-parsed")
+                return False
+            print("  ✓ Unchanged cache served from memo")
+            
+            copy = fe.load_fingerprint_cache(folder)
+            copy["files"]["a.wav"]["fingerprints"]["lightweight"] = [1.0]
+            copy["excluded_files"].append("c.wav")
+            if "lightweight" in first["files"]["a.wav"]["fingerprints"] or fe.is_file_excluded_from_fingerprinting(folder, "c.wav"):
+                print("  ✗ Mutating a loaded copy leaked into the memo")
+                return False
+            print("  ✓ Loaded copies are isolated from the memo")
+            
+            if not fe.is_file_excluded_from_fingerprinting(folder, "b.wav") or fe.is_folder_reference(folder):
+                print("  ✗ Flags read incorrectly")
+                return False
+            if not fe.toggle_folder_reference(folder) or not fe.is_folder_reference(folder):
+                print("  ✗ Toggle not visible through flags")
+                return False
+            print("  ✓ Flags and toggles read through the small flags structure")
+            
+            # External edit (e.g. the original app) must invalidate the memo
+            cache_path = folder / fe.FINGERPRINTS_JSON
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "files": {}, "excluded_files": [], "ignore_fingerprints": True}, f)
+            st = cache_path.stat()
+            os.utime(cache_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            if not fe.is_folder_ignored(folder) or fe.load_fingerprint_cache(folder)["files"]:
+                print("  ✗ External modification not picked up")
+                return False
+            print("  ✓ External modification invalidates the memo")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_benchmark_harness():
+    """Test the benchmark corpus is deterministic and regressions are flagged."""
+    print("\nTesting benchmark harness...")
+    try:
+        import json
+        import numpy as np
+        import benchmark_fingerprint as bench
+        
+        first = bench.generate_corpus(num_songs=2, seconds=4.0, holdout=0.5)
+        second = bench.generate_corpus(num_songs=2, seconds=4.0, holdout=0.5)
+        if list(first["references"]) != ["song_001"] or len(first["queries"]) != 2 * len(bench.TAKE_VARIATIONS) - 1:
+            print("  ✗ Unexpected corpus layout")
+            return False
+        if not all(np.array_equal(a["samples"], b["samples"]) for a, b in zip(first["queries"], second["queries"])):
+            print("  ✗ Corpus is not deterministic")
+            return False
+        print("  ✓ Corpus is deterministic with held-out songs")
+        
+        accuracy = {"thresholds": {"0.80": {"precision": 0.9, "recall": 0.8, "f1": 0.85}}}
+        baseline = {"algorithms": {"spectral": {"fingerprint": {"mean_s": 0.1}, "accuracy": accuracy,
+                                                "match_scaling": {"100": {"median_s": 0.01}}}}}
+        current = json.loads(json.dumps(baseline))
+        if bench.compare_reports(baseline, current):
+            print("  ✗ Identical reports flagged as regressions")
+            return False
+        current["algorithms"]["spectral"]["fingerprint"]["mean_s"] = 0.2
+        current["algorithms"]["spectral"]["accuracy"]["thresholds"]["0.80"]["recall"] = 0.7
+        if len(bench.compare_reports(baseline, current)) != 2:
+            print("  ✗ Slowdown and recall drop not both flagged")
+            return False
+        print("  ✓ Regressions detected against a baseline report")
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_checkpoint_resume():
+    """Test that a cancelled run keeps its progress and a rerun resumes."""
+    print("\nTesting checkpointed generation...")
+    try:
+        import math
+        import struct
+        import tempfile
+        import wave
+        from backend import fingerprint_engine as fe
+        from backend.waveform_engine import load_audio_data
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            files = []
+            for i in range(6):
+                path = folder / f"take{i}.wav"
+                with wave.open(str(path), "wb") as wf:
+                    wf.setnchannels(1)
+                    wf.setsampwidth(2)
+                    wf.setframerate(8000)
+                    wf.writeframes(b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * (220 + 40 * i) * n / 8000)))
+                                            for n in range(8000)))
+                files.append(str(path))
+            
+            def run_worker(stop_after=None, on_progress=None):
+                worker = fe.FingerprintWorker(folder, files, "spectral", load_audio_data)
+                messages = []
+                def progress(current, total, status):
+                    if on_progress:
+                        on_progress(current)
+                    if stop_after is not None and current > stop_after:
+                        worker.stop()
+                worker.progressUpdate.connect(progress)
+                worker.finished.connect(lambda ok, msg: messages.append((ok, msg)))
+                worker.run()
+                return messages[-1]
+            
+            # Cancel part way; toggle a flag mid-run, as the UI could
+            ok, message = run_worker(stop_after=3, on_progress=lambda n: n == 2 and fe.toggle_folder_reference(folder))
+            cache = fe.load_fingerprint_cache(folder)
+            done = [name for name, data in cache["files"].items() if "spectral" in data.get("fingerprints", {})]
+            if ok or len(done) < 3:
+                print(f"  ✗ Cancelled run lost its work: {message}, saved {done}")
+                return False
+            if not fe.is_folder_reference(folder):
+                print("  ✗ Checkpoint overwrote a flag toggled during the run")
+                return False
+            print(f"  ✓ Cancelled run saved {len(done)} fingerprints and kept concurrent flag changes")
+            
+            ok, message = run_worker()
+            if not ok or message != f"Generated {len(files) - len(done)} fingerprints":
+                print(f"  ✗ Rerun did not resume: {message}")
+                return False
+            print(f"  ✓ Rerun resumed: {message}")
+            
+            leftovers = [p.name for p in folder.iterdir() if p.suffix == ".tmp"]
+            if leftovers:
+                print(f"  ✗ Temporary files left behind: {leftovers}")
+                return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_compact_migration_on_open():
+    """Test that reads leave a legacy cache alone and scanning the folder compacts it."""
+    print("\nTesting compact storage migration...")
+    
+    try:
+        import json
+        import tempfile
+        import time
+        from PyQt6.QtWidgets import QApplication
+        from backend import fingerprint_engine as fe
+        from backend.fingerprint_engine import FingerprintEngine
+        from shared.fingerprint_store import HAVE_NUMPY
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            cache_path = folder / fe.FINGERPRINTS_JSON
+            legacy = {"version": 1, "excluded_files": [],
+                      "files": {"a.wav": {"fingerprints": {"spectral": [0.1, 0.2]}}}}
+            cache_path.write_text(json.dumps(legacy), encoding="utf-8")
+            before = cache_path.read_bytes()
+            
+            # What the per-row QML helpers read
+            fe.load_fingerprint_cache(folder, readonly=True)
+            fe.is_file_excluded_from_fingerprinting(folder, "a.wav")
+            if cache_path.read_bytes() != before:
+                print("  ✗ Reading the cache rewrote it")
+                return False
+            print("  ✓ Reads leave a legacy cache untouched")
+            
+            app = QApplication.instance() or QApplication(sys.argv)
+            engine = FingerprintEngine()
+            compacted = []
+            engine.cacheCompacted.connect(lambda directory, converted: compacted.append(converted))
+            engine.compactFolderCache(str(folder))
+            deadline = time.monotonic() + 10
+            while not compacted and time.monotonic() < deadline:
+                app.processEvents()
+                time.sleep(0.01)
+            cache = fe.load_fingerprint_cache(folder, readonly=True)
+            if HAVE_NUMPY and (compacted != [True] or cache.get("storage") != "npz"):
+                print("  ✗ Scanning the folder did not compact the cache")
+                return False
+            vector = [float(v) for v in cache["files"]["a.wav"]["fingerprints"]["spectral"]]
+            if len(vector) != 2 or abs(vector[0] - 0.1) > 1e-6 or abs(vector[1] - 0.2) > 1e-6:
+                print("  ✗ Fingerprints changed by the migration")
+                return False
+            print("  ✓ Scanning the folder converts it to compact storage in background")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def main():
     """Run all tests."""
     print("=" * 60)
@@ -165,6 +455,11 @@ def main():
     results.append(("Basic Fingerprinting", test_basic_fingerprinting()))
     results.append(("All Algorithms", test_all_algorithms()))
     results.append(("Engine Instantiation", test_engine_instantiation()))
+    results.append(("Partial Decode", test_partial_decode()))
+    results.append(("Cache Memoization", test_cache_memoization()))
+    results.append(("Benchmark Harness", test_benchmark_harness()))
+    results.append(("Checkpoint Resume", test_checkpoint_resume()))
+    results.append(("Compact Migration", test_compact_migration_on_open()))
     
     print("\n" + "=" * 60)
     print("Test Summary")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test suite for the landmark hash index (offset-aware matching).
+"""
+
+import sys
+import wave
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+SR = 11025
+
+
+def _synth_song(seed: int, seconds: float) -> np.ndarray:
+    """A sequence of random harmonic notes, so each song has its own landmarks."""
+    rng = np.random.default_rng(seed)
+    note_len = int(0.25 * SR)
+    t = np.arange(note_len) / SR
+    envelope = np.minimum(1.0, np.linspace(0, 8, note_len)) * np.exp(-3 * t)
+    notes = []
+    for _ in range(int(seconds / 0.25)):
+        freq = 110.0 * 2 ** (rng.integers(0, 36) / 12.0)
+        tone = sum(np.sin(2 * np.pi * freq * h * t) / h for h in (1, 2, 3))
+        notes.append(tone * envelope)
+    return (0.3 * np.concatenate(notes)).astype(np.float32)
+
+
+def _noise(seed: int, seconds: float) -> np.ndarray:
+    return (0.02 * np.random.default_rng(seed).standard_normal(int(seconds * SR))).astype(np.float32)
+
+
+def _write_wav(path: Path, samples: np.ndarray):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SR)
+        wf.writeframes(pcm.tobytes())
+
+
+def test_imports():
+    """Test that the landmark module imports."""
+    print("Testing imports...")
+    try:
+        from backend.landmark_index import (
+            LandmarkIndex, LandmarkIndexWorker, LandmarkSearchWorker,
+            extract_landmarks, find_songs_in_recording, match_clip
+        )
+        print("  ✓ All imports successful")
+        return True
+    except ImportError as e:
+        print(f"  ✗ Import failed: {e}")
+        return False
+
+
+def test_clip_matching():
+    """Test that a short clip is matched to its song at the right offset."""
+    print("\nTesting partial-clip matching...")
+    try:
+        from backend.landmark_index import LandmarkIndex, extract_landmarks, match_clip
+
+        songs = {f"song{i}.wav": _synth_song(i, 30) for i in range(5)}
+        index = LandmarkIndex()
+        for name, samples in songs.items():
+            index.add(name, *extract_landmarks(samples, SR))
+
+        clip = songs["song3.wav"][12 * SR:20 * SR] + _noise(99, 8)
+        matches = match_clip(index, clip, SR)
+        if not matches or matches[0]["file"] != "song3.wav":
+            print(f"  ✗ Wrong match: {matches[:2]}")
+            return False
+        if abs(matches[0]["offset_s"] - 12.0) > 0.1:
+            print(f"  ✗ Wrong offset: {matches[0]['offset_s']}")
+            return False
+        if any(m["file"] != "song3.wav" for m in matches):
+            print(f"  ✗ Spurious matches: {matches}")
+            return False
+
+        print(f"  ✓ Clip found in song3.wav at {matches[0]['offset_s']}s ({matches[0]['votes']} votes)")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_songs_in_recording():
+    """Test locating several songs (one played twice) inside a long recording."""
+    print("\nTesting songs in a long recording...")
+    try:
+        import json
+        from backend.landmark_index import (
+            LandmarkIndex, LandmarkIndexWorker, LandmarkSearchWorker, find_songs_in_recording,
+            load_landmark_store, load_merged_index, save_landmark_store
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            songs_dir = Path(tmp) / "songs"
+            songs_dir.mkdir()
+            songs = {f"song{i}.wav": _synth_song(i, 20) for i in range(4)}
+            files = []
+            for name, samples in songs.items():
+                _write_wav(songs_dir / name, samples)
+                files.append(str(songs_dir / name))
+
+            messages = []
+            worker = LandmarkIndexWorker(songs_dir, files)
+            worker.finished.connect(lambda ok, msg: messages.append((ok, msg)))
+            worker.run()
+            if not messages or not messages[-1][0] or len(load_landmark_store(songs_dir)) != 4:
+                print(f"  ✗ Indexing failed: {messages}")
+                return False
+
+            # Rehearsal: noise, song1, noise, song2, noise, second half of song1
+            parts = [_noise(1, 7.3), songs["song1.wav"], _noise(2, 11.0),
+                     songs["song2.wav"], _noise(3, 5.0), songs["song1.wav"][10 * SR:]]
+            expected = [("song1.wav", 7.3), ("song2.wav", 7.3 + 20 + 11.0),
+                        ("song1.wav", 7.3 + 20 + 11.0 + 20 + 5.0 - 10.0)]
+            recording = Path(tmp) / "rehearsal.wav"
+            _write_wav(recording, np.concatenate(parts))
+
+            index = LandmarkIndex.from_folders([songs_dir])
+            # Small chunks so the chunk boundaries are exercised
+            results = find_songs_in_recording(index, recording, chunk_frames=512)
+            found = [(Path(r["file"]).name, r["song_start_s"]) for r in results]
+            if len(found) != len(expected):
+                print(f"  ✗ Expected {len(expected)} occurrences, got {found}")
+                return False
+            for (name, start), (exp_name, exp_start) in zip(found, expected):
+                if name != exp_name or abs(start - exp_start) > 0.1:
+                    print(f"  ✗ Expected {exp_name} at {exp_start}s, got {name} at {start}s")
+                    return False
+            if abs(results[2]["song_position_s"] - 10.0) > 0.5:
+                print(f"  ✗ Partial repeat should start 10s into the song: {results[2]}")
+                return False
+
+            # The search worker finds the indexed folders itself and reuses the merged index
+            messages = []
+            worker = LandmarkSearchWorker(recording, Path(tmp))
+            worker.finished.connect(lambda ok, msg: messages.append((ok, msg)))
+            worker.run()
+            if not messages or not messages[-1][0] or \
+                    len(json.loads(messages[-1][1])["matches"]) != len(expected):
+                print(f"  ✗ Search worker failed: {messages}")
+                return False
+            merged = load_merged_index([songs_dir])
+            if load_merged_index([songs_dir]) is not merged:
+                print("  ✗ Merged index rebuilt although no landmark file changed")
+                return False
+            store = load_landmark_store(songs_dir)
+            del store["song3.wav"]
+            save_landmark_store(songs_dir, store)
+            rebuilt = load_merged_index([songs_dir])
+            if rebuilt is merged or len(rebuilt.names) != 3:
+                print("  ✗ Merged index not rebuilt after a landmark file changed")
+                return False
+
+        print(f"  ✓ Found {found}")
+        return True
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_chunked_extraction_matches_full():
+    """Test that chunked extraction yields the same landmarks as one pass."""
+    print("\nTesting chunked extraction...")
+    try:
+        from backend.landmark_index import extract_landmarks, iter_file_landmarks
+
+        with tempfile.TemporaryDirectory() as tmp:
+            samples = _synth_song(7, 40)
+            path = Path(tmp) / "long.wav"
+            _write_wav(path, samples)
+            full = set(zip(*extract_landmarks(samples, SR)))
+            chunked = set()
+            for hashes, times, _, _ in iter_file_landmarks(path, chunk_frames=300):
+                chunked.update(zip(hashes, times))
+
+        overlap = len(full & chunked) / max(1, len(full))
+        if overlap < 0.98:
+            print(f"  ✗ Only {overlap:.1%} of landmarks agree")
+            return False
+        print(f"  ✓ {overlap:.1%} of {len(full)} landmarks agree")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Landmark Index Tests")
+    print("=" * 60)
+
+    results = [
+        test_imports(),
+        test_clip_matching(),
+        test_songs_in_recording(),
+        test_chunked_extraction_matches_full(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Test suite for LibraryWatcher and incremental FileListModel updates.
+"""
+
+import os
+import sys
+import time
+import wave
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _write_wav(path: Path, seconds: float = 1.0):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(8000)
+        wf.writeframes(b"\x00\x00" * int(8000 * seconds))
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_diff_snapshots():
+    """Test that snapshot comparison finds adds, removes, renames and edits."""
+    print("Testing snapshot diff...")
+    try:
+        from backend.library_watcher import diff_snapshots
+
+        old = {"a.wav": (1, 100, 1), "b.wav": (2, 200, 2), "c.wav": (3, 300, 3)}
+        new = {"a.wav": (1, 150, 5), "c2.wav": (3, 300, 3), "d.wav": (4, 50, 6)}
+        changes = diff_snapshots(old, new)
+        expected = (["d.wav"], ["b.wav"], [("c.wav", "c2.wav")], ["a.wav"])
+        if tuple(changes) != expected:
+            print(f"  ✗ Unexpected changes: {changes}")
+            return False
+
+        # Without inodes, renames are matched on size and mtime
+        changes = diff_snapshots({"x.wav": (0, 10, 7)}, {"y.wav": (0, 10, 7)})
+        if changes.renamed != [("x.wav", "y.wav")] or changes.added or changes.removed:
+            print(f"  ✗ Rename without inodes not detected: {changes}")
+            return False
+
+        print("  ✓ Snapshot diff works correctly")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_incremental_model_updates():
+    """Test that filesystem changes update rows without resetting the model."""
+    print("\nTesting incremental model updates...")
+    try:
+        from backend import library_watcher as watcher_module
+        from backend.file_manager import FileManager
+        from backend.models import FileListModel
+        from backend.library_watcher import LibraryWatcher
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            for name in ["b.wav", "d.wav"]:
+                _write_wav(folder / name)
+
+            fm = FileManager()
+            model = FileListModel(file_manager=fm)
+            watcher = LibraryWatcher(file_manager=fm)
+            watcher._timer.setInterval(50)
+            watcher.filesAdded.connect(model.insertFiles)
+            watcher.filesRemoved.connect(model.removeFiles)
+            watcher.filesRenamed.connect(model.renameFiles)
+            watcher.filesModified.connect(model.refreshFiles)
+            fm.filesDiscovered.connect(model.setFiles)
+            fm.discoverAudioFiles(str(folder))
+
+            resets, inserts, removes = [], [], []
+            model.modelReset.connect(lambda: resets.append(1))
+            model.rowsInserted.connect(lambda parent, first, last: inserts.append(first))
+            model.rowsRemoved.connect(lambda parent, first, last: removes.append(first))
+
+            def names():
+                return [model.getFilePath(i).rsplit(os.sep, 1)[-1] for i in range(model.rowCount())]
+
+            _write_wav(folder / "c.wav", 2.0)
+            if not _wait_for(lambda: names() == ["b.wav", "c.wav", "d.wav"]):
+                print(f"  ✗ Added file not inserted in order: {names()}")
+                return False
+
+            (folder / "b.wav").unlink()
+            os.rename(folder / "d.wav", folder / "e.wav")
+            if not _wait_for(lambda: names() == ["c.wav", "e.wav"]):
+                print(f"  ✗ Remove/rename not applied: {names()}")
+                return False
+
+            if resets or inserts != [1] or removes != [0]:
+                print(f"  ✗ Expected row operations only (resets={len(resets)}, "
+                      f"inserts={inserts}, removes={removes})")
+                return False
+            if sorted(Path(p).name for p in fm.getDiscoveredFiles()) != ["c.wav", "e.wav"]:
+                print(f"  ✗ Discovered files not updated: {fm.getDiscoveredFiles()}")
+                return False
+
+            # A file being recorded: many appends become few rescans
+            rescans = []
+            original_rescan = watcher_module.LibraryWatcher.rescan
+            watcher._timer.timeout.disconnect()
+            watcher._timer.timeout.connect(lambda: (rescans.append(1), original_rescan(watcher)))
+            with open(folder / "c.wav", "ab") as f:
+                for _ in range(40):
+                    f.write(b"\x00" * 4000)
+                    f.flush()
+                    app.processEvents()
+                    time.sleep(0.005)
+            size = (folder / "c.wav").stat().st_size
+            row = names().index("c.wav")
+            if not _wait_for(lambda: model.data(model.index(row, 0), model.FileSizeRole) == size):
+                print("  ✗ Modified file's row not refreshed")
+                return False
+            if len(rescans) > 3:
+                print(f"  ✗ Events not debounced ({len(rescans)} rescans for 40 writes)")
+                return False
+
+            watcher.stop()
+
+        print(f"  ✓ Insert/remove/rename/modify applied as row operations ({len(rescans)} rescan(s) for 40 writes)")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_stale_durations_forgotten():
+    """Test that changed files lose their cached durations and renames keep them."""
+    print("\nTesting duration cache invalidation...")
+    try:
+        from backend.file_manager import FileManager
+        from backend.library_watcher import LibraryWatcher
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            _write_wav(folder / "a.wav")
+            _write_wav(folder / "b.wav")
+
+            fm = FileManager()
+            fm.cacheDurations(folder, {"a.wav": 61000, "b.wav": 61000})
+            fm.flushDurationCache()
+            watcher = LibraryWatcher(file_manager=fm)
+            watcher.setDirectory(str(folder))
+
+            _write_wav(folder / "a.wav", 3.0)
+            os.rename(folder / "b.wav", folder / "renamed.wav")
+            watcher.rescan()
+            durations = fm.getFolderSnapshot(folder)["durations"]
+            if "a.wav" in durations or "b.wav" in durations or durations.get("renamed.wav") != 61000:
+                print(f"  ✗ Unexpected cached durations: {durations}")
+                return False
+
+            fm.flushDurationCache()
+            if FileManager().getFolderSnapshot(folder)["durations"] != {"renamed.wav": 61000}:
+                print("  ✗ Forgotten durations still on disk")
+                return False
+            watcher.stop()
+
+        print("  ✓ Stale durations dropped; renamed file kept its duration")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_files_added_during_ingest():
+    """Test that files appearing mid-ingest join it instead of replacing it."""
+    print("\nTesting files added during an ingest...")
+    try:
+        from backend import audio_ingest
+        from backend.audio_ingest import AudioIngestPipeline, IngestWorker, load_duration_cache
+        from backend.file_manager import FileManager
+        from backend.library_watcher import LibraryWatcher
+
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            for i in range(5):
+                _write_wav(folder / f"take{i}.wav", 0.5)
+
+            # A finished worker refuses new files, so the pipeline queues them
+            worker = IngestWorker(folder, [str(folder / "take0.wav")])
+            worker.run()
+            if worker.addFiles([str(folder / "take1.wav")]):
+                print("  ✗ Finished worker accepted new files")
+                return False
+
+            fm = FileManager()
+            pipeline = AudioIngestPipeline()
+            watcher = LibraryWatcher(file_manager=fm)
+            watcher._timer.setInterval(50)
+            # Wired as in main.py
+            fm.filesDiscovered.connect(pipeline.ingestFiles)
+            watcher.filesAdded.connect(pipeline.ingestFiles)
+            messages = []
+            pipeline.ingestFinished.connect(lambda ok, message: messages.append(message))
+
+            # Slow each file down so the new take lands while the first ingest runs
+            original_ingest = audio_ingest.ingest_file
+            audio_ingest.ingest_file = lambda *args: (time.sleep(0.1), original_ingest(*args))[1]
+            try:
+                fm.discoverAudioFiles(str(folder))
+                if not _wait_for(lambda: pipeline.isIngesting(), 2.0):
+                    print("  ✗ Ingest did not start")
+                    return False
+                _write_wav(folder / "new_take.wav", 0.5)
+                expected = {f"take{i}.wav" for i in range(5)} | {"new_take.wav"}
+                done = _wait_for(lambda: not pipeline.isIngesting() and messages
+                                 and set(load_duration_cache(folder)) == expected, 20.0)
+            finally:
+                audio_ingest.ingest_file = original_ingest
+                watcher.stop()
+                pipeline.finishIngest()
+
+            if not done:
+                print(f"  ✗ Not every file ingested: {sorted(load_duration_cache(folder))}, finished: {messages}")
+                return False
+            if "Operation cancelled" in messages:
+                print(f"  ✗ Running ingest was cancelled: {messages}")
+                return False
+
+        print(f"  ✓ New take joined the running ingest ({messages})")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Library Watcher Tests")
+    print("=" * 60)
+
+    results = [
+        test_diff_snapshots(),
+        test_incremental_model_updates(),
+        test_stale_durations_forgotten(),
+        test_files_added_during_ingest(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
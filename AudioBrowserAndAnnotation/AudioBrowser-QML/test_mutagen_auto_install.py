@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 """
-Test script to verify mutagen auto-installation in file_manager.py
+Test script to verify mutagen auto-installation for file_manager.py
 
 This test ensures that the mutagen module is automatically installed
-when the file_manager module is imported, following the repository's
-auto-install pattern.
+when the file_manager module is imported (through shared/audio_probe.py),
+following the repository's auto-install pattern.
 """
 
 import sys
@@ -43,22 +43,27 @@ def test_mutagen_auto_install():
         print(f"✗ Failed to load file_manager: {e}")
         return False
     
-    # Check HAVE_MUTAGEN flag
+    # file_manager probes durations through shared.audio_probe, which
+    # installs mutagen for the formats its header parsers don't cover
     print("\nChecking HAVE_MUTAGEN flag...")
-    if hasattr(file_manager, 'HAVE_MUTAGEN'):
-        print(f"✓ HAVE_MUTAGEN = {file_manager.HAVE_MUTAGEN}")
+    audio_probe = sys.modules.get('shared.audio_probe')
+    if audio_probe is None:
+        print("✗ shared.audio_probe was not imported by file_manager")
+        return False
+    if hasattr(audio_probe, 'HAVE_MUTAGEN'):
+        print(f"✓ HAVE_MUTAGEN = {audio_probe.HAVE_MUTAGEN}")
     else:
         print("✗ HAVE_MUTAGEN flag not found")
         return False
     
-    if not file_manager.HAVE_MUTAGEN:
+    if not audio_probe.HAVE_MUTAGEN:
         print("✗ Mutagen was not installed successfully")
         return False
     
     # Check MutagenFile is available
     print("\nChecking MutagenFile availability...")
-    if hasattr(file_manager, 'MutagenFile'):
-        print(f"✓ MutagenFile is available: {file_manager.MutagenFile}")
+    if hasattr(audio_probe, 'MutagenFile'):
+        print(f"✓ MutagenFile is available: {audio_probe.MutagenFile}")
     else:
         print("✗ MutagenFile not found in module")
         return False
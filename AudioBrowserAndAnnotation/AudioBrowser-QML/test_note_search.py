@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test suite for the background-built note search index behind FileManager.searchNotes.
+"""
+
+import json
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _sets_file(folder: Path, user: str, files: dict, folder_notes: str = ""):
+    data = {"version": 3, "sets": [{"id": "s1", "name": user, "folder_notes": folder_notes,
+                                    "files": files}], "current_set_id": "s1"}
+    (folder / f".audio_notes_{user}.json").write_text(json.dumps(data), encoding="utf-8")
+
+
+def _open_library(root: Path):
+    """A FileManager on root with its first note index built."""
+    from backend.file_manager import FileManager
+
+    manager = FileManager()
+    rebuilt = []
+    manager.noteIndexChanged.connect(lambda: rebuilt.append(True))
+    manager.setCurrentDirectory(str(root))
+    if not _wait_for(lambda: rebuilt and not manager.isNoteIndexBuilding()):
+        raise AssertionError("Note index was not built")
+    return manager, rebuilt
+
+
+def test_search_from_index():
+    """Test that searches are answered from the index, with locations to open."""
+    print("Testing note search from the index...")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            gig = root / "2024-05-01"
+            gig.mkdir()
+            (gig / "solo.wav").write_bytes(b"")
+            _sets_file(gig, "alice", {"solo.wav": {"notes": [
+                {"ms": 61000, "text": "Dave flubbed the bridge"}]}}, folder_notes="Great energy tonight")
+
+            manager, _ = _open_library(root)
+            hits = manager.searchNotes("dave flub")
+            if [(h["name"], h["timestampMs"], h["folder"]) for h in hits] != [("solo.wav", 61000, "2024-05-01")]:
+                print(f"  ✗ Unexpected results: {hits}")
+                return False
+            if hits[0]["path"] != str(gig / "solo.wav") or hits[0]["directory"] != str(gig):
+                print(f"  ✗ Wrong location: {hits[0]}")
+                return False
+            folder_hits = manager.searchNotes("energy")
+            if len(folder_hits) != 1 or folder_hits[0]["kind"] != "folder_note" or \
+                    folder_hits[0]["directory"] != str(gig) or folder_hits[0]["timestampMs"] != -1:
+                print(f"  ✗ Folder note result wrong: {folder_hits}")
+                return False
+
+            # A query never reads the disk: new notes appear after the next reconcile
+            _sets_file(gig, "bob", {"solo.wav": {"notes": [{"ms": 5000, "text": "ending drags"}]}})
+            if manager.searchNotes("drags"):
+                print("  ✗ Search read the disk instead of the index")
+                return False
+            manager.refreshNoteIndex()
+            if not _wait_for(lambda: manager.searchNotes("drags")):
+                print("  ✗ Reconcile did not pick up the new note")
+                return False
+            manager.cancelNoteIndex()
+
+        print("  ✓ Searches answered from the index")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_incremental_rebuild():
+    """Test that unchanged folders are reused and a library switch drops stale results."""
+    print("\nTesting incremental rebuilds...")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "library"
+            other = Path(tmp) / "other"
+            for folder in (root / "a", root / "b", other):
+                folder.mkdir(parents=True)
+            _sets_file(root / "a", "band", {"x.wav": {"notes": [{"ms": 1, "text": "tuning drift"}]}})
+            _sets_file(root / "b", "band", {"y.wav": {"notes": [{"ms": 2, "text": "feedback"}]}})
+            _sets_file(other, "band", {"z.wav": {"notes": [{"ms": 3, "text": "other library"}]}})
+
+            manager, rebuilt = _open_library(root)
+            first = manager._note_index
+            _sets_file(root / "b", "band", {"y.wav": {"notes": [{"ms": 2, "text": "squeal"}]}})
+            os.utime(root / "b" / ".audio_notes_band.json", ns=(1, 1))
+            count = len(rebuilt)
+            manager.refreshNoteIndex()
+            if not _wait_for(lambda: len(rebuilt) > count and not manager.isNoteIndexBuilding()):
+                print("  ✗ Index not rebuilt")
+                return False
+            second = manager._note_index
+            if second.folders["a"] is not first.folders["a"]:
+                print("  ✗ Unchanged folder was re-read")
+                return False
+            if manager.searchNotes("feedback") or not manager.searchNotes("squeal"):
+                print("  ✗ Changed folder not re-read")
+                return False
+
+            # Switching library while a build runs: the old build's result is dropped
+            manager.refreshNoteIndex()
+            manager.setCurrentDirectory(str(other))
+            if not _wait_for(lambda: not manager.isNoteIndexBuilding() and manager.searchNotes("other")):
+                print("  ✗ New library not indexed")
+                return False
+            if manager._note_index.root != other or manager.searchNotes("squeal"):
+                print("  ✗ Stale library index kept")
+                return False
+            manager.cancelNoteIndex()
+
+        print("  ✓ Unchanged folders reused, stale builds dropped")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_search_speed():
+    """Test that tens of thousands of notes are searched in under 10 ms."""
+    print("\nTesting search speed...")
+    try:
+        words = ["verse", "chorus", "tempo", "tuning", "drums", "vocals", "rushed", "late", "sharp", "flat"]
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for i in range(40):
+                folder = root / f"2023-{i:03d}"
+                folder.mkdir()
+                files = {f"take{j}.wav": {"notes": [{"ms": k * 1000, "text": f"{words[(i + j + k) % 10]} "
+                                                     f"{words[(j * k) % 10]} note {k}"} for k in range(50)]}
+                         for j in range(10)}
+                _sets_file(folder, "band", files)
+
+            manager, _ = _open_library(root)
+            manager.searchNotes("chorus rushed")
+            start = time.perf_counter()
+            hits = manager.searchNotes("chorus rush")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            manager.cancelNoteIndex()
+            if not hits:
+                print("  ✗ No results")
+                return False
+            if elapsed_ms >= 10:
+                print(f"  ✗ Search too slow: {elapsed_ms:.1f} ms")
+                return False
+
+        print(f"  ✓ 20000 notes searched in {elapsed_ms:.1f} ms")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Note Search Tests")
+    print("=" * 60)
+
+    results = [
+        test_search_from_index(),
+        test_incremental_rebuild(),
+        test_search_speed(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
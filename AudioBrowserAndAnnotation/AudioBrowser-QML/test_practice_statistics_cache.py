@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test suite for the incremental practice statistics cache.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _make_folder(root: Path, name: str, names: dict, takes: dict = None) -> Path:
+    """Create a practice folder with empty audio files and metadata."""
+    folder = root / name
+    folder.mkdir(parents=True)
+    for filename in names:
+        (folder / filename).touch()
+    (folder / ".provided_names.json").write_text(json.dumps(names))
+    if takes is not None:
+        (folder / ".takes_metadata.json").write_text(json.dumps(takes))
+    return folder
+
+
+def _statistics(root: Path):
+    from backend.practice_statistics import PracticeStatistics
+    stats = PracticeStatistics()
+    stats.setRootPath(str(root))
+    return stats._generate_practice_folder_statistics()
+
+
+def _count_scans(module):
+    """Wrap PracticeStatistics._scan_folder to count how each folder was handled."""
+    outcomes = []
+    original = module.PracticeStatistics._scan_folder
+
+    def counting_scan(self, relative, old):
+        result = original(self, relative, old)
+        if result is not None:
+            outcomes.append(result[3])
+        return result
+
+    module.PracticeStatistics._scan_folder = counting_scan
+    return outcomes, original
+
+
+def test_unchanged_folders_reused():
+    """Test that a second run reuses every folder and gives the same statistics."""
+    print("Testing unchanged folders are reused...")
+    try:
+        from backend import practice_statistics as ps_module
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for i in range(20):
+                _make_folder(root / "2024", f"2024-03-{i + 1:02d}-practice",
+                             {"take1.wav": "Song A", "take2.wav": f"Song {i % 3}"},
+                             {"take1.wav": {"best_take": True}})
+            first = _statistics(root)
+            if not (root / ".library_cache" / ".practice_stats_cache.json").exists():
+                print("  ✗ Cache not written")
+                return False
+            root_mtime = root.stat().st_mtime_ns
+
+            outcomes, original = _count_scans(ps_module)
+            try:
+                second = _statistics(root)
+            finally:
+                ps_module.PracticeStatistics._scan_folder = original
+
+            if root.stat().st_mtime_ns != root_mtime:
+                print("  ✗ Saving the cache changed the root's mtime")
+                return False
+
+            if second != first:
+                print("  ✗ Cached statistics differ from the first run")
+                return False
+            if set(outcomes) != {"reused"}:
+                print(f"  ✗ Expected every folder reused, got {outcomes}")
+                return False
+            if first["songs"]["Song A"]["best_takes"] != 20 or first["summary"]["total_files"] != 40:
+                print(f"  ✗ Wrong totals: {first['summary']}")
+                return False
+
+        print("  ✓ Unchanged folders reused with identical statistics")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_changed_folders_recomputed():
+    """Test that edited, added and removed folders are picked up."""
+    print("Testing changed folders are recomputed...")
+    try:
+        import shutil
+        from backend import practice_statistics as ps_module
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            edited = _make_folder(root, "2024-01-05-rehearsal", {"a.wav": "Song A", "b.wav": "Song B"})
+            removed = _make_folder(root, "2024-01-12-rehearsal", {"c.wav": "Song C"})
+            for i in range(5):
+                _make_folder(root / "older", f"2023-06-{i + 1:02d}-jam", {"d.wav": "Song D"})
+            _statistics(root)
+
+            # Same size, so only the mtime tells the edit apart
+            (edited / ".provided_names.json").write_text(json.dumps({"a.wav": "Song X", "b.wav": "Song B"}))
+            shutil.rmtree(removed)
+            _make_folder(root, "2024-01-19-rehearsal", {"e.mp3": "Song E"})
+
+            outcomes, original = _count_scans(ps_module)
+            try:
+                stats = _statistics(root)
+            finally:
+                ps_module.PracticeStatistics._scan_folder = original
+
+            songs = stats["songs"]
+            if "Song X" not in songs or "Song A" in songs or "Song C" in songs or "Song E" not in songs:
+                print(f"  ✗ Stale songs: {sorted(songs)}")
+                return False
+            if stats["summary"]["total_sessions"] != 7:
+                print(f"  ✗ Expected 7 sessions, got {stats['summary']['total_sessions']}")
+                return False
+            if outcomes.count("reused") != 6:
+                print(f"  ✗ Expected the older folders reused, got {outcomes}")
+                return False
+            if songs["Song D"]["first_practiced"] != "2023-06-01T00:00:00" \
+                    or songs["Song D"]["last_practiced"] != "2023-06-05T00:00:00":
+                print(f"  ✗ Wrong practice dates: {songs['Song D']}")
+                return False
+
+        print("  ✓ Edited, added and removed folders picked up; others reused")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_corrupt_cache_rebuilt():
+    """Test that an unreadable cache is ignored and rewritten."""
+    print("Testing corrupt cache is rebuilt...")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _make_folder(root, "2024-02-01-practice", {"a.wav": "Song A"})
+            expected = _statistics(root)
+            (root / ".library_cache" / ".practice_stats_cache.json").write_text('{"version": 1, "dirs": {')
+
+            if _statistics(root) != expected:
+                print("  ✗ Statistics changed after the cache was corrupted")
+                return False
+            cached = json.loads((root / ".library_cache" / ".practice_stats_cache.json").read_text())
+            if "2024-02-01-practice" not in cached.get("dirs", {}):
+                print("  ✗ Cache not rebuilt")
+                return False
+
+        print("  ✓ Corrupt cache ignored and rebuilt")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Practice Statistics Cache Tests")
+    print("=" * 60)
+
+    results = [
+        test_unchanged_folders_reused(),
+        test_changed_folders_recomputed(),
+        test_corrupt_cache_rebuilt(),
+    ]
+
+    print("\n" + "=" * 60)
+    passed = sum(results)
+    total = len(results)
+    print(f"Results: {passed}/{total} tests passed")
+    print("=" * 60)
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -89,18 +89,23 @@ def test_worker_deletelater_connected():
         assert 'worker.cancelled.connect(thread.quit)' in gen_source, \
             "cancelled signal should trigger thread.quit"
         
-        # Check that cleanup handlers properly call deleteLater
+        # Check that the shared cleanup helper calls deleteLater
+        helper_source = inspect.getsource(WaveformEngine._finish_thread)
+        assert 'worker.deleteLater()' in helper_source and 'thread.deleteLater()' in helper_source, \
+            "_finish_thread should call deleteLater() on the worker and thread"
+        
+        # Check that every handler goes through it
         finished_source = inspect.getsource(WaveformEngine._on_waveform_finished)
-        assert 'deleteLater()' in finished_source, \
-            "finished handler should call deleteLater()"
+        assert '_finish_thread(' in finished_source, \
+            "finished handler should call _finish_thread()"
         
         error_source = inspect.getsource(WaveformEngine._on_waveform_error)
-        assert 'deleteLater()' in error_source, \
-            "error handler should call deleteLater()"
+        assert '_finish_thread(' in error_source, \
+            "error handler should call _finish_thread()"
         
         cancelled_source = inspect.getsource(WaveformEngine._on_waveform_cancelled)
-        assert 'deleteLater()' in cancelled_source, \
-            "cancelled handler should call deleteLater()"
+        assert '_finish_thread(' in cancelled_source, \
+            "cancelled handler should call _finish_thread()"
         
         print("✓ Worker and thread cleanup is properly handled in all handlers")
         return True
@@ -36,7 +36,10 @@ from shared.metadata_constants import (
 )
 from shared.file_utils import sanitize as _shared_sanitize, sanitize_library_name as _shared_sanitize_library_name
 from shared import backup_utils
+from shared import json_io
+from shared.dir_walker import skip_dirs_named, walk_directories
 from shared.metadata_manager import MetadataManager
+from shared.fingerprint_store import read_fingerprint_store, write_fingerprint_store
 
 # Windows subprocess flag to hide console windows
 if sys.platform == "win32":
@@ -332,6 +335,7 @@ APP_ICON_NAME = "app_icon.png"
 DEFAULT_PAGINATION_CHUNK_SIZE = 200  # Default number of files to display at once
 PAGINATION_THRESHOLD = 500  # Auto-enable pagination for libraries larger than this
 DEFAULT_PARALLEL_WORKERS = 0  # 0 = auto-detect (use CPU count - 1)
+SCAN_WORKERS = 8  # Folders listed concurrently when discovering folders (hides network share latency)
 
 # Visual widths
 MARKER_WIDTH = 2                # thin marker width
@@ -695,8 +699,7 @@ def load_json(path: Path, default):
     # Once we refactor, this will be removed
     try:
         if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return json_io.read_json(path)
     except Exception:
         pass
     return default
@@ -708,8 +711,7 @@ def save_json(path: Path, data):
     error handling and additional features like backup support.
     """
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        json_io.write_json(path, data)
     except Exception:
         pass
 
@@ -1203,8 +1205,7 @@ class JSONPersistence:
         """
         try:
             if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return json_io.read_json(file_path)
         except json.JSONDecodeError as e:
             logging.error(f"Invalid JSON in {file_path}: {e}")
         except Exception as e:
@@ -1235,9 +1236,8 @@ class JSONPersistence:
             # Ensure directory exists
             file_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write JSON
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=indent, ensure_ascii=False)
+            # Write JSON atomically (machine caches compactly, see json_io)
+            json_io.write_json(file_path, data, indent=indent)
             return True
         except Exception as e:
             logging.error(f"Failed to save {file_path}: {e}")
@@ -2780,8 +2780,8 @@ def migrate_fingerprint_cache(cache: Dict) -> Dict:
     return cache
 
 def load_fingerprint_cache(dirpath: Path) -> Dict:
-    """Load fingerprint cache from directory."""
-    data = load_json(dirpath / FINGERPRINTS_JSON, None)
+    """Load fingerprint cache from directory (legacy JSON or compact manifest + vectors)."""
+    data = read_fingerprint_store(dirpath)
     cache = data if isinstance(data, dict) and "files" in data else {"version": 1, "files": {}, "excluded_files": []}
     
     # Ensure excluded_files field exists
@@ -2794,7 +2794,13 @@ def load_fingerprint_cache(dirpath: Path) -> Dict:
     return cache
 
 def save_fingerprint_cache(dirpath: Path, cache: Dict) -> None:
-    """Save fingerprint cache to directory."""
+    """Save fingerprint cache to directory (compact format when numpy is available)."""
+    try:
+        if write_fingerprint_store(dirpath, cache):
+            return
+    except Exception as e:
+        log_print(f"Could not write compact fingerprint cache, falling back to JSON: {e}")
+    cache.pop("storage", None)
     save_json(dirpath / FINGERPRINTS_JSON, cache)
 
 def is_file_excluded_from_fingerprinting(dirpath: Path, filename: str) -> bool:
@@ -2856,17 +2862,10 @@ def discover_practice_folders_with_fingerprints(root_path: Path) -> List[Path]:
     if not root_path.exists() or not root_path.is_dir():
         return practice_folders
     
-    # Check root directory itself
-    if (root_path / FINGERPRINTS_JSON).exists():
-        practice_folders.append(root_path)
-    
-    # Check immediate subdirectories
-    try:
-        for item in root_path.iterdir():
-            if item.is_dir() and (item / FINGERPRINTS_JSON).exists():
-                practice_folders.append(item)
-    except (OSError, PermissionError):
-        pass  # Skip directories we can't read
+    # Root directory itself and its immediate subdirectories
+    for listing in walk_directories(root_path, skip_dir=None, max_depth=1):
+        if listing.has_file(FINGERPRINTS_JSON):
+            practice_folders.append(listing.path)
     
     return practice_folders
 
@@ -2879,33 +2878,12 @@ def discover_directories_with_audio_files(root_path: Path) -> List[Path]:
     if not root_path.exists() or not root_path.is_dir():
         return directories_with_audio
     
-    def scan_directory(directory: Path):
-        """Recursively scan directory for audio files."""
-        try:
-            has_audio_files = False
-            subdirectories = []
-            
-            for item in directory.iterdir():
-                if item.is_file() and item.suffix.lower() in AUDIO_EXTS:
-                    has_audio_files = True
-                elif item.is_dir():
-                    # Skip hidden directories and common non-audio directories
-                    if not item.name.startswith('.') and item.name.lower() not in {'__pycache__', 'node_modules', '.git'}:
-                        subdirectories.append(item)
-            
-            # Add this directory if it contains audio files
-            if has_audio_files:
-                directories_with_audio.append(directory)
-            
-            # Recursively scan subdirectories
-            for subdir in subdirectories:
-                scan_directory(subdir)
-                
-        except (OSError, PermissionError):
-            # Skip directories we can't read
-            pass
+    # Skip hidden directories and common non-audio directories
+    skip_dir = skip_dirs_named({'__pycache__', 'node_modules'})
+    for listing in walk_directories(root_path, AUDIO_EXTS, skip_dir, workers=SCAN_WORKERS):
+        if listing.audio:
+            directories_with_audio.append(listing.path)
     
-    scan_directory(root_path)
     return directories_with_audio
 
 def find_files_with_song_name(root_path: Path, song_name: str) -> List[Dict[str, Any]]:
@@ -3251,34 +3229,18 @@ def create_metadata_backup_if_needed(practice_folder: Path) -> Optional[Path]:
     """
     Create a backup of metadata files if needed.
     
-    This function implements the main backup logic:
-    1. Check if there are metadata files that could change
-    2. If yes, create a timestamped backup folder in the practice folder
-    3. Copy all existing metadata files to the backup location
+    Uses shared.backup_utils.create_metadata_backup_if_needed: existing
+    metadata files are snapshotted into the folder's content-addressed
+    backup store (.backup/YYYY-MM-DD-###.json plus shared blobs), at most
+    once every few minutes per folder.
     
     Args:
         practice_folder: Current practice session folder where backup will be created
         
     Returns:
-        Path to created backup folder if backup was created, None otherwise
+        Path to the snapshot manifest if a backup was created, None otherwise
     """
-    if not should_create_backup(practice_folder):
-        return None
-    
-    backup_folder = create_backup_folder_name(practice_folder)
-    backed_up_count = backup_metadata_files(practice_folder, backup_folder)
-    
-    if backed_up_count > 0:
-        return backup_folder
-    else:
-        # Clean up empty backup folder
-        try:
-            backup_folder.rmdir()
-            # Also try to remove parent .backup directory if it's empty
-            backup_folder.parent.rmdir()
-        except Exception:
-            pass
-        return None
+    return backup_utils.create_metadata_backup_if_needed(practice_folder)
 
 def discover_available_backups(root_path: Path) -> List[Tuple[Path, str]]:
     """
@@ -3295,15 +3257,17 @@ def discover_available_backups(root_path: Path) -> List[Tuple[Path, str]]:
     backups = []
     
     # Search for .backup directories recursively
-    for backup_dir in root_path.rglob(".backup"):
+    for backup_dir in root_path.rglob(backup_utils.BACKUP_DIR_NAME):
         if backup_dir.is_dir():
-            # Look for dated backup folders within each .backup directory
+            # Look for snapshot manifests and dated backup folders within each .backup directory
             for backup_folder in backup_dir.iterdir():
-                if backup_folder.is_dir():
-                    # Parse folder name format: YYYY-MM-DD-###
+                if backup_folder.is_dir() and backup_folder.name == backup_utils.BACKUP_OBJECTS_DIR:
+                    continue  # Blob store
+                if backup_folder.is_dir() or backup_utils.is_snapshot_manifest(backup_folder):
+                    # Parse name format: YYYY-MM-DD-###
                     try:
                         # Extract timestamp info for display
-                        folder_name = backup_folder.name
+                        folder_name = backup_utils.backup_name(backup_folder)
                         date_part = folder_name.rsplit('-', 1)[0]  # Remove counter
                         date_obj = datetime.strptime(date_part, "%Y-%m-%d")
                         
@@ -3321,11 +3285,11 @@ def discover_available_backups(root_path: Path) -> List[Tuple[Path, str]]:
                         practice_folder = backup_dir.parent
                         rel_practice = practice_folder.relative_to(root_path)
                         practice_name = str(rel_practice) if str(rel_practice) != "." else "Root"
-                        display_name = f"{backup_folder.name} - {practice_name}"
+                        display_name = f"{folder_name} - {practice_name}"
                         backups.append((backup_folder, display_name))
     
     # Sort by folder name (which includes timestamp) in descending order
-    backups.sort(key=lambda x: x[0].name, reverse=True)
+    backups.sort(key=lambda x: backup_utils.backup_name(x[0]), reverse=True)
     return backups
 
 def get_backup_contents(backup_folder: Path, root_path: Path) -> Dict[Path, List[Path]]:
@@ -3344,6 +3308,9 @@ def get_backup_contents(backup_folder: Path, root_path: Path) -> Dict[Path, List
     if not backup_folder.exists():
         return contents
     
+    if backup_utils.is_snapshot_manifest(backup_folder):
+        return backup_utils.get_backup_contents(backup_folder, root_path)
+    
     # The backup folder is in a practice folder's .backup directory
     # So the practice folder is backup_folder.parent.parent
     practice_folder = backup_folder.parent.parent
@@ -3372,6 +3339,11 @@ def restore_metadata_from_backup(backup_folder: Path, target_practice_folder: Pa
     if not backup_folder.exists():
         return 0
     
+    if backup_utils.is_snapshot_manifest(backup_folder):
+        restored_count = backup_utils.restore_metadata_from_backup(backup_folder, target_practice_folder, root_path)
+        log_print(f"Restored {restored_count} file(s) from {backup_folder.name}")
+        return restored_count
+    
     restored_count = 0
     # Copy all JSON files from backup to target folder
     for backup_file in backup_folder.glob("*.json"):
@@ -4087,44 +4059,14 @@ class DirectoryDiscoveryWorker(QObject):
         """
         directories_with_audio = []
         
-        def scan_directory(directory: Path):
-            """Recursively scan directory for audio files."""
-            if self._canceled:
-                return
-            
-            try:
-                has_audio_files = False
-                subdirectories = []
-                
-                # Emit progress
-                self.progress.emit(str(directory))
-                
-                for item in directory.iterdir():
-                    if self._canceled:
-                        return
-                    
-                    if item.is_file() and item.suffix.lower() in AUDIO_EXTS:
-                        has_audio_files = True
-                    elif item.is_dir():
-                        # Skip hidden directories and common non-audio directories
-                        if not item.name.startswith('.') and item.name.lower() not in {'__pycache__', 'node_modules', '.git'}:
-                            subdirectories.append(item)
-                
-                # Add this directory if it contains audio files
-                if has_audio_files:
-                    directories_with_audio.append(directory)
-                
-                # Recursively scan subdirectories
-                for subdir in subdirectories:
-                    if self._canceled:
-                        return
-                    scan_directory(subdir)
-                    
-            except (OSError, PermissionError):
-                # Skip directories we can't read
-                pass
+        # Skip hidden directories and common non-audio directories
+        skip_dir = skip_dirs_named({'__pycache__', 'node_modules'})
+        for listing in walk_directories(root_path, AUDIO_EXTS, skip_dir, workers=SCAN_WORKERS,
+                                        should_stop=lambda: self._canceled):
+            self.progress.emit(str(listing.path))
+            if listing.audio:
+                directories_with_audio.append(listing.path)
         
-        scan_directory(root_path)
         return directories_with_audio
 
 class SpectrogramWorker(QObject):
@@ -4335,41 +4277,13 @@ class SongNameSearchWorker(QObject):
         if not root_path.exists() or not root_path.is_dir():
             return directories_with_audio
         
-        def scan_directory(directory: Path):
-            """Recursively scan directory for audio files."""
-            if self._canceled:
-                return
-            
-            try:
-                has_audio_files = False
-                subdirectories = []
-                
-                for item in directory.iterdir():
-                    if self._canceled:
-                        return
-                    
-                    if item.is_file() and item.suffix.lower() in AUDIO_EXTS:
-                        has_audio_files = True
-                    elif item.is_dir():
-                        # Skip hidden directories and common non-audio directories
-                        if not item.name.startswith('.') and item.name.lower() not in {'__pycache__', 'node_modules', '.git'}:
-                            subdirectories.append(item)
-                
-                # Add this directory if it contains audio files
-                if has_audio_files:
-                    directories_with_audio.append(directory)
-                
-                # Recursively scan subdirectories
-                for subdir in subdirectories:
-                    if self._canceled:
-                        return
-                    scan_directory(subdir)
-                    
-            except (OSError, PermissionError):
-                # Skip directories we can't read
-                pass
+        # Skip hidden directories and common non-audio directories
+        skip_dir = skip_dirs_named({'__pycache__', 'node_modules'})
+        for listing in walk_directories(root_path, AUDIO_EXTS, skip_dir, workers=SCAN_WORKERS,
+                                        should_stop=lambda: self._canceled):
+            if listing.audio:
+                directories_with_audio.append(listing.path)
         
-        scan_directory(root_path)
         return directories_with_audio
 
 class AutoFingerprintWorker(QObject):
@@ -6784,7 +6698,8 @@ class AudioBrowser(QMainWindow):
         - Only creates backup if metadata files exist in the current folder
         - Only creates backup once per session (tracked via _backup_created_this_session)
         - Only creates backup after initialization is complete (not during app startup)
-        - Creates .backup/YYYY-MM-DD-###/ folder in the current practice directory
+        - Creates a .backup/YYYY-MM-DD-###.json snapshot in the current practice directory
+          (unchanged files share blobs with earlier snapshots)
         - Increments backup number for multiple backups on same day
         - Shows backup location in console if backup is created
         """
@@ -0,0 +1,382 @@
+"""
+Audio Probe
+
+Header-only duration probing for audio files, shared by the AudioBrowser
+applications.
+
+Durations are read from container and frame headers without decoding any
+audio:
+- WAV/RIFF (and RF64): fmt chunk byte rate and data chunk size
+- FLAC: total samples and sample rate from STREAMINFO
+- MP3: Xing/Info (with LAME gapless trimming) or VBRI frame counts, or the
+  first frame's bitrate for constant-bitrate files
+- Ogg Vorbis/Opus: granule position of the last page
+
+Anything these parsers can't handle falls back to mutagen (installed if missing)
+and then to ffprobe (if on the PATH). Each probe reads a few kilobytes, so
+a whole library can be probed in seconds.
+"""
+
+import shutil
+import struct
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+
+def _ensure_import(mod_name: str, pip_name: Optional[str] = None) -> bool:
+    """Try to import a module, installing it if necessary."""
+    if pip_name is None:
+        pip_name = mod_name
+    
+    try:
+        __import__(mod_name)
+        return True
+    except ImportError:
+        print(f"Installing {pip_name}...")
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", pip_name])
+            __import__(mod_name)
+            return True
+        except Exception as e:
+            print(f"Failed to install {pip_name}: {e}")
+            return False
+
+# Ensure mutagen is available for formats the header parsers don't cover
+HAVE_MUTAGEN = _ensure_import("mutagen", "mutagen")
+if HAVE_MUTAGEN:
+    from mutagen import File as MutagenFile
+
+
+# Bytes read from the start of a file when looking for headers
+HEAD_BYTES = 64 * 1024
+
+# Bytes read from the end of an Ogg file when looking for the last page
+OGG_TAIL_BYTES = 64 * 1024
+
+# Seconds to wait for ffprobe before giving up on a file
+FFPROBE_TIMEOUT_SECONDS = 10
+
+# Extensions probed as MPEG audio even when the stream doesn't start cleanly
+MPEG_AUDIO_EXTS = {".mp3", ".mp2", ".mpga"}
+
+# MP3 bitrates (kbps) by [MPEG-1?][layer][index]
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# MP3 sample rates by version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_MP3_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+
+_ffprobe_path: Optional[str] = None
+_ffprobe_searched = False
+
+
+def find_ffprobe() -> Optional[str]:
+    """
+    Find the ffprobe executable on the system.
+
+    Returns:
+        Path to ffprobe or None if not found
+    """
+    global _ffprobe_path, _ffprobe_searched
+    if not _ffprobe_searched:
+        _ffprobe_path = shutil.which("ffprobe")
+        _ffprobe_searched = True
+    return _ffprobe_path
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Return the offset just past any ID3v2 tags at the start of data."""
+    offset = 0
+    while data[offset:offset + 3] == b"ID3" and len(data) >= offset + 10:
+        flags = data[offset + 5]
+        size = 0
+        for b in data[offset + 6:offset + 10]:
+            size = (size << 7) | (b & 0x7F)
+        offset += 10 + size + (10 if flags & 0x10 else 0)
+    return offset
+
+
+def _parse_mp3_header(header: bytes) -> Optional[dict]:
+    """Decode a 4-byte MPEG audio frame header, or None if it isn't one."""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer_bits = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    mono = (header[3] >> 6) == 3
+
+    if layer == 1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples_per_frame = 1152 if (layer == 2 or mpeg1) else 576
+        frame_length = (samples_per_frame // 8) * bitrate // sample_rate + padding
+
+    if mpeg1:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+
+    return {
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "samples_per_frame": samples_per_frame,
+        "frame_length": frame_length,
+        "side_info": side_info,
+    }
+
+
+def _find_mp3_frame(data: bytes, start: int):
+    """
+    Find the first frame header at or after start that is followed by another.
+
+    Requiring a second valid header one frame later keeps stray 0xFF bytes
+    in tags or junk from being taken for the stream start.
+    """
+    end = len(data) - 4
+    pos = start
+    while pos < end:
+        pos = data.find(b"\xFF", pos, end)
+        if pos < 0:
+            return None, None
+        frame = _parse_mp3_header(data[pos:pos + 4])
+        if frame:
+            following = pos + frame["frame_length"]
+            if following + 4 > len(data) or _parse_mp3_header(data[following:following + 4]):
+                return pos, frame
+        pos += 1
+    return None, None
+
+
+def _probe_mp3(f, data: bytes, file_size: int) -> Optional[float]:
+    """Duration of an MP3 from its VBR tag, or from the bitrate for CBR files."""
+    audio_start, frame = _find_mp3_frame(data, _skip_id3v2(data))
+    if frame is None:
+        return None
+    sample_rate = frame["sample_rate"]
+    spf = frame["samples_per_frame"]
+
+    # Xing/Info tag (LAME writes "Info" for CBR) right after the side info
+    xing = audio_start + 4 + frame["side_info"]
+    if data[xing:xing + 4] in (b"Xing", b"Info") and len(data) >= xing + 8:
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        if flags & 0x01 and len(data) >= xing + 12:
+            frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+            samples = frames * spf
+
+            # LAME tag follows the Xing fields; trim encoder delay and padding
+            lame = xing + 8
+            lame += 4 if flags & 0x01 else 0
+            lame += 4 if flags & 0x02 else 0
+            lame += 100 if flags & 0x04 else 0
+            lame += 4 if flags & 0x08 else 0
+            if data[lame:lame + 4] in (b"LAME", b"Lavf", b"Lavc") and len(data) >= lame + 24:
+                b0, b1, b2 = data[lame + 21:lame + 24]
+                delay = (b0 << 4) | (b1 >> 4)
+                padding = ((b1 & 0x0F) << 8) | b2
+                if delay + padding < samples:
+                    samples -= delay + padding
+            return samples / sample_rate
+
+    # VBRI tag (Fraunhofer) at a fixed offset
+    vbri = audio_start + 36
+    if data[vbri:vbri + 4] == b"VBRI" and len(data) >= vbri + 18:
+        frames = struct.unpack(">I", data[vbri + 14:vbri + 18])[0]
+        return frames * spf / sample_rate
+
+    # Constant bitrate: audio bytes over byte rate
+    audio_end = file_size
+    try:
+        f.seek(-128, 2)
+        if f.read(3) == b"TAG":
+            audio_end -= 128
+    except OSError:
+        pass
+    if frame["bitrate"] <= 0 or audio_end <= audio_start:
+        return None
+    return (audio_end - audio_start) * 8 / frame["bitrate"]
+
+
+def _probe_wav(f, file_size: int) -> Optional[float]:
+    """Duration of a RIFF/RF64 WAVE file from its fmt and data chunks."""
+    byte_rate = None
+    ds64_data_size = None
+    pos = 12
+    while pos + 8 <= file_size:
+        # Seek chunk to chunk so large LIST/bext chunks cost nothing to skip
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        chunk_id = header[:4]
+        chunk_size = struct.unpack("<I", header[4:])[0]
+        body = pos + 8
+        if chunk_id == b"ds64":
+            fields = f.read(16)
+            if len(fields) == 16:
+                ds64_data_size = struct.unpack("<Q", fields[8:16])[0]
+        elif chunk_id == b"fmt ":
+            fields = f.read(12)
+            if len(fields) == 12:
+                byte_rate = struct.unpack("<I", fields[8:12])[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            if chunk_size == 0xFFFFFFFF and ds64_data_size is not None:
+                chunk_size = ds64_data_size
+            # Streamed or truncated files claim more data than exists
+            chunk_size = min(chunk_size, file_size - body)
+            return chunk_size / byte_rate
+        pos = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _probe_flac(data: bytes) -> Optional[float]:
+    """Duration of a FLAC file from STREAMINFO."""
+    start = _skip_id3v2(data)
+    if data[start:start + 4] != b"fLaC" or len(data) < start + 26:
+        return None
+    # STREAMINFO is always the first metadata block
+    block = start + 4
+    if data[block] & 0x7F != 0:
+        return None
+    info = block + 4
+    packed = struct.unpack(">Q", data[info + 10:info + 18])[0]
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if sample_rate == 0 or total_samples == 0:
+        return None  # Unknown length (e.g. a stream); let the fallbacks try
+    return total_samples / sample_rate
+
+
+def _probe_ogg(f, data: bytes, file_size: int) -> Optional[float]:
+    """Duration of an Ogg Vorbis or Opus file from the last page's granule position."""
+    if len(data) < 28:
+        return None
+    packet = 27 + data[26]
+    if data[packet:packet + 7] == b"\x01vorbis" and len(data) >= packet + 16:
+        sample_rate = struct.unpack("<I", data[packet + 12:packet + 16])[0]
+        pre_skip = 0
+    elif data[packet:packet + 8] == b"OpusHead" and len(data) >= packet + 12:
+        sample_rate = 48000  # Opus granules always count 48 kHz samples
+        pre_skip = struct.unpack("<H", data[packet + 10:packet + 12])[0]
+    else:
+        return None
+
+    f.seek(max(0, file_size - OGG_TAIL_BYTES))
+    tail = f.read(OGG_TAIL_BYTES)
+    last_page = tail.rfind(b"OggS")
+    if sample_rate <= 0 or last_page < 0 or len(tail) < last_page + 14:
+        return None
+    granule = struct.unpack("<q", tail[last_page + 6:last_page + 14])[0]
+    if granule <= pre_skip:
+        return None
+    return (granule - pre_skip) / sample_rate
+
+
+def probe_headers(path: Path) -> Optional[float]:
+    """
+    Read a file's duration from its headers with the built-in parsers only.
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        Duration in seconds, or None if the format isn't recognized
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read(HEAD_BYTES)
+            file_size = Path(path).stat().st_size
+            if data[:4] in (b"RIFF", b"RF64") and data[8:12] == b"WAVE":
+                return _probe_wav(f, file_size)
+            if data[:4] == b"OggS":
+                return _probe_ogg(f, data, file_size)
+            start = _skip_id3v2(data)
+            if data[start:start + 4] == b"fLaC":
+                return _probe_flac(data)
+            # Other containers (MP4, WMA, ...) are left to the fallbacks
+            if start > 0 or _parse_mp3_header(data[:4]) or Path(path).suffix.lower() in MPEG_AUDIO_EXTS:
+                return _probe_mp3(f, data, file_size)
+            return None
+    except Exception:
+        return None
+
+
+def probe_with_mutagen(path: Path) -> Optional[float]:
+    """Duration from mutagen, or None if it isn't installed or can't read the file."""
+    if not HAVE_MUTAGEN:
+        return None
+    try:
+        audio = MutagenFile(str(path))
+        if audio and hasattr(audio.info, "length") and audio.info.length > 0:
+            return float(audio.info.length)
+    except Exception:
+        pass
+    return None
+
+
+def probe_with_ffprobe(path: Path) -> Optional[float]:
+    """Duration from ffprobe, or None if it isn't available or fails."""
+    ffprobe = find_ffprobe()
+    if not ffprobe:
+        return None
+    try:
+        result = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+            capture_output=True, text=True, timeout=FFPROBE_TIMEOUT_SECONDS
+        )
+        if result.returncode == 0:
+            duration = float(result.stdout.strip())
+            return duration if duration > 0 else None
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+def probe_duration(path: Path) -> Optional[float]:
+    """
+    Get an audio file's duration without decoding it.
+
+    Tries the built-in header parsers, then mutagen, then ffprobe.
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        Duration in seconds, or None if it cannot be determined
+    """
+    path = Path(path)
+    for probe in (probe_headers, probe_with_mutagen, probe_with_ffprobe):
+        duration = probe(path)
+        if duration is not None and duration > 0:
+            return duration
+    return None
+
+
+def probe_duration_ms(path: Path) -> int:
+    """Like probe_duration, in whole milliseconds (0 if unknown)."""
+    duration = probe_duration(path)
+    return int(duration * 1000) if duration else 0
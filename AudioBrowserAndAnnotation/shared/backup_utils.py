@@ -2,27 +2,69 @@
 Backup Utilities
 
 Common backup-related functions used across AudioBrowser applications.
-Handles metadata file backups with timestamped folders.
+Handles metadata file backups in each practice folder's .backup directory.
+
+Backups are content-addressed snapshots:
+- .backup/objects/<hh>/<sha256> holds each distinct file content once
+- .backup/YYYY-MM-DD-###.json is a small manifest mapping metadata file
+  names to blobs, so unchanged files (e.g. a large fingerprint cache) are
+  shared by every snapshot instead of being copied again
+- Automatic snapshots are rate-limited per folder and skipped when nothing
+  changed since the previous one
+
+Older full-copy backup folders (.backup/YYYY-MM-DD-###/) are still listed
+and restored.
 """
 
 import getpass
+import hashlib
+import json
+import os
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Tuple
+from typing import Any, List, Optional, Dict, Tuple
+
+from . import json_io
+from .file_utils import atomic_write_bytes
+from .metadata_cache import get_metadata_cache
 
 from .metadata_constants import (
     NAMES_JSON,
     DURATIONS_JSON,
     WAVEFORM_JSON,
     FINGERPRINTS_JSON,
+    FINGERPRINT_VECTORS_NPZ,
     TEMPO_JSON,
     TAKES_METADATA_JSON,
     PRACTICE_GOALS_JSON,
     SETLISTS_JSON,
     CLIPS_JSON,
+    FOLDER_STORE_JSON,
+    ANNOTATION_JOURNAL_SUFFIX,
 )
 
 
+# Backup directory inside each practice folder
+BACKUP_DIR_NAME = ".backup"
+
+# Blob store inside the backup directory
+BACKUP_OBJECTS_DIR = "objects"
+
+# Snapshot manifest format version
+SNAPSHOT_MANIFEST_VERSION = 1
+
+# Automatic snapshots of one folder are at least this far apart
+BACKUP_MIN_INTERVAL_SECONDS = 300
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Practice folder -> time.time() of its last automatic snapshot check
+_last_snapshot_times: Dict[str, float] = {}
+_snapshot_lock = threading.Lock()
+
+
 def create_backup_folder_name(practice_folder: Path) -> Path:
     """
     Create a unique backup folder name with format .backup/YYYY-MM-DD-###
@@ -39,15 +81,21 @@ def create_backup_folder_name(practice_folder: Path) -> Path:
     """
     today = datetime.now()
     date_str = today.strftime("%Y-%m-%d")
-    backups_dir = practice_folder / ".backup"
+    backups_dir = practice_folder / BACKUP_DIR_NAME
     
-    # Find the next available number for today
-    counter = 1
-    while True:
-        backup_folder = backups_dir / f"{date_str}-{counter:03d}"
-        if not backup_folder.exists():
-            return backup_folder
-        counter += 1
+    # Find the next number for today with one listing (folders and manifests share the sequence)
+    prefix = f"{date_str}-"
+    highest = 0
+    try:
+        with os.scandir(backups_dir) as it:
+            for entry in it:
+                if entry.name.startswith(prefix):
+                    counter = entry.name[len(prefix):].split(".", 1)[0]
+                    if counter.isdigit():
+                        highest = max(highest, int(counter))
+    except OSError:
+        pass  # No backups yet
+    return backups_dir / f"{date_str}-{highest + 1:03d}"
 
 
 def get_metadata_files_to_backup(practice_folder: Path) -> List[Path]:
@@ -58,13 +106,15 @@ def get_metadata_files_to_backup(practice_folder: Path) -> List[Path]:
     - .provided_names.json (file naming data)
     - .duration_cache.json (playback duration cache)
     - .waveforms/.waveform_cache.json (waveform visualization cache)
-    - .audio_fingerprints.json (audio fingerprint data)
+    - .audio_fingerprints.json (audio fingerprint data / compact manifest)
+    - .audio_fingerprints.npz (compact fingerprint vectors)
     - .tempo.json (tempo/BPM data)
     - .takes_metadata.json (best/partial take indicators)
     - .practice_goals.json (practice goals)
     - .setlists.json (setlist data)
     - .clips.json (clip definitions)
     - .audio_notes_<username>.json (user-specific annotation data)
+    - .audio_notes_<username>.json.journal (annotation edits not yet compacted)
     
     Args:
         practice_folder: Directory to scan for metadata files
@@ -84,11 +134,13 @@ def get_metadata_files_to_backup(practice_folder: Path) -> List[Path]:
         practice_folder / DURATIONS_JSON,
         practice_folder / ".waveforms" / WAVEFORM_JSON,  # Waveform cache in .waveforms subdirectory
         practice_folder / FINGERPRINTS_JSON,
+        practice_folder / FINGERPRINT_VECTORS_NPZ,
         practice_folder / TEMPO_JSON,
         practice_folder / TAKES_METADATA_JSON,
         practice_folder / PRACTICE_GOALS_JSON,
         practice_folder / SETLISTS_JSON,
         practice_folder / CLIPS_JSON,
+        practice_folder / FOLDER_STORE_JSON,
     ]
     
     # Add user-specific annotation files
@@ -101,6 +153,9 @@ def get_metadata_files_to_backup(practice_folder: Path) -> List[Path]:
         if json_file not in possible_files:
             possible_files.append(json_file)
     
+    # Annotation journals not yet compacted into their files
+    possible_files.extend(practice_folder.glob(".audio_notes_*.json" + ANNOTATION_JOURNAL_SUFFIX))
+    
     # Only include files that actually exist and are not in backup directories
     for file_path in possible_files:
         if file_path.exists() and file_path.is_file():
@@ -157,31 +212,173 @@ def backup_metadata_files(practice_folder: Path, backup_base_folder: Path) -> in
     return backed_up_count
 
 
-def create_metadata_backup_if_needed(practice_folder: Path) -> Optional[Path]:
+def is_snapshot_manifest(path: Path) -> bool:
+    """Check whether a backup path is a snapshot manifest (rather than a full-copy folder)."""
+    path = Path(path)
+    return path.suffix == ".json" and path.parent.name == BACKUP_DIR_NAME
+
+
+def read_snapshot_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """
+    Read a snapshot manifest.
+    
+    Returns:
+        Manifest dict with a 'files' mapping of relative name to
+        {'sha256', 'size', 'mtime_ns'}; empty 'files' if unreadable
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("files"), dict):
+            return data
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read backup manifest {manifest_path}: {e}")
+    return {"version": SNAPSHOT_MANIFEST_VERSION, "files": {}}
+
+
+def latest_snapshot(practice_folder: Path) -> Optional[Path]:
+    """Newest snapshot manifest of a practice folder, or None."""
+    backups_dir = practice_folder / BACKUP_DIR_NAME
+    try:
+        with os.scandir(backups_dir) as it:
+            names = [e.name for e in it
+                     if e.name.endswith(".json") and e.name[:1].isdigit() and e.is_file()]
+    except OSError:
+        return None
+    return backups_dir / max(names) if names else None
+
+
+def _blob_path(backups_dir: Path, digest: str) -> Path:
+    return backups_dir / BACKUP_OBJECTS_DIR / digest[:2] / digest[2:]
+
+
+def _store_blob(backups_dir: Path, source: Path) -> Tuple[str, int]:
+    """
+    Copy a file into the blob store, hashing it in the same pass.
+    
+    Returns:
+        (sha256 hex digest, size in bytes)
+    """
+    objects_dir = backups_dir / BACKUP_OBJECTS_DIR
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = objects_dir / f".incoming-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(source, "rb") as src, open(temp_path, "wb") as dst:
+            while True:
+                chunk = src.read(_HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+        hex_digest = digest.hexdigest()
+        blob = _blob_path(backups_dir, hex_digest)
+        if blob.exists():
+            temp_path.unlink()  # Same content already stored
+        else:
+            blob.parent.mkdir(exist_ok=True)
+            os.replace(temp_path, blob)
+        return hex_digest, size
+    except OSError:
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def create_snapshot(practice_folder: Path) -> Optional[Path]:
+    """
+    Snapshot the folder's metadata files into the content-addressed store.
+    
+    Files whose size and mtime match the previous snapshot reuse its blob
+    without being read; others are hashed and stored once per distinct
+    content.
+    
+    Args:
+        practice_folder: Practice folder to back up
+        
+    Returns:
+        Path to the new manifest, or None if there was nothing to back up or
+        nothing changed since the previous snapshot
+    """
+    metadata_files = get_metadata_files_to_backup(practice_folder)
+    if not metadata_files:
+        return None
+    
+    backups_dir = practice_folder / BACKUP_DIR_NAME
+    previous = latest_snapshot(practice_folder)
+    previous_files = read_snapshot_manifest(previous)["files"] if previous else {}
+    
+    files = {}
+    for metadata_file in metadata_files:
+        relative = metadata_file.relative_to(practice_folder).as_posix()
+        try:
+            st = metadata_file.stat()
+            old = previous_files.get(relative)
+            if (isinstance(old, dict) and old.get("size") == st.st_size
+                    and old.get("mtime_ns") == st.st_mtime_ns
+                    and _blob_path(backups_dir, old.get("sha256", "")).exists()):
+                files[relative] = old
+                continue
+            digest, size = _store_blob(backups_dir, metadata_file)
+            files[relative] = {"sha256": digest, "size": size, "mtime_ns": st.st_mtime_ns}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to backup {metadata_file}: {e}")
+    
+    if not files:
+        return None
+    if previous is not None and {k: v["sha256"] for k, v in files.items()} == \
+            {k: v.get("sha256") for k, v in previous_files.items() if isinstance(v, dict)}:
+        return None  # Identical to the previous snapshot
+    
+    manifest_path = create_backup_folder_name(practice_folder).with_suffix(".json")
+    json_io.write_json(manifest_path, {
+        "version": SNAPSHOT_MANIFEST_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "files": files,
+    })
+    return manifest_path
+
+
+def create_metadata_backup_if_needed(practice_folder: Path,
+                                     min_interval: float = BACKUP_MIN_INTERVAL_SECONDS) -> Optional[Path]:
     """
     Create a backup of metadata files if needed.
     
     This function implements the main backup logic:
-    1. Check if there are metadata files that could change
-    2. Create a timestamped backup folder if needed
-    3. Copy all metadata files to the backup folder
+    1. Skip if this folder was snapshotted less than min_interval seconds ago
+    2. Check if there are metadata files that could change
+    3. Snapshot them into the content-addressed store (see create_snapshot)
     
     Args:
         practice_folder: Practice folder to backup
+        min_interval: Minimum seconds between automatic snapshots of the folder
         
     Returns:
-        Path to the created backup folder, or None if no backup was needed
+        Path to the created snapshot manifest, or None if no backup was needed
     """
+    key = str(practice_folder)
+    now = time.time()
+    with _snapshot_lock:
+        last = _last_snapshot_times.get(key)
+        if last is None:
+            # First check this session: the newest snapshot on disk counts too
+            previous = latest_snapshot(practice_folder)
+            if previous is not None:
+                try:
+                    last = previous.stat().st_mtime
+                except OSError:
+                    last = None
+        if last is not None and now - last < min_interval:
+            return None
+        _last_snapshot_times[key] = now
+    
     if not should_create_backup(practice_folder):
         return None
-    
-    backup_folder = create_backup_folder_name(practice_folder)
-    num_backed_up = backup_metadata_files(practice_folder, backup_folder)
-    
-    if num_backed_up > 0:
-        return backup_folder
-    
-    return None
+    return create_snapshot(practice_folder)
 
 
 def discover_available_backups(root_path: Path) -> List[Tuple[Path, str]]:
@@ -200,31 +397,53 @@ def discover_available_backups(root_path: Path) -> List[Tuple[Path, str]]:
     backups = []
     
     try:
-        for backup_dir in root_path.rglob(".backup"):
+        for backup_dir in root_path.rglob(BACKUP_DIR_NAME):
             if backup_dir.is_dir():
-                # Find all dated backup folders
+                # Find all snapshot manifests and older dated backup folders
                 for backup_folder in backup_dir.iterdir():
-                    if backup_folder.is_dir() and backup_folder.name[0].isdigit():
+                    if not backup_folder.name[0].isdigit():
+                        continue
+                    if backup_folder.is_dir() or is_snapshot_manifest(backup_folder):
                         # Create display name with practice folder and date
                         practice_folder = backup_dir.parent
                         relative_path = practice_folder.relative_to(root_path)
-                        display_name = f"{relative_path} - {backup_folder.name}"
+                        display_name = f"{relative_path} - {backup_name(backup_folder)}"
                         backups.append((backup_folder, display_name))
     except Exception as e:
         print(f"Error discovering backups: {e}")
     
     # Sort by date (newest first)
-    backups.sort(key=lambda x: x[0].name, reverse=True)
+    backups.sort(key=lambda x: backup_name(x[0]), reverse=True)
     
     return backups
 
 
+def backup_name(backup_path: Path) -> str:
+    """Display name of a backup (YYYY-MM-DD-###) for manifests and folders alike."""
+    return backup_path.stem if is_snapshot_manifest(backup_path) else backup_path.name
+
+
+def list_backup_files(backup_path: Path) -> List[str]:
+    """
+    Names of the metadata files in a backup, relative to the practice folder.
+    
+    Args:
+        backup_path: Snapshot manifest or full-copy backup folder
+    """
+    if is_snapshot_manifest(backup_path):
+        return sorted(read_snapshot_manifest(backup_path)["files"])
+    try:
+        return sorted(p.name for p in Path(backup_path).iterdir() if p.is_file())
+    except OSError:
+        return []
+
+
 def get_backup_contents(backup_folder: Path, root_path: Path) -> Dict[Path, List[Path]]:
     """
     Get the contents of a backup folder organized by practice folder.
     
     Args:
-        backup_folder: Path to the backup folder
+        backup_folder: Snapshot manifest or full-copy backup folder
         root_path: Root directory for relative path calculation
         
     Returns:
@@ -236,6 +455,12 @@ def get_backup_contents(backup_folder: Path, root_path: Path) -> Dict[Path, List
         # The practice folder is the parent of .backup
         practice_folder = backup_folder.parent.parent
         
+        if is_snapshot_manifest(backup_folder):
+            names = list_backup_files(backup_folder)
+            if names:
+                contents[practice_folder] = [practice_folder / name for name in names]
+            return contents
+        
         # List all files in the backup folder
         backed_up_files = []
         for file_path in backup_folder.iterdir():
@@ -252,10 +477,10 @@ def get_backup_contents(backup_folder: Path, root_path: Path) -> Dict[Path, List
 
 def restore_metadata_from_backup(backup_folder: Path, target_practice_folder: Path, root_path: Path) -> int:
     """
-    Restore metadata files from a backup folder to the target practice folder.
+    Restore metadata files from a backup to the target practice folder.
     
     Args:
-        backup_folder: Path to the backup folder
+        backup_folder: Snapshot manifest or full-copy backup folder
         target_practice_folder: Destination practice folder
         root_path: Root directory (for logging/display purposes)
         
@@ -264,6 +489,29 @@ def restore_metadata_from_backup(backup_folder: Path, target_practice_folder: Pa
     """
     restored_count = 0
     
+    if is_snapshot_manifest(backup_folder):
+        backups_dir = backup_folder.parent
+        restored = read_snapshot_manifest(backup_folder)["files"]
+        # A journal the backup doesn't have would replay newer edits over the restored files
+        for journal in target_practice_folder.glob(".audio_notes_*.json" + ANNOTATION_JOURNAL_SUFFIX):
+            if journal.name not in restored:
+                try:
+                    journal.unlink()
+                except OSError as e:
+                    print(f"Warning: Could not remove {journal.name}: {e}")
+        for relative, info in restored.items():
+            try:
+                blob = _blob_path(backups_dir, info["sha256"])
+                target_file = target_practice_folder / relative
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(blob, "rb") as src:
+                    atomic_write_bytes(target_file, lambda dst: dst.write(src.read()))
+                get_metadata_cache().invalidate(target_file)
+                restored_count += 1
+            except (OSError, KeyError, TypeError) as e:
+                print(f"Warning: Failed to restore {relative}: {e}")
+        return restored_count
+    
     try:
         # List all files in the backup folder
         for backup_file in backup_folder.iterdir():
@@ -272,6 +520,7 @@ def restore_metadata_from_backup(backup_folder: Path, target_practice_folder: Pa
                 target_file = target_practice_folder / backup_file.name
                 try:
                     target_file.write_bytes(backup_file.read_bytes())
+                    get_metadata_cache().invalidate(target_file)
                     restored_count += 1
                 except Exception as e:
                     print(f"Warning: Failed to restore {backup_file.name}: {e}")
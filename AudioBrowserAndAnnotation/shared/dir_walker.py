@@ -0,0 +1,203 @@
+"""
+Directory Walker
+
+Single-pass directory traversal shared by the AudioBrowser applications.
+
+Each directory is listed exactly once with os.scandir. File/directory
+checks use the type information cached on each DirEntry, so a folder of
+N files costs one listing rather than a glob per audio extension plus an
+iterdir and a stat per entry.
+
+On network shares each listing is a round trip, so walk_directories can
+also list several directories at once on a thread pool (workers > 1). The
+output is the same in both modes.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .metadata_constants import AUDIO_EXTS
+
+
+class DirListing(NamedTuple):
+    """One directory's contents, from a single scandir call."""
+    path: Path
+    relative: str               # POSIX path from the walk root ("" for the root)
+    dirs: List[os.DirEntry]     # Subdirectories to descend into (prune in place)
+    files: List[os.DirEntry]    # All regular files
+    audio: List[os.DirEntry]    # Files whose extension is an audio extension
+
+    def has_file(self, name: str) -> bool:
+        """Check whether this directory contains a file with the given name."""
+        return any(entry.name == name for entry in self.files)
+
+
+class WalkStats:
+    """Throughput of one walk_directories call, updated as the walk runs."""
+
+    def __init__(self):
+        self.directories = 0    # Directories yielded so far
+        self.elapsed = 0.0      # Seconds since the walk started
+        self.workers = 1
+        self.canceled = False
+
+    @property
+    def dirs_per_second(self) -> float:
+        return self.directories / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        mode = f"{self.workers} workers" if self.workers > 1 else "serial"
+        return (f"{self.directories} directories in {self.elapsed:.2f}s "
+                f"({self.dirs_per_second:.0f} dirs/s, {mode})")
+
+
+def skip_hidden_dir(name: str) -> bool:
+    """Default directory filter: skip dot-directories (.backup, .git, ...)."""
+    return name.startswith(".")
+
+
+def skip_dirs_named(names: Iterable[str], hidden: bool = True) -> Callable[[str], bool]:
+    """
+    Build a directory filter skipping the given names (case-insensitive).
+
+    Args:
+        names: Directory names to skip
+        hidden: Also skip dot-directories
+    """
+    lowered = {n.lower() for n in names}
+    return lambda name: (hidden and name.startswith(".")) or name.lower() in lowered
+
+
+def scan_directory(path: Path, audio_exts: Iterable[str] = AUDIO_EXTS,
+                   skip_dir: Optional[Callable[[str], bool]] = skip_hidden_dir,
+                   relative: str = "") -> DirListing:
+    """
+    List one directory.
+
+    Args:
+        path: Directory to list
+        audio_exts: Lower-case extensions counted as audio (matched case-insensitively)
+        skip_dir: Predicate on a subdirectory name; True leaves it out of dirs
+        relative: Value for the listing's relative field
+
+    Returns:
+        DirListing with subdirectories and files sorted by name
+
+    Raises:
+        OSError: If the directory cannot be read
+    """
+    exts = {e.lower() for e in audio_exts}
+    dirs, files, audio = [], [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    if skip_dir is None or not skip_dir(entry.name):
+                        dirs.append(entry)
+                elif entry.is_file():
+                    files.append(entry)
+                    if os.path.splitext(entry.name)[1].lower() in exts:
+                        audio.append(entry)
+            except OSError:
+                continue  # Broken symlink or entry removed mid-listing
+    dirs.sort(key=lambda e: e.name)
+    files.sort(key=lambda e: e.name)
+    audio.sort(key=lambda e: e.name)
+    return DirListing(Path(path), relative, dirs, files, audio)
+
+
+def _list_directory(path: Path, audio_exts: Iterable[str],
+                    skip_dir: Optional[Callable[[str], bool]],
+                    relative: str) -> Tuple[Tuple[int, int], DirListing]:
+    """Identify (device, inode) and list one directory; raises OSError."""
+    st = os.stat(path)
+    return (st.st_dev, st.st_ino), scan_directory(path, audio_exts, skip_dir, relative)
+
+
+def walk_directories(root: Path, audio_exts: Iterable[str] = AUDIO_EXTS,
+                     skip_dir: Optional[Callable[[str], bool]] = skip_hidden_dir,
+                     max_depth: Optional[int] = None, workers: int = 1,
+                     should_stop: Optional[Callable[[], bool]] = None,
+                     stats: Optional[WalkStats] = None) -> Iterator[DirListing]:
+    """
+    Walk a directory tree top-down, listing each directory once.
+
+    Like os.walk, callers may remove entries from a listing's dirs before
+    the walk continues to prune the traversal. Unreadable directories are
+    skipped. Symlinked directories are followed, but each directory is
+    visited at most once so link cycles can't loop forever.
+
+    With workers > 1, a directory's subdirectories are listed on a thread
+    pool as soon as it has been yielded, while the caller handles the
+    listings ahead of them. Listings are still yielded in the serial order.
+
+    Args:
+        root: Directory to start from (yielded first)
+        audio_exts: Lower-case extensions counted as audio
+        skip_dir: Predicate on a subdirectory name; True skips that subtree
+        max_depth: Levels below root to descend (None for unlimited, 0 for
+            the root only)
+        workers: Directories listed concurrently (1 lists them serially)
+        should_stop: Polled before each directory; True ends the walk
+        stats: Filled in with the number of directories and elapsed time
+
+    Yields:
+        DirListing for each directory, parents before children
+    """
+    root = Path(root)
+    exts = {e.lower() for e in audio_exts}
+    stats = stats if stats is not None else WalkStats()
+    stats.workers = max(1, workers)
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def submit(path: Path, relative: str):
+        if pool is None:
+            return None
+        return pool.submit(_list_directory, path, exts, skip_dir, relative)
+
+    stack = [(root, "", 0, submit(root, ""))]
+    visited = set()
+    try:
+        while stack:
+            if should_stop is not None and should_stop():
+                stats.canceled = True
+                break
+            path, relative, depth, future = stack.pop()
+            try:
+                if future is None:
+                    key, listing = _list_directory(path, exts, skip_dir, relative)
+                else:
+                    key, listing = future.result()
+            except OSError:
+                continue  # Skip directories we can't read
+            if key in visited:
+                continue
+            visited.add(key)
+
+            stats.directories += 1
+            stats.elapsed = time.perf_counter() - start
+            yield listing
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+            # Submitted in name order so the pool lists them in the order
+            # they'll be needed; pushed reversed so the stack pops them that way
+            children = []
+            for entry in listing.dirs:
+                child_relative = f"{relative}/{entry.name}" if relative else entry.name
+                child_path = Path(entry.path)
+                children.append((child_path, child_relative, depth + 1,
+                                 submit(child_path, child_relative)))
+            stack.extend(reversed(children))
+    finally:
+        stats.elapsed = time.perf_counter() - start
+        if pool is not None:
+            # Listings not yet started are dropped (shutdown's cancel_futures needs 3.9)
+            for _, _, _, pending in stack:
+                if pending is not None:
+                    pending.cancel()
+            pool.shutdown(wait=False)
@@ -4,9 +4,11 @@ File Utilities
 Common file handling utility functions used across AudioBrowser applications.
 """
 
+import os
 import re
+import uuid
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Callable, Tuple
 
 
 def sanitize(name: str) -> str:
@@ -53,3 +55,44 @@ def file_signature(p: Path) -> Tuple[int, int]:
         return int(st.st_size), int(st.st_mtime)
     except Exception:
         return (0, 0)
+
+
+def atomic_write_bytes(path: Path, writer: Callable) -> None:
+    """
+    Write a file so readers never see it half-written.
+    
+    The content goes to a temporary sibling file, is flushed to disk, and
+    then replaces the target with os.replace. A crash leaves either the old
+    file or the new one, never a truncated mix.
+    
+    Args:
+        path: Target file
+        writer: Callable receiving the open binary file object
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            writer(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+def atomic_write_json(path: Path, data: Any, indent: int = 2) -> None:
+    """
+    Write readable JSON atomically (see json_io.write_json).
+    
+    Args:
+        path: Target file
+        data: JSON-serializable data
+        indent: Indentation of the output
+    """
+    from .json_io import write_json
+    write_json(path, data, compact=False, indent=indent)
@@ -0,0 +1,184 @@
+"""
+Fingerprint Store
+
+Compact on-disk storage for audio fingerprint caches, shared by the
+AudioBrowser applications.
+
+A compact cache is two files in the practice folder:
+- .audio_fingerprints.json: a small manifest holding flags, exclusions and
+  per-file metadata (size, mtime, duration), with no vectors
+- .audio_fingerprints.npz: per algorithm, every file's vector concatenated
+  into one flat float16 (float32 for hash-based algorithms) array, plus an
+  offsets array and the index of the file each vector belongs to
+
+Readers get back the same dictionary shape as the legacy all-JSON format,
+so callers don't need to know which format is on disk; compact caches carry
+an extra "storage": "npz" key. The cache's own "version" field is left to
+the callers. Legacy files are still read as-is; they are upgraded the next
+time a writer that uses this module saves the cache.
+"""
+
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+from . import json_io
+from .file_utils import atomic_write_bytes
+from .metadata_constants import FINGERPRINTS_JSON, FINGERPRINT_VECTORS_NPZ
+
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    np = None
+    HAVE_NUMPY = False
+
+
+# Value of the "storage" key marking a compact cache
+COMPACT_STORAGE = "npz"
+
+# Layout version of the compact manifest + vector file pair
+COMPACT_STORE_VERSION = 1
+
+# Algorithms whose values are hash-derived and lose meaning at half precision
+FLOAT32_ALGORITHMS = {"audfprint"}
+
+
+def is_compact_manifest(data: Dict) -> bool:
+    """Check whether a parsed fingerprint cache or manifest uses compact storage."""
+    return isinstance(data, dict) and data.get("storage") == COMPACT_STORAGE
+
+
+def split_fingerprint_cache(cache: Dict):
+    """
+    Split a legacy-shaped cache into a vector-free manifest and packed arrays.
+
+    Returns:
+        Tuple of (manifest, arrays) where arrays maps npz keys to numpy arrays
+    """
+    manifest = {k: v for k, v in cache.items() if k != "files"}
+    names = sorted(cache.get("files", {}).keys())
+    manifest_files = {}
+    per_algorithm: Dict[str, list] = {}
+
+    for index, name in enumerate(names):
+        data = cache["files"][name]
+        if not isinstance(data, dict):
+            continue
+        entry = {k: v for k, v in data.items() if k not in ("fingerprints", "fingerprint")}
+        manifest_files[name] = entry
+        for algorithm, vector in (data.get("fingerprints") or {}).items():
+            if vector is not None:
+                per_algorithm.setdefault(algorithm, []).append((index, vector))
+
+    arrays = {}
+    for algorithm, items in per_algorithm.items():
+        dtype = np.float32 if algorithm in FLOAT32_ALGORITHMS else np.float16
+        lengths = [len(vector) for _, vector in items]
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lengths)
+        flat = np.empty(int(offsets[-1]), dtype=dtype)
+        for (_, vector), start, end in zip(items, offsets[:-1], offsets[1:]):
+            flat[start:end] = vector
+        arrays[f"{algorithm}/data"] = flat
+        arrays[f"{algorithm}/offsets"] = offsets
+        arrays[f"{algorithm}/files"] = np.array([index for index, _ in items], dtype=np.int32)
+
+    manifest.setdefault("version", 1)
+    manifest["storage"] = COMPACT_STORAGE
+    manifest["storage_version"] = COMPACT_STORE_VERSION
+    manifest["names"] = names
+    manifest["algorithms"] = sorted(per_algorithm.keys())
+    manifest["files"] = manifest_files
+    manifest.setdefault("excluded_files", [])
+    return manifest, arrays
+
+
+def write_fingerprint_store(dirpath: Path, cache: Dict) -> bool:
+    """
+    Save a fingerprint cache in the compact format.
+
+    The vector file is written first and the manifest last, both atomically.
+    A shared token in both files lets readers detect a mismatched pair (e.g.
+    a crash between the two writes, or a partial sync) and ignore the vectors
+    rather than attach them to the wrong files.
+
+    Returns:
+        True if written, False if numpy is unavailable (caller should fall
+        back to the legacy JSON format)
+    """
+    if not HAVE_NUMPY:
+        return False
+
+    dirpath = Path(dirpath)
+    manifest, arrays = split_fingerprint_cache(cache)
+    token = uuid.uuid4().hex
+    manifest["vectors_token"] = token
+    arrays["__token__"] = np.array(token)
+
+    atomic_write_bytes(dirpath / FINGERPRINT_VECTORS_NPZ, lambda f: np.savez(f, **arrays))
+    json_io.write_json(dirpath / FINGERPRINTS_JSON, manifest)
+    return True
+
+
+def attach_fingerprint_vectors(dirpath: Path, manifest: Dict) -> Dict:
+    """
+    Expand a compact manifest into the legacy cache shape.
+
+    Files keep their metadata; each gets a "fingerprints" dict filled from
+    the vector file (as lists of floats). Missing or mismatched vector files
+    yield empty fingerprint dicts so the vectors are simply regenerated.
+    """
+    cache = {k: v for k, v in manifest.items()
+             if k not in ("storage_version", "names", "algorithms", "vectors_token", "files")}
+    files = {name: {**(data if isinstance(data, dict) else {}), "fingerprints": {}}
+             for name, data in manifest.get("files", {}).items()}
+    cache["files"] = files
+    cache.setdefault("excluded_files", [])
+
+    if not HAVE_NUMPY:
+        print("Warning: numpy is required to read compact fingerprint vectors")
+        return cache
+
+    vectors_path = Path(dirpath) / FINGERPRINT_VECTORS_NPZ
+    try:
+        with np.load(vectors_path, allow_pickle=False) as npz:
+            if "__token__" not in npz.files or str(npz["__token__"]) != manifest.get("vectors_token"):
+                print(f"Warning: fingerprint vectors in {dirpath} do not match the manifest; ignoring them")
+                return cache
+            names = manifest.get("names", [])
+            for algorithm in manifest.get("algorithms", []):
+                flat = npz[f"{algorithm}/data"].astype(np.float32)
+                offsets = npz[f"{algorithm}/offsets"]
+                for i, index in enumerate(npz[f"{algorithm}/files"]):
+                    name = names[index]
+                    if name in files:
+                        files[name]["fingerprints"][algorithm] = flat[offsets[i]:offsets[i + 1]].tolist()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: Could not read fingerprint vectors: {e}")
+
+    return cache
+
+
+def read_fingerprint_store(dirpath: Path) -> Optional[Dict]:
+    """
+    Read a fingerprint cache in either format.
+
+    Returns:
+        Cache in the legacy dictionary shape, or None if the folder has no
+        readable fingerprint cache. Legacy data is returned unmigrated.
+    """
+    dirpath = Path(dirpath)
+    try:
+        data = json_io.read_json(dirpath / FINGERPRINTS_JSON)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Could not load fingerprint cache: {e}")
+        return None
+
+    if is_compact_manifest(data):
+        return attach_fingerprint_vectors(dirpath, data)
+    return data if isinstance(data, dict) else None
@@ -0,0 +1,332 @@
+"""
+Folder Store
+
+Optional single-file metadata store for a practice folder. The contents of
+.provided_names.json, .duration_cache.json, .takes_metadata.json,
+.tempo.json, .audio_analysis.json and the .audio_notes_<user>.json files
+are kept as sections of one .folder_store.json, so opening a folder parses
+one file and a save changes one file for sync clients to upload.
+
+The legacy files stay in place for the original AudioBrowser, the library
+catalog and backups:
+- a section's legacy file is written when the section is first created
+- later saves only mark the section dirty in the store; export_folder_store
+  writes dirty sections back out (the QML app does so on folder switch and
+  exit)
+- a legacy file changed by another application since it was last exported
+  is read instead of its (clean) section, and import_folder_store takes it
+  into the store
+- if a dirty section's legacy file was changed too, export merges the two:
+  the section's changes since it became dirty are reapplied on top of the
+  other application's version
+
+Sections are read and written through the shared metadata cache (see
+metadata_cache.set_folder_store_enabled), so managers don't need to know
+whether a folder has a store.
+"""
+
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .metadata_cache import MetadataCache, PathLike, copy_json
+from .metadata_constants import (
+    ANALYSIS_JSON,
+    DURATIONS_JSON,
+    FOLDER_STORE_JSON,
+    NAMES_JSON,
+    TAKES_METADATA_JSON,
+    TEMPO_JSON,
+)
+
+
+FOLDER_STORE_VERSION = 1
+
+# Legacy files kept as store sections (plus the per-user annotation sets files)
+STORE_SECTIONS = {NAMES_JSON, DURATIONS_JSON, TAKES_METADATA_JSON, TEMPO_JSON, ANALYSIS_JSON}
+
+# Marks a key missing from one side of a merge
+_MISSING = object()
+
+# Folders with dirty sections written by this process
+_dirty_folders: Set[str] = set()
+_dirty_lock = threading.Lock()
+
+
+def is_store_section(name: str) -> bool:
+    """Whether a metadata file name is kept in the folder store."""
+    if name in STORE_SECTIONS:
+        return True
+    return name.startswith(".audio_notes_") and name.endswith(".json")
+
+
+def get_store_path(folder: PathLike) -> Path:
+    """Path of a folder's store file."""
+    return Path(folder) / FOLDER_STORE_JSON
+
+
+def _legacy_signature(path: Path) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _read_store(cache: MetadataCache, folder: Path) -> Optional[Dict[str, Any]]:
+    """A folder's store (shared, read-only), or None if it has none."""
+    store = cache.load_json(get_store_path(folder))
+    if isinstance(store, dict) and store.get("version") == FOLDER_STORE_VERSION \
+            and isinstance(store.get("sections"), dict):
+        return store
+    return None
+
+
+def _editable(store: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of a store whose top-level tables can be changed (sections are shared)."""
+    return {
+        "version": FOLDER_STORE_VERSION,
+        "updated": store.get("updated", ""),
+        "sections": dict(store.get("sections", {})),
+        "legacy": dict(store.get("legacy", {})),
+        "dirty": list(store.get("dirty", [])),
+        "base": dict(store.get("base", {})),
+    }
+
+
+def _write_store(cache: MetadataCache, folder: Path, store: Dict[str, Any]) -> None:
+    store["updated"] = datetime.now().isoformat(timespec="seconds")
+    cache.save_json(get_store_path(folder), store)
+    with _dirty_lock:
+        if store["dirty"]:
+            _dirty_folders.add(str(folder))
+        else:
+            _dirty_folders.discard(str(folder))
+
+
+def _legacy_changed(store: Dict[str, Any], path: Path) -> bool:
+    """Whether a clean section's legacy file was changed since it was exported."""
+    if path.name in store.get("dirty", []):
+        return False
+    return _legacy_signature(path) != store.get("legacy", {}).get(path.name)
+
+
+def has_folder_store(cache: MetadataCache, folder: PathLike) -> bool:
+    """Whether a folder has a store file."""
+    return _read_store(cache, Path(folder)) is not None
+
+
+def load_section(cache: MetadataCache, path: PathLike, default: Any = None, copy: bool = False) -> Any:
+    """
+    Load a metadata file's data from its folder's store.
+
+    Falls back to the legacy file if the folder has no store, the store has
+    no such section, or the legacy file was changed by another application.
+
+    Args:
+        cache: Metadata cache holding the parsed store
+        path: Legacy metadata file
+        default: Returned when there is no data
+        copy: Return a private copy the caller may modify
+    """
+    path = Path(path)
+    store = _read_store(cache, path.parent)
+    if store is None or path.name not in store["sections"] or _legacy_changed(store, path):
+        return cache.load_json(path, default, copy=copy)
+    data = store["sections"][path.name]
+    return copy_json(data) if copy else data
+
+
+def section_signature(cache: MetadataCache, path: PathLike) -> Optional[Tuple]:
+    """
+    Signature that changes whenever load_section's result may change.
+
+    Returns:
+        (store signature, legacy file signature), or None if neither exists
+    """
+    path = Path(path)
+    store_signature = _legacy_signature(get_store_path(path.parent))
+    legacy_signature = _legacy_signature(path)
+    if store_signature is None and legacy_signature is None:
+        return None
+    return (tuple(store_signature or ()), tuple(legacy_signature or ()))
+
+
+def save_section(cache: MetadataCache, path: PathLike, data: Any, indent: int = 2) -> None:
+    """
+    Save a metadata file's data as a section of its folder's store.
+
+    A folder without a store gets one, seeded from its legacy files.
+
+    Raises:
+        OSError, TypeError, ValueError: If a file can't be written
+    """
+    path = Path(path)
+    folder = path.parent
+    current = _read_store(cache, folder)
+    if current is None:
+        store = _editable({})
+        _import_legacy(cache, folder, store)
+    else:
+        store = _editable(current)
+
+    dirty = set(store["dirty"])
+    if path.exists():
+        if path.name not in dirty:
+            # Remember what the change was made against, for merging on export
+            if _legacy_changed(store, path):
+                store["base"][path.name] = cache.load_json(path)
+                store["legacy"][path.name] = _legacy_signature(path)
+            else:
+                store["base"][path.name] = store["sections"].get(path.name)
+        dirty.add(path.name)
+    else:
+        # Create the legacy file so other applications (and globs) see it
+        cache.save_json(path, data, indent=indent)
+        store["legacy"][path.name] = _legacy_signature(path)
+        store["base"].pop(path.name, None)
+        dirty.discard(path.name)
+    store["sections"][path.name] = data
+    store["dirty"] = sorted(dirty)
+    _write_store(cache, folder, store)
+
+
+def _id_keyed(items: Any) -> bool:
+    return isinstance(items, list) and all(isinstance(item, dict) and "id" in item for item in items)
+
+
+def _merge_json(base: Any, ours: Any, theirs: Any) -> Any:
+    """
+    Three-way merge of JSON data: the changes from base to ours applied to theirs.
+
+    Objects are merged per key and lists of objects with an "id" (annotation
+    sets) per id. Where both sides changed the same value, ours wins.
+    Returns _MISSING if the merged value was deleted.
+    """
+    if ours == base:
+        return theirs
+    if theirs == base or theirs == ours:
+        return ours
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in list(theirs) + [key for key in ours if key not in theirs]:
+            value = _merge_json(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING))
+            if value is not _MISSING:
+                merged[key] = value
+        return merged
+    if _id_keyed(ours) and _id_keyed(theirs):
+        base = {item["id"]: item for item in base} if _id_keyed(base) else {}
+        merged = _merge_json(base, {item["id"]: item for item in ours},
+                             {item["id"]: item for item in theirs})
+        return list(merged.values())
+    return ours
+
+
+def _import_legacy(cache: MetadataCache, folder: Path, store: Dict[str, Any]) -> int:
+    """Take clean sections' changed legacy files into a store (in place)."""
+    try:
+        names = {entry.name for entry in os.scandir(folder) if is_store_section(entry.name)}
+    except OSError:
+        return 0
+    dirty = set(store["dirty"])
+    changed = 0
+    for name in sorted(names | set(store["legacy"])):
+        if name in dirty:
+            continue
+        legacy = folder / name
+        signature = _legacy_signature(legacy)
+        if signature == store["legacy"].get(name) and name in store["sections"]:
+            continue
+        if signature is None:
+            # Deleted by another application
+            store["sections"].pop(name, None)
+            store["legacy"].pop(name, None)
+        else:
+            data = cache.load_json(legacy)
+            if data is None:
+                continue
+            store["sections"][name] = data
+            store["legacy"][name] = signature
+        changed += 1
+    return changed
+
+
+def import_folder_store(cache: MetadataCache, folder: PathLike) -> int:
+    """
+    Take legacy files changed by other applications into a folder's store.
+
+    Returns:
+        Number of sections updated (0 if the folder has no store)
+    """
+    folder = Path(folder)
+    current = _read_store(cache, folder)
+    if current is None:
+        return 0
+    store = _editable(current)
+    changed = _import_legacy(cache, folder, store)
+    if changed:
+        _write_store(cache, folder, store)
+    return changed
+
+
+def export_folder_store(cache: MetadataCache, folder: PathLike) -> int:
+    """
+    Write a folder store's dirty sections back to their legacy files.
+
+    Returns:
+        Number of legacy files written
+    """
+    folder = Path(folder)
+    current = _read_store(cache, folder)
+    if current is None or not current.get("dirty"):
+        return 0
+    store = _editable(current)
+    written = 0
+    for name in list(store["dirty"]):
+        legacy = folder / name
+        data = store["sections"].get(name)
+        if _legacy_signature(legacy) != store["legacy"].get(name):
+            # Changed by another application while the section was dirty
+            theirs = cache.load_json(legacy)
+            if theirs is not None and name in store["base"]:
+                data = _merge_json(store["base"][name], data, theirs)
+                store["sections"][name] = data
+                print(f"Merged changes made to {legacy} by another application")
+            elif theirs is not None:
+                print(f"Warning: Overwriting changes made to {legacy} by another application")
+        try:
+            cache.save_json(legacy, data)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not export {legacy}: {e}")
+            continue
+        store["legacy"][name] = _legacy_signature(legacy)
+        store["base"].pop(name, None)
+        store["dirty"].remove(name)
+        written += 1
+    _write_store(cache, folder, store)
+    return written
+
+
+def sync_folder_store(cache: MetadataCache, folder: PathLike) -> int:
+    """
+    Import changed legacy files into a folder's store, then export its dirty sections.
+
+    Returns:
+        Number of sections and legacy files updated
+    """
+    return import_folder_store(cache, folder) + export_folder_store(cache, folder)
+
+
+def export_dirty_folder_stores(cache: MetadataCache) -> int:
+    """
+    Export every folder store this process left dirty (e.g. on exit).
+
+    Returns:
+        Number of legacy files written
+    """
+    with _dirty_lock:
+        folders = sorted(_dirty_folders)
+    return sum(export_folder_store(cache, folder) for folder in folders)
@@ -0,0 +1,141 @@
+"""
+JSON I/O
+
+Serialization layer for the metadata files:
+- writes are atomic (temporary file + os.replace, see file_utils), so a
+  crash never leaves a truncated file
+- user data (annotations, names, takes, tempo, setlists, goals, clips) is
+  written indented and human-readable; machine caches (durations, analysis,
+  fingerprints, waveforms, practice statistics, the folder store) are
+  written compactly
+- orjson is used when installed, which is several times faster for large
+  caches; the files are the same JSON either way (orjson only writes
+  2-space indentation, so other indents use the standard library)
+
+AudioBrowser-QML/benchmark_json_io.py compares the backends and encodings
+on realistic cache sizes.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .file_utils import atomic_write_bytes
+from .metadata_constants import (
+    ANALYSIS_JSON,
+    DURATIONS_JSON,
+    FINGERPRINTS_JSON,
+    FOLDER_STORE_JSON,
+    PRACTICE_STATS_CACHE_JSON,
+    WAVEFORM_JSON,
+)
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    orjson = None
+    HAVE_ORJSON = False
+
+
+# Machine-written caches nobody edits by hand
+COMPACT_FILES = {ANALYSIS_JSON, DURATIONS_JSON, FINGERPRINTS_JSON, FOLDER_STORE_JSON,
+                 PRACTICE_STATS_CACHE_JSON, WAVEFORM_JSON}
+
+# Backend used by dumps/loads: "orjson" or "json"
+_backend = "orjson" if HAVE_ORJSON else "json"
+
+
+def set_backend(name: str) -> None:
+    """
+    Choose the JSON backend ("orjson" or "json"), e.g. for benchmarks.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    global _backend
+    if name not in ("orjson", "json") or (name == "orjson" and not HAVE_ORJSON):
+        raise ValueError(f"JSON backend not available: {name}")
+    _backend = name
+
+
+def get_backend() -> str:
+    """Name of the JSON backend in use."""
+    return _backend
+
+
+def is_compact_file(path: Union[str, Path]) -> bool:
+    """Whether a metadata file is a machine cache written without indentation."""
+    return Path(path).name in COMPACT_FILES
+
+
+def dumps(data: Any, compact: bool = False, indent: int = 2) -> bytes:
+    """
+    Serialize data to UTF-8 JSON (non-ASCII characters are kept as is).
+
+    Args:
+        data: JSON-serializable data
+        compact: Write without indentation or spaces after separators
+        indent: Indentation of readable output
+
+    Raises:
+        TypeError, ValueError: If the data can't be serialized
+    """
+    if _backend == "orjson" and (compact or indent == 2):
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            # Types only the standard library accepts (e.g. numpy.float64, a float subclass)
+            pass
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+
+
+def loads(payload: Union[bytes, str]) -> Any:
+    """
+    Parse JSON text.
+
+    Raises:
+        ValueError: If the text isn't valid JSON (json.JSONDecodeError with
+            either backend)
+    """
+    if _backend == "orjson":
+        return orjson.loads(payload)
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8")
+    return json.loads(payload)
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    """
+    Read and parse a JSON file.
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If it isn't valid JSON
+    """
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_json(path: Union[str, Path], data: Any, compact: Optional[bool] = None, indent: int = 2) -> None:
+    """
+    Write a JSON file atomically.
+
+    Args:
+        path: Target file
+        data: JSON-serializable data
+        compact: Compact encoding; None decides by file name (COMPACT_FILES)
+        indent: Indentation of readable output
+
+    Raises:
+        OSError, TypeError, ValueError: If the file can't be written
+    """
+    if compact is None:
+        compact = is_compact_file(path)
+    payload = dumps(data, compact=compact, indent=indent)
+    atomic_write_bytes(Path(path), lambda f: f.write(payload))
@@ -0,0 +1,650 @@
+"""
+Library Catalog
+
+Optional SQLite index of a whole practice library, shared by the
+AudioBrowser applications.
+
+The catalog lives in the library root (.library_catalog.db) and holds one
+row per folder and per audio file: size, mtime, duration, provided name,
+best/partial/hidden flags, BPM and annotation counts. Folder trees,
+statistics, setlists and searches can then be answered with one query
+instead of walking the tree and parsing every folder's JSON files.
+
+The catalog also holds a full-text index of every user's annotation notes,
+subsection labels, file and folder notes and provided names, so a search
+across the whole library jumps straight to a file and timestamp
+(search_notes). It is an inverted index in plain tables (term -> entry),
+rewritten per folder whenever that folder's metadata files change.
+
+The per-folder JSON files remain the source of truth. The catalog is
+reconciled lazily before queries: each known folder costs one stat of the
+directory plus one stat per metadata file. Folders whose directory mtime
+changed are listed again, and folders whose metadata files changed are
+re-read; everything else is reused. Note searches answer from the catalog
+as it is, so callers reconcile it in background (refresh_in_background)
+when they learn of changes. Deleting the database is always safe.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .dir_walker import scan_directory, skip_hidden_dir
+from .metadata_constants import (
+    AUDIO_EXTS,
+    DURATIONS_JSON,
+    LIBRARY_CATALOG_DB,
+    NAMES_JSON,
+    NOTES_JSON,
+    TAKES_METADATA_JSON,
+    TEMPO_JSON,
+)
+
+
+# Bump when the tables change; older catalogs are rebuilt from scratch
+CATALOG_SCHEMA_VERSION = 2
+
+# Queries within this many seconds of the last reconcile reuse it
+RECONCILE_INTERVAL_SECONDS = 2.0
+
+# A reconcile commits (and lets queries in) about this often
+REFRESH_BATCH_SECONDS = 0.1
+
+# Per-user annotation set files (.audio_notes_<user>.json)
+NOTES_SET_PREFIX = ".audio_notes_"
+
+# Metadata files read into the catalog (besides annotation set files)
+CATALOG_METADATA = {NAMES_JSON, DURATIONS_JSON, TAKES_METADATA_JSON, TEMPO_JSON, NOTES_JSON}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS folders (
+    relative TEXT PRIMARY KEY,
+    dir_mtime_ns INTEGER NOT NULL,
+    metadata TEXT NOT NULL,
+    subdirs TEXT NOT NULL,
+    audio_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    provided_name TEXT NOT NULL,
+    best_take INTEGER NOT NULL,
+    partial_take INTEGER NOT NULL,
+    hidden INTEGER NOT NULL,
+    bpm REAL NOT NULL,
+    annotation_count INTEGER NOT NULL,
+    important_count INTEGER NOT NULL,
+    PRIMARY KEY (folder, name)
+);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    folder TEXT NOT NULL,
+    file TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    ms INTEGER,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_folder ON notes (folder);
+CREATE TABLE IF NOT EXISTS note_terms (
+    term TEXT NOT NULL,
+    note_id INTEGER NOT NULL,
+    PRIMARY KEY (term, note_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS note_terms_note ON note_terms (note_id);
+"""
+
+# Kinds of searchable text: annotation note, subsection (label and note),
+# a file's general notes, a set's folder notes, and a provided song name
+NOTE_KINDS = ("note", "section", "file_note", "folder_note", "name")
+
+_TERM_RE = re.compile(r"\w+")
+
+# (file, owner, kind, ms or None, text) of one searchable entry
+SearchEntry = Tuple[str, str, str, Optional[int], str]
+
+_FILE_COLUMNS = ("folder", "name", "size", "mtime_ns", "duration_ms", "provided_name",
+                 "best_take", "partial_take", "hidden", "bpm", "annotation_count",
+                 "important_count")
+
+
+def is_catalog_metadata(name: str) -> bool:
+    """Check whether a file in a practice folder feeds the catalog."""
+    return name in CATALOG_METADATA or (name.startswith(NOTES_SET_PREFIX) and name.endswith(".json"))
+
+
+def _load_json(path: Path) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Could not read {path}: {e}")
+        return None
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a text, as stored in the full-text index."""
+    return _TERM_RE.findall(text.lower())
+
+
+def matches_words(text: str, words: Iterable[str]) -> bool:
+    """Whether every word starts some word of text (the search_notes rule, without the index)."""
+    terms = tokenize(text)
+    return all(any(term.startswith(word) for term in terms) for word in words)
+
+
+def _note_entries(file_name: str, owner: str, notes: Any) -> List[SearchEntry]:
+    """Search entries of one file's notes list."""
+    entries = []
+    if not isinstance(notes, list):
+        return entries
+    for note in notes:
+        if not isinstance(note, dict):
+            continue
+        ms = note.get("ms", note.get("timestamp_ms"))
+        ms = int(ms) if isinstance(ms, (int, float)) else None
+        text = str(note.get("text", "") or "")
+        if note.get("subsection"):
+            label_note = str(note.get("subsection_note", "") or "")
+            entries.append((file_name, owner, "section", ms, f"{text} {label_note}".strip()))
+        elif text.strip():
+            entries.append((file_name, owner, "note", ms, text))
+    return entries
+
+
+def _count_notes(notes: Any):
+    """(annotation count, important count) of one file's notes list."""
+    if not isinstance(notes, list):
+        return 0, 0
+    important = sum(1 for n in notes if isinstance(n, dict) and n.get("important", False))
+    return len(notes), important
+
+
+def read_folder_metadata(folder: Path, names: Iterable[str],
+                         search_entries: Optional[List[SearchEntry]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Read a folder's metadata files into per-file catalog values.
+
+    Follows the same rules as the applications: .takes_metadata.json wins
+    over take flags in annotation files, and durations below 10000 are
+    seconds from older caches.
+
+    Args:
+        folder: Practice folder
+        names: Metadata filenames present in the folder
+        search_entries: Optional list that receives the folder's searchable
+            texts as (file, owner, kind, ms, text) tuples while the files are read
+
+    Returns:
+        Mapping of audio filename to the catalog fields it has values for
+    """
+    if search_entries is None:
+        search_entries = []
+    per_file: Dict[str, Dict[str, Any]] = {}
+
+    def entry(name: str) -> Dict[str, Any]:
+        return per_file.setdefault(name, {})
+
+    names = set(names)
+    if NAMES_JSON in names:
+        data = _load_json(folder / NAMES_JSON)
+        if isinstance(data, dict):
+            for name, provided in data.items():
+                if isinstance(provided, str) and provided.strip():
+                    entry(name)["provided_name"] = provided
+                    search_entries.append((name, "", "name", None, provided))
+
+    if DURATIONS_JSON in names:
+        data = _load_json(folder / DURATIONS_JSON)
+        if isinstance(data, dict):
+            for name, value in data.items():
+                if isinstance(value, (int, float)) and value > 0:
+                    entry(name)["duration_ms"] = int(value * 1000) if value < 10000 else int(value)
+
+    if TEMPO_JSON in names:
+        data = _load_json(folder / TEMPO_JSON)
+        if isinstance(data, dict):
+            for name, bpm in data.items():
+                if isinstance(bpm, (int, float)):
+                    entry(name)["bpm"] = float(bpm)
+
+    takes = _load_json(folder / TAKES_METADATA_JSON) if TAKES_METADATA_JSON in names else None
+    takes_from_notes = not (isinstance(takes, dict) and takes)
+    if not takes_from_notes:
+        for key, field in (("best_takes", "best_take"), ("partial_takes", "partial_take"),
+                           ("hidden_songs", "hidden")):
+            for name in takes.get(key, []) or []:
+                entry(name)[field] = True
+
+    note_files = sorted(n for n in names if n.startswith(NOTES_SET_PREFIX) and n.endswith(".json"))
+    if NOTES_JSON in names:
+        note_files.append(NOTES_JSON)
+    for note_file in note_files:
+        data = _load_json(folder / note_file)
+        if not isinstance(data, dict):
+            continue
+        user = note_file[len(NOTES_SET_PREFIX):-len(".json")] if note_file != NOTES_JSON else ""
+        if "sets" in data:
+            files_by_set = []
+            for aset in data.get("sets", []):
+                if not isinstance(aset, dict):
+                    continue
+                owner = str(aset.get("name") or user)
+                folder_notes = aset.get("folder_notes", "")
+                if isinstance(folder_notes, str) and folder_notes.strip():
+                    search_entries.append(("", owner, "folder_note", None, folder_notes))
+                files_by_set.append((owner, aset.get("files", {})))
+        else:
+            files_by_set = [(user, data)]
+        for owner, files in files_by_set:
+            if not isinstance(files, dict):
+                continue
+            for name, file_data in files.items():
+                if isinstance(file_data, dict):
+                    notes = file_data.get("notes", [])
+                    general = file_data.get("general", "")
+                    if isinstance(general, str) and general.strip():
+                        search_entries.append((name, owner, "file_note", None, general))
+                    if takes_from_notes and note_file != NOTES_JSON:
+                        if file_data.get("best_take", False):
+                            entry(name)["best_take"] = True
+                        if file_data.get("partial_take", False):
+                            entry(name)["partial_take"] = True
+                else:
+                    notes = file_data
+                search_entries.extend(_note_entries(name, owner, notes))
+                count, important = _count_notes(notes)
+                if count:
+                    e = entry(name)
+                    e["annotation_count"] = e.get("annotation_count", 0) + count
+                    e["important_count"] = e.get("important_count", 0) + important
+    return per_file
+
+
+class LibraryCatalog:
+    """
+    SQLite catalog of the audio files under one library root.
+
+    Safe to share between threads; calls are serialized. Query methods
+    other than search_notes reconcile the catalog with the filesystem first
+    (at most once every RECONCILE_INTERVAL_SECONDS).
+    """
+
+    def __init__(self, root: Path, db_path: Optional[Path] = None):
+        """
+        Open (or create) the catalog for a library root.
+
+        Args:
+            root: Library root folder
+            db_path: Database file (default: LIBRARY_CATALOG_DB in the root)
+
+        Raises:
+            sqlite3.Error: If the database can't be opened
+        """
+        self.root = Path(root)
+        self.db_path = Path(db_path) if db_path else self.root / LIBRARY_CATALOG_DB
+        self._lock = threading.RLock()
+        self._closing = False
+        self._refreshing = False
+        self._last_refresh: Optional[float] = None
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # Keep the rollback journal between transactions: creating and deleting
+        # it would change the root folder's mtime and force a relisting each time
+        # (WAL would avoid that too, but doesn't work on network shares)
+        self._db.execute("PRAGMA journal_mode=PERSIST")
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._db:
+            self._db.executescript(_SCHEMA)
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or int(row["value"]) != CATALOG_SCHEMA_VERSION:
+                for table in ("folders", "files", "notes", "note_terms"):
+                    self._db.execute(f"DROP TABLE IF EXISTS {table}")
+                self._db.executescript(_SCHEMA)
+                self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                                 (str(CATALOG_SCHEMA_VERSION),))
+
+    def close(self) -> None:
+        """Close the database connection (a background refresh stops at the next folder)."""
+        self._closing = True
+        with self._lock:
+            self._db.close()
+    
+    def refresh_in_background(self) -> threading.Thread:
+        """
+        Reconcile the catalog on a daemon thread.
+
+        Used right after opening a large library, so the first search finds
+        the catalog (mostly) up to date, and whenever the caller learns of
+        changes on disk. Queries in the meantime wait for the folder being
+        processed, not the whole build.
+        """
+        def run():
+            try:
+                self.refresh(force=True)
+            except sqlite3.Error as e:
+                if not self._closing:
+                    print(f"Warning: Library catalog refresh failed: {e}")
+        thread = threading.Thread(target=run, name="library-catalog-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    # ========== Reconciliation ==========
+
+    def relative_path(self, path: Path) -> Optional[str]:
+        """POSIX path of a folder relative to the root ("" for the root), or None if outside it."""
+        try:
+            relative = Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+        except (ValueError, OSError):
+            return None
+        return "" if relative == "." else relative
+
+    def _folder_path(self, relative: str) -> Path:
+        return self.root / relative if relative else self.root
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the catalog in line with the filesystem.
+
+        Work is committed in batches of about REFRESH_BATCH_SECONDS, and the
+        lock is released in between: a query arriving while another thread
+        reconciles answers from what is already catalogued instead of waiting.
+
+        Args:
+            force: Reconcile even if the last one was moments ago
+
+        Returns:
+            Counts of folders 'listed', 'reread' (metadata only), 'reused'
+            and 'removed' (empty if the last reconcile was reused or is
+            running on another thread)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._refreshing:
+                return {}
+            if (not force and self._last_refresh is not None
+                    and now - self._last_refresh < RECONCILE_INTERVAL_SECONDS):
+                return {}
+            self._refreshing = True
+            known = {row["relative"]: row for row in self._db.execute(
+                "SELECT relative, dir_mtime_ns, metadata, subdirs FROM folders")}
+
+        counts = {"listed": 0, "reread": 0, "reused": 0, "removed": 0}
+        try:
+            seen = set()
+            visited = set()
+            stack = [""]
+            while stack:
+                with self._lock:
+                    if self._closing:
+                        return counts
+                    batch_end = time.monotonic() + REFRESH_BATCH_SECONDS
+                    with self._db:
+                        while stack and time.monotonic() < batch_end:
+                            relative = stack.pop()
+                            subdirs = self._reconcile_folder(relative, known.get(relative), visited, counts)
+                            if subdirs is None:
+                                continue
+                            seen.add(relative)
+                            for name in reversed(subdirs):
+                                stack.append(f"{relative}/{name}" if relative else name)
+
+            with self._lock:
+                if self._closing:
+                    return counts
+                with self._db:
+                    for relative in set(known) - seen:
+                        self._db.execute("DELETE FROM folders WHERE relative = ?", (relative,))
+                        self._db.execute("DELETE FROM files WHERE folder = ?", (relative,))
+                        self._delete_notes(relative)
+                        counts["removed"] += 1
+                self._last_refresh = time.monotonic()
+        finally:
+            self._refreshing = False
+        return counts
+
+    def _reconcile_folder(self, relative: str, row: Optional[sqlite3.Row], visited: set,
+                          counts: Dict[str, int]) -> Optional[List[str]]:
+        """Update one folder's rows if it changed; returns its subfolders (None if unreadable)."""
+        path = self._folder_path(relative)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if (st.st_dev, st.st_ino) in visited:
+            return None  # Symlink loop
+        visited.add((st.st_dev, st.st_ino))
+
+        if row is not None and row["dir_mtime_ns"] == st.st_mtime_ns:
+            old_signature = json.loads(row["metadata"])
+            signature = self._metadata_signature(path, old_signature.keys())
+            if signature != old_signature:
+                self._reread_folder(relative, path, signature)
+                counts["reread"] += 1
+            else:
+                counts["reused"] += 1
+            return json.loads(row["subdirs"])
+        try:
+            subdirs = self._list_folder(relative, path, st.st_mtime_ns)
+        except OSError:
+            return None
+        counts["listed"] += 1
+        return subdirs
+
+    @staticmethod
+    def _metadata_signature(folder: Path, names: Iterable[str]) -> Dict[str, List[int]]:
+        """[size, mtime_ns] of each named metadata file that still exists."""
+        signature = {}
+        for name in names:
+            try:
+                st = os.stat(folder / name)
+            except OSError:
+                continue
+            signature[name] = [st.st_size, st.st_mtime_ns]
+        return signature
+
+    def _list_folder(self, relative: str, path: Path, dir_mtime_ns: int) -> List[str]:
+        """List a folder and replace its catalog rows; returns its subfolder names."""
+        listing = scan_directory(path, AUDIO_EXTS, skip_hidden_dir)
+        signature = {}
+        for entry in listing.files:
+            if is_catalog_metadata(entry.name):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                signature[entry.name] = [st.st_size, st.st_mtime_ns]
+
+        audio = []
+        for entry in listing.audio:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            audio.append((entry.name, st.st_size, st.st_mtime_ns))
+
+        subdirs = [entry.name for entry in listing.dirs]
+        self._db.execute(
+            "INSERT OR REPLACE INTO folders (relative, dir_mtime_ns, metadata, subdirs, audio_count) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (relative, dir_mtime_ns, json.dumps(signature), json.dumps(subdirs), len(audio)))
+        self._write_files(relative, path, audio, signature)
+        return subdirs
+
+    def _reread_folder(self, relative: str, path: Path, signature: Dict[str, List[int]]) -> None:
+        """Refresh a folder's metadata columns without listing it."""
+        audio = [(row["name"], row["size"], row["mtime_ns"]) for row in self._db.execute(
+            "SELECT name, size, mtime_ns FROM files WHERE folder = ?", (relative,))]
+        self._db.execute("UPDATE folders SET metadata = ? WHERE relative = ?",
+                         (json.dumps(signature), relative))
+        self._write_files(relative, path, audio, signature)
+
+    def _write_files(self, relative: str, path: Path, audio, signature) -> None:
+        entries: List[SearchEntry] = []
+        metadata = read_folder_metadata(path, signature.keys(), entries) if signature else {}
+        self._write_notes(relative, entries)
+        rows = []
+        for name, size, mtime_ns in audio:
+            values = metadata.get(name) or metadata.get(Path(name).stem) or {}
+            rows.append((
+                relative, name, size, mtime_ns,
+                values.get("duration_ms", 0),
+                values.get("provided_name", ""),
+                int(values.get("best_take", False)),
+                int(values.get("partial_take", False)),
+                int(values.get("hidden", False)),
+                values.get("bpm", 0.0),
+                values.get("annotation_count", 0),
+                values.get("important_count", 0),
+            ))
+        self._db.execute("DELETE FROM files WHERE folder = ?", (relative,))
+        self._db.executemany(
+            f"INSERT INTO files ({', '.join(_FILE_COLUMNS)}) VALUES ({', '.join('?' * len(_FILE_COLUMNS))})",
+            rows)
+
+    def _delete_notes(self, relative: str) -> None:
+        self._db.execute("DELETE FROM note_terms WHERE note_id IN (SELECT id FROM notes WHERE folder = ?)",
+                         (relative,))
+        self._db.execute("DELETE FROM notes WHERE folder = ?", (relative,))
+
+    def _write_notes(self, relative: str, entries: List[SearchEntry]) -> None:
+        """Replace a folder's entries in the full-text index."""
+        self._delete_notes(relative)
+        for file_name, owner, kind, ms, text in entries:
+            terms = set(tokenize(text))
+            if not terms:
+                continue
+            note_id = self._db.execute(
+                "INSERT INTO notes (folder, file, owner, kind, ms, text) VALUES (?, ?, ?, ?, ?, ?)",
+                (relative, file_name, owner, kind, ms, text)).lastrowid
+            self._db.executemany("INSERT OR IGNORE INTO note_terms (term, note_id) VALUES (?, ?)",
+                                 [(term, note_id) for term in terms])
+
+    # ========== Queries ==========
+
+    def _file_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        data["path"] = str(self._folder_path(row["folder"]) / row["name"])
+        for flag in ("best_take", "partial_take", "hidden"):
+            data[flag] = bool(data[flag])
+        return data
+
+    def folders(self, with_audio: bool = True) -> List[Dict[str, Any]]:
+        """
+        Catalogued folders in path order.
+
+        Args:
+            with_audio: Only folders holding audio files
+
+        Returns:
+            Dicts with 'relative', 'path', 'audio_count' and 'mtime' (seconds)
+        """
+        self.refresh()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT relative, audio_count, dir_mtime_ns FROM folders "
+                + ("WHERE audio_count > 0 " if with_audio else "") + "ORDER BY relative").fetchall()
+        return [{"relative": r["relative"], "path": str(self._folder_path(r["relative"])),
+                 "audio_count": r["audio_count"], "mtime": r["dir_mtime_ns"] / 1e9} for r in rows]
+
+    def folder_files(self, relative: str) -> List[Dict[str, Any]]:
+        """Audio files of one folder (relative path from the root), by name."""
+        self.refresh()
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM files WHERE folder = ? ORDER BY name",
+                                    (relative,)).fetchall()
+        return [self._file_dict(r) for r in rows]
+
+    def file_info(self, relative: str, name: str) -> Optional[Dict[str, Any]]:
+        """One file's catalog entry, or None if it isn't in the library."""
+        self.refresh()
+        with self._lock:
+            row = self._db.execute("SELECT * FROM files WHERE folder = ? AND name = ?",
+                                   (relative, name)).fetchone()
+        return self._file_dict(row) if row is not None else None
+
+    def search(self, text: str, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Files whose provided name or filename contains text (case-insensitive).
+
+        Returns:
+            Up to limit file dicts, ordered by folder then name
+        """
+        self.refresh()
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM files WHERE provided_name LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' "
+                "ORDER BY folder, name LIMIT ?", (pattern, pattern, limit)).fetchall()
+        return [self._file_dict(r) for r in rows]
+
+
+    def search_notes(self, text: str, limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Full-text search over notes, subsection labels, file and folder notes and provided names.
+
+        Every word of text must match the start of a word in the entry
+        (case-insensitive), so "dave flub bridge" finds "Dave flubbed the bridge".
+        The catalog is not reconciled first, so a search never walks the
+        library; see refresh_in_background.
+
+        Args:
+            text: Words to look for
+            limit: Maximum number of results
+
+        Returns:
+            Dicts with 'folder' (relative), 'file' (empty for folder notes),
+            'path' (file, or folder for folder notes), 'owner' (set name),
+            'kind' (see NOTE_KINDS), 'ms' (None if the entry has no
+            timestamp) and 'text', ordered by folder, file and time
+        """
+        words = sorted(set(tokenize(text)), key=len, reverse=True)
+        if not words:
+            return []
+        # One prefix range per word; longest (most selective) words first
+        clauses, params = [], []
+        for word in words:
+            clauses.append("id IN (SELECT note_id FROM note_terms WHERE term >= ? AND term < ?)")
+            params += [word, word[:-1] + chr(ord(word[-1]) + 1)]
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT folder, file, owner, kind, ms, text FROM notes WHERE " + " AND ".join(clauses)
+                + " ORDER BY folder, file, ms LIMIT ?", params + [limit]).fetchall()
+        results = []
+        for row in rows:
+            result = dict(row)
+            folder_path = self._folder_path(row["folder"])
+            result["path"] = str(folder_path / row["file"]) if row["file"] else str(folder_path)
+            results.append(result)
+        return results
+
+
+def open_catalog(root: Path) -> Optional[LibraryCatalog]:
+    """
+    Open the catalog for a library root.
+
+    Returns:
+        LibraryCatalog, or None if the database can't be created (e.g. a
+        read-only share); callers then fall back to the filesystem
+    """
+    try:
+        return LibraryCatalog(root)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not open library catalog in {root}: {e}")
+        return None
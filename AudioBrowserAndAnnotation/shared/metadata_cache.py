@@ -0,0 +1,240 @@
+"""
+Metadata Cache
+
+Process-wide cache of parsed JSON metadata files, shared by every manager
+that reads the per-folder files (.provided_names.json, .duration_cache.json,
+.audio_notes_<user>.json, .tempo.json, ...).
+
+Entries are keyed by absolute path and validated by the file's
+(st_mtime_ns, st_size) on every read, so a file changed by another
+manager, the other application or a sync client is parsed again. A cached
+read costs one stat instead of a read and a parse, which matters most on
+network shares.
+
+Writes made through save_json update the entry in place, so the writer's
+next read (and everyone else's) is a hit.
+
+Data returned by load_json is shared between callers and must be treated
+as read-only; pass copy=True to get a private copy to modify.
+
+When per-folder stores are enabled (set_folder_store_enabled), the
+module-level load_json/save_json read and write the files kept in a
+folder's .folder_store.json as sections of it (see folder_store).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from . import json_io
+
+
+# Parsed files kept (least recently used are dropped first)
+MAX_CACHED_FILES = 1024
+
+# (st_mtime_ns, st_size) of a cached file
+FileSignature = Tuple[int, int]
+
+PathLike = Union[str, Path]
+
+
+def copy_json(value: Any) -> Any:
+    """Copy parsed JSON data (dicts, lists and scalars), much faster than copy.deepcopy."""
+    if isinstance(value, dict):
+        return {key: copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_json(item) for item in value]
+    return value
+
+
+class MetadataCache:
+    """
+    Cache of parsed JSON files validated by stat signature.
+
+    Thread-safe; files are read and parsed outside the lock.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_FILES):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[FileSignature, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def _key(path: PathLike) -> str:
+        return os.path.abspath(os.fspath(path))
+
+    def _store(self, key: str, signature: FileSignature, data: Any) -> None:
+        with self._lock:
+            self._entries[key] = (signature, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def load_json(self, path: PathLike, default: Any = None, copy: bool = False) -> Any:
+        """
+        Load a JSON file, from the cache if it hasn't changed on disk.
+
+        Args:
+            path: JSON file
+            default: Returned when the file is missing or can't be parsed
+            copy: Return a private copy the caller may modify
+
+        Returns:
+            Parsed data, or default
+        """
+        key = self._key(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.invalidate(key)
+            return default
+        signature = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                data = entry[1]
+                return copy_json(data) if copy else data
+            self.misses += 1
+
+        try:
+            data = json_io.read_json(key)
+        except FileNotFoundError:
+            self.invalidate(key)
+            return default
+        except Exception as e:
+            print(f"Warning: Could not read {key}: {e}")
+            self.invalidate(key)
+            return default
+
+        self._store(key, signature, data)
+        return copy_json(data) if copy else data
+
+    def save_json(self, path: PathLike, data: Any, indent: int = 2) -> None:
+        """
+        Write a JSON file atomically and cache what was written.
+
+        Args:
+            path: Target file
+            data: JSON-serializable data (a copy is cached, so the caller
+                may keep modifying it)
+            indent: Indentation of readable files (machine caches are
+                written compactly, see json_io)
+
+        Raises:
+            OSError, TypeError, ValueError: If the file can't be written
+        """
+        key = self._key(path)
+        try:
+            json_io.write_json(key, data, indent=indent)
+        except Exception:
+            self.invalidate(key)
+            raise
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.invalidate(key)
+            return
+        self._store(key, (st.st_mtime_ns, st.st_size), copy_json(data))
+        self.writes += 1
+
+    def invalidate(self, path: Optional[PathLike] = None) -> None:
+        """
+        Forget a cached file (e.g. after writing it another way), or all of them.
+
+        Args:
+            path: File to forget, or None to clear the cache
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(path), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/write counters, the number of cached files and the hit rate (0.0-1.0)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        """Zero the counters (cached files are kept)."""
+        with self._lock:
+            self.hits = self.misses = self.writes = 0
+
+
+# The process-wide cache used by the managers
+_cache = MetadataCache()
+
+# Route store sections through per-folder stores (see folder_store)
+_folder_store_enabled = False
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Get the process-wide metadata cache."""
+    return _cache
+
+
+def set_folder_store_enabled(enabled: bool) -> None:
+    """Enable or disable keeping per-folder metadata in one store file (folder_store)."""
+    global _folder_store_enabled
+    _folder_store_enabled = bool(enabled)
+
+
+def is_folder_store_enabled() -> bool:
+    """Whether per-folder metadata is kept in store files."""
+    return _folder_store_enabled
+
+
+def _store_section(path: PathLike) -> bool:
+    if not _folder_store_enabled:
+        return False
+    from . import folder_store
+    return folder_store.is_store_section(os.path.basename(os.fspath(path)))
+
+
+def load_json(path: PathLike, default: Any = None, copy: bool = False) -> Any:
+    """Load a JSON file through the process-wide cache (see MetadataCache.load_json)."""
+    if _store_section(path):
+        from . import folder_store
+        return folder_store.load_section(_cache, path, default, copy=copy)
+    return _cache.load_json(path, default, copy=copy)
+
+
+def save_json(path: PathLike, data: Any, indent: int = 2) -> None:
+    """Write a JSON file through the process-wide cache (see MetadataCache.save_json)."""
+    if _store_section(path):
+        from . import folder_store
+        folder_store.save_section(_cache, path, data, indent=indent)
+        return
+    _cache.save_json(path, data, indent=indent)
+
+
+def metadata_signature(path: PathLike) -> Optional[Tuple]:
+    """
+    Signature that changes whenever load_json(path) may return something new.
+
+    Returns:
+        A comparable tuple, or None if there is nothing to load
+    """
+    if _store_section(path):
+        from . import folder_store
+        return folder_store.section_signature(_cache, path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
@@ -13,6 +13,7 @@ SESSION_STATE_JSON = ".session_state.json"
 WAVEFORM_JSON = ".waveform_cache.json"
 DURATIONS_JSON = ".duration_cache.json"
 FINGERPRINTS_JSON = ".audio_fingerprints.json"
+FINGERPRINT_VECTORS_NPZ = ".audio_fingerprints.npz"
 USER_COLORS_JSON = ".user_colors.json"
 SONG_RENAMES_JSON = ".song_renames.json"
 PRACTICE_STATS_JSON = ".practice_stats.json"
@@ -21,6 +22,18 @@ SETLISTS_JSON = ".setlists.json"
 TEMPO_JSON = ".tempo.json"
 TAKES_METADATA_JSON = ".takes_metadata.json"
 CLIPS_JSON = ".clips.json"
+ANALYSIS_JSON = ".audio_analysis.json"
+LANDMARKS_NPZ = ".audio_landmarks.npz"
+LIBRARY_CATALOG_DB = ".library_catalog.db"
+FOLDER_STORE_JSON = ".folder_store.json"
+PRACTICE_STATS_CACHE_JSON = ".practice_stats_cache.json"
+
+# Hidden subfolder of a library root holding caches about the whole library
+# (writing inside it leaves the root's own mtime alone)
+LIBRARY_CACHE_DIR = ".library_cache"
+
+# Appended to an annotation sets file name for its journal (.audio_notes_<user>.json.journal)
+ANNOTATION_JOURNAL_SUFFIX = ".journal"
 
 # Set of all reserved JSON files
 RESERVED_JSON = {
@@ -37,7 +50,10 @@ RESERVED_JSON = {
     TEMPO_JSON,
     TAKES_METADATA_JSON,
     CLIPS_JSON,
+    ANALYSIS_JSON,
     SESSION_STATE_JSON,
+    FOLDER_STORE_JSON,
+    PRACTICE_STATS_CACHE_JSON,
 }
 
 # Audio file extensions
@@ -3,17 +3,146 @@ Metadata Manager
 
 Common metadata management functionality used across AudioBrowser applications.
 Handles loading, saving, and backing up annotation data and other metadata.
+
+Annotation sets can optionally be journaled: instead of rewriting the whole
+.audio_notes_<user>.json on every save, the changed sets and files are
+appended as JSON lines to a sidecar journal (.audio_notes_<user>.json.journal)
+and folded back into the main file by compact_annotation_sets. Loading
+always replays a journal it finds, so the result is the same v3 data either
+way.
+
+Per-folder metadata can optionally be kept in one .folder_store.json per
+folder (see folder_store); load_json and save_json go through it when it
+is enabled, and the legacy files are brought up to date by
+export_folder_store / sync_folder_store.
 """
 
+import copy
 import json
+import os
 import getpass
 import uuid
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
-from .metadata_constants import NOTES_JSON
+from .metadata_constants import ANNOTATION_JOURNAL_SUFFIX, NOTES_JSON
 from . import backup_utils
+from . import folder_store
+from . import metadata_cache
+
+
+# A journal larger than this is compacted on the next save
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+# Keys of an annotation set other than its files
+_SET_HEADER_KEYS = ("id", "name", "color", "visible", "folder_notes")
+
+
+def _diff_annotation_sets(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Journal operations that turn annotation sets data old into new.
+    
+    Changes are recorded per set header and per file entry, so editing one
+    note rewrites that file's entry only.
+    """
+    ops = []
+    old_sets = {s.get("id"): s for s in old.get("sets", []) if isinstance(s, dict)}
+    new_sets = {s.get("id"): s for s in new.get("sets", []) if isinstance(s, dict)}
+    
+    for set_id in old_sets:
+        if set_id not in new_sets:
+            ops.append({"op": "del_set", "set": set_id})
+    
+    for set_id, new_set in new_sets.items():
+        old_set = old_sets.get(set_id, {})
+        header = {k: v for k, v in new_set.items() if k != "files"}
+        if set_id not in old_sets or header != {k: v for k, v in old_set.items() if k != "files"}:
+            ops.append({"op": "put_set", "set": set_id, "data": header})
+        old_files = old_set.get("files", {}) or {}
+        new_files = new_set.get("files", {}) or {}
+        for name in old_files:
+            if name not in new_files:
+                ops.append({"op": "del_file", "set": set_id, "file": name})
+        for name, entry in new_files.items():
+            if old_files.get(name) != entry:
+                ops.append({"op": "put_file", "set": set_id, "file": name, "data": entry})
+    
+    ops.append({"op": "meta", "version": new.get("version", 3), "updated": new.get("updated"),
+                "current_set_id": new.get("current_set_id"), "order": list(new_sets)})
+    return ops
+
+
+def replay_annotation_journal(data: Dict[str, Any], journal_path: Path) -> int:
+    """
+    Apply a journal's operations to annotation sets data in place.
+    
+    Operations are idempotent, so replaying a journal that was already
+    folded into the main file is harmless. A line that can't be parsed
+    (e.g. torn by a crash mid-append) is skipped.
+    
+    Args:
+        data: Annotation sets data ('sets' list format)
+        journal_path: Journal file
+        
+    Returns:
+        Number of operations applied
+    """
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return 0
+    except OSError as e:
+        print(f"Warning: Could not read annotation journal {journal_path}: {e}")
+        return 0
+    
+    sets = data.setdefault("sets", [])
+    applied = 0
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            op = json.loads(line)
+            kind = op["op"]
+        except (ValueError, KeyError, TypeError):
+            print(f"Warning: Skipping unreadable line {number} of {journal_path}")
+            continue
+        
+        by_id = {s.get("id"): s for s in sets if isinstance(s, dict)}
+        if kind == "put_set":
+            target = by_id.get(op["set"])
+            if target is None:
+                target = {}
+                sets.append(target)
+            for key, value in op["data"].items():
+                target[key] = value
+            target.setdefault("files", {})
+        elif kind == "del_set":
+            sets[:] = [s for s in sets if not (isinstance(s, dict) and s.get("id") == op["set"])]
+        elif kind == "put_file":
+            target = by_id.get(op["set"])
+            if target is not None:
+                target.setdefault("files", {})[op["file"]] = op["data"]
+        elif kind == "del_file":
+            target = by_id.get(op["set"])
+            if target is not None:
+                target.get("files", {}).pop(op["file"], None)
+        elif kind == "meta":
+            data["version"] = op.get("version", 3)
+            data["updated"] = op.get("updated")
+            data["current_set_id"] = op.get("current_set_id")
+            position = {set_id: i for i, set_id in enumerate(op.get("order", []))}
+            sets.sort(key=lambda s: position.get(s.get("id"), len(position)))
+        else:
+            continue
+        applied += 1
+    
+    # Keep the v3 key order: version, updated, sets, current_set_id
+    for key in ("version", "updated", "sets", "current_set_id"):
+        if key in data:
+            data[key] = data.pop(key)
+    return applied
 
 
 class MetadataManager:
@@ -37,6 +166,9 @@ class MetadataManager:
         """
         self._username = username or getpass.getuser()
         self._backup_enabled = True
+        self._journal_enabled = False
+        # Sets file -> data as last written (main file plus journal), for diffing
+        self._journal_states: Dict[Path, Dict[str, Any]] = {}
     
     def set_username(self, username: str) -> None:
         """Set the username for user-specific metadata files."""
@@ -50,6 +182,66 @@ class MetadataManager:
         """Enable or disable automatic backups before saves."""
         self._backup_enabled = enabled
     
+    def set_journal_enabled(self, enabled: bool) -> None:
+        """
+        Enable or disable journaled saving of annotation sets.
+        
+        Call compact_annotation_sets first when turning it off, or the next
+        full save does it.
+        """
+        self._journal_enabled = enabled
+        if not enabled:
+            self._journal_states.clear()
+    
+    def is_journal_enabled(self) -> bool:
+        """Check whether annotation sets are saved through a journal."""
+        return self._journal_enabled
+    
+    def set_folder_store_enabled(self, enabled: bool) -> None:
+        """
+        Enable or disable keeping per-folder metadata in .folder_store.json.
+        
+        This is process-wide (every reader of the shared metadata cache
+        follows it). Call export_dirty_folder_stores first when turning it
+        off, so the legacy files hold everything.
+        """
+        metadata_cache.set_folder_store_enabled(enabled)
+    
+    def is_folder_store_enabled(self) -> bool:
+        """Check whether per-folder metadata is kept in store files."""
+        return metadata_cache.is_folder_store_enabled()
+    
+    def sync_folder_store(self, directory: Path) -> int:
+        """
+        Bring a folder's store and legacy files in line (no-op without a store).
+        
+        Legacy files changed by other applications are imported into the
+        store, then the store's unexported changes are written to the
+        legacy files.
+        
+        Returns:
+            Number of sections and files updated
+        """
+        return folder_store.sync_folder_store(metadata_cache.get_metadata_cache(), directory)
+    
+    def export_folder_store(self, directory: Path) -> int:
+        """
+        Write a folder store's unexported changes to the legacy files.
+        
+        Returns:
+            Number of legacy files written
+        """
+        return folder_store.export_folder_store(metadata_cache.get_metadata_cache(), directory)
+    
+    def export_dirty_folder_stores(self) -> int:
+        """
+        Export every folder store changed by this process (e.g. on exit).
+        
+        Returns:
+            Number of legacy files written
+        """
+        return folder_store.export_dirty_folder_stores(metadata_cache.get_metadata_cache())
+    
     def get_annotation_file_path(self, audio_file_path: Path) -> Path:
         """
         Get the path to the annotation file for a given audio file.
@@ -82,24 +274,33 @@ class MetadataManager:
         user = username or self._username
         return directory / f".audio_notes_{user}.json"
     
-    def load_json(self, path: Path, default: Any = None) -> Any:
+    def get_annotation_journal_path(self, directory: Path, username: Optional[str] = None) -> Path:
+        """
+        Get the path to the journal of a directory's annotation sets file.
+        
+        Args:
+            directory: Directory containing the audio files
+            username: Username for the annotation set. If None, uses manager's username.
+            
+        Returns:
+            Path like /folder/.audio_notes_user.json.journal
+        """
+        sets_file = self.get_annotation_sets_file_path(directory, username)
+        return sets_file.with_name(sets_file.name + ANNOTATION_JOURNAL_SUFFIX)
+    
+    def load_json(self, path: Path, default: Any = None, copy: bool = True) -> Any:
         """
-        Load JSON data from a file.
+        Load JSON data from a file (through the shared metadata cache).
         
         Args:
             path: Path to the JSON file
             default: Default value to return if file doesn't exist or fails to load
+            copy: Return a private copy; pass False for read-only use
             
         Returns:
             Loaded JSON data or default value
         """
-        try:
-            if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Warning: Failed to load {path}: {e}")
-        return default
+        return metadata_cache.load_json(path, default, copy=copy)
     
     def save_json(self, path: Path, data: Any, create_backup: bool = True) -> bool:
         """
@@ -114,22 +315,19 @@ class MetadataManager:
             True if save was successful, False otherwise
         """
         try:
-            # Create backup if enabled and file exists
+            # Create backup if enabled and file exists (snapshots are rate-limited per folder)
             if create_backup and self._backup_enabled and path.exists():
-                practice_folder = path.parent
-                if backup_utils.should_create_backup(practice_folder):
-                    backup_utils.create_metadata_backup_if_needed(practice_folder)
+                backup_utils.create_metadata_backup_if_needed(path.parent)
             
             # Create parent directory if it doesn't exist
             path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Save JSON data
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Save JSON data (temporary file + replace, so a crash never truncates it)
+            metadata_cache.save_json(path, data)
             
             return True
             
-        except (IOError, TypeError) as e:
+        except (IOError, TypeError, ValueError) as e:
             print(f"Error: Failed to save {path}: {e}")
             return False
     
@@ -151,12 +349,23 @@ class MetadataManager:
         sets_file = self.get_annotation_sets_file_path(directory, username)
         data = self.load_json(sets_file, {})
         
+        # Changes not yet compacted into the main file
+        journal = self.get_annotation_journal_path(directory, username)
+        if journal.exists() and (data == {} or (isinstance(data, dict) and "sets" in data)):
+            if data == {}:
+                data = {"version": 3, "sets": []}
+            replay_annotation_journal(data, journal)
+            if not data["sets"]:
+                data = {}
+        
         # Ensure data has expected structure
         if not isinstance(data, dict):
             return self._create_default_annotation_sets_data()
         
         # Check if this is the new multi-set format
         if "sets" in data:
+            if self._journal_enabled:
+                self._journal_states[sets_file] = copy.deepcopy(data)
             return data
         
         # Legacy format or empty - return default structure
@@ -178,12 +387,92 @@ class MetadataManager:
             True if save was successful, False otherwise
         """
         sets_file = self.get_annotation_sets_file_path(directory, username)
+        journal = self.get_annotation_journal_path(directory, username)
         
         # Ensure updated timestamp is current
         sets_data = sets_data.copy()
         sets_data["updated"] = datetime.now().isoformat(timespec="seconds")
         
-        return self.save_json(sets_file, sets_data, create_backup=create_backup)
+        if self._journal_enabled:
+            base = self._journal_states.get(sets_file)
+            if base is not None and sets_file.exists():
+                return self._append_to_journal(directory, username, base, sets_data, create_backup)
+        
+        if not self.save_json(sets_file, sets_data, create_backup=create_backup):
+            return False
+        # The main file now holds everything the journal did
+        try:
+            journal.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not remove {journal}: {e}")
+        if self._journal_enabled:
+            self._journal_states[sets_file] = copy.deepcopy(sets_data)
+        return True
+    
+    def _append_to_journal(self, directory: Path, username: Optional[str], base: Dict[str, Any],
+                           sets_data: Dict[str, Any], create_backup: bool) -> bool:
+        """Append the changes from base to sets_data to the journal."""
+        sets_file = self.get_annotation_sets_file_path(directory, username)
+        journal = self.get_annotation_journal_path(directory, username)
+        try:
+            if create_backup and self._backup_enabled:
+                backup_utils.create_metadata_backup_if_needed(directory)
+            
+            ops = _diff_annotation_sets(base, sets_data)
+            payload = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+            with open(journal, "a+b") as f:
+                # Start on a fresh line if a previous append was cut short
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        payload = "\n" + payload
+                f.write(payload.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+            self._journal_states[sets_file] = copy.deepcopy(sets_data)
+        except (IOError, TypeError, ValueError) as e:
+            print(f"Error: Failed to append to {journal}: {e}")
+            return False
+        
+        if size > JOURNAL_COMPACT_BYTES:
+            self.compact_annotation_sets(directory, username)
+        return True
+    
+    def compact_annotation_sets(self, directory: Path, username: Optional[str] = None) -> bool:
+        """
+        Fold a directory's annotation journal into its annotation sets file.
+        
+        The main file is rewritten atomically before the journal is removed,
+        so a crash in between only leaves a journal that replays harmlessly.
+        
+        Args:
+            directory: Directory containing the annotation sets file
+            username: Username for the annotation set. If None, uses manager's username.
+            
+        Returns:
+            True if there was nothing to compact or compaction succeeded
+        """
+        sets_file = self.get_annotation_sets_file_path(directory, username)
+        journal = self.get_annotation_journal_path(directory, username)
+        if not journal.exists():
+            return True
+        
+        data = self._journal_states.get(sets_file)
+        if data is None:
+            data = self.load_annotation_sets(directory, username)
+        if not self.save_json(sets_file, data, create_backup=False):
+            return False
+        try:
+            journal.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not remove {journal}: {e}")
+            return False
+        return True
     
     def load_legacy_annotations(self, audio_file_path: Path) -> List[Dict[str, Any]]:
         """
@@ -408,7 +697,7 @@ class MetadataManager:
             # Count for all users
             annotation_files = self.discover_annotation_files(directory)
             for user, file_path in annotation_files:
-                data = self.load_json(file_path, {})
+                data = self.load_json(file_path, {}, copy=False)
                 if isinstance(data, dict) and "sets" in data:
                     for aset in data.get("sets", []):
                         for file_data in aset.get("files", {}).values():
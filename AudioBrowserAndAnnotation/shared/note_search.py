@@ -0,0 +1,138 @@
+"""
+Note Search Index
+
+In-memory full-text index of the annotation notes, subsection labels, file
+and folder notes and provided names under a library root, for searching
+without the library catalog (same entries and matching rule as
+LibraryCatalog.search_notes).
+
+build_note_index walks the library and is meant for a background thread:
+folders whose metadata files are unchanged (same size and mtime) keep
+their entries from the previous index, the others are re-read. An index
+never changes once built, so the caller swaps in the new one with a single
+assignment and queries never wait for a build. Terms are kept sorted, so
+each query word is a prefix range found by binary search.
+"""
+
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .dir_walker import skip_hidden_dir, walk_directories
+from .library_catalog import SearchEntry, is_catalog_metadata, read_folder_metadata, tokenize
+
+
+# Most results one query returns
+MAX_RESULTS = 200
+
+# relative folder -> ({metadata file: [size, mtime_ns]}, search entries)
+FolderEntries = Dict[str, Tuple[Dict[str, List[int]], List[SearchEntry]]]
+
+
+class NoteSearchIndex:
+    """
+    Immutable inverted index over the search entries of a library's folders.
+
+    Safe to query from any thread.
+    """
+
+    def __init__(self, root: Path, folders: Optional[FolderEntries] = None):
+        self.root = Path(root)
+        self.folders: FolderEntries = folders or {}
+        self._entries: List[Tuple[str, SearchEntry]] = []
+        postings: Dict[str, List[int]] = {}
+        for relative in sorted(self.folders):
+            for entry in self.folders[relative][1]:
+                terms = set(tokenize(entry[4]))
+                if not terms:
+                    continue
+                entry_id = len(self._entries)
+                self._entries.append((relative, entry))
+                for term in terms:
+                    postings.setdefault(term, []).append(entry_id)
+        self._terms = sorted(postings)
+        self._postings = [postings[term] for term in self._terms]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, text: str, limit: int = MAX_RESULTS) -> List[Dict[str, Any]]:
+        """
+        Entries where every word of text starts a word (case-insensitive).
+
+        Returns:
+            Dicts like LibraryCatalog.search_notes: 'folder' (relative),
+            'file', 'path', 'owner', 'kind', 'ms' (None without a timestamp)
+            and 'text', ordered by folder, file and time
+        """
+        # Longest (most selective) words first, so the candidates shrink early
+        words = sorted(set(tokenize(text)), key=len, reverse=True)
+        if not words:
+            return []
+        matched = None
+        for word in words:
+            lo = bisect_left(self._terms, word)
+            hi = bisect_left(self._terms, word[:-1] + chr(ord(word[-1]) + 1), lo)
+            ids = set()
+            for postings in self._postings[lo:hi]:
+                ids.update(postings if matched is None else matched.intersection(postings))
+            matched = ids
+            if not matched:
+                return []
+
+        results = []
+        for entry_id in sorted(matched)[:limit]:
+            relative, (file_name, owner, kind, ms, note_text) = self._entries[entry_id]
+            folder_path = self.root / relative if relative else self.root
+            results.append({
+                "folder": relative,
+                "file": file_name,
+                "path": str(folder_path / file_name) if file_name else str(folder_path),
+                "owner": owner,
+                "kind": kind,
+                "ms": ms,
+                "text": note_text,
+            })
+        results.sort(key=lambda r: (r["folder"], r["file"], -1 if r["ms"] is None else r["ms"]))
+        return results
+
+
+def build_note_index(root: Path, previous: Optional[NoteSearchIndex] = None,
+                     skip_dir: Optional[Callable[[str], bool]] = skip_hidden_dir, workers: int = 1,
+                     should_stop: Optional[Callable[[], bool]] = None) -> Optional[NoteSearchIndex]:
+    """
+    Build a library's note index, reusing unchanged folders of a previous one.
+
+    Args:
+        root: Library root
+        previous: Earlier index of the same root, or None
+        skip_dir: Predicate on a subdirectory name; True skips that subtree
+        workers: Directories listed concurrently (see walk_directories)
+        should_stop: Polled before each directory; True abandons the build
+
+    Returns:
+        The new index, or None if the build was stopped
+    """
+    known = previous.folders if previous is not None and previous.root == Path(root) else {}
+    folders: FolderEntries = {}
+    for listing in walk_directories(root, skip_dir=skip_dir, workers=workers, should_stop=should_stop):
+        signature = {}
+        for entry in listing.files:
+            if is_catalog_metadata(entry.name):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                signature[entry.name] = [st.st_size, st.st_mtime_ns]
+        if not signature:
+            continue
+        cached = known.get(listing.relative)
+        if cached is not None and cached[0] == signature:
+            folders[listing.relative] = cached
+            continue
+        entries: List[SearchEntry] = []
+        read_folder_metadata(listing.path, signature.keys(), entries)
+        folders[listing.relative] = (signature, entries)
+    if should_stop is not None and should_stop():
+        return None
+    return NoteSearchIndex(root, folders)
@@ -70,6 +70,10 @@ def test_backup_utils():
         should_create_backup,
         backup_metadata_files,
         create_metadata_backup_if_needed,
+        create_snapshot,
+        discover_available_backups,
+        list_backup_files,
+        restore_metadata_from_backup,
     )
     
     # Create a temporary directory for testing
@@ -112,6 +116,31 @@ def test_backup_utils():
         backup_path = create_metadata_backup_if_needed(practice_folder)
         assert backup_path is not None, "Should create backup"
         assert backup_path.exists(), "Backup folder should exist"
+        
+        # Automatic snapshots are rate-limited per folder
+        metadata_file.write_text('{"test": "changed"}')
+        assert create_metadata_backup_if_needed(practice_folder) is None, "Snapshot should be rate-limited"
+        
+        # Snapshots share unchanged content and skip when nothing changed
+        big_file = practice_folder / ".audio_fingerprints.json"
+        big_file.write_text('{"files": {}}' + " " * 10000)
+        first = create_snapshot(practice_folder)
+        assert create_snapshot(practice_folder) is None, "Unchanged folder should not get a new snapshot"
+        metadata_file.write_text('{"test": "changed again"}')
+        second = create_snapshot(practice_folder)
+        assert second is not None and second.name > first.name, "Changed folder should get a new snapshot"
+        blobs = [p for p in (practice_folder / ".backup" / "objects").rglob("*") if p.is_file()]
+        assert len(blobs) == 4, f"Unchanged file should be stored once, got {len(blobs)} blobs"
+        
+        found = [path for path, _ in discover_available_backups(Path(tmpdir))]
+        assert found == [second, first, backup_path], f"Snapshots not discovered: {found}"
+        assert list_backup_files(second) == [".audio_fingerprints.json", ".provided_names.json"]
+        
+        metadata_file.write_text('{"test": "lost"}')
+        big_file.unlink()
+        assert restore_metadata_from_backup(first, practice_folder, Path(tmpdir)) == 2, "Restore count wrong"
+        assert metadata_file.read_text() == '{"test": "changed"}', "Restored content wrong"
+        assert big_file.exists(), "Deleted file not restored"
     
     print("   ✓ Backup utilities module works correctly")
     return True
@@ -143,6 +172,574 @@ def test_audio_workers():
     return True
 
 
+def test_fingerprint_store():
+    """Test compact fingerprint store module."""
+    print("\nTesting Fingerprint Store...")
+
+    from shared.fingerprint_store import (
+        HAVE_NUMPY, read_fingerprint_store, write_fingerprint_store
+    )
+    from shared.metadata_constants import FINGERPRINTS_JSON, FINGERPRINT_VECTORS_NPZ
+    import json
+
+    if not HAVE_NUMPY:
+        print("   ⊘ Skipping fingerprint_store test (numpy not available in test environment)")
+        return True
+
+    cache = {
+        "version": 1,
+        "is_reference_folder": True,
+        "excluded_files": ["skip.wav"],
+        "files": {
+            "a.wav": {"fingerprints": {"spectral": [0.1, 0.25, 0.5], "audfprint": [123456.0, 7.0]},
+                      "size": 10, "mtime": 20, "duration_ms": 3000},
+            "b.wav": {"fingerprints": {"spectral": [1.0, 2.0]}, "size": 11, "mtime": 21},
+        },
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = Path(tmpdir)
+
+        # Legacy JSON is read unchanged
+        with open(folder / FINGERPRINTS_JSON, "w") as f:
+            json.dump(cache, f)
+        legacy = read_fingerprint_store(folder)
+        assert "storage" not in legacy, "Legacy cache should be returned unmigrated"
+
+        # Compact roundtrip keeps metadata and (approximately) the vectors
+        assert write_fingerprint_store(folder, cache), "Compact write should succeed"
+        assert (folder / FINGERPRINT_VECTORS_NPZ).exists(), "Vector file should exist"
+        with open(folder / FINGERPRINTS_JSON) as f:
+            manifest = json.load(f)
+        assert "fingerprints" not in manifest["files"]["a.wav"], "Manifest should not hold vectors"
+
+        loaded = read_fingerprint_store(folder)
+        assert loaded["storage"] == "npz", "Compact cache should be marked as such"
+        assert loaded["version"] == 1, "Cache version should be left to the caller"
+        assert loaded["is_reference_folder"] is True, "Flags should be preserved"
+        assert loaded["excluded_files"] == ["skip.wav"], "Exclusions should be preserved"
+        assert loaded["files"]["a.wav"]["duration_ms"] == 3000, "File metadata should be preserved"
+        spectral = loaded["files"]["a.wav"]["fingerprints"]["spectral"]
+        assert all(abs(x - y) < 1e-3 for x, y in zip(spectral, [0.1, 0.25, 0.5])), "float16 vector drifted"
+        assert loaded["files"]["a.wav"]["fingerprints"]["audfprint"][0] == 123456.0, \
+            "audfprint should be stored at full float32 precision"
+        assert loaded["files"]["b.wav"]["fingerprints"]["spectral"] == [1.0, 2.0], "Second file vectors lost"
+
+        # A vector file from a different save is ignored rather than misattributed
+        manifest["vectors_token"] = "stale"
+        with open(folder / FINGERPRINTS_JSON, "w") as f:
+            json.dump(manifest, f)
+        mismatched = read_fingerprint_store(folder)
+        assert mismatched["files"]["a.wav"]["fingerprints"] == {}, "Mismatched vectors should be ignored"
+        assert mismatched["files"]["a.wav"]["size"] == 10, "Metadata should survive a vector mismatch"
+
+    print("   ✓ Fingerprint store module works correctly")
+    return True
+
+
+def test_audio_probe():
+    """Test header-only duration probing."""
+    print("\nTesting Audio Probe...")
+
+    import struct
+    import wave
+    from shared.audio_probe import probe_duration, probe_headers
+
+    def mp3_frame():
+        # MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo, no padding
+        return b"\xFF\xFB\x90\x00" + b"\x00" * (144 * 128000 // 44100 - 4)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = Path(tmpdir)
+
+        # WAV, with a metadata chunk before the data
+        with wave.open(str(folder / "a.wav"), "wb") as wf:
+            wf.setnchannels(2)
+            wf.setsampwidth(2)
+            wf.setframerate(48000)
+            wf.writeframes(b"\x00" * 4 * 48000 * 3)
+        assert abs(probe_headers(folder / "a.wav") - 3.0) < 1e-6, "WAV duration wrong"
+
+        # CBR MP3 behind an ID3v2 tag with an ID3v1 tag at the end
+        id3v2 = b"ID3\x03\x00\x00\x00\x00\x00\x14" + b"\x00" * 20
+        frames = b"".join(mp3_frame() for _ in range(500))
+        (folder / "cbr.mp3").write_bytes(id3v2 + frames + b"TAG" + b"\x00" * 125)
+        expected = len(frames) * 8 / 128000
+        assert abs(probe_headers(folder / "cbr.mp3") - expected) < 1e-6, "CBR MP3 duration wrong"
+
+        # VBR MP3 with a Xing header and LAME gapless info
+        tag = bytearray(mp3_frame())
+        tag[36:48] = b"Xing" + struct.pack(">II", 1, 300)
+        delay, padding = 576, 1000
+        tag[48:52] = b"LAME"
+        tag[69:72] = bytes([delay >> 4, ((delay & 0x0F) << 4) | (padding >> 8), padding & 0xFF])
+        (folder / "vbr.mp3").write_bytes(bytes(tag) + frames[:300 * len(mp3_frame())])
+        expected = (300 * 1152 - delay - padding) / 44100
+        assert abs(probe_headers(folder / "vbr.mp3") - expected) < 1e-6, "Xing MP3 duration wrong"
+
+        # FLAC STREAMINFO
+        total_samples = 44100 * 7
+        packed = (44100 << 44) | (1 << 41) | (15 << 36) | total_samples
+        streaminfo = b"\x10\x00\x10\x00" + b"\x00" * 6 + struct.pack(">Q", packed) + b"\x00" * 16
+        (folder / "a.flac").write_bytes(b"fLaC\x80\x00\x00\x22" + streaminfo)
+        assert abs(probe_headers(folder / "a.flac") - 7.0) < 1e-6, "FLAC duration wrong"
+
+        # Ogg Vorbis: identification header page, then a last page at 5 seconds
+        def ogg_page(granule, packet):
+            return (b"OggS\x00\x00" + struct.pack("<q", granule) + b"\x00" * 12
+                    + bytes([1, len(packet)]) + packet)
+        ident = b"\x01vorbis" + struct.pack("<IBI", 0, 2, 22050) + b"\x00" * 14
+        (folder / "a.ogg").write_bytes(ogg_page(0, ident) + ogg_page(22050 * 5, b"\x00" * 10))
+        assert abs(probe_headers(folder / "a.ogg") - 5.0) < 1e-6, "Ogg duration wrong"
+
+        # Unrecognized data is left to the fallbacks rather than guessed at
+        (folder / "notes.m4a").write_bytes(b"\x00\x00\x00\x18ftypM4A " + b"\xFF\xFB" * 100)
+        assert probe_headers(folder / "notes.m4a") is None, "Unknown container should not be parsed"
+        assert probe_duration(folder / "missing.mp3") is None, "Missing file should give None"
+
+    print("   ✓ Audio probe module works correctly")
+
+
+def test_dir_walker():
+    """Test single-pass directory walking."""
+    print("\nTesting Directory Walker...")
+
+    from shared.dir_walker import WalkStats, scan_directory, skip_dirs_named, walk_directories
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for rel in ["b/take.WAV", "a/x/song.mp3", "a/notes.txt", ".backup/old.wav",
+                    "docs/demo.wav", "root.wav", "root.flac", ".provided_names.json"]:
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_bytes(b"")
+
+        listing = scan_directory(root)
+        assert [e.name for e in listing.dirs] == ["a", "b", "docs"], "Hidden folder not skipped"
+        assert [e.name for e in listing.audio] == ["root.wav"], "Audio entries wrong"
+        assert listing.has_file(".provided_names.json"), "Hidden files should be listed"
+
+        walked = [(l.relative, [e.name for e in l.audio])
+                  for l in walk_directories(root, skip_dir=skip_dirs_named({"DOCS"}))]
+        assert walked == [("", ["root.wav"]), ("a", []), ("a/x", ["song.mp3"]), ("b", ["take.WAV"])], \
+            f"Walk order or contents wrong: {walked}"
+
+        depth_one = [l.relative for l in walk_directories(root, max_depth=1)]
+        assert depth_one == ["", "a", "b", "docs"], "max_depth not honoured"
+
+        pruned = []
+        for l in walk_directories(root):
+            l.dirs[:] = [e for e in l.dirs if e.name != "a"]
+            pruned.append(l.relative)
+        assert "a" not in pruned and "a/x" not in pruned, "Pruning dirs should skip subtrees"
+
+        assert list(walk_directories(root / "missing")) == [], "Missing root should yield nothing"
+
+        # Thread-pooled mode gives the same output, honours pruning and stops on request
+        for i in range(30):
+            (root / "b" / f"s{i:02d}" / "deep").mkdir(parents=True)
+        serial = [(l.relative, [e.name for e in l.audio]) for l in walk_directories(root)]
+        stats = WalkStats()
+        parallel = [(l.relative, [e.name for e in l.audio])
+                    for l in walk_directories(root, workers=4, stats=stats)]
+        assert parallel == serial, "Parallel walk order differs from serial"
+        assert stats.directories == len(serial) and stats.dirs_per_second > 0, "Stats not filled in"
+
+        pruned = []
+        for l in walk_directories(root, workers=4):
+            l.dirs[:] = [e for e in l.dirs if e.name != "b"]
+            pruned.append(l.relative)
+        assert not any(r.startswith("b") for r in pruned), "Parallel pruning should skip subtrees"
+
+        seen = []
+        stats = WalkStats()
+        for l in walk_directories(root, workers=4, should_stop=lambda: len(seen) >= 5, stats=stats):
+            seen.append(l.relative)
+        assert seen == [r for r, _ in serial[:5]] and stats.canceled, "Cancellation not honoured"
+
+    print("   ✓ Directory walker works correctly")
+    return True
+
+
+def test_library_catalog():
+    """Test the SQLite library catalog and its lazy reconciliation."""
+    print("\nTesting Library Catalog...")
+
+    import json
+    import os
+    from shared.library_catalog import LibraryCatalog
+    from shared.metadata_constants import NAMES_JSON, TAKES_METADATA_JSON
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for rel in ["2024-01-05/take1.wav", "2024-01-05/take2.wav", "2024-02-10/jam.mp3",
+                    ".backup/old.wav", "empty/readme.txt"]:
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_bytes(b"")
+        session = root / "2024-01-05"
+        (session / NAMES_JSON).write_text(json.dumps({"take1.wav": "Blue Sky"}))
+        (session / TAKES_METADATA_JSON).write_text(json.dumps({"best_takes": ["take1.wav"]}))
+        (session / ".audio_notes_bob.json").write_text(json.dumps(
+            {"take2.wav": {"notes": [{"ms": 1, "text": "a"}, {"ms": 2, "text": "b", "important": True}]}}))
+
+        catalog = LibraryCatalog(root)
+        counts = catalog.refresh(force=True)
+        assert counts["listed"] == 4 and counts["reused"] == 0, f"Initial scan wrong: {counts}"
+        assert [f["relative"] for f in catalog.folders()] == ["2024-01-05", "2024-02-10"], \
+            "Folders with audio wrong (hidden folders must be skipped)"
+
+        take1 = catalog.file_info("2024-01-05", "take1.wav")
+        take2 = catalog.file_info("2024-01-05", "take2.wav")
+        assert take1["provided_name"] == "Blue Sky" and take1["best_take"], "Names/takes not read"
+        assert (take2["annotation_count"], take2["important_count"]) == (2, 1), "Annotations not counted"
+        assert [f["name"] for f in catalog.search("blue")] == ["take1.wav"], "Search by provided name failed"
+
+        counts = catalog.refresh(force=True)
+        assert counts == {"listed": 0, "reread": 0, "reused": 4, "removed": 0}, f"Nothing should change: {counts}"
+
+        # Rewriting a metadata file only re-reads that folder
+        (session / NAMES_JSON).write_text(json.dumps({"take1.wav": "Blue Skies", "take2.wav": "Red"}))
+        os.utime(session / NAMES_JSON, ns=(1, 1))
+        counts = catalog.refresh(force=True)
+        assert counts["reread"] == 1 and counts["listed"] == 0, f"Metadata change not re-read: {counts}"
+        assert catalog.file_info("2024-01-05", "take2.wav")["provided_name"] == "Red", "Stale name"
+
+        # Adding and removing folders relists only what changed
+        (root / "2024-02-10" / "jam.mp3").unlink()
+        (root / "2024-02-10").rmdir()
+        (root / "2024-03-01").mkdir()
+        (root / "2024-03-01" / "new.wav").write_bytes(b"")
+        counts = catalog.refresh(force=True)
+        assert counts["removed"] == 1 and counts["listed"] == 2, f"Tree change not reconciled: {counts}"
+        assert [f["relative"] for f in catalog.folders()] == ["2024-01-05", "2024-03-01"], "Folders stale"
+        catalog.close()
+
+        # The database persists between sessions
+        catalog = LibraryCatalog(root)
+        assert catalog.refresh(force=True)["listed"] == 0, "Catalog not reused after reopening"
+        catalog.close()
+
+    print("   ✓ Library catalog works correctly")
+    return True
+
+
+def test_annotation_journal():
+    """Test journaled annotation saves, replay and compaction."""
+    print("\nTesting Annotation Journal...")
+
+    import json
+    from shared.metadata_manager import MetadataManager
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = Path(tmpdir)
+        mm = MetadataManager(username="tester")
+        mm.set_backup_enabled(False)
+        mm.set_journal_enabled(True)
+        sets_file = mm.get_annotation_sets_file_path(folder)
+        journal = mm.get_annotation_journal_path(folder)
+        assert journal.name == ".audio_notes_tester.json.journal", f"Wrong journal name: {journal.name}"
+
+        data = {"version": 3, "sets": [{"id": "s1", "name": "Main", "color": "#00ff00", "visible": True,
+                                         "folder_notes": "", "files": {}}], "current_set_id": "s1"}
+        assert mm.save_annotation_sets(folder, data), "Initial save failed"
+        assert not journal.exists(), "First save should write the main file"
+        data = mm.load_annotation_sets(folder)
+        main_before = sets_file.read_bytes()
+
+        for i in range(5):
+            data["sets"][0]["files"][f"take{i}.wav"] = {"notes": [{"ms": i, "text": f"note {i}"}]}
+            assert mm.save_annotation_sets(folder, data), "Journaled save failed"
+        data["sets"][0]["name"] = "Renamed"
+        del data["sets"][0]["files"]["take0.wav"]
+        data["sets"].append({"id": "s2", "name": "Second", "files": {"a.wav": {"notes": []}}})
+        assert mm.save_annotation_sets(folder, data), "Journaled save failed"
+        assert sets_file.read_bytes() == main_before, "Main file rewritten despite journal"
+        assert journal.exists(), "Journal not written"
+
+        # Another reader (journal disabled) replays the journal, even with a torn last line
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"op": "put_file", "set": "s1", "fil')
+        reader = MetadataManager(username="tester")
+        loaded = reader.load_annotation_sets(folder)
+        assert loaded["sets"][0]["name"] == "Renamed", "Set header change not replayed"
+        assert sorted(loaded["sets"][0]["files"]) == ["take1.wav", "take2.wav", "take3.wav", "take4.wav"], \
+            "File changes not replayed"
+        assert [s["id"] for s in loaded["sets"]] == ["s1", "s2"], "Set order not replayed"
+        assert list(loaded) == ["version", "updated", "sets", "current_set_id"], "Key order not restored"
+
+        # Appends after a torn line still replay
+        data["sets"][0]["files"]["take9.wav"] = {"notes": []}
+        assert mm.save_annotation_sets(folder, data), "Save after torn line failed"
+        assert "take9.wav" in reader.load_annotation_sets(folder)["sets"][0]["files"], "Append lost after torn line"
+
+        assert mm.compact_annotation_sets(folder), "Compaction failed"
+        assert not journal.exists(), "Journal not removed after compaction"
+        on_disk = json.loads(sets_file.read_text(encoding="utf-8"))
+        assert on_disk["sets"] == mm.load_annotation_sets(folder)["sets"], "Compacted file differs from replay"
+        assert "take9.wav" in on_disk["sets"][0]["files"], "Compacted file missing changes"
+
+    print("   ✓ Annotation journal works correctly")
+    return True
+
+
+def test_note_search():
+    """Test the catalog's full-text index of notes, names and folder notes."""
+    print("\nTesting Note Search...")
+
+    import json
+    import os
+    import time
+    from shared.library_catalog import LibraryCatalog
+    from shared.metadata_constants import NAMES_JSON
+
+    def sets_file(folder, user, files, folder_notes=""):
+        data = {"version": 3, "sets": [{"id": "s1", "name": user, "folder_notes": folder_notes,
+                                        "files": files}], "current_set_id": "s1"}
+        (folder / f".audio_notes_{user}.json").write_text(json.dumps(data))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        gig = root / "2024-05-01"
+        gig.mkdir()
+        for name in ["solo.wav", "outro.wav"]:
+            (gig / name).write_bytes(b"")
+        sets_file(gig, "alice", {"solo.wav": {"general": "keeper", "notes": [
+            {"ms": 61000, "text": "Dave flubbed the bridge"},
+            {"ms": 90000, "text": "Bridge", "subsection": True, "end_ms": 120000,
+             "subsection_note": "too fast"}]}}, folder_notes="Great energy tonight")
+        sets_file(gig, "bob", {"outro.wav": {"notes": [{"ms": 5000, "text": "bridge feedback"}]}})
+        (gig / NAMES_JSON).write_text(json.dumps({"outro.wav": "Bridge Over Water"}))
+
+        catalog = LibraryCatalog(root)
+        catalog.refresh_in_background().join()
+        hits = catalog.search_notes("dave flub bridge")
+        assert [(h["file"], h["kind"], h["ms"]) for h in hits] == [("solo.wav", "note", 61000)], \
+            f"Prefix words not matched: {hits}"
+        assert hits[0]["path"] == str(gig / "solo.wav") and hits[0]["owner"] == "alice", "Wrong location"
+        kinds = sorted((h["file"], h["kind"]) for h in catalog.search_notes("BRIDGE"))
+        assert kinds == [("outro.wav", "name"), ("outro.wav", "note"), ("solo.wav", "note"),
+                         ("solo.wav", "section")], f"Case-insensitive search across users wrong: {kinds}"
+        assert catalog.search_notes("too fast")[0]["ms"] == 90000, "Subsection note not indexed"
+        assert catalog.search_notes("energy")[0]["kind"] == "folder_note", "Folder notes not indexed"
+        assert catalog.search_notes("keeper")[0]["kind"] == "file_note", "File notes not indexed"
+        assert catalog.search_notes("zebra") == [] and catalog.search_notes("  ") == [], "Spurious hits"
+
+        # Editing one user's notes re-indexes just that folder
+        sets_file(gig, "bob", {"outro.wav": {"notes": [{"ms": 7000, "text": "ending drags"}]}})
+        os.utime(gig / ".audio_notes_bob.json", ns=(1, 1))
+        assert catalog.search_notes("drags") == [], "Search reconciled the catalog itself"
+        counts = catalog.refresh(force=True)
+        assert counts["reread"] == 1, f"Changed notes not re-read: {counts}"
+        assert catalog.search_notes("feedback") == [], "Stale note still found"
+        assert catalog.search_notes("drags")[0]["ms"] == 7000, "New note not found"
+
+        # Tens of thousands of notes still answer in milliseconds
+        words = ["verse", "chorus", "tempo", "tuning", "drums", "vocals", "rushed", "late", "sharp", "flat"]
+        for i in range(40):
+            folder = root / f"2023-{i:03d}"
+            folder.mkdir()
+            files = {f"take{j}.wav": {"notes": [{"ms": k * 1000, "text": f"{words[(i + j + k) % 10]} "
+                                                 f"{words[(j * k) % 10]} note {k}"} for k in range(50)]}
+                     for j in range(10)}
+            sets_file(folder, "band", files)
+        catalog.refresh(force=True)
+        catalog.search_notes("chorus rushed")
+        start = time.perf_counter()
+        hits = catalog.search_notes("chorus rush", limit=50)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        assert len(hits) == 50, f"Expected a full page of hits, got {len(hits)}"
+        assert elapsed_ms < 100, f"Search too slow: {elapsed_ms:.1f} ms"
+        catalog.close()
+
+    print(f"   ✓ Note search works correctly (20000 notes searched in {elapsed_ms:.1f} ms)")
+    return True
+
+
+def test_metadata_cache():
+    """Test the shared stat-validated JSON cache."""
+    print("\nTesting Metadata Cache...")
+
+    import json
+    from shared.metadata_cache import MetadataCache
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / ".provided_names.json"
+        cache = MetadataCache(max_entries=2)
+        assert cache.load_json(path, {}) == {}, "Missing file should return the default"
+
+        path.write_text(json.dumps({"a.wav": "Song A"}), encoding="utf-8")
+        first = cache.load_json(path)
+        assert cache.load_json(path) is first, "Unchanged file should be a cache hit"
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1, f"Wrong counters: {cache.stats()}"
+
+        private = cache.load_json(path, copy=True)
+        private["b.wav"] = "Song B"
+        assert "b.wav" not in cache.load_json(path), "copy=True result shares the cached data"
+
+        # An external change (new size) is parsed again
+        path.write_text(json.dumps({"a.wav": "Song A", "c.wav": "Song C"}), encoding="utf-8")
+        assert "c.wav" in cache.load_json(path), "Changed file served from cache"
+
+        # Writes update the entry, and later changes to the saved dict don't leak in
+        data = {"a.wav": "Renamed"}
+        cache.save_json(path, data)
+        data["a.wav"] = "Changed after save"
+        misses = cache.stats()["misses"]
+        assert cache.load_json(path) == {"a.wav": "Renamed"}, "Write-through entry wrong"
+        assert cache.stats()["misses"] == misses, "Read after write should be a hit"
+        assert json.loads(path.read_text(encoding="utf-8")) == {"a.wav": "Renamed"}, "File not written"
+
+        # Unparseable files fall back to the default; the cache is bounded
+        bad = Path(tmpdir) / ".tempo.json"
+        bad.write_text("{not json", encoding="utf-8")
+        assert cache.load_json(bad, {}) == {}, "Invalid JSON should return the default"
+        for i in range(3):
+            other = Path(tmpdir) / f"other{i}.json"
+            other.write_text("[]", encoding="utf-8")
+            cache.load_json(other)
+        assert cache.stats()["entries"] == 2, "Cache grew past max_entries"
+        assert 0.0 < cache.stats()["hit_rate"] < 1.0, "Hit rate not reported"
+
+    print("   ✓ Metadata cache works correctly")
+    return True
+
+
+def test_folder_store():
+    """Test the optional per-folder store and its legacy file import/export."""
+    print("\nTesting Folder Store...")
+
+    import json
+    import os
+    import time
+    from shared import metadata_cache
+    from shared.metadata_manager import MetadataManager
+
+    def read(path):
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = Path(tmpdir)
+        names, tempo, durations = folder / ".provided_names.json", folder / ".tempo.json", folder / ".duration_cache.json"
+        names.write_text(json.dumps({"a.wav": "Song A"}), encoding="utf-8")
+        tempo.write_text(json.dumps({"a.wav": 120.0}), encoding="utf-8")
+        mm = MetadataManager(username="tester")
+        mm.set_backup_enabled(False)
+        mm.set_folder_store_enabled(True)
+        try:
+            # The first save creates the store from the legacy files; the legacy file waits for export
+            signature = metadata_cache.metadata_signature(names)
+            assert mm.save_json(names, {"a.wav": "Renamed"}), "Save failed"
+            store = read(folder / ".folder_store.json")
+            assert store["sections"][".tempo.json"] == {"a.wav": 120.0}, "Store not seeded from legacy files"
+            assert read(names) == {"a.wav": "Song A"}, "Legacy file rewritten before export"
+            assert mm.load_json(names) == {"a.wav": "Renamed"}, "Section not read from the store"
+            assert metadata_cache.metadata_signature(names) != signature, "Signature unchanged by a store write"
+
+            # A section without a legacy file gets one right away
+            metadata_cache.save_json(durations, {"a.wav": 1000})
+            assert read(durations) == {"a.wav": 1000}, "New section's legacy file not created"
+
+            # Another application edits a clean section's legacy file
+            tempo.write_text(json.dumps({"a.wav": 96.0, "b.wav": 140.0}), encoding="utf-8")
+            assert mm.load_json(tempo) == {"a.wav": 96.0, "b.wav": 140.0}, "External edit not seen"
+
+            assert mm.sync_folder_store(folder) == 2, "Expected one import and one export"
+            assert read(names) == {"a.wav": "Renamed"}, "Dirty section not exported"
+            store = read(folder / ".folder_store.json")
+            assert store["sections"][".tempo.json"]["b.wav"] == 140.0 and not store["dirty"], "Store not synced"
+            assert mm.export_dirty_folder_stores() == 0, "Nothing should be left to export"
+
+            # Annotation sets are kept as a section too
+            data = mm._create_default_annotation_sets_data()
+            assert mm.save_annotation_sets(folder, data), "Annotation save failed"
+            data["sets"][0]["files"]["a.wav"] = {"notes": [{"ms": 5, "text": "x"}]}
+            assert mm.save_annotation_sets(folder, data), "Annotation save failed"
+            assert "a.wav" not in read(mm.get_annotation_sets_file_path(folder))["sets"][0]["files"], \
+                "Annotation file rewritten before export"
+            assert "a.wav" in mm.load_annotation_sets(folder)["sets"][0]["files"], "Annotation edit lost"
+            assert mm.export_dirty_folder_stores() == 1, "Annotation section not exported"
+            assert "a.wav" in read(mm.get_annotation_sets_file_path(folder))["sets"][0]["files"], \
+                "Exported annotation file missing the edit"
+
+            # Another application edits a dirty section's legacy file: export merges both edits
+            assert mm.save_json(names, {"a.wav": "Renamed", "c.wav": "Song C"}), "Save failed"
+            names.write_text(json.dumps({"a.wav": "Renamed", "b.wav": "Song B"}), encoding="utf-8")
+            os.utime(names, ns=(time.time_ns() + 10**9,) * 2)
+            data["sets"][0]["files"]["a.wav"]["notes"].append({"ms": 9, "text": "y"})
+            assert mm.save_annotation_sets(folder, data), "Annotation save failed"
+            notes_path = mm.get_annotation_sets_file_path(folder)
+            external = read(notes_path)
+            external["sets"][0]["files"]["b.wav"] = {"notes": [{"ms": 1, "text": "z"}]}
+            external["sets"].append({"id": "other", "name": "Other", "files": {}})
+            notes_path.write_text(json.dumps(external), encoding="utf-8")
+            os.utime(notes_path, ns=(time.time_ns() + 10**9,) * 2)
+            assert mm.export_dirty_folder_stores() == 2, "Dirty sections not exported"
+            assert read(names) == {"a.wav": "Renamed", "b.wav": "Song B", "c.wav": "Song C"}, \
+                "External name edit lost on export"
+            merged = read(notes_path)
+            assert [s["id"] for s in merged["sets"]][1:] == ["other"], "External annotation set lost"
+            files = merged["sets"][0]["files"]
+            assert len(files["a.wav"]["notes"]) == 2 and "b.wav" in files, "Annotation edits not merged"
+            assert mm.load_json(names) == read(names), "Store not updated with the merge"
+        finally:
+            mm.set_folder_store_enabled(False)
+
+        # With the store off the exported legacy files are read directly
+        assert mm.load_json(names) == {"a.wav": "Renamed", "b.wav": "Song B", "c.wav": "Song C"}, \
+            "Legacy file out of date after export"
+
+    print("   ✓ Folder store works correctly")
+    return True
+
+
+def test_json_io():
+    """Test atomic, compact/readable JSON writes with each available backend."""
+    print("\nTesting JSON I/O...")
+
+    import json
+    from shared import json_io
+
+    data = {"Überraschung.wav": [1, 2.5, None, True], "nested": {"notes": [{"ms": 5, "text": "ok"}]}}
+    default_backend = json_io.get_backend()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = Path(tmpdir)
+        try:
+            for backend in ["json"] + (["orjson"] if json_io.HAVE_ORJSON else []):
+                json_io.set_backend(backend)
+                readable, cache = folder / ".provided_names.json", folder / ".duration_cache.json"
+                json_io.write_json(readable, data)
+                json_io.write_json(cache, data)
+                text = readable.read_text(encoding="utf-8")
+                assert "\n  " in text and "Überraschung" in text, f"{backend}: user data not readable"
+                assert "\n" not in cache.read_text(encoding="utf-8"), f"{backend}: cache not compact"
+                assert json_io.read_json(readable) == data == json_io.read_json(cache), f"{backend}: round trip"
+                assert json.loads(text) == data, f"{backend}: output not standard JSON"
+                assert json_io.loads(json_io.dumps({1: "a"})) == {"1": "a"}, f"{backend}: int keys"
+
+                class Gain(float):  # Like numpy.float64
+                    pass
+                assert json_io.loads(json_io.dumps({"gain": Gain(0.5)})) == {"gain": 0.5}, f"{backend}: float subclass"
+
+                # A failed serialization leaves the old file and no temporary file
+                try:
+                    json_io.write_json(readable, {"bad": object()})
+                    assert False, f"{backend}: unserializable data written"
+                except TypeError:
+                    pass
+                assert json_io.read_json(readable) == data, f"{backend}: old file damaged"
+                assert not list(folder.glob("*.tmp")), f"{backend}: temporary file left behind"
+
+                try:
+                    json_io.loads(b"{broken")
+                    assert False, f"{backend}: invalid JSON parsed"
+                except ValueError:
+                    pass
+        finally:
+            json_io.set_backend(default_backend)
+
+    print(f"   ✓ JSON I/O works correctly (default backend: {default_backend})")
+    return True
+
+
 def run_all_tests():
     """Run all tests."""
     print("=" * 60)
@@ -154,6 +751,15 @@ def run_all_tests():
         test_file_utils,
         test_backup_utils,
         test_audio_workers,
+        test_fingerprint_store,
+        test_audio_probe,
+        test_dir_walker,
+        test_library_catalog,
+        test_note_search,
+        test_annotation_journal,
+        test_metadata_cache,
+        test_folder_store,
+        test_json_io,
     ]
     
     passed = 0